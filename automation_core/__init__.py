@@ -0,0 +1,10 @@
+"""
+Shared building blocks for the site automations in this repository.
+
+The automation scripts under ``oh_ui_sessions/``, ``oh-cli/``, ``cc_deepseek/``
+and ``codex/`` are standalone programs; this package holds the pieces they
+share so that a batch of tasks does not pay the same costs over and over.
+
+Scripts put the repository root on ``sys.path`` and import modules directly,
+e.g. ``from automation_core.browser_pool import AsyncBrowserPool``.
+"""
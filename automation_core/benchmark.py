@@ -0,0 +1,311 @@
+"""
+Benchmark Suite
+
+Runs automations N times against recorded HAR fixtures (see
+``har_fixtures.py``) and reports p50/p95 wall time per named step: browser
+startup, page load, the site-specific steps, extraction and output write,
+plus the total per run. Results are written as JSON and can be compared
+against a stored baseline to catch regressions.
+
+Each benchmark is an async function registered with ``@register_benchmark``
+that receives a ``StepTimer`` and a scratch output directory; the automation
+records its own steps on the timer.
+
+Usage:
+    python -m automation_core.benchmark -n 10 --output bench.json
+    python -m automation_core.benchmark megabus_lost_item -n 10 --baseline bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from automation_core.har_fixtures import HAR_MODE_ENV
+from automation_core.scripts import load_script
+from automation_core.timing import StepTimer
+
+
+BenchmarkFunc = Callable[[StepTimer, str], Awaitable[Any]]
+
+BENCHMARKS: Dict[str, BenchmarkFunc] = {}
+
+
+def register_benchmark(name: str):
+    """Decorator that adds a benchmark to the suite"""
+    def decorator(func: BenchmarkFunc) -> BenchmarkFunc:
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+@lru_cache(maxsize=None)
+def _script(relative_path: str):
+    # Imported once so module loading is not part of any timed run
+    return load_script(relative_path)
+
+
+@register_benchmark('megabus_lost_item')
+async def bench_megabus_lost_item(timer: StepTimer, output_dir: str):
+    module = _script('oh_ui_sessions/megabus/megabus_lost_item_automation.py')
+    automation = module.MegabusLostItemAutomation(timer=timer)
+    await automation.run()
+    automation.save_results(os.path.join(output_dir, 'automation_results.json'))
+    automation.generate_markdown_report(os.path.join(output_dir, 'output.md'))
+
+
+@register_benchmark('target_job_search')
+async def bench_target_job_search(timer: StepTimer, output_dir: str):
+    module = _script('oh_ui_sessions/target_job_search/target_job_search_automation.py')
+    result = await module.TargetJobSearchAutomation(headless=True, timer=timer).search_jobs()
+    if not result.get('success'):
+        raise RuntimeError(result.get('error', 'search failed'))
+    with timer.step('output_write'), open(os.path.join(output_dir, 'results.json'), 'w') as f:
+        json.dump(result, f, indent=2)
+
+
+@register_benchmark('mta_brooklyn_maps')
+async def bench_mta_brooklyn_maps(timer: StepTimer, output_dir: str):
+    module = _script('oh_ui_sessions/mta/brooklyn_maps_automation.py')
+    maps = await module.get_brooklyn_neighborhood_maps(timer=timer)
+    if not maps:
+        raise RuntimeError('no maps found')
+    with timer.step('output_write'):
+        await module.save_results_to_file(maps, os.path.join(output_dir, 'output.md'))
+
+
+@register_benchmark('gamestop_store_locator')
+async def bench_gamestop_store_locator(timer: StepTimer, output_dir: str):
+    module = _script('oh_ui_sessions/gamestop/gamestop_automation.py')
+
+    def run():
+        # The locator is sync; its steps are timed here rather than inside run_automation
+        locator = module.GameStopStoreLocator(headless=True)
+        try:
+            with timer.step('browser_startup'):
+                locator.setup_browser()
+            with timer.step('page_load'):
+                if not locator.navigate_to_store_locator():
+                    raise RuntimeError('store locator did not load')
+            with timer.step('store_search'):
+                if not locator.search_stores('90028'):
+                    raise RuntimeError('store search failed')
+            with timer.step('extraction'):
+                stores = locator.get_store_results()
+            if not stores:
+                raise RuntimeError('no stores found')
+            with timer.step('output_write'):
+                locator.save_results('90028', stores, filename=os.path.join(output_dir, 'store_results.json'))
+        finally:
+            locator.cleanup()
+
+    await asyncio.to_thread(run)
+
+
+@register_benchmark('marriott_credit_cards')
+async def bench_marriott_credit_cards(timer: StepTimer, output_dir: str):
+    module = _script('oh_ui_sessions/marriott/marriott_credit_cards_automation.py')
+    automation = module.MarriottCreditCardsAutomation(
+        output_path=os.path.join(output_dir, 'credit_cards_data.json'), timer=timer)
+    await automation.run()
+    if not automation.results['personal_cards']:
+        raise RuntimeError('no credit cards found')
+
+
+@register_benchmark('flightaware_aeroapi_pricing')
+async def bench_flightaware_aeroapi_pricing(timer: StepTimer, output_dir: str):
+    module = _script('oh_ui_sessions/flightaware/enhanced_aeroapi_scraper.py')
+    result = await module.main(output_path=os.path.join(output_dir, 'detailed_aeroapi_pricing.json'), timer=timer)
+    if not result.get('success'):
+        raise RuntimeError(result.get('error', 'extraction failed'))
+
+
+@register_benchmark('eventbrite_event_planning')
+async def bench_eventbrite_event_planning(timer: StepTimer, output_dir: str):
+    module = _script('oh_ui_sessions/eventbrite/eventbrite_automation.py')
+    automation = module.EventbriteAutomation(timer=timer)
+    result = await automation.run()
+    if not result.get('success'):
+        raise RuntimeError(result.get('error', 'navigation failed'))
+    with timer.step('output_write'):
+        automation.save_results(os.path.join(output_dir, 'automation_results.json'))
+
+
+@register_benchmark('foxsports_mls_standings')
+async def bench_foxsports_mls_standings(timer: StepTimer, output_dir: str):
+    module = _script('codex/foxsports-mls-standings-gpt5mini/fetch_standings.py')
+    with timer.step('fetch_standings'):
+        standings = await asyncio.to_thread(module.fetch_standings)
+    if not standings:
+        raise RuntimeError('no standings rows')
+    with timer.step('output_write'), open(os.path.join(output_dir, 'output.md'), 'w', encoding='utf-8') as f:
+        f.write(module.render_markdown(standings))
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linear-interpolated percentile of ``values`` (q in 0-100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize_runs(runs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per-step statistics (in ms) over successful runs, including the run total"""
+    samples: Dict[str, List[float]] = {}
+    for run in runs:
+        if run['error']:
+            continue
+        for step, seconds in list(run['steps'].items()) + [('total', run['total'])]:
+            samples.setdefault(step, []).append(seconds * 1000)
+
+    return {
+        step: {
+            'runs': len(values),
+            'p50_ms': round(percentile(values, 50), 1),
+            'p95_ms': round(percentile(values, 95), 1),
+            'mean_ms': round(sum(values) / len(values), 1),
+            'max_ms': round(max(values), 1),
+        }
+        for step, values in samples.items()
+    }
+
+
+async def run_benchmark(name: str, iterations: int = 5, warmup: int = 1) -> Dict[str, Any]:
+    """Run one benchmark ``warmup + iterations`` times and summarize the measured runs"""
+    func = BENCHMARKS[name]
+    runs = []
+    for i in range(warmup + iterations):
+        timer = StepTimer()
+        error = None
+        with tempfile.TemporaryDirectory() as output_dir:
+            started = time.perf_counter()
+            try:
+                await func(timer, output_dir)
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            total = time.perf_counter() - started
+        if i < warmup:
+            continue
+        runs.append({'steps': timer.totals(), 'total': total, 'error': error})
+        print(f"{name} run {i - warmup + 1}/{iterations}: {total:.2f}s" + (f" (failed: {error})" if error else ""))
+
+    return {
+        'iterations': iterations,
+        'failures': sum(1 for run in runs if run['error']),
+        'errors': sorted({run['error'] for run in runs if run['error']}),
+        'steps': summarize_runs(runs),
+    }
+
+
+async def run_suite(names: Optional[List[str]] = None, iterations: int = 5, warmup: int = 1,
+                    har_mode: Optional[str] = 'replay') -> Dict[str, Any]:
+    """Run the named benchmarks (default: all) one after another"""
+    names = names or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(unknown)}. Known: {', '.join(BENCHMARKS)}")
+
+    previous_mode = os.environ.get(HAR_MODE_ENV)
+    if har_mode:
+        os.environ[HAR_MODE_ENV] = har_mode
+    try:
+        results = {}
+        for name in names:
+            results[name] = await run_benchmark(name, iterations, warmup)
+    finally:
+        if previous_mode is None:
+            os.environ.pop(HAR_MODE_ENV, None)
+        else:
+            os.environ[HAR_MODE_ENV] = previous_mode
+
+    return {
+        'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'har_mode': har_mode or os.environ.get(HAR_MODE_ENV, 'live'),
+        'iterations': iterations,
+        'benchmarks': results,
+    }
+
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2,
+                        min_delta_ms: float = 50.0, metric: str = 'p50_ms') -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Compare ``metric`` per benchmark step against a baseline report.
+
+    A step regresses when it is more than ``threshold`` (fractional) slower
+    and at least ``min_delta_ms`` slower, so tiny steps don't flag on noise.
+    """
+    comparison = {'regressions': [], 'improvements': []}
+    for name, result in report['benchmarks'].items():
+        baseline_steps = baseline.get('benchmarks', {}).get(name, {}).get('steps', {})
+        for step, stats in result['steps'].items():
+            if step not in baseline_steps:
+                continue
+            before, after = baseline_steps[step][metric], stats[metric]
+            delta = after - before
+            if abs(delta) < min_delta_ms or before <= 0:
+                continue
+            change = delta / before
+            entry = {'benchmark': name, 'step': step, 'metric': metric,
+                     'baseline': before, 'current': after, 'change': round(change, 3)}
+            if change > threshold:
+                comparison['regressions'].append(entry)
+            elif change < -threshold:
+                comparison['improvements'].append(entry)
+    return comparison
+
+
+def print_report(report: Dict[str, Any]):
+    for name, result in report['benchmarks'].items():
+        print(f"\n{name} ({result['iterations']} runs, {result['failures']} failed)")
+        for step, stats in result['steps'].items():
+            print(f"  {step:<20} p50 {stats['p50_ms']:>9.1f} ms   p95 {stats['p95_ms']:>9.1f} ms")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the site automations per step')
+    parser.add_argument('benchmarks', nargs='*', help=f"Benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument('-n', '--iterations', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1, help='Unmeasured runs before the measured ones')
+    parser.add_argument('--har-mode', default='replay', choices=['live', 'record', 'replay'])
+    parser.add_argument('--output', help='Write the JSON report here')
+    parser.add_argument('--baseline', help='Compare against a previous JSON report')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Fractional slowdown that counts as a regression')
+    parser.add_argument('--min-delta-ms', type=float, default=50.0)
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_suite(args.benchmarks, args.iterations, args.warmup, args.har_mode))
+    print_report(report)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        comparison = compare_to_baseline(report, baseline, args.threshold, args.min_delta_ms)
+        report['comparison'] = comparison
+        for entry in comparison['regressions']:
+            print(f"REGRESSION {entry['benchmark']}.{entry['step']}: "
+                  f"{entry['baseline']} -> {entry['current']} ms ({entry['change']:+.0%})")
+        for entry in comparison['improvements']:
+            print(f"improved   {entry['benchmark']}.{entry['step']}: "
+                  f"{entry['baseline']} -> {entry['current']} ms ({entry['change']:+.0%})")
+        if comparison['regressions']:
+            exit_code = 1
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
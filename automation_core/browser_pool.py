@@ -0,0 +1,449 @@
+"""
+Shared Browser Pool
+
+Keeps a small number of Chromium processes warm and hands out browser
+contexts and pages from them, so a batch of tasks pays the browser cold start
+once instead of once per task.
+
+Two flavours are provided because Playwright's sync and async APIs cannot
+share objects:
+
+- ``AsyncBrowserPool`` for the ``playwright.async_api`` scripts
+- ``SyncBrowserPool`` for the ``playwright.sync_api`` scripts
+
+Both offer the same operations:
+
+- ``new_context(**options)``: a fresh, isolated context (own cookies/storage)
+  that is closed when the block exits
+- ``page(**options)``: a page from a pooled context that is shared between
+  callers and replaced after ``max_pages_per_context`` pages
+- ``acquire_context()``/``release_context()``: the non-context-manager form
+  of ``new_context`` for classes with separate setup/cleanup methods
+
+Scripts that may or may not be given a pool use ``async_browser_context`` /
+``sync_browser_context``, which fall back to launching a private browser.
+
+Usage:
+    async with AsyncBrowserPool(size=2) as pool:
+        async with pool.new_context(user_agent=UA) as context:
+            page = await context.new_page()
+            ...
+"""
+
+import asyncio
+import atexit
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, List, Optional
+
+
+DEFAULT_LAUNCH_ARGS = [
+    '--no-sandbox',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-dev-shm-usage',
+]
+
+
+class _PooledContext:
+    """A shared context and how many pages it has handed out"""
+
+    def __init__(self, context, options: Optional[Dict[str, Any]] = None):
+        self.context = context
+        self.options = dict(options or {})
+        self.pages_served = 0
+        self.active_pages = 0
+        self.retired = False
+
+
+class _BrowserSlot:
+    """One warm browser process and the pooled context living in it"""
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.current: Optional[_PooledContext] = None
+        self.active_contexts = 0
+        # Serializes connect/rotate/create in the async pool; made on first use
+        # so it binds to the running event loop
+        self.lock = None
+
+    @property
+    def load(self) -> int:
+        pages = self.current.active_pages if self.current else 0
+        return pages + self.active_contexts
+
+
+class _BrowserPoolBase:
+    """Bookkeeping shared by the sync and async pools (no Playwright calls)"""
+
+    def __init__(self, size: int = 1, headless: bool = True, max_pages_per_context: int = 20,
+                 launch_args: Optional[List[str]] = None, context_options: Optional[Dict[str, Any]] = None,
+                 cdp_endpoint: Optional[str] = None):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        if max_pages_per_context < 1:
+            raise ValueError("max_pages_per_context must be at least 1")
+        self.size = size
+        self.headless = headless
+        self.max_pages_per_context = max_pages_per_context
+        self.launch_args = list(DEFAULT_LAUNCH_ARGS if launch_args is None else launch_args)
+        self.context_options = dict(context_options or {})
+        # Connect to an already running Chrome (--remote-debugging-port) instead
+        # of launching one, so separate worker processes can share a browser
+        self.cdp_endpoint = cdp_endpoint
+        self.slots: List[_BrowserSlot] = []
+        self._context_slots: Dict[int, _BrowserSlot] = {}
+        self.stats = {
+            'browser_launches': 0,
+            'contexts_created': 0,
+            'contexts_recycled': 0,
+            'pages_served': 0,
+        }
+
+    def _launch_options(self) -> Dict[str, Any]:
+        return {'headless': self.headless, 'args': self.launch_args}
+
+    def _merged_context_options(self, overrides: Dict[str, Any]) -> Dict[str, Any]:
+        options = dict(self.context_options)
+        options.update(overrides)
+        return options
+
+    def _pick_slot(self) -> _BrowserSlot:
+        """Least loaded browser; ties go to the earliest slot"""
+        if not self.slots:
+            raise RuntimeError("Browser pool is not started")
+        return min(self.slots, key=lambda slot: slot.load)
+
+    def _rotate(self, slot: _BrowserSlot) -> Optional[_PooledContext]:
+        """
+        Retire the slot's pooled context once it has served its quota.
+
+        Returns the retired context if nothing is using it any more and it
+        should be closed now; otherwise it is closed by the last ``_release``.
+        """
+        pooled = slot.current
+        if pooled is None or pooled.pages_served < self.max_pages_per_context:
+            return None
+        pooled.retired = True
+        slot.current = None
+        self.stats['contexts_recycled'] += 1
+        return pooled if pooled.active_pages == 0 else None
+
+    def _pooled_options(self, slot: _BrowserSlot, overrides: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Context options for a ``page()`` lease on ``slot``.
+
+        Pages share the slot's context, so a lease cannot change its options;
+        asking for different ones raises instead of silently ignoring them.
+        Use ``new_context`` for a context with its own options.
+        """
+        options = self._merged_context_options(overrides)
+        if slot.current is not None and slot.current.options != options:
+            raise ValueError("page() options differ from the pooled context's; use new_context() instead")
+        return options
+
+    def _lease(self, pooled: _PooledContext):
+        pooled.pages_served += 1
+        pooled.active_pages += 1
+        self.stats['pages_served'] += 1
+
+    def _release(self, pooled: _PooledContext) -> bool:
+        """Return True when a retired context has no pages left and can be closed"""
+        pooled.active_pages -= 1
+        return pooled.retired and pooled.active_pages == 0
+
+    def _track_context(self, context, slot: _BrowserSlot):
+        slot.active_contexts += 1
+        self._context_slots[id(context)] = slot
+        self.stats['contexts_created'] += 1
+
+    def _untrack_context(self, context):
+        slot = self._context_slots.pop(id(context), None)
+        if slot is not None:
+            slot.active_contexts -= 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return counters describing how much work the pool has saved"""
+        return dict(self.stats, browsers=len(self.slots))
+
+
+class AsyncBrowserPool(_BrowserPoolBase):
+    """Browser pool for scripts built on ``playwright.async_api``"""
+
+    async def start(self):
+        """Launch (or connect to) the pool's browsers"""
+        if self.slots:
+            return self
+        from playwright.async_api import async_playwright
+        self._playwright = await async_playwright().start()
+        for _ in range(self.size):
+            self.slots.append(_BrowserSlot(await self._launch()))
+        return self
+
+    async def _launch(self):
+        self.stats['browser_launches'] += 1
+        if self.cdp_endpoint:
+            return await self._playwright.chromium.connect_over_cdp(self.cdp_endpoint)
+        return await self._playwright.chromium.launch(**self._launch_options())
+
+    async def _ensure_connected(self, slot: _BrowserSlot):
+        """Relaunch a browser that crashed or was closed underneath us"""
+        if not slot.browser.is_connected():
+            print("Pooled browser disconnected, relaunching...")
+            slot.browser = await self._launch()
+            slot.current = None
+
+    async def acquire_context(self, **options):
+        """Create a fresh isolated context; pair with ``release_context``"""
+        slot = self._pick_slot()
+        await self._ensure_connected(slot)
+        context = await slot.browser.new_context(**self._merged_context_options(options))
+        self._track_context(context, slot)
+        return context
+
+    async def release_context(self, context):
+        """Close a context obtained from ``acquire_context``"""
+        self._untrack_context(context)
+        try:
+            await context.close()
+        except Exception as e:
+            print(f"Error closing pooled context: {e}")
+
+    @asynccontextmanager
+    async def new_context(self, **options):
+        """Yield a fresh isolated context that is closed on exit"""
+        context = await self.acquire_context(**options)
+        try:
+            yield context
+        finally:
+            await self.release_context(context)
+
+    @asynccontextmanager
+    async def page(self, **options):
+        """Yield a page from a shared context, recycling the context after N pages"""
+        slot = self._pick_slot()
+        if slot.lock is None:
+            slot.lock = asyncio.Lock()
+        # Without the lock, callers arriving together all see no context and
+        # each create one, orphaning all but the last
+        async with slot.lock:
+            await self._ensure_connected(slot)
+            retired = self._rotate(slot)
+            if retired is not None:
+                await retired.context.close()
+            merged = self._pooled_options(slot, options)
+            if slot.current is None:
+                context = await slot.browser.new_context(**merged)
+                slot.current = _PooledContext(context, merged)
+                self.stats['contexts_created'] += 1
+            pooled = slot.current
+            self._lease(pooled)
+        page = None
+        try:
+            page = await pooled.context.new_page()
+            yield page
+        finally:
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+            if self._release(pooled):
+                await pooled.context.close()
+
+    async def close(self):
+        """Close every browser and stop Playwright"""
+        for slot in self.slots:
+            try:
+                await slot.browser.close()
+            except Exception:
+                pass
+        self.slots = []
+        self._context_slots = {}
+        if getattr(self, '_playwright', None) is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+class SyncBrowserPool(_BrowserPoolBase):
+    """Browser pool for scripts built on ``playwright.sync_api``"""
+
+    def start(self):
+        """Launch (or connect to) the pool's browsers"""
+        if self.slots:
+            return self
+        from playwright.sync_api import sync_playwright
+        self._playwright = sync_playwright().start()
+        for _ in range(self.size):
+            self.slots.append(_BrowserSlot(self._launch()))
+        return self
+
+    def _launch(self):
+        self.stats['browser_launches'] += 1
+        if self.cdp_endpoint:
+            return self._playwright.chromium.connect_over_cdp(self.cdp_endpoint)
+        return self._playwright.chromium.launch(**self._launch_options())
+
+    def _ensure_connected(self, slot: _BrowserSlot):
+        """Relaunch a browser that crashed or was closed underneath us"""
+        if not slot.browser.is_connected():
+            print("Pooled browser disconnected, relaunching...")
+            slot.browser = self._launch()
+            slot.current = None
+
+    def acquire_context(self, **options):
+        """Create a fresh isolated context; pair with ``release_context``"""
+        slot = self._pick_slot()
+        self._ensure_connected(slot)
+        context = slot.browser.new_context(**self._merged_context_options(options))
+        self._track_context(context, slot)
+        return context
+
+    def release_context(self, context):
+        """Close a context obtained from ``acquire_context``"""
+        self._untrack_context(context)
+        try:
+            context.close()
+        except Exception as e:
+            print(f"Error closing pooled context: {e}")
+
+    @contextmanager
+    def new_context(self, **options):
+        """Yield a fresh isolated context that is closed on exit"""
+        context = self.acquire_context(**options)
+        try:
+            yield context
+        finally:
+            self.release_context(context)
+
+    @contextmanager
+    def page(self, **options):
+        """Yield a page from a shared context, recycling the context after N pages"""
+        slot = self._pick_slot()
+        self._ensure_connected(slot)
+        retired = self._rotate(slot)
+        if retired is not None:
+            retired.context.close()
+        merged = self._pooled_options(slot, options)
+        if slot.current is None:
+            context = slot.browser.new_context(**merged)
+            slot.current = _PooledContext(context, merged)
+            self.stats['contexts_created'] += 1
+        pooled = slot.current
+        self._lease(pooled)
+        page = None
+        try:
+            page = pooled.context.new_page()
+            yield page
+        finally:
+            if page is not None:
+                try:
+                    page.close()
+                except Exception:
+                    pass
+            if self._release(pooled):
+                pooled.context.close()
+
+    def close(self):
+        """Close every browser and stop Playwright"""
+        for slot in self.slots:
+            try:
+                slot.browser.close()
+            except Exception:
+                pass
+        self.slots = []
+        self._context_slots = {}
+        if getattr(self, '_playwright', None) is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+_shared_sync_pool: Optional[SyncBrowserPool] = None
+_shared_lock = threading.Lock()
+
+
+def shared_sync_pool(**options) -> SyncBrowserPool:
+    """
+    Return the process-wide sync pool, starting it on first use.
+
+    Options only take effect on the first call. The pool is closed at exit.
+    Async scripts should instead create one ``AsyncBrowserPool`` per batch,
+    since its objects are bound to the event loop that created them.
+    """
+    global _shared_sync_pool
+    with _shared_lock:
+        if _shared_sync_pool is None:
+            _shared_sync_pool = SyncBrowserPool(**options).start()
+            atexit.register(_shared_sync_pool.close)
+        return _shared_sync_pool
+
+
+@asynccontextmanager
+async def async_browser_context(pool: Optional[AsyncBrowserPool] = None, headless: bool = True,
+                                launch_args: Optional[List[str]] = None, **context_options):
+    """
+    Yield a browser context from ``pool``, or from a private browser if no pool is given.
+
+    Lets a script accept an optional pool while keeping its standalone behaviour.
+    """
+    if pool is not None:
+        async with pool.new_context(**context_options) as context:
+            yield context
+        return
+
+    from playwright.async_api import async_playwright
+    async with async_playwright() as p:
+        launch_options = {'headless': headless}
+        if launch_args is not None:
+            launch_options['args'] = launch_args
+        browser = await p.chromium.launch(**launch_options)
+        context = None
+        try:
+            context = await browser.new_context(**context_options)
+            yield context
+        finally:
+            # A recorded HAR is only written when its context closes
+            if context is not None:
+                await context.close()
+            await browser.close()
+
+
+@contextmanager
+def sync_browser_context(pool: Optional[SyncBrowserPool] = None, headless: bool = True,
+                         launch_args: Optional[List[str]] = None, **context_options):
+    """
+    Yield a browser context from ``pool``, or from a private browser if no pool is given.
+
+    Lets a script accept an optional pool while keeping its standalone behaviour.
+    """
+    if pool is not None:
+        with pool.new_context(**context_options) as context:
+            yield context
+        return
+
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as p:
+        launch_options = {'headless': headless}
+        if launch_args is not None:
+            launch_options['args'] = launch_args
+        browser = p.chromium.launch(**launch_options)
+        context = None
+        try:
+            context = browser.new_context(**context_options)
+            yield context
+        finally:
+            # A recorded HAR is only written when its context closes
+            if context is not None:
+                context.close()
+            browser.close()
@@ -0,0 +1,272 @@
+"""
+Change Detection
+
+Pages such as Marriott's credit cards, FlightAware's AeroAPI plans, the
+Megabus FAQ and the MTA Brooklyn map list rarely change. A ``ChangeDetector``
+fingerprints the sources a task reads and keeps the fingerprints next to the
+run they produced in the result store (see ``result_store.py``).
+
+- ``check_http(urls)`` sends a conditional GET (``If-None-Match`` /
+  ``If-Modified-Since``) for each URL. A 304 counts as unchanged. Otherwise
+  the body is normalized (visible text by default) and hashed.
+- ``check_dom_async(page, selector)`` / ``check_dom_sync`` hash the text of a
+  DOM region after navigation, for pages that only render in the browser.
+
+A source whose normalized content is blank (no text, or only empty lists,
+e.g. a client-rendered page fetched over HTTP) is unknown: it never counts as
+unchanged and is not fingerprinted. Only check a URL over HTTP when its body
+carries the data; otherwise check the rendered DOM.
+
+When every checked source matches the fingerprints of the last stored run,
+``reuse()`` returns that run's result and the extraction is skipped.
+Otherwise the task runs and stores its result, and ``commit(run_id, result)``
+saves the new fingerprints and returns what changed since the previous run.
+
+Detection is skipped during HAR record and replay, so fixtures and benchmarks
+always exercise the full run, and when ``AUTOMATION_CHANGE_DETECTION=0``.
+
+Usage:
+    detector = ChangeDetector('marriott_cards')
+    if detector.check_http([URL]):
+        return detector.reuse()
+    result = scrape()
+    run_id = shared_result_store().append('marriott_cards', result)
+    print(describe_changes(detector.commit(run_id, result)))
+"""
+
+import hashlib
+import json
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from automation_core.http_first import HttpClient, http_allowed, shared_http_client
+from automation_core.result_store import ResultStore, shared_result_store
+
+
+CHANGE_DETECTION_ENV = 'AUTOMATION_CHANGE_DETECTION'
+
+# Result fields that differ on every run and are left out of diffs
+VOLATILE_KEYS = frozenset({
+    'timestamp', 'search_timestamp', 'resource_blocking', 'http_cache', 'wait_timings', 'timings',
+})
+
+# Text of every element matching the selector, whitespace collapsed; null when nothing matches
+REGION_TEXT_JS = r"""
+(selector) => {
+    const elements = Array.from(document.querySelectorAll(selector));
+    if (!elements.length) return null;
+    return elements.map((el) => (el.textContent || '').replace(/\s+/g, ' ').trim()).join('\n');
+}
+"""
+
+_INVISIBLE_BLOCKS = re.compile(r'<(script|style|noscript|template)\b.*?</\1\s*>|<!--.*?-->', re.IGNORECASE | re.DOTALL)
+_TAGS = re.compile(r'<[^>]+>')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def visible_text(html: str) -> str:
+    """Text outside tags, scripts and styles, so nonces and tracking ids don't count as changes"""
+    return _WHITESPACE.sub(' ', _TAGS.sub(' ', _INVISIBLE_BLOCKS.sub(' ', html))).strip()
+
+
+def fingerprint(content: Any) -> str:
+    """SHA-256 of a string, or of the canonical JSON of any other value"""
+    if not isinstance(content, str):
+        content = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def is_blank(content: Any) -> bool:
+    """True for None, whitespace and containers holding only blank values"""
+    if content is None:
+        return True
+    if isinstance(content, str):
+        return not content.strip()
+    if isinstance(content, dict):
+        return all(is_blank(value) for value in content.values())
+    if isinstance(content, (list, tuple, set, frozenset)):
+        return all(is_blank(value) for value in content)
+    return False
+
+
+def detection_enabled() -> bool:
+    """On for live runs unless AUTOMATION_CHANGE_DETECTION is 0"""
+    return http_allowed() and os.environ.get(CHANGE_DETECTION_ENV, '1').strip().lower() not in ('0', 'false', 'no')
+
+
+def diff_results(old: Any, new: Any, ignore: Sequence[str] = VOLATILE_KEYS, path: str = '') -> List[Dict[str, Any]]:
+    """
+    Changes between two results as ``{'path', 'old', 'new'}`` entries.
+
+    Dicts are compared key by key and lists item by item; a missing side is
+    None. Keys in ``ignore`` are skipped at any depth.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = []
+        for key in list(old) + [key for key in new if key not in old]:
+            if key not in ignore:
+                changes += diff_results(old.get(key), new.get(key), ignore, f'{path}.{key}' if path else str(key))
+        return changes
+    if isinstance(old, list) and isinstance(new, list):
+        changes = []
+        for i in range(max(len(old), len(new))):
+            changes += diff_results(old[i] if i < len(old) else None, new[i] if i < len(new) else None,
+                                    ignore, f'{path}[{i}]')
+        return changes
+    return [] if old == new else [{'path': path, 'old': old, 'new': new}]
+
+
+def describe_changes(changes: Optional[List[Dict[str, Any]]], limit: int = 10) -> str:
+    """Short human-readable summary of ``diff_results`` output"""
+    if changes is None:
+        return "No previous run to compare with"
+    if not changes:
+        return "No changes since the previous run"
+    lines = [f"{len(changes)} change(s) since the previous run:"]
+    for change in changes[:limit]:
+        lines.append(f"  {change['path']}: {change['old']!r} -> {change['new']!r}")
+    if len(changes) > limit:
+        lines.append(f"  ... and {len(changes) - limit} more")
+    return "\n".join(lines)
+
+
+class ChangeDetector:
+    """Fingerprints a task's sources and reuses the last stored result when none changed"""
+
+    def __init__(self, task: str, store: Optional[ResultStore] = None, client: Optional[HttpClient] = None,
+                 enabled: Optional[bool] = None):
+        self.task = task
+        self.store = store or shared_result_store()
+        self.client = client
+        self.enabled = detection_enabled() if enabled is None else enabled
+        self.stored = self.store.fingerprints(task) if self.enabled else {}
+        # Fingerprints seen in this run, saved by commit() or reuse()
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.stats = {'checked': 0, 'not_modified': 0, 'unchanged': 0, 'changed': 0, 'unknown': 0,
+                      'errors': 0}
+        # Stored run whose fingerprints the last successful check matched
+        self.previous_run_id: Optional[str] = None
+
+    def _observe(self, source: str, digest: Optional[str], etag: Optional[str] = None,
+                 last_modified: Optional[str] = None) -> bool:
+        stored = self.stored.get(source)
+        if digest is None and stored:
+            # 304 Not Modified: keep the stored digest
+            digest = stored['digest']
+            etag = etag or stored['etag']
+            last_modified = last_modified or stored['last_modified']
+        self.pending[source] = {'digest': digest, 'etag': etag, 'last_modified': last_modified}
+        unchanged = stored is not None and stored['digest'] == digest
+        self.stats['unchanged' if unchanged else 'changed'] += 1
+        return unchanged
+
+    def _unchanged(self, sources: Sequence[str]) -> bool:
+        run_ids = set()
+        for source in sources:
+            stored = self.stored.get(source)
+            if source not in self.pending or not stored or stored['digest'] != self.pending[source]['digest']:
+                return False
+            run_ids.add(stored['run_id'])
+        if len(run_ids) != 1:
+            return False
+        run_id = run_ids.pop()
+        try:
+            self.store.get(self.task, run_id)
+        except KeyError:
+            return False
+        self.previous_run_id = run_id
+        return True
+
+    def check_http(self, urls: Sequence[str], normalize: Callable[[str], Any] = visible_text,
+                   timeout: Optional[float] = None) -> bool:
+        """Conditional GET of every URL; True when all match the last run's fingerprints"""
+        if not self.enabled:
+            return False
+        client = self.client or shared_http_client()
+        ok = True
+        for url in urls:
+            stored = self.stored.get(url) or {}
+            headers = {}
+            if stored.get('etag'):
+                headers['If-None-Match'] = stored['etag']
+            if stored.get('last_modified'):
+                headers['If-Modified-Since'] = stored['last_modified']
+            self.stats['checked'] += 1
+            try:
+                response = client.get(url, timeout=timeout, headers=headers)
+            except Exception as e:
+                print(f"Change check for {url} failed: {e}")
+                self.stats['errors'] += 1
+                ok = False
+                continue
+            response_headers = {key.lower(): value for key, value in (response.headers or {}).items()}
+            if response.status_code == 304 and stored:
+                self.stats['not_modified'] += 1
+                ok = self._observe(url, None) and ok
+            elif response.status_code >= 400:
+                print(f"Change check for {url} got HTTP {response.status_code}")
+                self.stats['errors'] += 1
+                ok = False
+            else:
+                content = normalize(response.text)
+                if is_blank(content):
+                    # Nothing to compare, e.g. the data only appears once scripts run
+                    print(f"Change check for {url} found nothing to fingerprint")
+                    self.stats['unknown'] += 1
+                    ok = False
+                    continue
+                ok = self._observe(url, fingerprint(content), response_headers.get('etag'),
+                                   response_headers.get('last-modified')) and ok
+        return ok and self._unchanged(urls)
+
+    async def check_dom_async(self, page, selector: str) -> bool:
+        """Hash the text of a DOM region; True when it and every other checked source are unchanged"""
+        if not self.enabled:
+            return False
+        self.stats['checked'] += 1
+        text = await page.evaluate(REGION_TEXT_JS, selector)
+        return self._observe_dom(selector, text)
+
+    def check_dom_sync(self, page, selector: str) -> bool:
+        """Synchronous ``check_dom_async``"""
+        if not self.enabled:
+            return False
+        self.stats['checked'] += 1
+        return self._observe_dom(selector, page.evaluate(REGION_TEXT_JS, selector))
+
+    def _observe_dom(self, selector: str, text: Optional[str]) -> bool:
+        if text is None:
+            self.stats['errors'] += 1
+            return False
+        if is_blank(text):
+            self.stats['unknown'] += 1
+            return False
+        source = f'dom:{selector}'
+        return self._observe(source, fingerprint(text)) and self._unchanged([source])
+
+    def reuse(self) -> Dict[str, Any]:
+        """The stored result the last check matched; this run's fingerprints now point at it"""
+        if self.previous_run_id is None:
+            raise RuntimeError("reuse() needs a check that found no changes")
+        result = self.store.get(self.task, self.previous_run_id)
+        self._save(self.previous_run_id)
+        return result
+
+    def commit(self, run_id: str, result: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Save this run's fingerprints for ``run_id``; returns the diff from the previous run, if any"""
+        previous = None
+        previous_runs = [run for run in self.store.runs(self.task, limit=2) if run['run_id'] != run_id]
+        if previous_runs:
+            previous = self.store.get(self.task, previous_runs[0]['run_id'])
+        self._save(run_id)
+        return None if previous is None else diff_results(previous, result)
+
+    def _save(self, run_id: str):
+        for source, fp in self.pending.items():
+            self.store.save_fingerprint(self.task, source, run_id, **fp)
+        self.stored.update({source: dict(fp, run_id=run_id) for source, fp in self.pending.items()})
+        self.pending = {}
+
+    def report(self) -> Dict[str, Any]:
+        return dict(self.stats, enabled=self.enabled, sources=sorted(self.stored))
@@ -0,0 +1,75 @@
+"""
+HAR Record/Replay Fixtures
+
+Lets an automation run against a recorded copy of the site instead of the
+live one. The mode comes from the ``AUTOMATION_HAR_MODE`` environment
+variable, so the existing tests switch over without code changes:
+
+- ``live`` (default): nothing is routed, the real site is used
+- ``record``: every request is made live and saved to ``<name>.har``
+  (written when the browser context is closed)
+- ``replay``: every request is answered from ``<name>.har`` via routing;
+  requests missing from the HAR are aborted, so nothing reaches the network
+
+HAR files live in ``automation_core/fixtures/har`` unless
+``AUTOMATION_HAR_DIR`` points elsewhere. Each automation uses its own HAR
+name, passed when it attaches the fixture to its context.
+
+Usage:
+    AUTOMATION_HAR_MODE=record python -m pytest oh_ui_sessions/marriott/test_marriott_automation.py
+    AUTOMATION_HAR_MODE=replay python -m pytest oh_ui_sessions/marriott/test_marriott_automation.py
+"""
+
+import os
+from typing import Optional
+
+
+HAR_MODE_ENV = 'AUTOMATION_HAR_MODE'
+HAR_DIR_ENV = 'AUTOMATION_HAR_DIR'
+HAR_MODES = ('live', 'record', 'replay')
+DEFAULT_HAR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'har')
+
+
+def har_mode() -> str:
+    """Return the current HAR mode from the environment"""
+    mode = os.environ.get(HAR_MODE_ENV, 'live').strip().lower() or 'live'
+    if mode not in HAR_MODES:
+        raise ValueError(f"{HAR_MODE_ENV} must be one of {', '.join(HAR_MODES)}, got {mode!r}")
+    return mode
+
+
+def har_path(name: str) -> str:
+    """Return the HAR file used for the automation called ``name``"""
+    return os.path.join(os.environ.get(HAR_DIR_ENV, DEFAULT_HAR_DIR), f'{name}.har')
+
+
+def _route_options(name: str, mode: str):
+    path = har_path(name)
+    if mode == 'record':
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Embedded bodies keep each fixture a single self-contained file
+        return path, {'update': True, 'update_content': 'embed', 'update_mode': 'full'}
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"No HAR fixture at {path}; record it first with {HAR_MODE_ENV}=record")
+    return path, {'not_found': 'abort'}
+
+
+async def attach_har_async(context, name: str, mode: Optional[str] = None) -> str:
+    """Record to or replay from the ``name`` fixture on an async context; returns the mode used"""
+    mode = mode or har_mode()
+    if mode != 'live':
+        path, options = _route_options(name, mode)
+        await context.route_from_har(path, **options)
+        print(f"HAR {mode}: {path}")
+    return mode
+
+
+def attach_har_sync(context, name: str, mode: Optional[str] = None) -> str:
+    """Record to or replay from the ``name`` fixture on a sync context; returns the mode used"""
+    mode = mode or har_mode()
+    if mode != 'live':
+        path, options = _route_options(name, mode)
+        context.route_from_har(path, **options)
+        print(f"HAR {mode}: {path}")
+    return mode
@@ -0,0 +1,361 @@
+"""
+Persistent HTTP Cache
+
+Every run starts from an empty browser profile, so each script downloads the
+same JS bundles, stylesheets, fonts and images again. ``BrowserHttpCache``
+routes those requests through a size-capped on-disk cache that is shared
+across runs and worker processes:
+
+- an entry still fresh by ``Cache-Control: max-age`` / ``Expires`` is served
+  straight from disk without touching the network
+- a stale entry with an ``ETag`` or ``Last-Modified`` is revalidated with a
+  conditional request; a 304 is answered from disk
+- everything else is fetched, stored if cacheable, and passed through
+
+Bodies are files under the cache directory; the index is a SQLite database, so
+concurrent workers can share one cache. The least recently used entries are
+evicted once the total size goes over the cap.
+
+The cache is opt-in: set ``AUTOMATION_HTTP_CACHE`` to a directory (and
+optionally ``AUTOMATION_HTTP_CACHE_MB``, default 500). It stays off during
+HAR record/replay, whose fixtures must see every request.
+
+Usage:
+    cache = await attach_http_cache_async(context)    # None when disabled
+    ...
+    if cache:
+        print(cache.summary())
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from automation_core.har_fixtures import har_mode
+
+
+HTTP_CACHE_ENV = 'AUTOMATION_HTTP_CACHE'
+HTTP_CACHE_SIZE_ENV = 'AUTOMATION_HTTP_CACHE_MB'
+DEFAULT_MAX_MB = 500
+DEFAULT_CACHEABLE_TYPES = frozenset({'script', 'stylesheet', 'font', 'image'})
+
+# Set by the transport, not the resource; a cached body is already decoded
+_UNSTORED_HEADERS = frozenset({'content-encoding', 'content-length', 'transfer-encoding', 'connection',
+                               'keep-alive', 'set-cookie', 'date', 'age'})
+
+_MAX_AGE = re.compile(r'(?:^|,)\s*max-age\s*=\s*"?(\d+)', re.IGNORECASE)
+
+
+def cache_policy(headers: Dict[str, str], now: float) -> Tuple[bool, float]:
+    """
+    Return (storable, expires_at) for a 200 response's headers.
+
+    ``expires_at <= now`` means the entry must be revalidated before use.
+    """
+    headers = {name.lower(): value for name, value in headers.items()}
+    cache_control = headers.get('cache-control', '').lower()
+    if 'no-store' in cache_control or 'set-cookie' in headers:
+        return False, now
+    validated = 'etag' in headers or 'last-modified' in headers
+    if 'no-cache' in cache_control:
+        return validated, now
+    match = _MAX_AGE.search(cache_control)
+    if match:
+        return True, now + int(match.group(1))
+    if 'expires' in headers:
+        try:
+            return True, parsedate_to_datetime(headers['expires']).timestamp()
+        except (TypeError, ValueError):
+            return validated, now
+    return validated, now
+
+
+class DiskCache:
+    """URL-keyed, size-capped LRU store of response bodies with a SQLite index"""
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024,
+                 clock: Callable[[], float] = time.time):
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_bytes = max_bytes
+        self.clock = clock
+        os.makedirs(os.path.join(self.directory, 'bodies'), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(self.directory, 'index.sqlite'), timeout=30,
+                                   check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            ' url TEXT PRIMARY KEY, file TEXT NOT NULL, status INTEGER NOT NULL, headers TEXT NOT NULL,'
+            ' etag TEXT, last_modified TEXT, size INTEGER NOT NULL, expires_at REAL NOT NULL,'
+            ' stored_at REAL NOT NULL, last_access REAL NOT NULL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access)')
+
+    def _file(self, url: str) -> str:
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(digest[:2], digest)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Index entry for ``url`` (without the body), or None"""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT url, file, status, headers, etag, last_modified, size, expires_at FROM entries WHERE url = ?',
+                (url,)).fetchone()
+        if row is None:
+            return None
+        keys = ('url', 'file', 'status', 'headers', 'etag', 'last_modified', 'size', 'expires_at')
+        entry = dict(zip(keys, row))
+        entry['headers'] = json.loads(entry['headers'])
+        return entry
+
+    def read_body(self, entry: Dict[str, Any]) -> Optional[bytes]:
+        """The stored body, touching the entry for LRU; None if the file has gone"""
+        try:
+            with open(os.path.join(self.directory, 'bodies', entry['file']), 'rb') as f:
+                body = f.read()
+        except OSError:
+            self.delete(entry['url'])
+            return None
+        with self._lock:
+            self._db.execute('UPDATE entries SET last_access = ? WHERE url = ?', (self.clock(), entry['url']))
+        return body
+
+    def put(self, url: str, status: int, headers: Dict[str, str], body: bytes, expires_at: float):
+        headers = {name.lower(): value for name, value in headers.items() if name.lower() not in _UNSTORED_HEADERS}
+        relative = self._file(url)
+        path = os.path.join(self.directory, 'bodies', relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(body)
+        os.replace(tmp, path)
+        now = self.clock()
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, relative, status, json.dumps(headers), headers.get('etag'), headers.get('last-modified'),
+                 len(body), expires_at, now, now))
+        self.evict()
+
+    def refresh(self, url: str, expires_at: float):
+        """Extend an entry's freshness after a successful revalidation"""
+        with self._lock:
+            self._db.execute('UPDATE entries SET expires_at = ?, last_access = ? WHERE url = ?',
+                             (expires_at, self.clock(), url))
+
+    def delete(self, url: str):
+        with self._lock:
+            self._db.execute('DELETE FROM entries WHERE url = ?', (url,))
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def evict(self) -> int:
+        """Drop least recently used entries until the cache fits in ``max_bytes``; returns how many"""
+        evicted = 0
+        with self._lock:
+            total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            for url, relative, size in self._db.execute(
+                    'SELECT url, file, size FROM entries ORDER BY last_access').fetchall():
+                if total <= self.max_bytes:
+                    break
+                self._db.execute('DELETE FROM entries WHERE url = ?', (url,))
+                try:
+                    os.remove(os.path.join(self.directory, 'bodies', relative))
+                except OSError:
+                    pass
+                total -= size
+                evicted += 1
+        return evicted
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class BrowserHttpCache:
+    """Routes cacheable GET requests of a Playwright context through a ``DiskCache``"""
+
+    def __init__(self, cache: DiskCache, resource_types: Iterable[str] = DEFAULT_CACHEABLE_TYPES):
+        self.cache = cache
+        self.resource_types = frozenset(resource_types)
+        self.stats = {
+            'hits': 0,
+            'revalidated': 0,
+            'misses': 0,
+            'stored': 0,
+            'bytes_from_cache': 0,
+            'bytes_downloaded': 0,
+        }
+
+    def _cacheable(self, request) -> bool:
+        return (request.method == 'GET' and request.resource_type in self.resource_types
+                and request.url.startswith(('http://', 'https://')))
+
+    def _fresh_body(self, entry: Optional[Dict[str, Any]]) -> Optional[bytes]:
+        if entry and entry['expires_at'] > self.cache.clock():
+            return self.cache.read_body(entry)
+        return None
+
+    def _conditional_headers(self, request, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers = dict(request.headers)
+        if entry and entry['etag']:
+            headers['if-none-match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['if-modified-since'] = entry['last_modified']
+        return headers
+
+    def _serve(self, entry: Dict[str, Any], body: bytes, counter: str) -> Dict[str, Any]:
+        self.stats[counter] += 1
+        self.stats['bytes_from_cache'] += len(body)
+        return {'status': entry['status'], 'headers': entry['headers'], 'body': body}
+
+    def _revalidated(self, url: str, entry: Dict[str, Any], headers: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Answer from disk after a 304, or None if the stored body has gone"""
+        body = self.cache.read_body(entry)
+        if body is None:
+            return None
+        _, expires_at = cache_policy(dict(entry['headers'], **headers), self.cache.clock())
+        self.cache.refresh(url, expires_at)
+        return self._serve(entry, body, 'revalidated')
+
+    def _store(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        self.stats['misses'] += 1
+        self.stats['bytes_downloaded'] += len(body)
+        if status != 200:
+            return
+        storable, expires_at = cache_policy(headers, self.cache.clock())
+        if storable:
+            try:
+                self.cache.put(url, status, headers, body, expires_at)
+                self.stats['stored'] += 1
+            except (OSError, sqlite3.Error) as e:
+                print(f"HTTP cache could not store {url}: {e}")
+
+    async def attach_async(self, target):
+        """
+        Install the cache on an async Playwright context or page.
+
+        Non-cacheable requests fall back to routes registered earlier. Attach
+        resource blocking after the cache so blocked requests never reach it.
+        """
+        async def handle(route):
+            request = route.request
+            if not self._cacheable(request):
+                await route.fallback()
+                return
+            entry = self.cache.get(request.url)
+            body = self._fresh_body(entry)
+            if body is not None:
+                await route.fulfill(**self._serve(entry, body, 'hits'))
+                return
+            try:
+                response = await route.fetch(headers=self._conditional_headers(request, entry))
+            except Exception:
+                await route.fallback()
+                return
+            if response.status == 304 and entry:
+                cached = self._revalidated(request.url, entry, response.headers)
+                if cached:
+                    await route.fulfill(**cached)
+                    return
+                response = await route.fetch()
+            body = await response.body()
+            self._store(request.url, response.status, response.headers, body)
+            await route.fulfill(response=response, body=body)
+
+        await target.route('**/*', handle)
+        return self
+
+    def attach_sync(self, target):
+        """Install the cache on a sync Playwright context or page"""
+        def handle(route):
+            request = route.request
+            if not self._cacheable(request):
+                route.fallback()
+                return
+            entry = self.cache.get(request.url)
+            body = self._fresh_body(entry)
+            if body is not None:
+                route.fulfill(**self._serve(entry, body, 'hits'))
+                return
+            try:
+                response = route.fetch(headers=self._conditional_headers(request, entry))
+            except Exception:
+                route.fallback()
+                return
+            if response.status == 304 and entry:
+                cached = self._revalidated(request.url, entry, response.headers)
+                if cached:
+                    route.fulfill(**cached)
+                    return
+                response = route.fetch()
+            body = response.body()
+            self._store(request.url, response.status, response.headers, body)
+            route.fulfill(response=response, body=body)
+
+        target.route('**/*', handle)
+        return self
+
+    def report(self) -> Dict[str, Any]:
+        """Hit/miss counts for this context plus the shared cache's size"""
+        served = self.stats['hits'] + self.stats['revalidated']
+        requests = served + self.stats['misses']
+        return dict(self.stats, hit_rate=round(served / requests, 3) if requests else 0.0,
+                    cache_bytes=self.cache.total_bytes(), cache_max_bytes=self.cache.max_bytes)
+
+    def summary(self) -> str:
+        """One-line human readable report"""
+        report = self.report()
+        return (f"HTTP cache: {report['hits']} hits, {report['revalidated']} revalidated, "
+                f"{report['misses']} misses ({report['hit_rate']:.0%} hit rate), "
+                f"{report['bytes_from_cache'] / 1024:.0f} KB from cache, "
+                f"{report['bytes_downloaded'] / 1024:.0f} KB downloaded")
+
+
+_shared_caches: Dict[str, DiskCache] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_disk_cache(directory: Optional[str] = None) -> Optional[DiskCache]:
+    """Process-wide ``DiskCache`` for ``directory`` (default: from the environment); None when disabled"""
+    directory = directory or os.environ.get(HTTP_CACHE_ENV)
+    if not directory:
+        return None
+    with _shared_lock:
+        if directory not in _shared_caches:
+            max_mb = float(os.environ.get(HTTP_CACHE_SIZE_ENV, DEFAULT_MAX_MB))
+            _shared_caches[directory] = DiskCache(directory, max_bytes=int(max_mb * 1024 * 1024))
+        return _shared_caches[directory]
+
+
+def _cache_for_context(directory: Optional[str]) -> Optional[BrowserHttpCache]:
+    if har_mode() != 'live':
+        return None
+    cache = shared_disk_cache(directory)
+    return BrowserHttpCache(cache) if cache else None
+
+
+async def attach_http_cache_async(context, directory: Optional[str] = None) -> Optional[BrowserHttpCache]:
+    """Route an async context through the shared disk cache if it is enabled; returns it or None"""
+    cache = _cache_for_context(directory)
+    if cache:
+        await cache.attach_async(context)
+    return cache
+
+
+def attach_http_cache_sync(context, directory: Optional[str] = None) -> Optional[BrowserHttpCache]:
+    """Route a sync context through the shared disk cache if it is enabled; returns it or None"""
+    cache = _cache_for_context(directory)
+    if cache:
+        cache.attach_sync(context)
+    return cache
@@ -0,0 +1,353 @@
+"""
+HTTP-First Fetching
+
+Many target pages already ship their data in the first HTML response:
+server-rendered tables, links and buttons, Next.js ``__NEXT_DATA__``, JSON-LD
+blocks, or an inline ``window.__STATE__ = {...}``. ``fetch_http_first`` gets
+the page with a pooled keep-alive HTTP client and parses it with the standard
+library HTML parser into a ``ParsedPage``. It then hands that page to a
+site-specific ``extract`` function. The browser fallback runs only when the
+request fails or a required field is missing. That is about 100 ms of HTTP
+instead of seconds of Chromium.
+
+HAR record and replay runs (see ``har_fixtures.py``) always use the browser.
+That keeps fixtures complete and replays offline.
+
+Usage:
+    def extract(page):
+        return {'rows': [row for table in page.tables for row in table]}
+
+    result = fetch_http_first(URL, extract, required=['rows'], browser_fallback=scrape_with_playwright)
+    print(result['source'], result['data'])
+"""
+
+import asyncio
+import atexit
+import json
+import re
+import threading
+import time
+from html.parser import HTMLParser
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from automation_core.har_fixtures import har_mode
+
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+# ``window.__STATE__ = {...}``, ``window.__INITIAL_STATE__ = [...]`` and the like
+WINDOW_STATE_PATTERN = re.compile(r'window\.(__[A-Za-z0-9_]+)\s*=\s*')
+
+_TABLE_CELLS = ('td', 'th')
+_TEXT_CAPTURE_TAGS = ('a', 'button', 'title')
+_RAW_TEXT_TAGS = ('script', 'style')
+
+
+def _normalize(text: str) -> str:
+    return ' '.join(text.split())
+
+
+class ParsedPage:
+    """What an HTML document offers without running its JavaScript"""
+
+    def __init__(self, url: str = '', status: Optional[int] = None, html: str = ''):
+        self.url = url
+        self.status = status
+        self.html = html
+        self.title = ''
+        self.next_data: Optional[Any] = None
+        self.json_ld: List[Any] = []
+        self.window_state: Dict[str, Any] = {}
+        # tables -> rows -> cell texts
+        self.tables: List[List[List[str]]] = []
+        self.links: List[Dict[str, str]] = []
+        self.buttons: List[str] = []
+
+    def json_ld_of_type(self, type_name: str) -> List[Dict[str, Any]]:
+        """JSON-LD objects whose ``@type`` is ``type_name``, including those inside ``@graph``"""
+        found = []
+        stack = list(reversed(self.json_ld))
+        while stack:
+            item = stack.pop()
+            if isinstance(item, list):
+                stack.extend(reversed(item))
+            elif isinstance(item, dict):
+                types = item.get('@type')
+                if type_name == types or (isinstance(types, list) and type_name in types):
+                    found.append(item)
+                stack.extend(reversed(item.get('@graph', [])))
+        return found
+
+
+class _PageParser(HTMLParser):
+    """Single pass over the document collecting scripts, tables, links and buttons"""
+
+    def __init__(self, page: ParsedPage):
+        super().__init__(convert_charrefs=True)
+        self.page = page
+        self._raw_tag: Optional[str] = None
+        self._script_attrs: Dict[str, str] = {}
+        self._script_parts: List[str] = []
+        # Open a/button/title elements: (tag, attrs, text parts)
+        self._captures: List[Tuple[str, Dict[str, str], List[str]]] = []
+        # Open tables: (rows, current row or None, current cell parts or None)
+        self._tables: List[List[Any]] = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value or '' for name, value in attrs}
+        if tag in _RAW_TEXT_TAGS:
+            self._raw_tag = tag
+            self._script_attrs = attrs
+            self._script_parts = []
+        elif tag in _TEXT_CAPTURE_TAGS:
+            self._captures.append((tag, attrs, []))
+        elif tag == 'table':
+            self._tables.append([[], None, None])
+        elif self._tables and tag == 'tr':
+            self._close_row()
+            self._tables[-1][1] = []
+        elif self._tables and tag in _TABLE_CELLS:
+            self._close_cell()
+            if self._tables[-1][1] is None:
+                self._tables[-1][1] = []
+            self._tables[-1][2] = []
+
+    def handle_endtag(self, tag):
+        if tag == self._raw_tag:
+            if tag == 'script':
+                self._handle_script(self._script_attrs, ''.join(self._script_parts))
+            self._raw_tag = None
+        elif tag in _TEXT_CAPTURE_TAGS:
+            for i in range(len(self._captures) - 1, -1, -1):
+                if self._captures[i][0] == tag:
+                    self._finish_capture(*self._captures.pop(i))
+                    break
+        elif self._tables and tag == 'table':
+            self._close_row()
+            rows = self._tables.pop()[0]
+            if rows:
+                self.page.tables.append(rows)
+        elif self._tables and tag == 'tr':
+            self._close_row()
+        elif self._tables and tag in _TABLE_CELLS:
+            self._close_cell()
+
+    def handle_data(self, data):
+        if self._raw_tag:
+            self._script_parts.append(data)
+            return
+        for _, _, parts in self._captures:
+            parts.append(data)
+        if self._tables and self._tables[-1][2] is not None:
+            self._tables[-1][2].append(data)
+
+    def close(self):
+        super().close()
+        while self._captures:
+            self._finish_capture(*self._captures.pop())
+        while self._tables:
+            self.handle_endtag('table')
+
+    def _close_cell(self):
+        table = self._tables[-1]
+        if table[2] is not None:
+            table[1].append(_normalize(''.join(table[2])))
+            table[2] = None
+
+    def _close_row(self):
+        self._close_cell()
+        table = self._tables[-1]
+        if table[1]:
+            table[0].append(table[1])
+        table[1] = None
+
+    def _finish_capture(self, tag, attrs, parts):
+        text = _normalize(''.join(parts))
+        if tag == 'title':
+            self.page.title = self.page.title or text
+        elif tag == 'button':
+            self.page.buttons.append(text)
+        else:
+            self.page.links.append({'href': attrs.get('href', ''), 'text': text})
+
+    def _handle_script(self, attrs, text):
+        script_type = attrs.get('type', '').lower()
+        if attrs.get('id') == '__NEXT_DATA__':
+            self.page.next_data = _loads(text)
+        elif script_type == 'application/ld+json':
+            block = _loads(text)
+            if block is not None:
+                self.page.json_ld.append(block)
+        elif script_type in ('', 'text/javascript', 'application/javascript', 'module'):
+            self.page.window_state.update(parse_window_state(text))
+
+
+def _loads(text: str) -> Optional[Any]:
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+def parse_window_state(script: str) -> Dict[str, Any]:
+    """JSON values assigned to ``window.__NAME`` in an inline script"""
+    decoder = json.JSONDecoder()
+    state = {}
+    for match in WINDOW_STATE_PATTERN.finditer(script):
+        try:
+            state[match.group(1)], _ = decoder.raw_decode(script, match.end())
+        except ValueError:
+            # Assigned from an expression rather than a literal
+            continue
+    return state
+
+
+def parse_page(html: str, url: str = '', status: Optional[int] = None) -> ParsedPage:
+    """Parse an HTML document into a ``ParsedPage``"""
+    page = ParsedPage(url, status, html)
+    parser = _PageParser(page)
+    parser.feed(html)
+    parser.close()
+    return page
+
+
+def find_values(obj: Any, key: str) -> Iterator[Any]:
+    """Every value stored under ``key`` anywhere in a nested JSON structure"""
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            if key in item:
+                yield item[key]
+            stack.extend(reversed(list(item.values())))
+        elif isinstance(item, list):
+            stack.extend(reversed(item))
+
+
+def missing_fields(data: Dict[str, Any], required: Sequence[str]) -> List[str]:
+    """Required fields that are absent or empty in ``data``"""
+    return [field for field in required if data.get(field) in (None, '', [], {})]
+
+
+def http_allowed() -> bool:
+    """Plain HTTP is skipped while recording or replaying HAR fixtures"""
+    return har_mode() == 'live'
+
+
+class HttpClient:
+    """Keep-alive HTTP client with a connection pool per host"""
+
+    def __init__(self, pool_size: int = 10, timeout: float = 15, headers: Optional[Dict[str, str]] = None,
+                 session=None):
+        if session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=1)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        session.headers.update(headers or DEFAULT_HEADERS)
+        self.session = session
+        self.timeout = timeout
+
+    def get(self, url: str, timeout: Optional[float] = None, **kwargs):
+        return self.session.get(url, timeout=timeout or self.timeout, **kwargs)
+
+    def head(self, url: str, timeout: Optional[float] = None, **kwargs):
+        return self.session.head(url, timeout=timeout or self.timeout, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_shared_client: Optional[HttpClient] = None
+_shared_lock = threading.Lock()
+
+
+def shared_http_client() -> HttpClient:
+    """Process-wide ``HttpClient``, closed at exit"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient()
+            atexit.register(_shared_client.close)
+        return _shared_client
+
+
+def _try_http(url: str, extract: Callable[[ParsedPage], Dict[str, Any]], required: Sequence[str],
+              client: Optional[HttpClient], timeout: Optional[float]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    attempt = {'data': {}, 'missing': list(required), 'error': None}
+    try:
+        response = (client or shared_http_client()).get(url, timeout=timeout)
+        if response.status_code >= 400:
+            raise RuntimeError(f"HTTP {response.status_code}")
+        page = parse_page(response.text, url=getattr(response, 'url', url), status=response.status_code)
+        attempt['data'] = extract(page) or {}
+        attempt['missing'] = missing_fields(attempt['data'], required)
+    except Exception as e:
+        attempt['error'] = str(e) or type(e).__name__
+    attempt['http_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return attempt
+
+
+def _result(url: str, source: Optional[str], data: Dict[str, Any], required: Sequence[str],
+            attempt: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    missing = missing_fields(data, required)
+    return {
+        'success': source is not None and not missing,
+        'url': url,
+        'source': source,
+        'data': data,
+        'missing': missing,
+        'http_ms': attempt['http_ms'] if attempt else None,
+        'http_error': attempt['error'] if attempt else None,
+    }
+
+
+def _escalation_note(url: str, attempt: Dict[str, Any]) -> str:
+    reason = attempt['error'] or f"missing {', '.join(attempt['missing'])}"
+    return f"HTTP-first fetch of {url} insufficient ({reason}); falling back to the browser"
+
+
+def fetch_http_first(url: str, extract: Callable[[ParsedPage], Dict[str, Any]], required: Sequence[str] = (),
+                     browser_fallback: Optional[Callable[[], Dict[str, Any]]] = None,
+                     client: Optional[HttpClient] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Extract ``required`` fields from ``url`` over plain HTTP, escalating to the browser only if needed.
+
+    ``extract`` turns a ``ParsedPage`` into a dict of fields; ``browser_fallback``
+    produces the same dict by driving a browser. ``result['source']`` says
+    which one the data came from ('http' or 'browser'). Browser errors propagate.
+    """
+    attempt = None
+    if http_allowed():
+        attempt = _try_http(url, extract, required, client, timeout)
+        if not attempt['error'] and not attempt['missing']:
+            return _result(url, 'http', attempt['data'], required, attempt)
+        print(_escalation_note(url, attempt))
+    if browser_fallback is None:
+        return _result(url, None, attempt['data'] if attempt else {}, required, attempt)
+    return _result(url, 'browser', browser_fallback() or {}, required, attempt)
+
+
+async def fetch_http_first_async(url: str, extract: Callable[[ParsedPage], Dict[str, Any]],
+                                 required: Sequence[str] = (),
+                                 browser_fallback: Optional[Callable[[], Awaitable[Dict[str, Any]]]] = None,
+                                 client: Optional[HttpClient] = None,
+                                 timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Async version of ``fetch_http_first``; the HTTP request runs in a worker thread"""
+    attempt = None
+    if http_allowed():
+        attempt = await asyncio.to_thread(_try_http, url, extract, required, client, timeout)
+        if not attempt['error'] and not attempt['missing']:
+            return _result(url, 'http', attempt['data'], required, attempt)
+        print(_escalation_note(url, attempt))
+    if browser_fallback is None:
+        return _result(url, None, attempt['data'] if attempt else {}, required, attempt)
+    return _result(url, 'browser', await browser_fallback() or {}, required, attempt)
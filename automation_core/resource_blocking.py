@@ -0,0 +1,224 @@
+"""
+Resource Blocking Profiles
+
+Request-routing profiles that abort requests a text-only automation does not
+need: images, fonts, media and known analytics/ads hosts. Pages reach
+``domcontentloaded``/``networkidle`` sooner because trackers never start, and
+less bandwidth is used.
+
+Each task can allowlist URLs it does need (e.g. a site whose layout breaks
+without a particular script). A profile counts what it blocked and reports
+the requests and an estimate of the bytes saved. Aborted requests are never
+downloaded, so their size is estimated from typical sizes per resource type;
+bytes actually loaded are measured from ``Content-Length``.
+
+Usage:
+    blocking = site_profile('mta')
+    await blocking.attach_async(context)   # or blocking.attach_sync(context)
+    ...
+    print(blocking.report())
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Union
+from urllib.parse import urlparse
+
+
+DEFAULT_BLOCKED_TYPES = frozenset({'image', 'font', 'media'})
+
+# Analytics, tag managers, ad networks and session recorders seen on the target sites
+DEFAULT_BLOCKED_HOSTS = frozenset({
+    'google-analytics.com',
+    'analytics.google.com',
+    'googletagmanager.com',
+    'googleadservices.com',
+    'googlesyndication.com',
+    'doubleclick.net',
+    'connect.facebook.net',
+    'facebook.com/tr',
+    'bat.bing.com',
+    'clarity.ms',
+    'hotjar.com',
+    'fullstory.com',
+    'quantummetric.com',
+    'cdn.segment.com',
+    'api.segment.io',
+    'optimizely.com',
+    'nr-data.net',
+    'js-agent.newrelic.com',
+    'scorecardresearch.com',
+    'quantserve.com',
+    'adsrvr.org',
+    'adnxs.com',
+    'criteo.com',
+    'criteo.net',
+    'taboola.com',
+    'outbrain.com',
+    'amazon-adsystem.com',
+    'demdex.net',
+    'omtrdc.net',
+    'everesttech.net',
+    'krxd.net',
+    'ct.pinterest.com',
+    'analytics.tiktok.com',
+    'sc-static.net',
+})
+
+# Typical transfer sizes used to estimate what an aborted request would have cost
+ESTIMATED_BYTES_BY_TYPE = {
+    'image': 45_000,
+    'font': 30_000,
+    'media': 500_000,
+    'script': 25_000,
+    'stylesheet': 15_000,
+    'xhr': 2_000,
+    'fetch': 2_000,
+}
+DEFAULT_ESTIMATED_BYTES = 5_000
+
+UrlPattern = Union[str, Pattern]
+
+
+class ResourceBlockingProfile:
+    """Decides which requests to abort and keeps statistics about it"""
+
+    def __init__(self, block_types: Iterable[str] = DEFAULT_BLOCKED_TYPES,
+                 block_hosts: Iterable[str] = DEFAULT_BLOCKED_HOSTS,
+                 allow: Optional[Iterable[UrlPattern]] = None, name: str = 'default'):
+        self.name = name
+        self.block_types = frozenset(block_types)
+        self.block_hosts = frozenset(block_hosts)
+        self.allow: List[UrlPattern] = list(allow or [])
+        self.stats = {
+            'requests_seen': 0,
+            'requests_blocked': 0,
+            'blocked_by_type': {},
+            'blocked_by_host': {},
+            'estimated_bytes_saved': 0,
+            'bytes_loaded': 0,
+        }
+
+    def with_allow(self, *patterns: UrlPattern) -> 'ResourceBlockingProfile':
+        """Return a copy of this profile that also lets ``patterns`` through"""
+        return ResourceBlockingProfile(self.block_types, self.block_hosts, self.allow + list(patterns), self.name)
+
+    def _is_allowed(self, url: str) -> bool:
+        for pattern in self.allow:
+            if isinstance(pattern, str):
+                if pattern in url:
+                    return True
+            elif pattern.search(url):
+                return True
+        return False
+
+    def _blocked_host(self, url: str) -> Optional[str]:
+        parsed = urlparse(url)
+        host = parsed.hostname or ''
+        for blocked in self.block_hosts:
+            # Entries may carry a path prefix, e.g. 'facebook.com/tr' for the pixel only
+            blocked_host, _, blocked_path = blocked.partition('/')
+            if host != blocked_host and not host.endswith('.' + blocked_host):
+                continue
+            if not blocked_path:
+                return blocked
+            # Match whole path segments, so 'facebook.com/tr' blocks /tr/ but not /translations
+            path = parsed.path.lstrip('/')
+            blocked_path = blocked_path.rstrip('/')
+            if path == blocked_path or path.startswith(blocked_path + '/'):
+                return blocked
+        return None
+
+    def should_block(self, url: str, resource_type: str) -> Optional[str]:
+        """Return the reason a request should be aborted, or None to let it through"""
+        if url.startswith('data:') or self._is_allowed(url):
+            return None
+        host = self._blocked_host(url)
+        if host:
+            return f'host:{host}'
+        if resource_type in self.block_types:
+            return f'type:{resource_type}'
+        return None
+
+    def _record(self, url: str, resource_type: str, reason: Optional[str]) -> bool:
+        self.stats['requests_seen'] += 1
+        if reason is None:
+            return False
+        self.stats['requests_blocked'] += 1
+        by_type = self.stats['blocked_by_type']
+        by_type[resource_type] = by_type.get(resource_type, 0) + 1
+        if reason.startswith('host:'):
+            host = reason[5:]
+            self.stats['blocked_by_host'][host] = self.stats['blocked_by_host'].get(host, 0) + 1
+        self.stats['estimated_bytes_saved'] += ESTIMATED_BYTES_BY_TYPE.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+        return True
+
+    def _record_response(self, response):
+        try:
+            length = response.headers.get('content-length')
+            if length:
+                self.stats['bytes_loaded'] += int(length)
+        except Exception:
+            pass
+
+    async def attach_async(self, target):
+        """
+        Install the profile on an async Playwright context or page.
+
+        Requests that are not blocked fall back to routes registered earlier
+        (e.g. a HAR replay), or go to the network if there are none.
+        """
+        async def handle(route):
+            request = route.request
+            if self._record(request.url, request.resource_type, self.should_block(request.url, request.resource_type)):
+                await route.abort()
+            else:
+                await route.fallback()
+
+        await target.route('**/*', handle)
+        target.on('response', self._record_response)
+        return self
+
+    def attach_sync(self, target):
+        """Install the profile on a sync Playwright context or page"""
+        def handle(route):
+            request = route.request
+            if self._record(request.url, request.resource_type, self.should_block(request.url, request.resource_type)):
+                route.abort()
+            else:
+                route.fallback()
+
+        target.route('**/*', handle)
+        target.on('response', self._record_response)
+        return self
+
+    def report(self) -> Dict[str, Any]:
+        """Return a copy of the blocking statistics"""
+        report = dict(self.stats, profile=self.name)
+        report['blocked_by_type'] = dict(self.stats['blocked_by_type'])
+        report['blocked_by_host'] = dict(self.stats['blocked_by_host'])
+        return report
+
+    def summary(self) -> str:
+        """One-line human readable report"""
+        return (f"Resource blocking ({self.name}): blocked {self.stats['requests_blocked']} of "
+                f"{self.stats['requests_seen']} requests, ~{self.stats['estimated_bytes_saved'] / 1024:.0f} KB saved, "
+                f"{self.stats['bytes_loaded'] / 1024:.0f} KB loaded")
+
+
+# Per-site settings. Sites missing here get the default profile. Scripts that
+# still need a resource type or host allowlist it here (or per task through
+# ``site_profile(..., allow=[...])``) instead of dropping the profile.
+SITE_PROFILES: Dict[str, Dict[str, Any]] = {
+    # Map names are read with textContent, so styling is not needed either
+    'mta': {'block_types': DEFAULT_BLOCKED_TYPES | {'stylesheet'}},
+    'flightaware': {'block_types': DEFAULT_BLOCKED_TYPES | {'stylesheet'}},
+    # Accordions are clicked, so stylesheets must load for elements to be visible
+    'megabus': {},
+    'eventbrite': {},
+}
+
+
+def site_profile(site: str, allow: Optional[Iterable[UrlPattern]] = None) -> ResourceBlockingProfile:
+    """Return a fresh profile (with its own statistics) for ``site``"""
+    settings = dict(SITE_PROFILES.get(site, {}))
+    extra_allow = list(settings.pop('allow', [])) + list(allow or [])
+    return ResourceBlockingProfile(name=site, allow=extra_allow, **settings)
@@ -0,0 +1,295 @@
+"""
+Result Store
+
+One SQLite database that every automation appends its results to, instead of
+each script rewriting its own JSON dump or ``output.md`` per run. A run is
+stored once, keyed by task, run id and timestamp, together with its item
+records (stores, products, cards, ...) in their own indexed table. JSON and
+markdown files are rendered from the store on demand, so history queries
+across thousands of runs read only the index and never parse old files.
+
+The database is ``~/.local/share/automation_core/results.sqlite`` unless
+``AUTOMATION_RESULT_STORE`` points elsewhere. Scripts register a markdown
+renderer for their task with ``@register_renderer``; tasks without one get a
+generic rendering.
+
+Usage:
+    store = shared_result_store()
+    run_id = store.append('gamestop_stores', results, records=results['stores'])
+    store.render_json('gamestop_stores', run_id, path='store_results.json')
+
+    python -m automation_core.result_store history gamestop_stores --limit 20
+    python -m automation_core.result_store render target_vegan_pizza --format md --output output.md
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from automation_core.scripts import load_script
+
+
+RESULT_STORE_ENV = 'AUTOMATION_RESULT_STORE'
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser('~'), '.local', 'share', 'automation_core', 'results.sqlite')
+
+Renderer = Callable[[Dict[str, Any]], str]
+
+RENDERERS: Dict[str, Renderer] = {}
+
+# Scripts that register a renderer, imported when a renderer is needed outside the script
+RENDERER_SCRIPTS = {
+    'target_vegan_pizza': 'oh-cli/target_vegan_pizza_automation/target_vegan_pizza_automation.py',
+}
+
+
+def register_renderer(task: str):
+    """Decorator registering ``render(result) -> markdown`` for a task"""
+    def decorator(func: Renderer) -> Renderer:
+        RENDERERS[task] = func
+        return func
+    return decorator
+
+
+def _renderer(task: str) -> Optional[Renderer]:
+    if task not in RENDERERS and task in RENDERER_SCRIPTS:
+        try:
+            load_script(RENDERER_SCRIPTS[task])
+        except Exception as e:
+            print(f"Could not load the {task} renderer: {e}")
+    return RENDERERS.get(task)
+
+
+def generic_markdown(task: str, run: Dict[str, Any], result: Dict[str, Any], records: List[Dict[str, Any]]) -> str:
+    """Plain rendering: scalar fields as a list, records as a table"""
+    lines = [f"# {task}", "", f"- **Run**: {run['run_id']}",
+             f"- **Time**: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run['created_at']))}"]
+    for key, value in result.items():
+        if not isinstance(value, (dict, list)):
+            lines.append(f"- **{key}**: {value}")
+    if records:
+        columns = [key for key in records[0] if not isinstance(records[0][key], (dict, list))]
+        lines += ["", f"## Records ({len(records)})", "",
+                  "| " + " | ".join(columns) + " |", "|" + "---|" * len(columns)]
+        for record in records:
+            cells = [str(record.get(column, '')).replace('|', '\\|').replace('\n', ' ') for column in columns]
+            lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines) + "\n"
+
+
+class ResultStore:
+    """Append-only store of automation results with lazily rendered views"""
+
+    def __init__(self, path: Optional[str] = None, clock: Callable[[], float] = time.time):
+        self.path = path or os.environ.get(RESULT_STORE_ENV) or DEFAULT_STORE_PATH
+        self.clock = clock
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY,
+                task TEXT NOT NULL,
+                run_id TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                success INTEGER,
+                record_count INTEGER NOT NULL,
+                result TEXT NOT NULL
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS runs_task_run_id ON runs (task, run_id);
+            CREATE INDEX IF NOT EXISTS runs_task_created ON runs (task, created_at);
+            CREATE TABLE IF NOT EXISTS records (
+                run INTEGER NOT NULL REFERENCES runs (id),
+                position INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (run, position)
+            );
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                task TEXT NOT NULL,
+                source TEXT NOT NULL,
+                digest TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                run_id TEXT NOT NULL,
+                checked_at REAL NOT NULL,
+                PRIMARY KEY (task, source)
+            );
+        ''')
+
+    def append(self, task: str, result: Dict[str, Any], records: Optional[List[Dict[str, Any]]] = None,
+               run_id: Optional[str] = None, success: Optional[bool] = None,
+               created_at: Optional[float] = None) -> str:
+        """Store one run's result (and its item records); returns the run id"""
+        run_id = run_id or uuid.uuid4().hex[:12]
+        records = records or []
+        if success is None and 'success' in result:
+            success = bool(result['success'])
+        with self._lock:
+            self._db.execute('BEGIN')
+            try:
+                cursor = self._db.execute(
+                    'INSERT INTO runs (task, run_id, created_at, success, record_count, result) VALUES (?, ?, ?, ?, ?, ?)',
+                    (task, run_id, created_at if created_at is not None else self.clock(),
+                     None if success is None else int(success), len(records),
+                     json.dumps(result, ensure_ascii=False, default=str)))
+                self._db.executemany(
+                    'INSERT INTO records (run, position, data) VALUES (?, ?, ?)',
+                    [(cursor.lastrowid, i, json.dumps(record, ensure_ascii=False, default=str))
+                     for i, record in enumerate(records)])
+                self._db.execute('COMMIT')
+            except Exception:
+                self._db.execute('ROLLBACK')
+                raise
+        return run_id
+
+    def runs(self, task: Optional[str] = None, since: Optional[float] = None, until: Optional[float] = None,
+             limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Run metadata, newest first, without loading any result bodies"""
+        query = 'SELECT task, run_id, created_at, success, record_count FROM runs WHERE 1 = 1'
+        params: List[Any] = []
+        if task:
+            query += ' AND task = ?'
+            params.append(task)
+        if since is not None:
+            query += ' AND created_at >= ?'
+            params.append(since)
+        if until is not None:
+            query += ' AND created_at < ?'
+            params.append(until)
+        query += ' ORDER BY created_at DESC, id DESC'
+        if limit:
+            query += ' LIMIT ?'
+            params.append(limit)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [{'task': row[0], 'run_id': row[1], 'created_at': row[2],
+                 'success': None if row[3] is None else bool(row[3]), 'record_count': row[4]} for row in rows]
+
+    def _run_row(self, task: str, run_id: Optional[str]):
+        query = 'SELECT id, run_id, created_at, result FROM runs WHERE task = ?'
+        params: List[Any] = [task]
+        if run_id:
+            query += ' AND run_id = ?'
+            params.append(run_id)
+        with self._lock:
+            row = self._db.execute(query + ' ORDER BY created_at DESC, id DESC LIMIT 1', params).fetchone()
+        if row is None:
+            raise KeyError(f"No stored run for task {task!r}" + (f" with run id {run_id!r}" if run_id else ''))
+        return row
+
+    def get(self, task: str, run_id: Optional[str] = None) -> Dict[str, Any]:
+        """A run's result dict (the latest run when ``run_id`` is None)"""
+        return json.loads(self._run_row(task, run_id)[3])
+
+    def records(self, task: str, run_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """A run's item records in their original order"""
+        pk = self._run_row(task, run_id)[0]
+        with self._lock:
+            rows = self._db.execute('SELECT data FROM records WHERE run = ? ORDER BY position', (pk,)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def render_json(self, task: str, run_id: Optional[str] = None, path: Optional[str] = None) -> str:
+        """The stored result as indented JSON, also written to ``path`` if given"""
+        text = json.dumps(self.get(task, run_id), indent=2, ensure_ascii=False)
+        return _write(path, text)
+
+    def render_markdown(self, task: str, run_id: Optional[str] = None, path: Optional[str] = None) -> str:
+        """Markdown from the task's registered renderer (or the generic one), also written to ``path``"""
+        _, stored_run_id, created_at, result = self._run_row(task, run_id)
+        result = json.loads(result)
+        renderer = _renderer(task)
+        if renderer:
+            text = renderer(result)
+        else:
+            run = {'run_id': stored_run_id, 'created_at': created_at}
+            text = generic_markdown(task, run, result, self.records(task, stored_run_id))
+        return _write(path, text)
+
+    def fingerprints(self, task: str) -> Dict[str, Dict[str, Any]]:
+        """Content fingerprints of a task's sources (URLs, DOM regions), keyed by source"""
+        with self._lock:
+            rows = self._db.execute('SELECT source, digest, etag, last_modified, run_id, checked_at '
+                                    'FROM fingerprints WHERE task = ?', (task,)).fetchall()
+        return {row[0]: {'digest': row[1], 'etag': row[2], 'last_modified': row[3], 'run_id': row[4],
+                         'checked_at': row[5]} for row in rows}
+
+    def save_fingerprint(self, task: str, source: str, run_id: str, digest: Optional[str] = None,
+                         etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Record that ``source`` had this content when run ``run_id`` was stored"""
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO fingerprints '
+                             '(task, source, digest, etag, last_modified, run_id, checked_at) '
+                             'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                             (task, source, digest, etag, last_modified, run_id, self.clock()))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def _write(path: Optional[str], text: str) -> str:
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    return text
+
+
+_shared_stores: Dict[str, ResultStore] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_result_store(path: Optional[str] = None) -> ResultStore:
+    """Process-wide ``ResultStore`` per database file"""
+    path = path or os.environ.get(RESULT_STORE_ENV) or DEFAULT_STORE_PATH
+    with _shared_lock:
+        if path not in _shared_stores:
+            _shared_stores[path] = ResultStore(path)
+        return _shared_stores[path]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Query stored automation results')
+    parser.add_argument('--store', help=f"Database file (default: ${RESULT_STORE_ENV} or {DEFAULT_STORE_PATH})")
+    commands = parser.add_subparsers(dest='command', required=True)
+    history = commands.add_parser('history', help='List runs, newest first')
+    history.add_argument('task', nargs='?')
+    history.add_argument('--limit', type=int, default=20)
+    render = commands.add_parser('render', help='Render a stored run as JSON or markdown')
+    render.add_argument('task')
+    render.add_argument('--run-id', help='Default: the latest run')
+    render.add_argument('--format', choices=['json', 'md'], default='json')
+    render.add_argument('--output', help='Write to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    store = ResultStore(args.store)
+    try:
+        if args.command == 'history':
+            for run in store.runs(args.task, limit=args.limit):
+                status = {True: 'ok', False: 'failed', None: '-'}[run['success']]
+                stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run['created_at']))
+                print(f"{stamp}  {run['task']:<24} {run['run_id']:<14} {status:<7} {run['record_count']} records")
+            return 0
+        try:
+            render_view = store.render_json if args.format == 'json' else store.render_markdown
+            text = render_view(args.task, args.run_id, args.output)
+        except KeyError as e:
+            print(e.args[0])
+            return 1
+        if not args.output:
+            print(text)
+        return 0
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    # Run the package module's main so scripts register renderers in the registry it reads
+    from automation_core import result_store
+    sys.exit(result_store.main())
@@ -0,0 +1,37 @@
+"""
+Script Loading
+
+The automations are standalone scripts in directories that are not packages,
+and several share a file name. ``load_script`` imports one by its path
+relative to the repository root, under a module name derived from that path,
+so the task runner, the benchmark suite and the result store's renderers can
+all reach them without depending on each other.
+
+Usage:
+    module = load_script('oh_ui_sessions/marriott/marriott_credit_cards_automation.py')
+    automation = module.MarriottCreditCardsAutomation()
+"""
+
+import importlib.util
+import os
+import sys
+from typing import Any, Dict
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+_loaded_scripts: Dict[str, Any] = {}
+
+
+def load_script(relative_path: str):
+    """Import an automation script by its path relative to the repository root, once per process"""
+    if relative_path in _loaded_scripts:
+        return _loaded_scripts[relative_path]
+    path = os.path.join(REPO_ROOT, relative_path)
+    module_name = 'automation_task_' + relative_path.replace('/', '_').replace('-', '_')[:-3]
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    _loaded_scripts[relative_path] = module
+    return module
@@ -0,0 +1,241 @@
+"""
+Learned Selector Cascades
+
+Most extractors try a fixed list of fallback selectors in order and pay a
+wait (or a round trip) for every miss before the one that works. A
+``SelectorCascade`` keeps per site/page-type statistics of which selectors
+matched, so callers that test candidates one at a time try the historical
+winner first next time. It can also race every candidate in a single
+in-page query instead of one query per selector. Fallback lists are written
+most precise first, so a race picks the first candidate in the given order
+that has a visible match; a broad fallback that also matches never takes
+over.
+
+Statistics are a small JSON file, by default
+``~/.cache/automation_core/selector_stats.json``; set
+``AUTOMATION_SELECTOR_STATS`` to keep them elsewhere.
+
+Usage:
+    cascade = SelectorCascade('marriott')
+    selector = await cascade.resolve_async(page, 'personal_cards', [
+        'listitem', '.card-container', '.credit-card',
+    ], budget_ms=5000)
+    if selector:
+        cards = page.locator(selector)
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+SELECTOR_STATS_ENV = 'AUTOMATION_SELECTOR_STATS'
+DEFAULT_STATS_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'automation_core', 'selector_stats.json')
+
+# Counts visible matches for every candidate in one evaluate. Plain CSS and a
+# trailing Playwright ``:has-text("...")`` are handled in the page; anything
+# else (``text=``, ``>>`` chains, ...) comes back as null and is counted with a
+# locator instead. Visible means what Playwright's ``state='visible'`` waits
+# for: a non-empty box and not ``visibility: hidden``.
+RACE_SELECTORS_JS = r"""
+(selectors) => {
+    const visible = (el) => el.getClientRects().length > 0 && getComputedStyle(el).visibility !== 'hidden';
+    return selectors.map((selector) => {
+        const hasText = selector.match(/^(.*?):has-text\((["'])(.*)\2\)$/);
+        try {
+            if (!hasText) return [...document.querySelectorAll(selector)].filter(visible).length;
+            const needle = hasText[3].replace(/\s+/g, ' ').trim().toLowerCase();
+            let count = 0;
+            for (const el of document.querySelectorAll(hasText[1] || '*')) {
+                if ((el.textContent || '').replace(/\s+/g, ' ').toLowerCase().includes(needle) && visible(el)) count++;
+            }
+            return count;
+        } catch (e) {
+            return null;
+        }
+    });
+}
+"""
+
+
+def visible_only(selector: str) -> str:
+    """A Playwright selector for the visible matches of ``selector``"""
+    return f'{selector} >> visible=true'
+
+
+def stats_path() -> str:
+    return os.environ.get(SELECTOR_STATS_ENV) or DEFAULT_STATS_PATH
+
+
+class SelectorStats:
+    """Per-key hit/miss counts for selectors, persisted as JSON"""
+
+    def __init__(self, path: Optional[str] = None, autosave: bool = True):
+        self.path = path or stats_path()
+        self.autosave = autosave
+        self._lock = threading.Lock()
+        self.data: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def score(self, key: str, selector: str) -> int:
+        entry = self.data.get(key, {}).get(selector)
+        if not entry:
+            return 0
+        return entry.get('hits', 0) - entry.get('misses', 0)
+
+    def order(self, key: str, candidates: List[str]) -> List[str]:
+        """Candidates with the best-scoring selectors first; ties keep their given order"""
+        return sorted(candidates, key=lambda selector: -self.score(key, selector))
+
+    def record(self, key: str, winner: Optional[str], tried: List[str], matched: Sequence[str] = ()):
+        """Count a hit for ``winner`` and every selector in ``matched``, and a miss for the rest of ``tried``"""
+        with self._lock:
+            entries = self.data.setdefault(key, {})
+            for selector in tried:
+                entry = entries.setdefault(selector, {'hits': 0, 'misses': 0})
+                if selector == winner or selector in matched:
+                    entry['hits'] += 1
+                    entry['last_hit'] = time.time()
+                else:
+                    entry['misses'] += 1
+        if self.autosave:
+            self.save()
+
+    def save(self):
+        """Write the statistics atomically, so concurrent runs never see half a file"""
+        with self._lock:
+            payload = json.dumps(self.data, indent=2, sort_keys=True)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Could not save selector stats to {self.path}: {e}")
+
+
+_shared_stats: Dict[str, SelectorStats] = {}
+
+
+def shared_stats(path: Optional[str] = None) -> SelectorStats:
+    """Process-wide ``SelectorStats`` per file, so cascades don't overwrite each other"""
+    path = path or stats_path()
+    if path not in _shared_stats:
+        _shared_stats[path] = SelectorStats(path)
+    return _shared_stats[path]
+
+
+class SelectorCascade:
+    """Resolves the first matching selector from a list, learning the order across runs"""
+
+    def __init__(self, site: str, stats: Optional[SelectorStats] = None, poll_interval_ms: int = 100,
+                 clock: Callable[[], float] = time.monotonic):
+        self.site = site
+        self.stats = stats if stats is not None else shared_stats()
+        self.poll_interval_ms = poll_interval_ms
+        self.clock = clock
+        self.resolutions: List[Dict[str, Any]] = []
+
+    def key(self, page_type: str) -> str:
+        return f"{self.site}:{page_type}"
+
+    def order(self, page_type: str, candidates: List[str]) -> List[str]:
+        """Candidates in learned order, for callers that test them one at a time"""
+        return self.stats.order(self.key(page_type), candidates)
+
+    def record(self, page_type: str, winner: Optional[str], tried: List[str], matched: Sequence[str] = ()):
+        self.stats.record(self.key(page_type), winner, tried, matched)
+
+    def record_in_order(self, page_type: str, winner: str, ordered: List[str]):
+        """Record a win for callers that tried ``ordered`` one at a time and stopped at ``winner``"""
+        self.record(page_type, winner, ordered[:ordered.index(winner) + 1])
+
+    def _finish(self, page_type: str, candidates: List[str], counts: List[int],
+                started: float, rounds: int) -> Optional[str]:
+        # The given order is most precise first: the stats never let a broad
+        # fallback that also matched win over a precise candidate
+        winner = next((selector for selector, count in zip(candidates, counts) if count > 0), None)
+        self.resolutions.append({
+            'page_type': page_type,
+            'selector': winner,
+            'count': counts[candidates.index(winner)] if winner else 0,
+            'rounds': rounds,
+            'elapsed_ms': round((self.clock() - started) * 1000),
+        })
+        if winner:
+            self.record(page_type, winner, candidates,
+                        matched=[selector for selector, count in zip(candidates, counts) if count > 0])
+        return winner
+
+    def _count_sync(self, page, candidates: List[str]) -> List[int]:
+        try:
+            counts = page.evaluate(RACE_SELECTORS_JS, candidates)
+        except Exception:
+            counts = [None] * len(candidates)
+        for i, count in enumerate(counts):
+            if count is None:
+                try:
+                    counts[i] = page.locator(visible_only(candidates[i])).count()
+                except Exception:
+                    counts[i] = 0
+        return counts
+
+    def resolve_sync(self, page, page_type: str, candidates: List[str], budget_ms: int = 0) -> Optional[str]:
+        """
+        Race ``candidates`` on a sync Playwright page and return the winner.
+
+        Visible matches of all candidates are counted in one query per
+        polling tick until one matches or ``budget_ms`` runs out (0 checks
+        once). When several match, the first in the given order wins; every
+        candidate that matched is credited in the stats. Returns None on a miss.
+        """
+        started = self.clock()
+        deadline = started + budget_ms / 1000
+        rounds = 0
+        while True:
+            counts = self._count_sync(page, candidates)
+            rounds += 1
+            if any(count > 0 for count in counts) or self.clock() >= deadline:
+                return self._finish(page_type, candidates, counts, started, rounds)
+            page.wait_for_timeout(self.poll_interval_ms)
+
+    async def _count_async(self, page, candidates: List[str]) -> List[int]:
+        try:
+            counts = await page.evaluate(RACE_SELECTORS_JS, candidates)
+        except Exception:
+            counts = [None] * len(candidates)
+
+        async def locator_count(selector: str) -> int:
+            try:
+                return await page.locator(visible_only(selector)).count()
+            except Exception:
+                return 0
+
+        pending = [i for i, count in enumerate(counts) if count is None]
+        if pending:
+            fallback = await asyncio.gather(*(locator_count(candidates[i]) for i in pending))
+            for i, count in zip(pending, fallback):
+                counts[i] = count
+        return counts
+
+    async def resolve_async(self, page, page_type: str, candidates: List[str], budget_ms: int = 0) -> Optional[str]:
+        """Async version of ``resolve_sync``"""
+        started = self.clock()
+        deadline = started + budget_ms / 1000
+        rounds = 0
+        while True:
+            counts = await self._count_async(page, candidates)
+            rounds += 1
+            if any(count > 0 for count in counts) or self.clock() >= deadline:
+                return self._finish(page_type, candidates, counts, started, rounds)
+            await page.wait_for_timeout(self.poll_interval_ms)
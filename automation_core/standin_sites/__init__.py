@@ -0,0 +1,8 @@
+"""
+Local stand-in versions of the target sites, reproducing the DOM structures
+the automations depend on.
+"""
+
+from automation_core.standin_sites.server import ROUTES, StandinServer
+
+__all__ = ['ROUTES', 'StandinServer']
@@ -0,0 +1,314 @@
+"""
+Stand-in Pages
+
+Builders for pages that reproduce the DOM structures the automations
+depend on. Content is deterministic: item ``i`` always looks the same, so
+extraction results can be compared between runs. Every builder takes the
+number of items to render, which is how pages 10x-1000x the real size are
+produced.
+"""
+
+import json
+from html import escape
+from typing import Any, Dict, List
+
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+DAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+CITIES = [
+    ('Los Angeles', 'CA', '90028', 34.1016, -118.3267),
+    ('Hollywood', 'CA', '90038', 34.0900, -118.3387),
+    ('Burbank', 'CA', '91502', 34.1808, -118.3090),
+    ('Glendale', 'CA', '91203', 34.1425, -118.2551),
+    ('Pasadena', 'CA', '91101', 34.1478, -118.1445),
+]
+
+BROOKLYN_STATIONS = [
+    ('Atlantic Av-Barclays Ctr', '(B)(D)(N)(Q)(R)(2)(3)(4)(5)'),
+    ('Jay St-MetroTech', '(A)(C)(F)(R)'),
+    ('DeKalb Av', '(B)(Q)(R)'),
+    ('Bedford Av', '(L)'),
+    ('Church Av', '(B)(Q)'),
+    ('Coney Island-Stillwell Av', '(D)(F)(N)(Q)'),
+    ('Broadway Junction', '(A)(C)(J)(L)(Z)'),
+    ('Borough Hall', '(2)(3)(4)(5)(R)'),
+    ('Myrtle-Wyckoff Avs', '(L)(M)'),
+    ('Crown Hts-Utica Av', '(3)(4)'),
+]
+
+MARRIOTT_CARDS = [
+    ('Marriott Bonvoy Boundless® Credit Card from Chase', 'personal'),
+    ('Marriott Bonvoy Bold® Credit Card from Chase', 'personal'),
+    ('Marriott Bonvoy Bevy™ American Express® Card', 'personal'),
+    ('Marriott Bonvoy Brilliant® American Express® Card', 'personal'),
+    ('Marriott Bonvoy Business® American Express® Card', 'business'),
+]
+
+LOST_ITEM_QUESTION = 'What do I do if I lost an item on the bus?'
+
+
+def render_page(title: str, body: str) -> str:
+    """Wrap ``body`` in a minimal HTML document"""
+    return PAGE_TEMPLATE.format(title=escape(title), body=body)
+
+
+# --- GameStop store locator -------------------------------------------------
+
+def gamestop_store(i: int) -> Dict[str, Any]:
+    """Store ``i`` in the shape of the Stores-FindStores JSON"""
+    city, state, postal_code, lat, lng = CITIES[i % len(CITIES)]
+    return {
+        'ID': str(6000 + i),
+        'name': f'GameStop {city} #{i + 1}',
+        'address1': f'{100 + i * 7} Sunset Blvd',
+        'address2': f'Suite {i % 40 + 1}' if i % 3 == 0 else '',
+        'city': city,
+        'stateCode': state,
+        'postalCode': postal_code,
+        'phone': f'323555{i % 10000:04d}',
+        'latitude': round(lat + (i % 50) * 0.001, 6),
+        'longitude': round(lng - (i % 50) * 0.001, 6),
+        'distance': f'{0.4 + i * 0.3:.1f} mi',
+        'storeStatus': 'Open until 9 PM' if i % 4 else 'Closed until 10 AM',
+        'storeHours': [{'day': day, 'hours': '10:00 AM - 9:00 PM' if day != 'Sun' else '11:00 AM - 7:00 PM'}
+                       for day in DAYS],
+    }
+
+
+def gamestop_stores_json(count: int) -> str:
+    """Body of the store-search XHR"""
+    return json.dumps({'action': 'Stores-FindStores', 'stores': [gamestop_store(i) for i in range(count)]})
+
+
+def gamestop_store_card(store: Dict[str, Any]) -> str:
+    """One ``[data-store-id]`` card laid out the way parse_store_info reads it"""
+    digits = store['phone']
+    lines = [
+        f"<div class=\"store-name\">{escape(store['name'])}</div>",
+        f"<div class=\"store-status\">{escape(store['storeStatus'])}</div>",
+        f"<div class=\"store-phone\">({digits[:3]}) {digits[3:6]}-{digits[6:]}</div>",
+        f"<div class=\"store-address\">{escape(store['address1'])}</div>",
+    ]
+    if store['address2']:
+        lines.append(f"<div class=\"store-address\">{escape(store['address2'])}</div>")
+    lines.append(f"<div class=\"store-address\">{store['city']}, {store['stateCode']} {store['postalCode']}</div>")
+    lines.append('<a class="directions" href="#">Get Directions</a>')
+    lines.append('<div class="hours-title">HOURS</div>')
+    for entry in store['storeHours']:
+        lines.append(f"<div class=\"day\">{entry['day']}:</div><div class=\"time\">{entry['hours']}</div>")
+    lines.append('<button class="set-home-store">Set as Home Store</button>')
+    return f"<div class=\"store-card\" data-store-id=\"{store['ID']}\">{''.join(lines)}</div>"
+
+
+GAMESTOP_LOCATOR_SCRIPT = """
+<script>
+const params = new URLSearchParams(location.search);
+document.getElementById('search').addEventListener('click', async () => {
+    const postalCode = document.querySelector('input[name="postalCode"]').value;
+    const query = new URLSearchParams({postalCode, count: params.get('count') || '', latency_ms: params.get('latency_ms') || ''});
+    const response = await fetch('/gamestop/on/demandware.store/Sites-gamestop-us-Site/default/Stores-FindStores?' + query);
+    const data = await response.json();
+    const html = await (await fetch('/gamestop/stores/cards?' + query)).text();
+    document.getElementById('store-results').innerHTML = html;
+    document.querySelectorAll('.set-home-store').forEach((button) => button.addEventListener('click', () => {
+        document.getElementById('messages').innerHTML = '<div class="confirmation">Home store set</div>';
+    }));
+    document.getElementById('result-count').textContent = data.stores.length + ' stores';
+});
+</script>
+"""
+
+
+def gamestop_locator(count: int) -> str:
+    """Store locator form; searching fetches the JSON then renders the cards"""
+    body = (
+        '<form onsubmit="return false">'
+        '<input type="text" name="postalCode" placeholder="ZIP Code">'
+        '<button id="search" type="button">Search</button>'
+        '</form>'
+        '<div id="result-count"></div><div id="messages"></div>'
+        '<div id="store-results"></div>'
+        + GAMESTOP_LOCATOR_SCRIPT
+    )
+    return render_page('Store Locator | GameStop', body)
+
+
+def gamestop_store_cards(count: int) -> str:
+    """Rendered result cards, as the locator inserts them after a search"""
+    return ''.join(gamestop_store_card(gamestop_store(i)) for i in range(count))
+
+
+# --- Target search results --------------------------------------------------
+
+def target_search(count: int) -> str:
+    """Search results made of ``ProductCardWrapper`` cards"""
+    cards = []
+    for i in range(count):
+        vegan = i % 3 == 0
+        title = f"{'Vegan ' if vegan else ''}{['Margherita', 'Pepperoni', 'Veggie', 'Supreme'][i % 4]} Pizza {i + 1} - 12oz"
+        price = f'${4 + (i % 9) + 0.49:.2f}'
+        cards.append(
+            '<div data-test="@web/site-top-of-funnel/ProductCardWrapper">'
+            f'<a data-test="product-title" href="/p/-/A-{80000000 + i}">{escape(title)}</a>'
+            f'<span data-test="product-price">{price}</span>'
+            f'<span aria-label="current price {price}"></span>'
+            '</div>'
+        )
+    return render_page('vegan pizza : Target', '<div id="search-results">' + ''.join(cards) + '</div>')
+
+
+# --- FlightAware AeroAPI plans ----------------------------------------------
+
+FLIGHTAWARE_PLANS = """
+<table class="compare-plans">
+  <tr><th></th><th class="plan-header">Personal</th><th class="plan-header">Standard</th><th class="plan-header">Premium</th></tr>
+  <tr><td>Monthly minimum</td><td>No minimum</td><td>$100/month</td><td>$1,000/month</td></tr>
+  <tr><td>Rate limit</td><td>10 result sets/minute</td><td>5 result sets/second</td><td>100 result sets/second</td></tr>
+  <tr><td>Free usage</td><td>$5 free per month</td><td>-</td><td>-</td></tr>
+  <tr><td>Volume pricing</td><td>-</td><td class="discount">Volume Discount 10% over $1,000</td><td class="discount">Volume Discount 20% over $5,000</td></tr>
+</table>
+"""
+
+
+def flightaware_aeroapi(count: int) -> str:
+    """``#compare-plans-section`` with ``count`` priced API endpoint rows"""
+    rows = []
+    for i in range(count):
+        method = 'POST' if i % 5 == 4 else 'GET'
+        rows.append(
+            f'<tr class="endpoint"><td class="endpoint-name">{method} /flights/resource{i}</td>'
+            f'<td class="pricing">${0.002 + (i % 20) * 0.001:.3f}</td></tr>'
+        )
+    body = (
+        '<section id="compare-plans-section"><h2>Compare Plans</h2>'
+        + FLIGHTAWARE_PLANS
+        + '<table class="api-pricing">' + ''.join(rows) + '</table>'
+        + '</section>'
+    )
+    return render_page('AeroAPI | FlightAware', body)
+
+
+# --- Marriott credit cards --------------------------------------------------
+
+def marriott_card_name(i: int, tab: str) -> str:
+    """Card ``i`` on ``tab``; the first cards carry the real product names"""
+    real = [name for name, card_tab in MARRIOTT_CARDS if card_tab == tab]
+    if i < len(real):
+        return real[i]
+    return f'Marriott Bonvoy {tab.title()} Card {i + 1} from Chase'
+
+
+def marriott_card(i: int, tab: str, css_class: str) -> str:
+    name = marriott_card_name(i, tab)
+    bonus = f'{(3 + i % 5) * 25},000 Bonus Points' if i % 2 == 0 else f'{1 + i % 5} Free Night Awards'
+    fee = 'No Annual Fee' if i % 4 == 1 else f'${95 + (i % 6) * 100} Annual Fee'
+    lto = '<div class="badge">LIMITED TIME OFFER</div>' if i % 3 == 0 else ''
+    return (
+        f'<li class="{css_class}" data-testid="credit-card">{lto}'
+        f'<h3 class="card-name">{escape(name)}</h3>'
+        f'<p class="tagline">Earn more with card {i + 1}</p>'
+        f'<p class="bonus">{bonus}</p>'
+        f'<p class="fee">{fee}</p>'
+        f'<ul class="earning"><li>{6 - i % 3}X points at Marriott Bonvoy hotels</li><li>2X points on everything else</li></ul>'
+        f'<a href="/credit-cards/{i}.mi">Learn More</a>'
+        '</li>'
+    )
+
+
+def marriott_credit_cards(count: int) -> str:
+    """Personal and Business tabs, each with ``count`` cards"""
+    personal = ''.join(marriott_card(i, 'personal', 'card-container') for i in range(count))
+    business = ''.join(marriott_card(i, 'business', 'card-item') for i in range(count))
+    body = (
+        '<div data-testid="hero-banner"><h2>Earn 5 Free Night Awards</h2>'
+        '<p>Limited time offer on select Marriott Bonvoy cards.</p></div>'
+        '<div role="tablist">'
+        '<button role="tab" aria-selected="true" data-tab="personal">Personal</button>'
+        '<button role="tab" aria-selected="false" data-tab="business">Business</button>'
+        '</div>'
+        f'<ul id="personal" role="tabpanel">{personal}</ul>'
+        f'<ul id="business" role="tabpanel" hidden>{business}</ul>'
+        '<script>'
+        "document.querySelectorAll('[role=tab]').forEach((tab) => tab.addEventListener('click', () => {"
+        "document.querySelectorAll('[role=tab]').forEach((t) => t.setAttribute('aria-selected', t === tab));"
+        "document.querySelectorAll('[role=tabpanel]').forEach((p) => p.hidden = p.id !== tab.dataset.tab);"
+        '}));'
+        '</script>'
+    )
+    return render_page('Credit Cards | Marriott Bonvoy', body)
+
+
+# --- Megabus help -----------------------------------------------------------
+
+def megabus_home(count: int) -> str:
+    return render_page('megabus', '<nav><a href="/megabus/help">Help</a><a href="/megabus/contact-us">Contact us</a></nav>')
+
+
+def megabus_help(count: int) -> str:
+    """``count`` FAQ accordions; the lost-item question sits in the middle"""
+    lost_at = count // 2
+    items = []
+    for i in range(max(count, 1)):
+        if i == lost_at:
+            question = LOST_ITEM_QUESTION
+            answer = ('If an item is lost on a bus, please contact our lost and found department by '
+                      'completing this <a href="/contact-us">form</a>. We keep items for 30 days.')
+        else:
+            question = f'Frequently asked question {i + 1}?'
+            answer = f'Answer to question {i + 1}.'
+        items.append(
+            f'<div class="faq-item"><button aria-expanded="false" aria-controls="panel-{i}">{escape(question)}</button>'
+            f'<div id="panel-{i}" role="region" hidden>{answer}</div></div>'
+        )
+    body = (
+        '<h1>Help</h1><div class="faq">' + ''.join(items) + '</div>'
+        '<script>'
+        "document.querySelectorAll('[aria-controls]').forEach((button) => button.addEventListener('click', () => {"
+        "const open = button.getAttribute('aria-expanded') !== 'true';"
+        "button.setAttribute('aria-expanded', open);"
+        "document.getElementById(button.getAttribute('aria-controls')).hidden = !open;"
+        '}));'
+        '</script>'
+    )
+    return render_page('Help | megabus', body)
+
+
+def megabus_contact(count: int) -> str:
+    body = ('<h1>Contact us</h1><p>Chat with us <a href="https://help.megabus.com/chat">here!</a></p>'
+            '<p>Email <a href="mailto:questions@us.megabus.com">questions@us.megabus.com</a></p>')
+    return render_page('Contact us | megabus', body)
+
+
+# --- MTA neighborhood maps --------------------------------------------------
+
+def mta_station(i: int) -> str:
+    name, lines = BROOKLYN_STATIONS[i % len(BROOKLYN_STATIONS)]
+    if i >= len(BROOKLYN_STATIONS):
+        name = f'{name} {i // len(BROOKLYN_STATIONS) + 1}'
+    return f'{name} {lines}'
+
+
+def mta_brooklyn_maps(count: int) -> str:
+    """``count`` map download buttons among a few unrelated buttons"""
+    buttons = ['<button class="menu">Menu</button>', '<button class="search">Search</button>']
+    buttons += [
+        f'<button class="map-download" data-href="/maps/brooklyn/{i}.pdf">{escape(mta_station(i))} '
+        '<span class="icon">\ue900</span></button>'
+        for i in range(count)
+    ]
+    buttons.append('<button class="feedback">Feedback (opens survey)</button>')
+    return render_page('Brooklyn Neighborhood Maps | MTA', '<main>' + ''.join(buttons) + '</main>')
+
+
+def mta_station_names(count: int) -> List[str]:
+    """Map names the MTA automation is expected to find on a page of ``count`` buttons"""
+    return [mta_station(i) for i in range(count)]
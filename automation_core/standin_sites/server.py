@@ -0,0 +1,163 @@
+"""
+Stand-in Site Server
+
+Local HTTP server for the stand-in pages, for benchmarks and CI machines
+without network access. Each site is mounted under its own prefix:
+
+    /gamestop/stores/                         store locator form
+    /gamestop/on/demandware.store/.../Stores-FindStores   store-search JSON
+    /gamestop/stores/cards                    rendered store cards
+    /target/s?searchTerm=...                  product search results
+    /flightaware/commercial/aeroapi/          AeroAPI plan comparison
+    /marriott/credit-cards.mi                 credit card tabs
+    /megabus/, /megabus/help, /megabus/contact-us
+    /mta/maps/neighborhood-maps/brooklyn      neighborhood map buttons
+
+Every page accepts ``count`` (items to render) and ``latency_ms`` (delay
+before responding) query parameters, falling back to the server defaults.
+
+Usage:
+    python -m automation_core.standin_sites.server --port 8765 --latency-ms 150
+
+    with StandinServer(default_count=500) as server:
+        page.goto(server.url('/target/s?searchTerm=vegan+pizza'))
+"""
+
+import argparse
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from automation_core.standin_sites import pages
+
+
+# (path regex, content type, builder, default count) per route
+ROUTES: List[Tuple[str, str, Callable[[int], str], int]] = [
+    (r'/gamestop/stores/?', 'text/html', pages.gamestop_locator, 10),
+    (r'/gamestop/on/demandware\.store/.*Stores-FindStores', 'application/json', pages.gamestop_stores_json, 10),
+    (r'/gamestop/stores/cards', 'text/html', pages.gamestop_store_cards, 10),
+    (r'/target/s', 'text/html', pages.target_search, 24),
+    (r'/flightaware/commercial/aeroapi/?', 'text/html', pages.flightaware_aeroapi, 12),
+    (r'/marriott/credit-cards\.mi', 'text/html', pages.marriott_credit_cards, 4),
+    (r'/megabus/?', 'text/html', pages.megabus_home, 0),
+    (r'/megabus/help', 'text/html', pages.megabus_help, 20),
+    (r'/megabus/contact-us', 'text/html', pages.megabus_contact, 0),
+    (r'/mta/maps/neighborhood-maps/brooklyn', 'text/html', pages.mta_brooklyn_maps, 60),
+]
+COMPILED_ROUTES = [(re.compile(pattern + r'$'), content_type, builder, count)
+                   for pattern, content_type, builder, count in ROUTES]
+
+
+def _int_param(query: Dict[str, List[str]], name: str, default: Optional[int]) -> Optional[int]:
+    try:
+        return int(query[name][0])
+    except (KeyError, IndexError, ValueError):
+        return default
+
+
+class StandinRequestHandler(BaseHTTPRequestHandler):
+    """Serves the stand-in pages; settings come from ``self.server``"""
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+
+        latency_ms = _int_param(query, 'latency_ms', self.server.latency_ms)
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+
+        if parsed.path == '/':
+            self._send(200, 'text/html', pages.render_page(
+                'Stand-in sites', ''.join(f'<p>{pattern}</p>' for pattern, _, _, _ in ROUTES)))
+            return
+
+        for pattern, content_type, builder, default_count in COMPILED_ROUTES:
+            if pattern.match(parsed.path):
+                count = _int_param(query, 'count', self.server.default_count or default_count)
+                self._send(200, content_type, builder(count))
+                return
+
+        self._send(404, 'text/plain', 'Not found')
+
+    def _send(self, status: int, content_type: str, body: str):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        self.server.requests_served += 1
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class StandinServer(ThreadingHTTPServer):
+    """Stand-in site server that can run in a background thread"""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency_ms: int = 0,
+                 default_count: Optional[int] = None, verbose: bool = False):
+        super().__init__((host, port), StandinRequestHandler)
+        self.latency_ms = latency_ms
+        self.default_count = default_count
+        self.verbose = verbose
+        self.requests_served = 0
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def url(self, path: str = '/') -> str:
+        """Absolute URL for ``path`` on this server"""
+        return self.base_url + path
+
+    def start(self) -> 'StandinServer':
+        """Serve from a daemon thread"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port"""
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve stand-in pages for the site automations')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=int, default=0, help='Delay before every response')
+    parser.add_argument('--count', type=int, default=None, help='Items per page (default: per-site)')
+    args = parser.parse_args()
+
+    server = StandinServer(args.host, args.port, latency_ms=args.latency_ms,
+                           default_count=args.count, verbose=True)
+    print(f"Serving stand-in sites on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+"""
+Concurrent Multi-Task Runner
+
+Runs a manifest of automation tasks concurrently on asyncio, with a global
+concurrency limit and a per-host limit, and streams every task's results dict
+into one JSON-lines file as tasks finish. A nightly batch then takes about as
+long as its slowest task rather than the sum of all of them.
+
+Async automations share one ``AsyncBrowserPool``. Sync automations run in
+worker threads, because Playwright's sync API cannot share a browser across
+threads, and launch their own browser as before.
+
+Manifest format (JSON):
+
+    {
+        "max_concurrency": 6,
+        "per_host_limit": 2,
+        "tasks": [
+            {"id": "gamestop-90028", "type": "gamestop_stores", "params": {"zip_code": "90028"}},
+            {"type": "mta_maps", "timeout": 120}
+        ]
+    }
+
+Usage:
+    python -m automation_core.task_runner manifest.json [--output results.jsonl]
+        [--max-concurrency N] [--per-host-limit N]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from automation_core.browser_pool import AsyncBrowserPool
+from automation_core.scripts import load_script
+
+
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_PER_HOST_LIMIT = 2
+
+
+class TaskType:
+    """A kind of task the runner knows how to execute"""
+
+    def __init__(self, name: str, host: str, run: Callable[[Dict[str, Any], Optional[AsyncBrowserPool]], Awaitable[Any]],
+                 uses_pool: bool = True):
+        self.name = name
+        self.host = host
+        self.run = run
+        # Sync automations run in threads and cannot use the async pool
+        self.uses_pool = uses_pool
+
+
+TASK_TYPES: Dict[str, TaskType] = {}
+
+
+def register_task_type(name: str, host: str, uses_pool: bool = True):
+    """Decorator registering ``async def run(params, pool)`` as a task type"""
+    def decorator(func):
+        TASK_TYPES[name] = TaskType(name, host, func, uses_pool=uses_pool)
+        return func
+    return decorator
+
+
+@register_task_type('gamestop_stores', 'www.gamestop.com', uses_pool=False)
+async def run_gamestop_stores(params, pool):
+    module = load_script('oh_ui_sessions/gamestop/gamestop_automation.py')
+    locator = module.GameStopStoreLocator(headless=True)
+    return await asyncio.to_thread(locator.run_automation, str(params.get('zip_code', '90028')))
+
+
+@register_task_type('target_jobs', 'corporate.target.com')
+async def run_target_jobs(params, pool):
+    module = load_script('oh_ui_sessions/target_job_search/target_job_search_automation.py')
+    automation = module.TargetJobSearchAutomation(headless=True, pool=pool)
+    return await automation.search_jobs(
+        job_title=params.get('job_title', 'Human Resources Expert'),
+        location=params.get('location', 'Miami, FL')
+    )
+
+
+@register_task_type('eventbrite_tips', 'www.eventbrite.com')
+async def run_eventbrite_tips(params, pool):
+    module = load_script('oh_ui_sessions/eventbrite/eventbrite_automation.py')
+    automation = module.EventbriteAutomation(pool=pool)
+    return await automation.run()
+
+
+@register_task_type('mta_maps', 'new.mta.info')
+async def run_mta_maps(params, pool):
+    module = load_script('oh_ui_sessions/mta/brooklyn_maps_automation.py')
+    maps = await module.get_brooklyn_neighborhood_maps(pool=pool)
+    return {'success': bool(maps), 'maps': maps, 'count': len(maps)}
+
+
+@register_task_type('marriott_cards', 'www.marriott.com')
+async def run_marriott_cards(params, pool):
+    module = load_script('oh_ui_sessions/marriott/marriott_credit_cards_automation.py')
+    automation = module.MarriottCreditCardsAutomation(pool=pool)
+    await automation.run()
+    return automation.get_results()
+
+
+@register_task_type('discogs_submissions', 'www.discogs.com')
+async def run_discogs_submissions(params, pool):
+    module = load_script('oh_ui_sessions/discogs/discogs_automation.py')
+    return await module.navigate_to_discogs_submissions(pool=pool)
+
+
+@register_task_type('target_vegan_pizza', 'www.target.com', uses_pool=False)
+async def run_target_vegan_pizza(params, pool):
+    module = load_script('oh-cli/target_vegan_pizza_automation/target_vegan_pizza_automation.py')
+    return await asyncio.to_thread(module.search_target_vegan_pizza)
+
+
+def load_manifest(path: str) -> Dict[str, Any]:
+    """Read and validate a task manifest"""
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if isinstance(manifest, list):
+        manifest = {'tasks': manifest}
+    tasks = manifest.get('tasks')
+    if not isinstance(tasks, list) or not tasks:
+        raise ValueError(f"Manifest {path} has no tasks")
+    for i, task in enumerate(tasks):
+        if task.get('type') not in TASK_TYPES:
+            raise ValueError(f"Task {i} has unknown type {task.get('type')!r}; "
+                             f"known types: {', '.join(sorted(TASK_TYPES))}")
+        task.setdefault('id', f"{task['type']}-{i}")
+        task.setdefault('params', {})
+    return manifest
+
+
+class TaskRunner:
+    """Executes manifest tasks concurrently under global and per-host limits"""
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+                 pool: Optional[AsyncBrowserPool] = None, pool_size: int = 2):
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.pool = pool
+        self.pool_size = pool_size
+        self._owns_pool = False
+
+    async def _ensure_pool(self, tasks: List[Dict[str, Any]]):
+        if self.pool is not None:
+            return
+        if any(TASK_TYPES[task['type']].uses_pool for task in tasks):
+            self.pool = await AsyncBrowserPool(size=self.pool_size).start()
+            self._owns_pool = True
+
+    async def _run_task(self, task: Dict[str, Any], global_limit: asyncio.Semaphore,
+                        host_limits: Dict[str, asyncio.Semaphore]) -> Dict[str, Any]:
+        task_type = TASK_TYPES[task['type']]
+        host = task.get('host', task_type.host)
+        record = {
+            'task_id': task['id'],
+            'type': task['type'],
+            'host': host,
+            'params': task['params'],
+            'success': False,
+            'result': None,
+            'error': None,
+        }
+        # Take the host slot first so a task queued behind its host does not hold a global slot
+        async with host_limits[host], global_limit:
+            started = time.time()
+            record['started_at'] = started
+            try:
+                pool = self.pool if task_type.uses_pool else None
+                coro = task_type.run(task['params'], pool)
+                # A timeout only abandons a sync task; its worker thread runs to completion
+                result = await asyncio.wait_for(coro, timeout=task.get('timeout'))
+                record['result'] = result
+                if isinstance(result, dict):
+                    record['success'] = bool(result.get('success', True)) and not result.get('error')
+                else:
+                    record['success'] = result is not None
+            except asyncio.TimeoutError:
+                record['error'] = f"Timed out after {task.get('timeout')}s"
+            except Exception as e:
+                record['error'] = str(e)
+            record['duration_s'] = round(time.time() - started, 3)
+        print(f"[{record['task_id']}] finished in {record['duration_s']}s "
+              f"({'ok' if record['success'] else 'failed'})")
+        return record
+
+    async def stream(self, tasks: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """Run all tasks and yield each result record as soon as it completes"""
+        await self._ensure_pool(tasks)
+        global_limit = asyncio.Semaphore(self.max_concurrency)
+        host_limits: Dict[str, asyncio.Semaphore] = {}
+        for task in tasks:
+            host = task.get('host', TASK_TYPES[task['type']].host)
+            host_limits.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+
+        pending = [asyncio.ensure_future(self._run_task(task, global_limit, host_limits)) for task in tasks]
+        try:
+            for next_done in asyncio.as_completed(pending):
+                yield await next_done
+        finally:
+            for future in pending:
+                future.cancel()
+            if self._owns_pool:
+                await self.pool.close()
+                self.pool = None
+                self._owns_pool = False
+
+    async def run(self, tasks: List[Dict[str, Any]], output_path: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Run all tasks, appending each record to ``output_path`` (JSON lines) as it finishes"""
+        records = []
+        out = open(output_path, 'a', encoding='utf-8') if output_path else None
+        try:
+            async for record in self.stream(tasks):
+                records.append(record)
+                if out:
+                    out.write(json.dumps(record, default=str, ensure_ascii=False) + '\n')
+                    out.flush()
+        finally:
+            if out:
+                out.close()
+        return records
+
+
+async def run_manifest(path: str, output_path: Optional[str] = None, max_concurrency: Optional[int] = None,
+                       per_host_limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Load a manifest and run it; command-line values override the manifest's limits"""
+    manifest = load_manifest(path)
+    runner = TaskRunner(
+        max_concurrency=max_concurrency or manifest.get('max_concurrency', DEFAULT_MAX_CONCURRENCY),
+        per_host_limit=per_host_limit or manifest.get('per_host_limit', DEFAULT_PER_HOST_LIMIT),
+    )
+    return await runner.run(manifest['tasks'], output_path=output_path)
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Run automation tasks from a manifest concurrently")
+    parser.add_argument('manifest', help="Path to the JSON task manifest")
+    parser.add_argument('--output', default='task_results.jsonl', help="JSON-lines file receiving results")
+    parser.add_argument('--max-concurrency', type=int, default=None, help="Global limit on running tasks")
+    parser.add_argument('--per-host-limit', type=int, default=None, help="Limit on running tasks per host")
+    args = parser.parse_args()
+
+    started = time.time()
+    records = asyncio.run(run_manifest(args.manifest, args.output, args.max_concurrency, args.per_host_limit))
+    succeeded = sum(1 for record in records if record['success'])
+
+    print("\n" + "=" * 50)
+    print("TASK RUNNER SUMMARY")
+    print("=" * 50)
+    print(f"Tasks: {len(records)}  Succeeded: {succeeded}  Failed: {len(records) - succeeded}")
+    print(f"Wall time: {time.time() - started:.1f}s  "
+          f"(sum of task times: {sum(record['duration_s'] for record in records):.1f}s)")
+    print(f"Results appended to {args.output}")
+    return records
+
+
+if __name__ == '__main__':
+    main()
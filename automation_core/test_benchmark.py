@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for the benchmark suite and step timer.
+
+Uses throwaway benchmarks that sleep instead of driving a browser.
+
+Usage:
+    python -m pytest automation_core/test_benchmark.py
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from automation_core import benchmark
+from automation_core.benchmark import (BENCHMARKS, compare_to_baseline, percentile, register_benchmark,
+                                       run_suite, summarize_runs)
+from automation_core.har_fixtures import HAR_MODE_ENV
+from automation_core.timing import StepTimer
+
+
+class TestStepTimer(unittest.TestCase):
+    """Test cases for StepTimer"""
+
+    def test_steps_and_totals(self):
+        """Steps are recorded by name, repeated steps are summed, and failing blocks still count"""
+        now = [0.0]
+        timer = StepTimer(clock=lambda: now[0])
+        with timer.step('page_load'):
+            now[0] += 1.5
+        timer.start('browser_startup')
+        now[0] += 0.5
+        self.assertEqual(timer.stop('browser_startup'), 0.5)
+        with self.assertRaises(RuntimeError):
+            with timer.step('page_load'):
+                now[0] += 0.25
+                raise RuntimeError('navigation failed')
+        self.assertEqual(timer.totals(), {'page_load': 1.75, 'browser_startup': 0.5})
+        self.assertEqual(timer.stop('never_started'), 0.0)
+
+
+class TestBenchmark(unittest.TestCase):
+    """Test cases for the benchmark runner"""
+
+    def setUp(self):
+        self.seen_modes = []
+
+        @register_benchmark('fake_steps')
+        async def fake_steps(timer, output_dir):
+            self.seen_modes.append(os.environ.get(HAR_MODE_ENV))
+            with timer.step('page_load'):
+                await asyncio.sleep(0.01)
+            with timer.step('output_write'), open(os.path.join(output_dir, 'out.json'), 'w') as f:
+                json.dump({'ok': True}, f)
+
+        @register_benchmark('fake_failing')
+        async def fake_failing(timer, output_dir):
+            raise RuntimeError('site changed')
+
+    def tearDown(self):
+        BENCHMARKS.pop('fake_steps', None)
+        BENCHMARKS.pop('fake_failing', None)
+
+    def test_percentile(self):
+        self.assertEqual(percentile([], 50), 0.0)
+        self.assertEqual(percentile([10, 20, 30, 40], 50), 25)
+        self.assertAlmostEqual(percentile(list(range(1, 101)), 95), 95.05)
+
+    def test_summarize_skips_failed_runs(self):
+        """Statistics come from successful runs only"""
+        runs = [
+            {'steps': {'extraction': 0.1}, 'total': 1.0, 'error': None},
+            {'steps': {'extraction': 0.3}, 'total': 2.0, 'error': None},
+            {'steps': {'extraction': 9.9}, 'total': 9.9, 'error': 'timeout'},
+        ]
+        steps = summarize_runs(runs)
+        self.assertEqual(steps['extraction']['runs'], 2)
+        self.assertEqual(steps['extraction']['p50_ms'], 200.0)
+        self.assertEqual(steps['total']['max_ms'], 2000.0)
+
+    def test_run_suite_reports_steps_and_restores_har_mode(self):
+        """Each measured run contributes per-step timings; warmups are not counted"""
+        with mock.patch.dict(os.environ, {HAR_MODE_ENV: 'live'}):
+            report = asyncio.run(run_suite(['fake_steps', 'fake_failing'], iterations=3, warmup=1))
+            self.assertEqual(os.environ[HAR_MODE_ENV], 'live')
+
+        self.assertEqual(self.seen_modes, ['replay'] * 4)
+        self.assertEqual(report['har_mode'], 'replay')
+        steps = report['benchmarks']['fake_steps']['steps']
+        self.assertEqual(set(steps), {'page_load', 'output_write', 'total'})
+        self.assertEqual(steps['page_load']['runs'], 3)
+        self.assertGreaterEqual(steps['page_load']['p50_ms'], 10)
+        failing = report['benchmarks']['fake_failing']
+        self.assertEqual((failing['failures'], failing['errors']), (3, ['site changed']))
+
+        with self.assertRaises(ValueError):
+            asyncio.run(run_suite(['no_such_benchmark']))
+
+    def test_compare_to_baseline(self):
+        """Slowdowns beyond the threshold and minimum delta are regressions"""
+        def report(load_ms, extract_ms, write_ms):
+            return {'benchmarks': {'megabus_lost_item': {'steps': {
+                'page_load': {'p50_ms': load_ms},
+                'extraction': {'p50_ms': extract_ms},
+                'output_write': {'p50_ms': write_ms},
+            }}}}
+
+        comparison = compare_to_baseline(report(1500, 300, 2), report(1000, 600, 1))
+        self.assertEqual([(e['step'], e['change']) for e in comparison['regressions']], [('page_load', 0.5)])
+        self.assertEqual([e['step'] for e in comparison['improvements']], ['extraction'])
+
+    def test_cli_exit_code_and_output(self):
+        """The CLI writes the JSON report and fails when a baseline comparison regresses"""
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'bench.json')
+            baseline = os.path.join(tmp, 'baseline.json')
+            with open(baseline, 'w') as f:
+                json.dump({'benchmarks': {'fake_steps': {'steps': {'total': {'p50_ms': 0.001}}}}}, f)
+
+            code = benchmark.main(['fake_steps', '-n', '2', '--warmup', '0', '--output', output,
+                                   '--baseline', baseline, '--min-delta-ms', '0'])
+            with open(output) as f:
+                written = json.load(f)
+
+        self.assertEqual(code, 1)
+        self.assertEqual(written['comparison']['regressions'][0]['step'], 'total')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared browser pool bookkeeping.
+
+Playwright objects are replaced by small fakes so these run without a browser.
+
+Usage:
+    python -m pytest automation_core/test_browser_pool.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+from automation_core.browser_pool import AsyncBrowserPool, SyncBrowserPool, _BrowserSlot, async_browser_context
+from automation_core.har_fixtures import HAR_DIR_ENV, HAR_MODE_ENV, attach_har_async, har_path
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self, options):
+        self.options = options
+        self.closed = False
+
+    def new_page(self):
+        return FakePage(self)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    def new_context(self, **options):
+        context = FakeContext(options)
+        self.contexts.append(context)
+        return context
+
+    def close(self):
+        self.connected = False
+
+
+class AsyncFakeContext(FakeContext):
+    async def new_page(self):
+        return AsyncFakePage(self)
+
+    async def close(self):
+        self.closed = True
+
+
+class AsyncFakePage(FakePage):
+    async def close(self):
+        self.closed = True
+
+
+class AsyncFakeBrowser(FakeBrowser):
+    async def new_context(self, **options):
+        context = AsyncFakeContext(options)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.connected = False
+
+
+class SlowAsyncFakeBrowser(AsyncFakeBrowser):
+    """Yields to the event loop while creating a context, like a real browser"""
+
+    async def new_context(self, **options):
+        await asyncio.sleep(0.01)
+        return await super().new_context(**options)
+
+
+class HarRecordingContext(AsyncFakeContext):
+    """Writes a recorded HAR only on close, as Playwright's BrowserContext does"""
+
+    def __init__(self, options):
+        super().__init__(options)
+        self.har = None
+
+    async def route_from_har(self, path, **options):
+        if options.get('update'):
+            self.har = path
+
+    async def close(self):
+        if self.har and not self.closed:
+            with open(self.har, 'w') as f:
+                f.write('{"log": {"entries": []}}')
+        self.closed = True
+
+
+class HarRecordingBrowser(AsyncFakeBrowser):
+    async def new_context(self, **options):
+        context = HarRecordingContext(options)
+        self.contexts.append(context)
+        return context
+
+
+def fake_async_playwright(browser):
+    """A ``playwright.async_api`` module whose chromium launches ``browser``"""
+    class Playwright:
+        async def __aenter__(self):
+            launcher = types.SimpleNamespace()
+
+            async def launch(**options):
+                return browser
+            launcher.launch = launch
+            return types.SimpleNamespace(chromium=launcher)
+
+        async def __aexit__(self, *exc):
+            return False
+
+    return types.SimpleNamespace(async_playwright=Playwright)
+
+
+def started_sync_pool(size=1, **options):
+    pool = SyncBrowserPool(size=size, **options)
+    pool.slots = [_BrowserSlot(FakeBrowser()) for _ in range(size)]
+    pool._launch = FakeBrowser
+    return pool
+
+
+class TestSyncBrowserPool(unittest.TestCase):
+    """Test cases for SyncBrowserPool"""
+
+    def test_context_recycled_after_max_pages(self):
+        """A pooled context is replaced once it has served its page quota"""
+        pool = started_sync_pool(max_pages_per_context=2)
+        seen = []
+        for _ in range(5):
+            with pool.page() as page:
+                seen.append(page.context)
+
+        browser = pool.slots[0].browser
+        self.assertEqual(len(browser.contexts), 3)
+        self.assertIs(seen[0], seen[1])
+        self.assertIsNot(seen[1], seen[2])
+        self.assertTrue(browser.contexts[0].closed)
+        self.assertTrue(browser.contexts[1].closed)
+        self.assertFalse(browser.contexts[2].closed)
+        self.assertEqual(pool.get_stats()['contexts_recycled'], 2)
+        self.assertEqual(pool.get_stats()['pages_served'], 5)
+
+    def test_retired_context_waits_for_open_pages(self):
+        """A retired context is only closed after its last page is released"""
+        pool = started_sync_pool(max_pages_per_context=1)
+        with pool.page() as first:
+            with pool.page() as second:
+                self.assertIsNot(first.context, second.context)
+                self.assertFalse(first.context.closed)
+            self.assertFalse(first.context.closed)
+        self.assertTrue(first.context.closed)
+
+    def test_new_context_is_isolated_and_closed(self):
+        """new_context hands out a fresh context with merged options"""
+        pool = started_sync_pool(context_options={'viewport': {'width': 1920, 'height': 1080}})
+        with pool.new_context(user_agent='UA') as context:
+            self.assertEqual(context.options['user_agent'], 'UA')
+            self.assertEqual(context.options['viewport']['width'], 1920)
+            self.assertEqual(pool.slots[0].active_contexts, 1)
+        self.assertTrue(context.closed)
+        self.assertEqual(pool.slots[0].active_contexts, 0)
+
+    def test_least_loaded_browser_is_used(self):
+        """Contexts are spread over the pool's browsers"""
+        pool = started_sync_pool(size=2)
+        first = pool.acquire_context()
+        second = pool.acquire_context()
+        self.assertEqual([slot.active_contexts for slot in pool.slots], [1, 1])
+        pool.release_context(first)
+        pool.release_context(second)
+
+    def test_disconnected_browser_is_relaunched(self):
+        """A crashed browser is replaced before handing out a context"""
+        pool = started_sync_pool()
+        old_browser = pool.slots[0].browser
+        old_browser.connected = False
+        context = pool.acquire_context()
+        self.assertIsNot(pool.slots[0].browser, old_browser)
+        self.assertIn(context, pool.slots[0].browser.contexts)
+
+    def test_page_rejects_different_options(self):
+        """page() cannot change the options of the context it shares"""
+        pool = started_sync_pool()
+        with pool.page(locale='en-US'):
+            pass
+        with pool.page(locale='en-US') as page:
+            self.assertEqual(page.context.options, {'locale': 'en-US'})
+        with self.assertRaises(ValueError):
+            with pool.page(locale='de-DE'):
+                pass
+        self.assertEqual(len(pool.slots[0].browser.contexts), 1)
+
+    def test_unstarted_pool_raises(self):
+        """Using a pool before start() is an error"""
+        with self.assertRaises(RuntimeError):
+            SyncBrowserPool().acquire_context()
+
+    def test_invalid_size(self):
+        """Pool size must be positive"""
+        with self.assertRaises(ValueError):
+            SyncBrowserPool(size=0)
+
+
+class TestAsyncBrowserPool(unittest.TestCase):
+    """Test cases for AsyncBrowserPool"""
+
+    def test_async_page_recycling(self):
+        """The async pool follows the same recycling rules"""
+        async def run():
+            pool = AsyncBrowserPool(max_pages_per_context=2)
+            pool.slots = [_BrowserSlot(AsyncFakeBrowser())]
+            pages = []
+            for _ in range(3):
+                async with pool.page() as page:
+                    pages.append(page)
+            return pool, pages
+
+        pool, pages = asyncio.run(run())
+        self.assertTrue(all(page.closed for page in pages))
+        self.assertEqual(len(pool.slots[0].browser.contexts), 2)
+        self.assertTrue(pool.slots[0].browser.contexts[0].closed)
+
+    def test_concurrent_pages_share_one_context(self):
+        """Callers arriving together do not each create (and orphan) a context"""
+        async def run():
+            pool = AsyncBrowserPool(max_pages_per_context=3)
+            pool.slots = [_BrowserSlot(SlowAsyncFakeBrowser())]
+
+            async def use_page():
+                async with pool.page() as page:
+                    await asyncio.sleep(0.01)
+                    return page.context
+
+            contexts = await asyncio.gather(*(use_page() for _ in range(5)))
+            return pool, contexts
+
+        pool, contexts = asyncio.run(run())
+        browser = pool.slots[0].browser
+        self.assertEqual(len(browser.contexts), 2)
+        self.assertEqual([contexts.count(context) for context in browser.contexts], [3, 2])
+        self.assertTrue(browser.contexts[0].closed)
+        self.assertEqual(pool.get_stats()['contexts_created'], 2)
+
+    def test_async_new_context(self):
+        """new_context closes the context on exit"""
+        async def run():
+            pool = AsyncBrowserPool()
+            pool.slots = [_BrowserSlot(AsyncFakeBrowser())]
+            async with pool.new_context(locale='en-US') as context:
+                options = context.options
+            return context, options
+
+        context, options = asyncio.run(run())
+        self.assertTrue(context.closed)
+        self.assertEqual(options, {'locale': 'en-US'})
+
+    def test_private_context_is_closed_so_har_is_recorded(self):
+        """Without a pool the context is closed before the browser, which is when the HAR is written"""
+        browser = HarRecordingBrowser()
+
+        async def run():
+            async with async_browser_context() as context:
+                await attach_har_async(context, 'mta_brooklyn_maps')
+
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.dict(os.environ, {HAR_MODE_ENV: 'record', HAR_DIR_ENV: tmp}), \
+                mock.patch.dict(sys.modules, {'playwright': types.ModuleType('playwright'),
+                                              'playwright.async_api': fake_async_playwright(browser)}):
+            asyncio.run(run())
+            self.assertTrue(os.path.exists(har_path('mta_brooklyn_maps')))
+        self.assertTrue(browser.contexts[0].closed)
+        self.assertFalse(browser.connected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Tests for change detection.
+
+A fake HTTP client serves canned pages with validators and a fake page stands
+in for Playwright; the result store runs for real on a temporary file.
+
+Usage:
+    python -m pytest automation_core/test_change_detection.py
+"""
+
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from automation_core.change_detection import ChangeDetector, describe_changes, diff_results, visible_text
+from automation_core.har_fixtures import HAR_MODE_ENV
+from automation_core.http_first import HttpClient
+from automation_core.result_store import ResultStore
+
+
+PAGE = '<html><script>var nonce = "%s";</script><body><h1>Plans</h1><p>Premium $1,000/month</p></body></html>'
+
+
+class FakeResponse:
+    def __init__(self, text, status_code=200, headers=None):
+        self.text = text
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class Origin:
+    """Serves one page with an ETag and honours If-None-Match"""
+
+    def __init__(self):
+        self.headers = {}
+        self.requests = []
+        self.body = PAGE % 'a'
+        self.etag = None
+
+    def get(self, url, timeout=None, headers=None, **kwargs):
+        self.requests.append(dict(headers or {}))
+        if self.etag and (headers or {}).get('If-None-Match') == self.etag:
+            return FakeResponse('', 304)
+        return FakeResponse(self.body, headers={'ETag': self.etag} if self.etag else {})
+
+    def close(self):
+        pass
+
+
+class FakePage:
+    def __init__(self, text):
+        self.text = text
+
+    async def evaluate(self, script, selector):
+        return self.text
+
+
+class TestChangeDetector(unittest.TestCase):
+    """Test cases for ChangeDetector"""
+
+    URL = 'https://example.com/plans'
+
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, {HAR_MODE_ENV: 'live'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ResultStore(os.path.join(self.tmp.name, 'results.sqlite'))
+        self.origin = Origin()
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def detector(self):
+        return ChangeDetector('plans', store=self.store, client=HttpClient(session=self.origin))
+
+    def full_run(self, detector, result):
+        run_id = self.store.append('plans', result)
+        return detector.commit(run_id, result)
+
+    def test_unchanged_body_reuses_the_stored_run(self):
+        first = self.detector()
+        self.assertFalse(first.check_http([self.URL]))
+        self.assertIsNone(self.full_run(first, {'plans': ['Premium'], 'timestamp': 1}))
+
+        # Only the script nonce differs: the visible text is the same
+        self.origin.body = PAGE % 'b'
+        second = self.detector()
+        self.assertTrue(second.check_http([self.URL]))
+        self.assertEqual(second.reuse(), {'plans': ['Premium'], 'timestamp': 1})
+        self.assertEqual(len(self.store.runs('plans')), 1)
+
+    def test_etag_revalidation(self):
+        self.origin.etag = '"v1"'
+        first = self.detector()
+        first.check_http([self.URL])
+        self.full_run(first, {'plans': ['Premium']})
+
+        second = self.detector()
+        self.assertTrue(second.check_http([self.URL]))
+        self.assertEqual(self.origin.requests[-1]['If-None-Match'], '"v1"')
+        self.assertEqual(second.stats['not_modified'], 1)
+        second.reuse()
+        # The reused run keeps its validators for the next check
+        self.assertEqual(self.store.fingerprints('plans')[self.URL]['etag'], '"v1"')
+
+    def test_changed_page_runs_and_emits_a_diff(self):
+        first = self.detector()
+        first.check_http([self.URL])
+        self.full_run(first, {'plans': ['Premium'], 'fees': {'Premium': '$1,000'}})
+
+        self.origin.body = PAGE.replace('$1,000', '$1,500') % 'a'
+        second = self.detector()
+        self.assertFalse(second.check_http([self.URL]))
+        changes = self.full_run(second, {'plans': ['Premium', 'Standard'], 'fees': {'Premium': '$1,500'}})
+        self.assertEqual(changes, [{'path': 'plans[1]', 'old': None, 'new': 'Standard'},
+                                   {'path': 'fees.Premium', 'old': '$1,000', 'new': '$1,500'}])
+        self.assertIn('2 change(s)', describe_changes(changes))
+
+        third = self.detector()
+        self.assertTrue(third.check_http([self.URL]))
+        self.assertEqual(third.reuse()['fees'], {'Premium': '$1,500'})
+
+    def test_dom_region_fingerprint(self):
+        first = self.detector()
+        self.assertFalse(asyncio.run(first.check_dom_async(FakePage('Boundless  Bold'), 'main')))
+        self.full_run(first, {'cards': 2})
+
+        second = self.detector()
+        self.assertTrue(asyncio.run(second.check_dom_async(FakePage('Boundless  Bold'), 'main')))
+        self.assertFalse(asyncio.run(self.detector().check_dom_async(FakePage('Boundless Bevy'), 'main')))
+        self.assertFalse(asyncio.run(self.detector().check_dom_async(FakePage(None), 'main')))
+
+    def test_blank_content_is_never_reused(self):
+        """A client-rendered shell normalizes to nothing, which must not look unchanged"""
+        for _ in range(2):
+            detector = self.detector()
+            self.assertFalse(detector.check_http([self.URL], normalize=lambda html: {'maps': []}))
+            self.assertEqual(detector.stats['unknown'], 1)
+            self.full_run(detector, {'maps': ['Stale']})
+        self.assertEqual(self.store.fingerprints('plans'), {})
+        self.assertFalse(asyncio.run(self.detector().check_dom_async(FakePage('  '), 'main')))
+
+    def test_errors_and_har_replay_never_reuse(self):
+        first = self.detector()
+        first.check_http([self.URL])
+        self.full_run(first, {'plans': []})
+
+        blocked = ChangeDetector('plans', store=self.store,
+                                 client=HttpClient(session=mock.Mock(get=mock.Mock(return_value=FakeResponse('', 403)),
+                                                                     headers={})))
+        self.assertFalse(blocked.check_http([self.URL]))
+        self.assertEqual(blocked.stats['errors'], 1)
+
+        with mock.patch.dict(os.environ, {HAR_MODE_ENV: 'replay'}):
+            replay = self.detector()
+            self.assertFalse(replay.check_http([self.URL]))
+        self.assertEqual(len(self.origin.requests), 1)
+
+
+class TestDiff(unittest.TestCase):
+    """Test cases for diff_results and visible_text"""
+
+    def test_diff_skips_volatile_keys(self):
+        old = {'timestamp': 1, 'cards': [{'name': 'Bold', 'fee': '$0'}], 'resource_blocking': {'blocked': 3}}
+        new = {'timestamp': 2, 'cards': [{'name': 'Bold', 'fee': '$95'}], 'resource_blocking': {'blocked': 4}}
+        self.assertEqual(diff_results(old, new), [{'path': 'cards[0].fee', 'old': '$0', 'new': '$95'}])
+        self.assertEqual(diff_results(old, old), [])
+
+    def test_visible_text(self):
+        html = '<p>Hi<!-- x --></p><style>p{}</style><SCRIPT src="a.js"></SCRIPT>\n<b>there</b>'
+        self.assertEqual(visible_text(html), 'Hi there')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for HAR record/replay fixtures.
+
+A fake context records the ``route_from_har`` calls that Playwright would receive.
+
+Usage:
+    python -m pytest automation_core/test_har_fixtures.py
+"""
+
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from automation_core.har_fixtures import HAR_DIR_ENV, HAR_MODE_ENV, attach_har_async, attach_har_sync, har_mode
+
+
+class FakeContext:
+    def __init__(self):
+        self.calls = []
+
+    def route_from_har(self, path, **options):
+        self.calls.append((path, options))
+
+
+class AsyncFakeContext(FakeContext):
+    async def route_from_har(self, path, **options):
+        self.calls.append((path, options))
+
+
+class TestHarFixtures(unittest.TestCase):
+    """Test cases for the HAR fixture helpers"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.har_dir = os.path.join(self.tmp.name, 'har')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _env(self, mode):
+        return mock.patch.dict(os.environ, {HAR_MODE_ENV: mode, HAR_DIR_ENV: self.har_dir})
+
+    def test_live_mode_routes_nothing(self):
+        """Without the environment variable the live site is used"""
+        context = FakeContext()
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(har_mode(), 'live')
+            self.assertEqual(attach_har_sync(context, 'marriott_credit_cards'), 'live')
+        self.assertEqual(context.calls, [])
+
+    def test_record_mode_updates_har(self):
+        """Recording creates the fixture directory and asks Playwright to write the HAR"""
+        context = FakeContext()
+        with self._env('record'):
+            attach_har_sync(context, 'gamestop_store_locator')
+        path, options = context.calls[0]
+        self.assertEqual(path, os.path.join(self.har_dir, 'gamestop_store_locator.har'))
+        self.assertTrue(options['update'])
+        self.assertTrue(os.path.isdir(self.har_dir))
+
+    def test_replay_mode_serves_from_har(self):
+        """Replaying aborts anything missing from the HAR so no request goes live"""
+        os.makedirs(self.har_dir)
+        path = os.path.join(self.har_dir, 'mta_brooklyn_maps.har')
+        with open(path, 'w') as f:
+            f.write('{"log": {"entries": []}}')
+        context = AsyncFakeContext()
+        with self._env('replay'):
+            mode = asyncio.run(attach_har_async(context, 'mta_brooklyn_maps'))
+        self.assertEqual(mode, 'replay')
+        self.assertEqual(context.calls, [(path, {'not_found': 'abort'})])
+
+    def test_replay_without_fixture_fails(self):
+        """A missing fixture is an error rather than a silent live run"""
+        with self._env('replay'):
+            with self.assertRaises(FileNotFoundError):
+                attach_har_sync(FakeContext(), 'never_recorded')
+
+    def test_unknown_mode_rejected(self):
+        """Typos in the mode are reported instead of falling back to live"""
+        with self._env('playback'):
+            with self.assertRaises(ValueError):
+                har_mode()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent HTTP cache.
+
+Fake routes and a fake origin stand in for Playwright; the cache itself runs
+for real in a temporary directory with a simulated clock.
+
+Usage:
+    python -m pytest automation_core/test_http_cache.py
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from automation_core.har_fixtures import HAR_MODE_ENV
+from automation_core.http_cache import (HTTP_CACHE_ENV, BrowserHttpCache, DiskCache, attach_http_cache_sync,
+                                        cache_policy)
+
+
+class FakeRequest:
+    def __init__(self, url, resource_type='script', method='GET'):
+        self.url = url
+        self.resource_type = resource_type
+        self.method = method
+        self.headers = {'user-agent': 'test'}
+
+
+class FakeResponse:
+    def __init__(self, status, headers, body=b''):
+        self.status = status
+        self.headers = headers
+        self._body = body
+
+    def body(self):
+        return self._body
+
+
+class Origin:
+    """Serves one versioned resource and honours If-None-Match"""
+
+    def __init__(self, headers):
+        self.headers = headers
+        self.etag = '"v1"'
+        self.body = b'console.log(1)' * 100
+        self.requests = []
+
+    def fetch(self, headers):
+        self.requests.append(headers)
+        if headers.get('if-none-match') == self.etag:
+            return FakeResponse(304, {'etag': self.etag})
+        return FakeResponse(200, dict(self.headers, etag=self.etag, **{'content-encoding': 'gzip'}), self.body)
+
+
+class FakeRoute:
+    def __init__(self, request, origin):
+        self.request = request
+        self.origin = origin
+        self.outcome = None
+
+    def fetch(self, headers=None):
+        return self.origin.fetch(headers or {})
+
+    def fulfill(self, status=None, headers=None, body=None, response=None):
+        self.outcome = ('fulfill', response.status if response else status, body, headers)
+
+    def fallback(self):
+        self.outcome = ('fallback',)
+
+
+class FakeContext:
+    def __init__(self):
+        self.handler = None
+
+    def route(self, pattern, handler):
+        self.handler = handler
+
+
+class TestHttpCache(unittest.TestCase):
+    """Test cases for DiskCache and BrowserHttpCache"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.now = 1000.0
+        self.cache = DiskCache(self.tmp.name, max_bytes=10000, clock=lambda: self.now)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def request(self, context, origin, url='https://cdn.example.com/app.js', **kwargs):
+        route = FakeRoute(FakeRequest(url, **kwargs), origin)
+        context.handler(route)
+        return route.outcome
+
+    def attach(self):
+        context = FakeContext()
+        browser_cache = BrowserHttpCache(self.cache).attach_sync(context)
+        return context, browser_cache
+
+    def test_cache_policy(self):
+        self.assertEqual(cache_policy({'Cache-Control': 'public, max-age=60'}, 0), (True, 60))
+        self.assertEqual(cache_policy({'cache-control': 'no-store', 'etag': '"a"'}, 0), (False, 0))
+        self.assertEqual(cache_policy({'cache-control': 'no-cache', 'etag': '"a"'}, 0), (True, 0))
+        self.assertEqual(cache_policy({'expires': 'Thu, 01 Jan 1970 00:01:40 GMT'}, 0), (True, 100))
+        self.assertEqual(cache_policy({'content-type': 'text/javascript'}, 0), (False, 0))
+
+    def test_fresh_hit_skips_the_network(self):
+        origin = Origin({'cache-control': 'max-age=600', 'content-type': 'text/javascript'})
+        context, browser_cache = self.attach()
+        first = self.request(context, origin)
+        second = self.request(context, origin)
+
+        self.assertEqual(first[:3], ('fulfill', 200, origin.body))
+        self.assertEqual(second[:3], ('fulfill', 200, origin.body))
+        self.assertNotIn('content-encoding', second[3])
+        self.assertEqual(len(origin.requests), 1)
+        report = browser_cache.report()
+        self.assertEqual((report['hits'], report['misses'], report['stored']), (1, 1, 1))
+        self.assertEqual(report['hit_rate'], 0.5)
+
+    def test_stale_entry_is_revalidated_with_etag(self):
+        origin = Origin({'cache-control': 'max-age=60'})
+        context, browser_cache = self.attach()
+        self.request(context, origin)
+        self.now += 120
+        outcome = self.request(context, origin)
+
+        self.assertEqual(outcome[:3], ('fulfill', 200, origin.body))
+        self.assertEqual(origin.requests[-1]['if-none-match'], '"v1"')
+        self.assertEqual(browser_cache.stats['revalidated'], 1)
+        # The 304 renewed the entry's freshness
+        self.request(context, origin)
+        self.assertEqual((len(origin.requests), browser_cache.stats['hits']), (2, 1))
+
+        origin.etag = '"v2"'
+        self.now += 120
+        self.request(context, origin)
+        self.assertEqual(self.cache.get('https://cdn.example.com/app.js')['etag'], '"v2"')
+
+    def test_uncacheable_requests_fall_back(self):
+        origin = Origin({'cache-control': 'no-store'})
+        context, browser_cache = self.attach()
+        self.assertEqual(self.request(context, origin, resource_type='document'), ('fallback',))
+        self.assertEqual(self.request(context, origin, method='POST'), ('fallback',))
+        self.request(context, origin)
+        self.assertIsNone(self.cache.get('https://cdn.example.com/app.js'))
+        self.assertEqual(browser_cache.stats['stored'], 0)
+
+    def test_lru_eviction_keeps_the_cache_under_its_cap(self):
+        for i in range(4):
+            self.now += 1
+            self.cache.put(f'https://cdn.example.com/{i}.js', 200, {}, b'x' * 3000, self.now + 600)
+            if i == 1:
+                self.now += 1
+                self.cache.read_body(self.cache.get('https://cdn.example.com/0.js'))
+
+        self.assertLessEqual(self.cache.total_bytes(), 10000)
+        self.assertIsNotNone(self.cache.get('https://cdn.example.com/0.js'))
+        self.assertIsNone(self.cache.get('https://cdn.example.com/1.js'))
+
+        # A second handle on the same directory (another worker) sees the same entries
+        other = DiskCache(self.tmp.name)
+        self.assertEqual(other.read_body(other.get('https://cdn.example.com/3.js')), b'x' * 3000)
+        other.close()
+
+    def test_attach_is_opt_in_and_off_during_har_replay(self):
+        context = FakeContext()
+        with mock.patch.dict(os.environ, {HAR_MODE_ENV: 'live'}):
+            os.environ.pop(HTTP_CACHE_ENV, None)
+            self.assertIsNone(attach_http_cache_sync(context))
+            self.assertIsNotNone(attach_http_cache_sync(context, directory=self.tmp.name))
+        with mock.patch.dict(os.environ, {HAR_MODE_ENV: 'replay', HTTP_CACHE_ENV: self.tmp.name}):
+            self.assertIsNone(attach_http_cache_sync(FakeContext()))
+
+
+if __name__ == '__main__':
+    unittest.main()
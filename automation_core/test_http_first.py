@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tests for HTTP-first fetching.
+
+A fake HTTP client serves canned HTML, so no network access is needed.
+
+Usage:
+    python -m pytest automation_core/test_http_first.py
+"""
+
+import asyncio
+import os
+import unittest
+from unittest import mock
+
+from automation_core.har_fixtures import HAR_MODE_ENV
+from automation_core.http_first import (HttpClient, fetch_http_first, fetch_http_first_async, find_values,
+                                        parse_page)
+
+
+PAGE_HTML = """<!DOCTYPE html>
+<html><head>
+<title>MLS  Standings</title>
+<script id="__NEXT_DATA__" type="application/json">{"props": {"pageProps": {"teams": [{"name": "Philadelphia"}]}}}</script>
+<script type="application/ld+json">{"@context": "https://schema.org", "@graph": [
+  {"@type": "BlogPosting", "headline": "Event planning tips"}, {"@type": "Organization", "name": "Eventbrite"}]}</script>
+<script type="application/ld+json">{not json</script>
+<script>window.dataLayer = window.dataLayer || []; window.__STATE__ = {"stations": ["4 Av-9 St (F)(G)"]};</script>
+<style>td { color: red; }</style>
+</head><body>
+<a href="/blog/event-planning-guide">Event <b>planning</b> guide</a>
+<button class="map-download">4 Av-9 St (F)(G) &amp; more</button>
+<table>
+  <tr><th>Team</th><th>PTS</th></tr>
+  <tr><td>Philadelphia Union<td>66
+  <tr><td>FC Cincinnati</td><td>65</td></tr>
+</table>
+</body></html>
+"""
+
+
+class FakeResponse:
+    def __init__(self, text, status_code=200, url='https://example.com/'):
+        self.text = text
+        self.status_code = status_code
+        self.url = url
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = responses
+        self.headers = {}
+        self.requested = []
+
+    def get(self, url, timeout=None, **kwargs):
+        self.requested.append(url)
+        response = self.responses[url]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def close(self):
+        pass
+
+
+def standings(page):
+    return {'rows': [row for table in page.tables for row in table[1:]]}
+
+
+class TestParsePage(unittest.TestCase):
+    """Test cases for parse_page"""
+
+    def test_embedded_state_tables_links_and_buttons(self):
+        page = parse_page(PAGE_HTML)
+        self.assertEqual(page.title, 'MLS Standings')
+        self.assertEqual(list(find_values(page.next_data, 'name')), ['Philadelphia'])
+        self.assertEqual(len(page.json_ld), 1)
+        self.assertEqual([item['headline'] for item in page.json_ld_of_type('BlogPosting')], ['Event planning tips'])
+        self.assertEqual(page.window_state, {'__STATE__': {'stations': ['4 Av-9 St (F)(G)']}})
+        # Unclosed cells and rows are closed by the next one, as browsers do
+        self.assertEqual(page.tables, [[['Team', 'PTS'], ['Philadelphia Union', '66'], ['FC Cincinnati', '65']]])
+        self.assertEqual(page.links, [{'href': '/blog/event-planning-guide', 'text': 'Event planning guide'}])
+        self.assertEqual(page.buttons, ['4 Av-9 St (F)(G) & more'])
+
+
+class TestFetchHttpFirst(unittest.TestCase):
+    """Test cases for fetch_http_first"""
+
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, {HAR_MODE_ENV: 'live'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.browser_calls = 0
+
+    def client(self, responses):
+        return HttpClient(session=FakeSession(responses))
+
+    def browser(self):
+        self.browser_calls += 1
+        return {'rows': [['from', 'browser']]}
+
+    def test_http_result_skips_the_browser(self):
+        client = self.client({'https://example.com/': FakeResponse(PAGE_HTML)})
+        result = fetch_http_first('https://example.com/', standings, ['rows'], self.browser, client=client)
+        self.assertTrue(result['success'])
+        self.assertEqual(result['source'], 'http')
+        self.assertEqual(len(result['data']['rows']), 2)
+        self.assertEqual(self.browser_calls, 0)
+        self.assertIn('User-Agent', client.session.headers)
+
+    def test_missing_fields_or_errors_escalate(self):
+        client = self.client({
+            'https://example.com/empty': FakeResponse('<html><body>Loading...</body></html>'),
+            'https://example.com/blocked': FakeResponse('Access Denied', status_code=403),
+            'https://example.com/down': ConnectionError('connection refused'),
+        })
+        for path, error in (('empty', None), ('blocked', 'HTTP 403'), ('down', 'connection refused')):
+            result = fetch_http_first(f'https://example.com/{path}', standings, ['rows'], self.browser, client=client)
+            self.assertEqual((result['source'], result['http_error']), ('browser', error))
+            self.assertTrue(result['success'])
+        self.assertEqual(self.browser_calls, 3)
+
+        result = fetch_http_first('https://example.com/empty', standings, ['rows'], client=client)
+        self.assertEqual((result['success'], result['source'], result['missing']), (False, None, ['rows']))
+
+    def test_har_replay_goes_straight_to_the_browser(self):
+        session = FakeSession({})
+        with mock.patch.dict(os.environ, {HAR_MODE_ENV: 'replay'}):
+            result = fetch_http_first('https://example.com/', standings, ['rows'], self.browser,
+                                      client=HttpClient(session=session))
+        self.assertEqual((result['source'], result['http_ms']), ('browser', None))
+        self.assertEqual(session.requested, [])
+
+    def test_async(self):
+        async def browser():
+            return self.browser()
+
+        client = self.client({'https://example.com/': FakeResponse(PAGE_HTML),
+                              'https://example.com/empty': FakeResponse('')})
+        http = asyncio.run(fetch_http_first_async('https://example.com/', standings, ['rows'], browser, client=client))
+        escalated = asyncio.run(fetch_http_first_async('https://example.com/empty', standings, ['rows'], browser,
+                                                       client=client))
+        self.assertEqual((http['source'], escalated['source']), ('http', 'browser'))
+        self.assertEqual(escalated['data'], {'rows': [['from', 'browser']]})
+
+
+if __name__ == '__main__':
+    unittest.main()
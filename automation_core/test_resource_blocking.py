@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Tests for the resource blocking profiles.
+
+Fake routes and contexts stand in for Playwright's routing API.
+
+Usage:
+    python -m pytest automation_core/test_resource_blocking.py
+"""
+
+import asyncio
+import re
+import unittest
+
+from automation_core.resource_blocking import ESTIMATED_BYTES_BY_TYPE, ResourceBlockingProfile, site_profile
+
+
+class FakeRequest:
+    def __init__(self, url, resource_type):
+        self.url = url
+        self.resource_type = resource_type
+
+
+class FakeResponse:
+    def __init__(self, length):
+        self.headers = {'content-length': str(length)} if length is not None else {}
+
+
+class FakeRoute:
+    def __init__(self, url, resource_type):
+        self.request = FakeRequest(url, resource_type)
+        self.outcome = None
+
+    def abort(self):
+        self.outcome = 'aborted'
+
+    def fallback(self):
+        self.outcome = 'fallback'
+
+
+class AsyncFakeRoute(FakeRoute):
+    async def abort(self):
+        self.outcome = 'aborted'
+
+    async def fallback(self):
+        self.outcome = 'fallback'
+
+
+class FakeContext:
+    """Records the route handler and response listener a profile installs"""
+
+    def __init__(self):
+        self.handler = None
+        self.listeners = {}
+
+    def route(self, pattern, handler):
+        self.handler = handler
+
+    def on(self, event, handler):
+        self.listeners[event] = handler
+
+
+class AsyncFakeContext(FakeContext):
+    async def route(self, pattern, handler):
+        self.handler = handler
+
+
+class TestResourceBlocking(unittest.TestCase):
+    """Test cases for ResourceBlockingProfile"""
+
+    def test_blocks_heavy_types_and_trackers(self):
+        """Images/fonts/media and analytics hosts are blocked; documents and app scripts are not"""
+        profile = ResourceBlockingProfile()
+        self.assertEqual(profile.should_block('https://new.mta.info/logo.png', 'image'), 'type:image')
+        self.assertEqual(profile.should_block('https://new.mta.info/icons.woff2', 'font'), 'type:font')
+        self.assertEqual(profile.should_block('https://www.googletagmanager.com/gtm.js?id=X', 'script'),
+                         'host:googletagmanager.com')
+        self.assertEqual(profile.should_block('https://stats.g.doubleclick.net/collect', 'xhr'), 'host:doubleclick.net')
+        self.assertIsNone(profile.should_block('https://new.mta.info/maps', 'document'))
+        self.assertIsNone(profile.should_block('https://new.mta.info/app.js', 'script'))
+        self.assertIsNone(profile.should_block('data:image/png;base64,AAAA', 'image'))
+
+    def test_host_entries_with_path(self):
+        """Path-qualified entries only block that path on the host"""
+        profile = ResourceBlockingProfile()
+        self.assertEqual(profile.should_block('https://www.facebook.com/tr?id=1', 'image'), 'host:facebook.com/tr')
+        self.assertIsNone(profile.should_block('https://www.facebook.com/eventbrite', 'document'))
+
+    def test_host_path_matches_whole_segments(self):
+        """A path entry does not block longer paths that merely share its prefix"""
+        profile = ResourceBlockingProfile()
+        self.assertEqual(profile.should_block('https://www.facebook.com/tr/', 'script'), 'host:facebook.com/tr')
+        self.assertIsNone(profile.should_block('https://www.facebook.com/translations', 'document'))
+        trailing = ResourceBlockingProfile(block_types=(), block_hosts=('example.com/ads/',))
+        self.assertEqual(trailing.should_block('https://example.com/ads', 'script'), 'host:example.com/ads/')
+        self.assertEqual(trailing.should_block('https://example.com/ads/banner.js', 'script'), 'host:example.com/ads/')
+        self.assertIsNone(trailing.should_block('https://example.com/adsense.js', 'script'))
+
+    def test_allowlist_wins(self):
+        """Per-task allowlist entries (substring or regex) are never blocked"""
+        profile = site_profile('mta', allow=['/maps/thumbnails/', re.compile(r'googletagmanager\.com/gtag')])
+        self.assertIsNone(profile.should_block('https://new.mta.info/maps/thumbnails/a.png', 'image'))
+        self.assertIsNone(profile.should_block('https://www.googletagmanager.com/gtag/js', 'script'))
+        self.assertEqual(profile.should_block('https://new.mta.info/site.css', 'stylesheet'), 'type:stylesheet')
+
+    def test_site_profiles_are_independent(self):
+        """Each call returns a fresh profile so statistics are per task"""
+        first = site_profile('megabus')
+        second = site_profile('megabus')
+        first._record('https://x/a.png', 'image', 'type:image')
+        self.assertEqual(second.stats['requests_blocked'], 0)
+        self.assertNotIn('stylesheet', first.block_types)
+
+    def test_sync_attach_counts_requests_and_bytes(self):
+        """The sync handler aborts routes or passes them on and reports what was saved"""
+        context = FakeContext()
+        profile = ResourceBlockingProfile().attach_sync(context)
+        routes = [
+            FakeRoute('https://site/page', 'document'),
+            FakeRoute('https://site/hero.jpg', 'image'),
+            FakeRoute('https://www.google-analytics.com/g/collect', 'fetch'),
+        ]
+        for route in routes:
+            context.handler(route)
+        context.listeners['response'](FakeResponse(1200))
+        context.listeners['response'](FakeResponse(None))
+
+        self.assertEqual([route.outcome for route in routes], ['fallback', 'aborted', 'aborted'])
+        report = profile.report()
+        self.assertEqual(report['requests_seen'], 3)
+        self.assertEqual(report['requests_blocked'], 2)
+        self.assertEqual(report['blocked_by_type'], {'image': 1, 'fetch': 1})
+        self.assertEqual(report['blocked_by_host'], {'google-analytics.com': 1})
+        self.assertEqual(report['estimated_bytes_saved'], ESTIMATED_BYTES_BY_TYPE['image'] + ESTIMATED_BYTES_BY_TYPE['fetch'])
+        self.assertEqual(report['bytes_loaded'], 1200)
+
+    def test_async_attach(self):
+        """The async handler awaits route.abort()/fallback()"""
+        async def scenario():
+            context = AsyncFakeContext()
+            profile = await site_profile('flightaware').attach_async(context)
+            css = AsyncFakeRoute('https://www.flightaware.com/main.css', 'stylesheet')
+            doc = AsyncFakeRoute('https://www.flightaware.com/commercial/aeroapi/', 'document')
+            await context.handler(css)
+            await context.handler(doc)
+            return profile, css, doc
+
+        profile, css, doc = asyncio.run(scenario())
+        self.assertEqual(css.outcome, 'aborted')
+        self.assertEqual(doc.outcome, 'fallback')
+        self.assertIn('blocked 1 of 2 requests', profile.summary())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared result store.
+
+The store runs for real on a temporary SQLite file with a simulated clock.
+
+Usage:
+    python -m pytest automation_core/test_result_store.py
+"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from automation_core import result_store
+from automation_core.result_store import ResultStore, main, register_renderer
+
+
+class TestResultStore(unittest.TestCase):
+    """Test cases for ResultStore"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'results.sqlite')
+        self.now = 1000.0
+        self.store = ResultStore(self.path, clock=lambda: self.now)
+
+    def tearDown(self):
+        self.store.close()
+        result_store.RENDERERS.pop('test_task', None)
+        self.tmp.cleanup()
+
+    def append_runs(self, count):
+        run_ids = []
+        for i in range(count):
+            self.now += 60
+            stores = [{'name': f'Store {i}-{j}', 'distance': j} for j in range(i)]
+            run_ids.append(self.store.append('gamestop_stores', {'zip_code': str(90000 + i), 'stores': stores},
+                                             records=stores, success=bool(stores)))
+        return run_ids
+
+    def test_history_is_newest_first_and_filtered(self):
+        run_ids = self.append_runs(4)
+        self.store.append('marriott_cards', {'success': True})
+
+        history = self.store.runs('gamestop_stores')
+        self.assertEqual([run['run_id'] for run in history], run_ids[::-1])
+        self.assertEqual([run['record_count'] for run in history], [3, 2, 1, 0])
+        self.assertEqual(history[-1]['success'], False)
+        self.assertEqual(len(self.store.runs('gamestop_stores', since=1120, until=1240)), 2)
+        self.assertEqual(len(self.store.runs(limit=2)), 2)
+        self.assertEqual(self.store.runs()[0]['task'], 'marriott_cards')
+        self.assertTrue(self.store.runs()[0]['success'])
+
+    def test_get_and_records(self):
+        run_ids = self.append_runs(3)
+        self.assertEqual(self.store.get('gamestop_stores')['zip_code'], '90002')
+        self.assertEqual(self.store.get('gamestop_stores', run_ids[1])['zip_code'], '90001')
+        self.assertEqual([r['name'] for r in self.store.records('gamestop_stores')], ['Store 2-0', 'Store 2-1'])
+        with self.assertRaises(KeyError):
+            self.store.get('gamestop_stores', 'missing')
+        with self.assertRaises(KeyError):
+            self.store.get('unknown_task')
+
+        # Another handle on the same file (another process) sees the same runs
+        other = ResultStore(self.path)
+        self.assertEqual(len(other.runs('gamestop_stores')), 3)
+        other.close()
+
+    def test_render_json_and_markdown(self):
+        self.append_runs(3)
+        json_path = os.path.join(self.tmp.name, 'store_results.json')
+        self.store.render_json('gamestop_stores', path=json_path)
+        with open(json_path) as f:
+            self.assertEqual(json.load(f)['stores'][1]['name'], 'Store 2-1')
+
+        markdown = self.store.render_markdown('gamestop_stores')
+        self.assertIn('- **zip_code**: 90002', markdown)
+        self.assertIn('| name | distance |', markdown)
+        self.assertIn('| Store 2-1 | 1 |', markdown)
+
+        @register_renderer('test_task')
+        def render(result):
+            return f"# {result['title']}\n"
+
+        self.store.append('test_task', {'title': 'Custom'})
+        self.assertEqual(self.store.render_markdown('test_task'), '# Custom\n')
+
+    def test_cli(self):
+        run_ids = self.append_runs(2)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(main(['--store', self.path, 'history', 'gamestop_stores']), 0)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn(run_ids[-1], lines[0])
+
+        output = os.path.join(self.tmp.name, 'out.md')
+        self.assertEqual(main(['--store', self.path, 'render', 'gamestop_stores', '--run-id', run_ids[0],
+                               '--format', 'md', '--output', output]), 0)
+        with open(output) as f:
+            self.assertIn('90000', f.read())
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(main(['--store', self.path, 'render', 'unknown_task']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Tests for learned selector cascades.
+
+A fake page answers the in-page race query from a table of selectors and the
+(simulated) time they appear, so budgeted waits finish instantly.
+
+Usage:
+    python -m pytest automation_core/test_selector_cascade.py
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from automation_core.selector_cascade import RACE_SELECTORS_JS, SelectorCascade, SelectorStats
+
+
+class FakeLocator:
+    def __init__(self, page, selector):
+        self.page = page
+        self.selector = selector
+
+    def count(self):
+        selector = self.selector.removesuffix(' >> visible=true')
+        self.page.locator_counts.append(selector)
+        return self.page.count(selector)
+
+
+class FakePage:
+    """Sync page; selectors starting with ``text=`` are not CSS and need a locator"""
+
+    def __init__(self, appear_at=None):
+        self.now = 0.0
+        self.appear_at = appear_at or {}
+        self.evaluations = 0
+        self.locator_counts = []
+
+    def clock(self):
+        return self.now
+
+    def count(self, selector):
+        appears = self.appear_at.get(selector)
+        return 2 if appears is not None and self.now >= appears else 0
+
+    def evaluate(self, script, selectors):
+        assert script == RACE_SELECTORS_JS
+        self.evaluations += 1
+        return [None if s.startswith('text=') else self.count(s) for s in selectors]
+
+    def locator(self, selector):
+        return FakeLocator(self, selector)
+
+    def wait_for_timeout(self, ms):
+        self.now += ms / 1000
+
+
+class FakeAsyncLocator(FakeLocator):
+    async def count(self):
+        return FakeLocator.count(self)
+
+
+class FakeAsyncPage(FakePage):
+    async def evaluate(self, script, selectors):
+        return FakePage.evaluate(self, script, selectors)
+
+    def locator(self, selector):
+        return FakeAsyncLocator(self, selector)
+
+    async def wait_for_timeout(self, ms):
+        FakePage.wait_for_timeout(self, ms)
+
+
+class TestSelectorCascade(unittest.TestCase):
+    """Test cases for SelectorCascade and SelectorStats"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'stats', 'selector_stats.json')
+        self.candidates = ['listitem', '.card-container', '.credit-card', '.card-item']
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def cascade(self, page, stats=None):
+        return SelectorCascade('marriott', stats or SelectorStats(self.path), clock=page.clock)
+
+    def test_races_candidates_in_one_query_per_tick(self):
+        """A late selector resolves when it appears, not after a full timeout per earlier miss"""
+        page = FakePage({'.card-item': 1.2})
+        cascade = self.cascade(page)
+        selector = cascade.resolve_sync(page, 'personal_cards', self.candidates, budget_ms=5000)
+        self.assertEqual(selector, '.card-item')
+        self.assertAlmostEqual(page.now, 1.2, places=6)
+        self.assertEqual(page.evaluations, cascade.resolutions[0]['rounds'])
+        self.assertEqual(cascade.resolutions[0]['count'], 2)
+
+    def test_miss_returns_none_after_budget(self):
+        page = FakePage()
+        cascade = self.cascade(page)
+        self.assertIsNone(cascade.resolve_sync(page, 'personal_cards', self.candidates, budget_ms=500))
+        self.assertAlmostEqual(page.now, 0.5, places=6)
+        self.assertIsNone(cascade.resolve_sync(page, 'personal_cards', self.candidates))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_historical_winner_is_tried_first_and_persisted(self):
+        """The learned order puts past winners first for callers that try candidates one at a time"""
+        page = FakePage({'.card-item': 0, '.card-container': 0})
+        cascade = self.cascade(page)
+        self.assertEqual(cascade.resolve_sync(page, 'personal_cards', self.candidates), '.card-container')
+
+        cascade.record('personal_cards', '.card-item', self.candidates)
+        cascade.record('personal_cards', '.card-item', self.candidates)
+        with open(self.path) as f:
+            saved = json.load(f)
+        self.assertEqual(saved['marriott:personal_cards']['.card-item']['hits'], 3)
+
+        reloaded = self.cascade(page, SelectorStats(self.path))
+        self.assertEqual(reloaded.order('personal_cards', self.candidates)[0], '.card-item')
+        # Unknown page types and other sites keep the given order
+        self.assertEqual(reloaded.order('business_cards', self.candidates), self.candidates)
+
+    def test_precise_selector_wins_over_a_broad_past_winner(self):
+        """A broad fallback that won while the precise selector was missing does not keep winning"""
+        candidates = ['[id*="panel"]:has-text("lost")', 'div:has-text("lost")']
+        stats = SelectorStats(self.path, autosave=False)
+        page = FakePage({'div:has-text("lost")': 0})
+        cascade = self.cascade(page, stats)
+        for _ in range(3):
+            self.assertEqual(cascade.resolve_sync(page, 'lost_item_content', candidates), 'div:has-text("lost")')
+
+        page.appear_at['[id*="panel"]:has-text("lost")'] = 0
+        self.assertEqual(cascade.resolve_sync(page, 'lost_item_content', candidates), candidates[0])
+        # Both matched, so both are credited
+        entries = stats.data['marriott:lost_item_content']
+        self.assertEqual((entries[candidates[0]]['hits'], entries[candidates[0]]['misses']), (1, 3))
+        self.assertEqual(entries['div:has-text("lost")']['hits'], 4)
+
+    def test_stale_winner_drops_after_misses(self):
+        stats = SelectorStats(self.path, autosave=False)
+        stats.record('carmax:listing', '.car-tile', ['.car-tile'])
+        for _ in range(2):
+            stats.record('carmax:listing', '.vehicle-card', ['.car-tile', '.vehicle-card'])
+        self.assertEqual(stats.order('carmax:listing', ['.car-tile', '.vehicle-card']), ['.vehicle-card', '.car-tile'])
+
+        cascade = SelectorCascade('carmax', stats)
+        ordered = cascade.order('search_input', ['#a', '#b', '#c'])
+        cascade.record_in_order('search_input', '#b', ordered)
+        self.assertEqual(stats.data['carmax:search_input'], {
+            '#a': {'hits': 0, 'misses': 1},
+            '#b': {'hits': 1, 'misses': 0, 'last_hit': stats.data['carmax:search_input']['#b']['last_hit']},
+        })
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_non_css_selectors_fall_back_to_locators(self):
+        page = FakeAsyncPage({'text="Set as Home Store"': 0.3})
+        cascade = self.cascade(page)
+        selector = asyncio.run(cascade.resolve_async(
+            page, 'home_store_button', ['.set-home-store', 'text="Set as Home Store"'], budget_ms=3000))
+        self.assertEqual(selector, 'text="Set as Home Store"')
+        self.assertEqual(set(page.locator_counts), {'text="Set as Home Store"'})
+        self.assertAlmostEqual(page.now, 0.3, places=6)
+
+
+if __name__ == '__main__':
+    unittest.main()
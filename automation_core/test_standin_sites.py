@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the stand-in site server.
+
+Starts the server on a free local port and fetches pages with urllib.
+
+Usage:
+    python -m pytest automation_core/test_standin_sites.py
+"""
+
+import json
+import time
+import unittest
+from urllib.request import urlopen
+
+from automation_core.http_first import parse_page
+from automation_core.standin_sites import StandinServer
+from automation_core.standin_sites.pages import LOST_ITEM_QUESTION, mta_station_names
+from automation_core.scripts import load_script
+
+
+class TestStandinSites(unittest.TestCase):
+    """Test cases for StandinServer"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StandinServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def fetch(self, path):
+        with urlopen(self.server.url(path), timeout=10) as response:
+            return response.headers.get('Content-Type'), response.read().decode('utf-8')
+
+    def test_item_counts_are_configurable(self):
+        """Each page renders exactly ``count`` items of the structure the scripts select"""
+        _, target = self.fetch('/target/s?searchTerm=vegan+pizza&count=250')
+        self.assertEqual(target.count('data-test="@web/site-top-of-funnel/ProductCardWrapper"'), 250)
+
+        _, cards = self.fetch('/gamestop/stores/cards?count=30')
+        self.assertEqual(cards.count('data-store-id='), 30)
+
+        _, flightaware = self.fetch('/flightaware/commercial/aeroapi/?count=40')
+        self.assertIn('id="compare-plans-section"', flightaware)
+        self.assertEqual(flightaware.count('class="pricing"'), 40)
+
+        _, mta = self.fetch('/mta/maps/neighborhood-maps/brooklyn?count=25')
+        self.assertEqual(mta.count('class="map-download"'), 25)
+        self.assertEqual(len(set(mta_station_names(25))), 25)
+
+    def test_gamestop_store_search_json(self):
+        """The store-search XHR matches the GameStop network parser's URL and fields"""
+        content_type, body = self.fetch(
+            '/gamestop/on/demandware.store/Sites-gamestop-us-Site/default/Stores-FindStores?postalCode=90028&count=7')
+        self.assertIn('application/json', content_type)
+        stores = json.loads(body)['stores']
+        self.assertEqual(len(stores), 7)
+        self.assertEqual(stores[0]['ID'], '6000')
+        self.assertIn('storeHours', stores[0])
+
+    def test_marriott_tabs_and_fallback_parser(self):
+        """Both tabs are present and the script's HTML fallback finds the real card names"""
+        _, html = self.fetch('/marriott/credit-cards.mi?count=6')
+        self.assertIn('data-tab="business"', html)
+        self.assertEqual(html.count('class="card-container"'), 6)
+        self.assertEqual(html.count('class="card-item"'), 6)
+
+        module = load_script('oh_ui_sessions/marriott/marriott_credit_cards_automation.py')
+        automation = module.MarriottCreditCardsAutomation()
+        automation.extract_from_html_content(html)
+        results = automation.get_results()
+        self.assertEqual(len(results['personal_cards']), 4)
+        self.assertEqual(len(results['business_cards']), 1)
+        self.assertIn('Annual Fee', results['business_cards'][0]['annual_fee'])
+
+    def test_mta_maps_over_http(self):
+        """The MTA script's HTTP-first extractor reads every station from the plain HTML"""
+        _, html = self.fetch('/mta/maps/neighborhood-maps/brooklyn?count=25')
+        module = load_script('oh_ui_sessions/mta/brooklyn_maps_automation.py')
+        maps = module.maps_from_page(parse_page(html))['maps']
+        self.assertEqual([entry['name'] for entry in maps], mta_station_names(25))
+
+    def test_megabus_faq(self):
+        """The lost-item accordion is one of ``count`` collapsed FAQ entries"""
+        _, html = self.fetch('/megabus/help?count=100')
+        self.assertEqual(html.count('aria-expanded="false"'), 100)
+        self.assertEqual(html.count(LOST_ITEM_QUESTION), 1)
+        _, home = self.fetch('/megabus/')
+        self.assertIn('Help', home)
+
+    def test_latency_and_unknown_paths(self):
+        """latency_ms delays the response; unknown paths are 404s"""
+        started = time.monotonic()
+        self.fetch('/megabus/contact-us?latency_ms=200')
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+
+        with self.assertRaises(Exception) as error:
+            self.fetch('/nowhere')
+        self.assertIn('404', str(error.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tests for the concurrent multi-task runner.
+
+Uses throwaway task types that sleep instead of driving a browser.
+
+Usage:
+    python -m pytest automation_core/test_task_runner.py
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from automation_core import task_runner
+from automation_core.task_runner import TASK_TYPES, TaskRunner, load_manifest, register_task_type
+
+
+class ConcurrencyProbe:
+    """Records how many fake tasks run at once, overall and per host"""
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+
+    async def sleep(self, seconds):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            self.running -= 1
+
+
+class TestTaskRunner(unittest.TestCase):
+    """Test cases for TaskRunner"""
+
+    def setUp(self):
+        self.probe_a = ConcurrencyProbe()
+        self.probe_b = ConcurrencyProbe()
+
+        @register_task_type('fake_a', 'a.example.com', uses_pool=False)
+        async def fake_a(params, pool):
+            await self.probe_a.sleep(params.get('seconds', 0.05))
+            if params.get('fail'):
+                raise RuntimeError("boom")
+            return {'success': True, 'value': params.get('value')}
+
+        @register_task_type('fake_b', 'b.example.com', uses_pool=False)
+        async def fake_b(params, pool):
+            await self.probe_b.sleep(params.get('seconds', 0.05))
+            return {'success': True}
+
+    def tearDown(self):
+        TASK_TYPES.pop('fake_a', None)
+        TASK_TYPES.pop('fake_b', None)
+
+    def _tasks(self, task_type, count, **params):
+        return [{'id': f'{task_type}-{i}', 'type': task_type, 'params': dict(params, value=i)} for i in range(count)]
+
+    def test_tasks_run_concurrently(self):
+        """Wall time is close to one task, not the sum of all of them"""
+        tasks = self._tasks('fake_a', 4, seconds=0.2) + self._tasks('fake_b', 4, seconds=0.2)
+        runner = TaskRunner(max_concurrency=8, per_host_limit=4)
+        started = time.time()
+        records = asyncio.run(runner.run(tasks))
+        elapsed = time.time() - started
+
+        self.assertEqual(len(records), 8)
+        self.assertTrue(all(record['success'] for record in records))
+        self.assertLess(elapsed, 0.6)
+
+    def test_per_host_limit(self):
+        """No host ever has more than per_host_limit tasks running"""
+        tasks = self._tasks('fake_a', 6) + self._tasks('fake_b', 6)
+        runner = TaskRunner(max_concurrency=10, per_host_limit=2)
+        asyncio.run(runner.run(tasks))
+        self.assertEqual(self.probe_a.peak, 2)
+        self.assertEqual(self.probe_b.peak, 2)
+
+    def test_global_limit(self):
+        """The global limit caps tasks across all hosts"""
+        tasks = self._tasks('fake_a', 3) + self._tasks('fake_b', 3)
+        runner = TaskRunner(max_concurrency=1, per_host_limit=3)
+        asyncio.run(runner.run(tasks))
+        self.assertEqual(self.probe_a.peak + self.probe_b.peak, 2)
+        self.assertEqual(max(self.probe_a.peak, self.probe_b.peak), 1)
+
+    def test_failures_and_timeouts_are_recorded(self):
+        """A failing or slow task does not stop the others"""
+        tasks = [
+            {'id': 'ok', 'type': 'fake_a', 'params': {}},
+            {'id': 'fails', 'type': 'fake_a', 'params': {'fail': True}},
+            {'id': 'slow', 'type': 'fake_b', 'params': {'seconds': 1}, 'timeout': 0.05},
+        ]
+        records = {record['task_id']: record for record in asyncio.run(TaskRunner().run(tasks))}
+        self.assertTrue(records['ok']['success'])
+        self.assertEqual(records['fails']['error'], 'boom')
+        self.assertFalse(records['slow']['success'])
+        self.assertIn('Timed out', records['slow']['error'])
+
+    def test_results_streamed_to_jsonl(self):
+        """Each record is appended to the output file as one JSON line"""
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'results.jsonl')
+            asyncio.run(TaskRunner().run(self._tasks('fake_a', 3), output_path=output))
+            with open(output, 'r', encoding='utf-8') as f:
+                lines = [json.loads(line) for line in f]
+        self.assertEqual(sorted(line['task_id'] for line in lines), ['fake_a-0', 'fake_a-1', 'fake_a-2'])
+        self.assertEqual({line['host'] for line in lines}, {'a.example.com'})
+
+    def test_load_manifest(self):
+        """Manifests get default ids and params, and unknown types are rejected"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'manifest.json')
+            with open(path, 'w') as f:
+                json.dump({'tasks': [{'type': 'fake_a'}]}, f)
+            manifest = load_manifest(path)
+            self.assertEqual(manifest['tasks'][0]['id'], 'fake_a-0')
+            self.assertEqual(manifest['tasks'][0]['params'], {})
+
+            with open(path, 'w') as f:
+                json.dump([{'type': 'no_such_task'}], f)
+            with self.assertRaises(ValueError):
+                load_manifest(path)
+
+    def test_example_manifest_is_valid(self):
+        """The bundled example manifest only uses registered task types"""
+        path = os.path.join(os.path.dirname(task_runner.__file__), 'example_manifest.json')
+        manifest = load_manifest(path)
+        self.assertGreater(len(manifest['tasks']), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
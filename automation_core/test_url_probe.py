@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for concurrent URL probing.
+
+A fake HTTP session answers HEAD and GET from a status table and a fake
+render sleeps, so the concurrency shows up in wall-clock time.
+
+Usage:
+    python -m pytest automation_core/test_url_probe.py
+"""
+
+import asyncio
+import os
+import time
+import unittest
+from unittest import mock
+
+from automation_core.har_fixtures import HAR_MODE_ENV
+from automation_core.http_first import HttpClient
+from automation_core.url_probe import probe_http, probe_urls_async
+
+
+class FakeResponse:
+    def __init__(self, status_code, url):
+        self.status_code = status_code
+        self.url = url
+
+
+class FakeSession:
+    """Answers from a {url: status} table; HEAD is refused for URLs listed in ``no_head``"""
+
+    def __init__(self, statuses, no_head=(), delay=0.0):
+        self.headers = {}
+        self.statuses = statuses
+        self.no_head = no_head
+        self.delay = delay
+        self.calls = []
+
+    def head(self, url, timeout=None, **kwargs):
+        self.calls.append(('HEAD', url))
+        time.sleep(self.delay)
+        if url in self.no_head:
+            return FakeResponse(405, url)
+        return self._answer(url)
+
+    def get(self, url, timeout=None, **kwargs):
+        self.calls.append(('GET', url))
+        return self._answer(url)
+
+    def _answer(self, url):
+        status = self.statuses[url]
+        if isinstance(status, Exception):
+            raise status
+        return FakeResponse(status, url)
+
+    def close(self):
+        pass
+
+
+class TestUrlProbe(unittest.TestCase):
+    """Test cases for probe_http and probe_urls_async"""
+
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, {HAR_MODE_ENV: 'live'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_head_falls_back_to_get(self):
+        session = FakeSession({'https://a/': 200}, no_head=['https://a/'])
+        probe = probe_http('https://a/', client=HttpClient(session=session))
+        self.assertEqual(probe['http_status'], 200)
+        self.assertEqual(session.calls, [('HEAD', 'https://a/'), ('GET', 'https://a/')])
+
+        failed = probe_http('https://b/', client=HttpClient(session=FakeSession({'https://b/': OSError('refused')})))
+        self.assertEqual(failed['http_error'], 'refused')
+
+    def test_only_survivors_render_concurrently_and_rank(self):
+        statuses = {'https://dead/': 404, 'https://down/': OSError('timeout'), 'https://short/': 200,
+                    'https://long/': 200, 'https://blocked/': 200}
+        client = HttpClient(session=FakeSession(statuses, delay=0.1))
+        rendered = []
+
+        async def render(url):
+            rendered.append(url)
+            await asyncio.sleep(0.2)
+            if url == 'https://blocked/':
+                return {'title': 'Access Denied', 'accessible': False}
+            return {'title': 'x' * (10 if url == 'https://long/' else 2)}
+
+        started = time.perf_counter()
+        ranked = asyncio.run(probe_urls_async(list(statuses) + ['https://short/'], render=render,
+                                              score=lambda result: len(result['title']), client=client))
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 0.6)
+        # A failed probe is no reason to skip the browser; only the 404 is
+        self.assertEqual(sorted(rendered), ['https://blocked/', 'https://down/', 'https://long/', 'https://short/'])
+        self.assertEqual([result['url'] for result in ranked],
+                         ['https://long/', 'https://down/', 'https://short/', 'https://dead/', 'https://blocked/'])
+        self.assertEqual([result['accessible'] for result in ranked], [True, True, True, False, False])
+        self.assertEqual(ranked[1]['http_error'], 'timeout')
+        self.assertEqual(ranked[3]['http_status'], 404)
+
+    def test_keep_statuses_and_render_errors(self):
+        statuses = {'https://a/': 410, 'https://b/': 200, 'https://c/': 403, 'https://d/': 404}
+        client = HttpClient(session=FakeSession(statuses))
+
+        async def render(url):
+            if url == 'https://b/':
+                raise RuntimeError('crashed')
+            return {'title': 'ok'}
+
+        ranked = asyncio.run(probe_urls_async(list(statuses), render=render, client=client, keep_statuses=(410,)))
+        self.assertEqual([(result['url'], result['accessible']) for result in ranked],
+                         [('https://a/', True), ('https://c/', True), ('https://b/', False), ('https://d/', False)])
+        self.assertEqual(ranked[2]['render_error'], 'crashed')
+
+    def test_har_replay_skips_http(self):
+        session = FakeSession({})
+        with mock.patch.dict(os.environ, {HAR_MODE_ENV: 'replay'}):
+            ranked = asyncio.run(probe_urls_async(['https://a/'], client=HttpClient(session=session)))
+        self.assertEqual(session.calls, [])
+        self.assertTrue(ranked[0]['accessible'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for the adaptive wait layer.
+
+A fake page with a simulated clock stands in for Playwright, so waits that
+would take seconds finish instantly.
+
+Usage:
+    python -m pytest automation_core/test_waits.py
+"""
+
+import unittest
+
+from automation_core.waits import AdaptiveWaiter
+
+
+class FakeResponse:
+    def __init__(self, url):
+        self.url = url
+
+
+class FakePage:
+    """Page whose DOM and network events are scheduled on a simulated clock"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.handlers = {}
+        self.selector_at = {}
+        self.responses_at = []
+
+    def clock(self):
+        return self.now
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def query_selector(self, selector):
+        appears = self.selector_at.get(selector)
+        return object() if appears is not None and self.now >= appears else None
+
+    def wait_for_timeout(self, ms):
+        self.now += ms / 1000
+        due = [item for item in self.responses_at if item[0] <= self.now]
+        for item in due:
+            self.responses_at.remove(item)
+            self.handlers['response'](FakeResponse(item[1]))
+
+
+class TestAdaptiveWaiter(unittest.TestCase):
+    """Test cases for AdaptiveWaiter"""
+
+    def setUp(self):
+        self.page = FakePage()
+        self.waiter = AdaptiveWaiter(self.page, poll_interval_ms=100, clock=self.page.clock)
+
+    def test_resolves_when_selector_appears(self):
+        """The wait ends shortly after the selector shows up, not at the budget"""
+        self.page.selector_at['[data-store-id]'] = 1.2
+        resolved = self.waiter.until('store_results', budget_ms=23000, selector='[data-store-id]')
+        self.assertEqual(resolved, 'selector')
+        record = self.waiter.timings[0]
+        self.assertLessEqual(record['waited_ms'], 1300)
+        self.assertGreaterEqual(record['saved_ms'], 21700)
+
+    def test_resolves_on_matching_response(self):
+        """A matching XHR resolves the wait before the DOM renders"""
+        self.page.responses_at.append((0.5, 'https://www.gamestop.com/analytics/collect'))
+        self.page.responses_at.append((0.8, 'https://www.gamestop.com/on/demandware.store/Stores-FindStores?postalCode=90028'))
+        self.page.selector_at['[data-store-id]'] = 3.0
+        resolved = self.waiter.until('store_results', budget_ms=23000,
+                                     selector='[data-store-id]', response=r'Stores-FindStores')
+        self.assertEqual(resolved, 'response')
+        self.assertIn('Stores-FindStores', self.waiter.timings[0]['response_url'])
+        self.assertLess(self.waiter.timings[0]['waited_ms'], 1000)
+
+    def test_responses_before_arm_are_ignored(self):
+        """Only responses after arm() can satisfy the wait"""
+        self.page.handlers['response'](FakeResponse('https://x/Stores-FindStores'))
+        self.waiter.arm()
+        resolved = self.waiter.until('store_results', budget_ms=500, response=r'Stores-FindStores')
+        self.assertEqual(resolved, 'timeout')
+
+    def test_callable_response_matcher(self):
+        """Response matchers may be predicates on the response object"""
+        self.page.responses_at.append((0.2, 'https://x/api/stores.json'))
+        resolved = self.waiter.until('api', budget_ms=1000, response=lambda r: r.url.endswith('.json'))
+        self.assertEqual(resolved, 'response')
+
+    def test_timeout_uses_full_budget(self):
+        """With nothing arriving the old sleep length is the upper bound"""
+        resolved = self.waiter.until('never', budget_ms=3000, selector='.missing')
+        self.assertEqual(resolved, 'timeout')
+        self.assertEqual(self.waiter.timings[0]['waited_ms'], 3000)
+        self.assertEqual(self.waiter.timings[0]['saved_ms'], 0)
+
+    def test_condition_and_report(self):
+        """Conditions resolve immediately when already true; report sums all waits"""
+        self.waiter.until('zip_entered', budget_ms=3000, condition=lambda: True)
+        self.waiter.until('never', budget_ms=1000, selector='.missing')
+        report = self.waiter.report()
+        self.assertEqual(report['waits'][0]['resolved_by'], 'condition')
+        self.assertEqual(report['total_budget_ms'], 4000)
+        self.assertEqual(report['total_waited_ms'], 1000)
+        self.assertEqual(report['total_saved_ms'], 3000)
+
+
+if __name__ == '__main__':
+    unittest.main()
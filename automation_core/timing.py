@@ -0,0 +1,59 @@
+"""
+Step Timing
+
+Named wall-clock timings for the steps of an automation run (browser
+startup, page load, extraction, output write, ...). Automations accept an
+optional ``StepTimer``; the benchmark suite passes one in and aggregates the
+steps over many runs.
+
+Usage:
+    timer = StepTimer()
+    with timer.step('page_load'):
+        await page.goto(url)
+
+    timer.start('browser_startup')      # when a block can't be wrapped,
+    async with async_browser_context() as context:
+        timer.stop('browser_startup')   # e.g. around entering ``async with``
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+
+
+class StepTimer:
+    """Collects (step name, seconds) pairs in the order steps finish"""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.steps: List[Tuple[str, float]] = []
+        self._started: Dict[str, float] = {}
+
+    def start(self, name: str):
+        """Start timing ``name``; finish it with ``stop``"""
+        self._started[name] = self.clock()
+
+    def stop(self, name: str) -> float:
+        """Finish timing ``name`` and return its duration in seconds"""
+        started = self._started.pop(name, None)
+        if started is None:
+            return 0.0
+        duration = self.clock() - started
+        self.steps.append((name, duration))
+        return duration
+
+    @contextmanager
+    def step(self, name: str):
+        """Time the enclosed block as ``name``, even if it raises"""
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop(name)
+
+    def totals(self) -> Dict[str, float]:
+        """Seconds per step name, summed when a step ran more than once"""
+        totals: Dict[str, float] = {}
+        for name, duration in self.steps:
+            totals[name] = totals.get(name, 0.0) + duration
+        return totals
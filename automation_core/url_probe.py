@@ -0,0 +1,111 @@
+"""
+Concurrent URL Probing
+
+Several scripts look for the right page by walking a list of candidate URLs
+one after another, each with a full browser navigation. ``probe_urls_async``
+checks every candidate at once instead:
+
+1. A cheap HTTP status probe runs for all URLs concurrently. It sends a HEAD
+   and falls back to GET when the server refuses HEAD.
+2. Every URL that is not gone (404 or 410) is rendered in the browser, again
+   concurrently. A probe that failed or got another error status still gets
+   a render: many sites refuse plain HTTP clients but serve browsers.
+3. The results come back ranked: accessible pages first, best score first,
+   then in candidate order.
+
+Probing costs the slowest candidate instead of the sum of all of them. During
+HAR record and replay the HTTP probe is skipped and every candidate is
+rendered, as in ``http_first``.
+
+Usage:
+    async def render(url):
+        page = await context.new_page()
+        response = await page.goto(url, wait_until='domcontentloaded')
+        return {'status': response.status, 'title': await page.title()}
+
+    ranked = await probe_urls_async(URLS, render=render, score=lambda r: len(r['title']))
+    best = ranked[0] if ranked and ranked[0]['accessible'] else None
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from automation_core.http_first import HttpClient, http_allowed, shared_http_client
+
+
+# Servers that do not implement HEAD answer with one of these
+HEAD_REFUSED_STATUSES = (405, 501)
+# The page does not exist: the only answers that skip the browser render
+GONE_STATUSES = (404, 410)
+
+
+def probe_http(url: str, client: Optional[HttpClient] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """HTTP status of ``url`` from a HEAD request, or a GET if HEAD is refused"""
+    started = time.perf_counter()
+    probe = {'url': url, 'http_status': None, 'final_url': url, 'http_error': None}
+    try:
+        client = client or shared_http_client()
+        response = client.head(url, timeout=timeout, allow_redirects=True)
+        if response.status_code in HEAD_REFUSED_STATUSES:
+            response = client.get(url, timeout=timeout)
+        probe['http_status'] = response.status_code
+        probe['final_url'] = getattr(response, 'url', None) or url
+    except Exception as e:
+        probe['http_error'] = str(e) or type(e).__name__
+    probe['http_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return probe
+
+
+def survived(probe: Dict[str, Any], keep_statuses: Sequence[int] = ()) -> bool:
+    """Whether a probed URL is worth a browser render: anything but a page known to be gone"""
+    status = probe['http_status']
+    return status not in GONE_STATUSES or status in keep_statuses
+
+
+async def probe_urls_async(urls: Sequence[str],
+                           render: Optional[Callable[[str], Awaitable[Optional[Dict[str, Any]]]]] = None,
+                           score: Optional[Callable[[Dict[str, Any]], float]] = None,
+                           client: Optional[HttpClient] = None, timeout: Optional[float] = None,
+                           keep_statuses: Sequence[int] = (), max_renders: Optional[int] = None
+                           ) -> List[Dict[str, Any]]:
+    """
+    Probe ``urls`` concurrently and return one result per URL, best first.
+
+    ``render(url)`` drives the browser for a survivor and returns fields to
+    merge into its result; it may set ``accessible`` to False, for example on
+    a block page. ``score(result)`` ranks the accessible results, higher is
+    better. ``keep_statuses`` are gone statuses that still get a render.
+    ``max_renders`` caps how many renders run at once.
+    """
+    urls = list(dict.fromkeys(urls))
+    if http_allowed():
+        probes = list(await asyncio.gather(*(asyncio.to_thread(probe_http, url, client, timeout) for url in urls)))
+    else:
+        probes = [{'url': url, 'http_status': None, 'final_url': url, 'http_error': None, 'http_ms': None}
+                  for url in urls]
+
+    for index, probe in enumerate(probes):
+        probe['index'] = index
+        probe['survived'] = survived(probe, keep_statuses)
+        probe['accessible'] = probe['survived']
+
+    if render is not None:
+        limit = asyncio.Semaphore(max_renders or len(probes) or 1)
+
+        async def render_one(probe):
+            async with limit:
+                started = time.perf_counter()
+                try:
+                    probe.update(await render(probe['url']) or {})
+                except Exception as e:
+                    probe['render_error'] = str(e) or type(e).__name__
+                    probe['accessible'] = False
+                probe['render_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+        await asyncio.gather(*(render_one(probe) for probe in probes if probe['survived']))
+
+    for probe in probes:
+        probe['score'] = score(probe) if score is not None and probe['accessible'] else 0
+    probes.sort(key=lambda probe: (not probe['accessible'], -probe['score'], probe['index']))
+    return probes
@@ -0,0 +1,122 @@
+"""
+Adaptive Waits
+
+Replaces fixed ``time.sleep`` calls with waits that resolve as soon as the
+thing being waited for shows up: a selector in the DOM, a matching network
+response, or an arbitrary condition. The old sleep length becomes the upper
+bound (the "budget"), and every wait records how long it actually took so
+dead time in a run is visible.
+
+Built on the sync Playwright API: ``page.wait_for_timeout`` is used as the
+polling tick, which also lets Playwright dispatch the ``response`` events the
+waiter listens to.
+
+Usage:
+    waiter = AdaptiveWaiter(page)
+    waiter.arm()                      # start counting responses from here
+    search_button.click()
+    waiter.until('store_results', budget_ms=23000,
+                 selector='[data-store-id]', response=r'Stores-FindStores')
+    print(waiter.report())
+"""
+
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Pattern, Union
+
+
+ResponseMatcher = Union[str, Pattern, Callable[[Any], bool]]
+
+
+class AdaptiveWaiter:
+    """Event-driven waits with a time budget and per-wait timing records"""
+
+    def __init__(self, page, poll_interval_ms: int = 100, clock: Callable[[], float] = time.monotonic):
+        self.page = page
+        self.poll_interval_ms = poll_interval_ms
+        self.clock = clock
+        self.timings: List[Dict[str, Any]] = []
+        self.responses: List[Any] = []
+        self._armed_at = 0
+        page.on('response', self.responses.append)
+
+    def arm(self):
+        """Only responses received after this call can satisfy the next wait"""
+        self._armed_at = len(self.responses)
+
+    def _match_response(self, matcher: ResponseMatcher):
+        if isinstance(matcher, str):
+            matcher = re.compile(matcher, re.IGNORECASE)
+        for response in self.responses[self._armed_at:]:
+            if hasattr(matcher, 'search'):
+                if matcher.search(response.url):
+                    return response
+            elif matcher(response):
+                return response
+        return None
+
+    def _selector_present(self, selector: str) -> bool:
+        try:
+            return self.page.query_selector(selector) is not None
+        except Exception:
+            return False
+
+    def until(self, name: str, budget_ms: int, selector: Optional[str] = None,
+              response: Optional[ResponseMatcher] = None,
+              condition: Optional[Callable[[], bool]] = None) -> str:
+        """
+        Wait until any of ``selector``, ``response`` or ``condition`` is satisfied.
+
+        Returns what resolved the wait ('selector', 'response', 'condition')
+        or 'timeout' once ``budget_ms`` has passed. Never raises on timeout;
+        callers decide whether a timeout is fatal, as the old sleeps did.
+        """
+        started = self.clock()
+        deadline = started + budget_ms / 1000
+        resolved_by = 'timeout'
+        matched_response = None
+
+        while True:
+            if selector and self._selector_present(selector):
+                resolved_by = 'selector'
+                break
+            if response is not None:
+                matched_response = self._match_response(response)
+                if matched_response is not None:
+                    resolved_by = 'response'
+                    break
+            if condition is not None:
+                try:
+                    if condition():
+                        resolved_by = 'condition'
+                        break
+                except Exception:
+                    pass
+            remaining_ms = (deadline - self.clock()) * 1000
+            if remaining_ms <= 0:
+                break
+            self.page.wait_for_timeout(min(self.poll_interval_ms, remaining_ms))
+
+        waited_ms = round((self.clock() - started) * 1000)
+        record = {
+            'name': name,
+            'waited_ms': waited_ms,
+            'budget_ms': budget_ms,
+            'saved_ms': max(0, budget_ms - waited_ms),
+            'resolved_by': resolved_by,
+        }
+        if matched_response is not None:
+            record['response_url'] = matched_response.url
+        self.timings.append(record)
+        self.arm()
+        print(f"Wait '{name}' resolved by {resolved_by} after {waited_ms} ms (budget {budget_ms} ms)")
+        return resolved_by
+
+    def report(self) -> Dict[str, Any]:
+        """Summarize all waits so far"""
+        return {
+            'waits': list(self.timings),
+            'total_waited_ms': sum(t['waited_ms'] for t in self.timings),
+            'total_budget_ms': sum(t['budget_ms'] for t in self.timings),
+            'total_saved_ms': sum(t['saved_ms'] for t in self.timings),
+        }
@@ -1,11 +1,99 @@
 from pathlib import Path
-import requests
+import argparse
+import os
+import sys
 import time
 
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from automation_core.har_fixtures import attach_har_sync
+from automation_core.http_first import fetch_http_first
+
 URL = "https://www.foxsports.com/soccer/mls/standings"
 OUT = Path(__file__).parent / "output.md"
 
 
+# Every table as rows of cell texts, read in one round trip
+STANDINGS_TABLES_JS = """
+() => [...document.querySelectorAll('table')].map((table) =>
+    [...table.rows].map((row) => [...row.cells].map((cell) => cell.innerText.trim())))
+"""
+
+# Header label -> typed column; W-D-L is split into w/t/l
+INT_COLUMNS = {'MP': 'gp', 'GP': 'gp', 'PTS': 'pts', 'GF': 'gf', 'GA': 'ga', 'GD': 'gd'}
+FLOAT_COLUMNS = {'PPG': 'ppg'}
+RECORD_COLUMNS = {'W-D-L': ('w', 't', 'l'), 'W-L-T': ('w', 'l', 't')}
+# Columns compared by the watcher to decide whether a row changed
+WATCHED_COLUMNS = ('rank', 'gp', 'w', 'l', 't', 'pts', 'gd')
+
+
+def _number(text, cast=int):
+    text = text.replace('\u2212', '-').replace('+', '').strip()
+    try:
+        return cast(text)
+    except ValueError:
+        return None
+
+
+def parse_standings(tables):
+    """
+    Typed standings rows from tables of cell texts.
+
+    A row whose first cell names a conference starts a section and gives the
+    column labels; the label cell spans the rank and team columns, so labels
+    are aligned to the right end of the data rows.
+    """
+    standings = []
+    for table in tables:
+        conference, labels = None, []
+        for cells in table:
+            cells = [' '.join(cell.split()) for cell in cells]
+            if not cells:
+                continue
+            if 'CONFERENCE' in cells[0].upper():
+                conference = cells[0].title().replace(' Conference', '')
+                labels = [label.upper() for label in cells[1:]]
+                continue
+            rank = _number(cells[0])
+            if rank is None or len(cells) < 3:
+                continue
+            row = {'conference': conference, 'rank': rank, 'team': cells[1]}
+            values = cells[len(cells) - len(labels):] if labels else []
+            for label, value in zip(labels, values):
+                if label in INT_COLUMNS:
+                    row[INT_COLUMNS[label]] = _number(value)
+                elif label in FLOAT_COLUMNS:
+                    row[FLOAT_COLUMNS[label]] = _number(value, float)
+                elif label in RECORD_COLUMNS:
+                    parts = [_number(part) for part in value.split('-')]
+                    if len(parts) == 3:
+                        row.update(zip(RECORD_COLUMNS[label], parts))
+            standings.append(row)
+    return standings
+
+
+def _open_standings_page(p):
+    browser = p.chromium.launch(headless=True)
+    context = browser.new_context()
+    # Record/replay from a HAR when AUTOMATION_HAR_MODE is set
+    attach_har_sync(context, 'foxsports_mls_standings')
+    page = context.new_page()
+    page.goto(URL, timeout=30000)
+    return browser, context, page
+
+
+def _read_standings(page):
+    # Wait for a standings marker
+    try:
+        page.wait_for_selector('text="LIVE STANDINGS"', timeout=10000)
+    except Exception:
+        # fallback: wait for table
+        page.wait_for_selector('table', timeout=10000)
+    return {'standings': parse_standings(page.evaluate(STANDINGS_TABLES_JS))}
+
+
 def fetch_with_playwright():
     try:
         from playwright.sync_api import sync_playwright
@@ -13,69 +101,147 @@ def fetch_with_playwright():
         raise
 
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        page.goto(URL, timeout=30000)
-        # Wait for a standings marker
+        browser, context, page = _open_standings_page(p)
         try:
-            page.wait_for_selector('text="LIVE STANDINGS"', timeout=10000)
-        except Exception:
-            # fallback: wait for table
-            page.wait_for_selector('table', timeout=10000)
-
-        # grab table rows text
-        rows = page.locator('table tr')
-        lines = []
-        count = rows.count()
-        for i in range(min(count, 80)):
-            try:
-                lines.append(rows.nth(i).inner_text())
-            except Exception:
-                break
-
-        content = [f"# Fox Sports — MLS Standings\n\nURL: {URL}\n\nScraped rows:\n"]
-        content += [f"- {r}" for r in lines]
-        OUT.write_text("\n".join(content), encoding="utf-8")
-        browser.close()
-
-
-def fetch_with_requests():
-    # Lightweight fallback that fetches the HTML and saves a short snapshot
-    resp = requests.get(URL, timeout=20)
-    resp.raise_for_status()
-    html = resp.text
-
-    # Try to pull some recognizable team names and standings markers
-    markers = []
-    for team in ['Philadelphia', 'FC Cincinnati', 'San Diego', 'Vancouver', 'NYCFC', 'Inter Miami']:
-        if team in html:
-            markers.append(team)
-
-    content = [f"# Fox Sports — MLS Standings (fallback)\n\nURL: {URL}\n\nFetched at: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\nFound teams:\n"]
-    if markers:
-        content += [f"- {t}" for t in markers]
-    else:
-        # save a short snippet of the page for debugging
-        snippet = html[:400].replace('\n', ' ')
-        content.append(f"- Snippet: {snippet}")
+            return _read_standings(page)
+        finally:
+            context.close()
+            browser.close()
 
-    OUT.write_text("\n".join(content), encoding="utf-8")
 
+def standings_from_page(page):
+    # The standings tables are server-rendered, so the plain HTML has every row
+    return {'standings': parse_standings(page.tables)}
 
-def fetch_and_save():
-    # Try Playwright first; if it's not available or fails, use requests fallback
-    try:
-        fetch_with_playwright()
-        return
-    except Exception as e:
-        # Print error for local debugging and continue with fallback
-        print('Playwright fetch failed, falling back to requests:', str(e))
+
+def fetch_standings(browser_fallback=fetch_with_playwright):
+    """Typed standings rows: plain HTTP first, Playwright only when the HTML has no standings table"""
+    # (HAR record/replay always goes through the browser)
+    result = fetch_http_first(URL, standings_from_page, required=['standings'], browser_fallback=browser_fallback)
+    standings = result['data'].get('standings', [])
+    print(f"Fetched {len(standings)} rows via {result['source']}")
+    return standings
+
+
+def render_markdown(standings):
+    content = [f"# Fox Sports — MLS Standings\n\nURL: {URL}\n"]
+    conferences = list(dict.fromkeys(row['conference'] for row in standings))
+    for conference in conferences:
+        content.append(f"## {conference} Conference\n" if conference else "## Standings\n")
+        content.append("| # | Team | GP | W | L | T | PTS | GD |")
+        content.append("|---|------|----|---|---|---|-----|----|")
+        for row in standings:
+            if row['conference'] == conference:
+                cells = [row.get(key) for key in ('rank', 'team', 'gp', 'w', 'l', 't', 'pts', 'gd')]
+                content.append("| " + " | ".join('' if cell is None else str(cell) for cell in cells) + " |")
+        content.append("")
+    return "\n".join(content)
+
+
+def write_output(standings):
+    OUT.write_text(render_markdown(standings), encoding="utf-8")
+
+
+def diff_standings(previous, standings):
+    """Rows that are new or whose watched columns changed, each with a ``changes`` dict of (old, new)"""
+    changed = []
+    for row in standings:
+        before = previous.get((row['conference'], row['team']))
+        if before is None:
+            changed.append(dict(row, changes={}))
+            continue
+        changes = {key: (before.get(key), row.get(key)) for key in WATCHED_COLUMNS
+                   if before.get(key) != row.get(key)}
+        if changes:
+            changed.append(dict(row, changes=changes))
+    return changed
+
+
+def describe_change(row):
+    if not row['changes']:
+        return f"{row['conference']} {row['rank']}. {row['team']}: {row.get('pts')} pts (new)"
+    changes = ', '.join(f"{key.upper()} {old} -> {new}" for key, (old, new) in row['changes'].items())
+    return f"{row['conference']} {row['rank']}. {row['team']}: {changes}"
+
+
+class StandingsWatcher:
+    """Re-fetches the standings on an interval and emits only the rows that changed"""
+
+    def __init__(self, interval=60.0, emit=print, sleep=time.sleep):
+        self.interval = interval
+        self.emit = emit
+        self.sleep = sleep
+        self.previous = {}
+        # Opened on the first poll that needs a browser, then reloaded instead of relaunched
+        self._playwright = None
+        self._browser = None
+        self._page = None
+
+    def _fetch_in_open_page(self):
+        if self._page is None:
+            from playwright.sync_api import sync_playwright
+            self._playwright = sync_playwright().start()
+            self._browser, _, self._page = _open_standings_page(self._playwright)
+        else:
+            self._page.reload(timeout=30000)
+        return _read_standings(self._page)
+
+    def poll(self):
+        """Fetch once and return the changed rows (every row on the first poll)"""
+        standings = fetch_standings(browser_fallback=self._fetch_in_open_page)
+        changed = diff_standings(self.previous, standings)
+        if standings:
+            self.previous = {(row['conference'], row['team']): row for row in standings}
+        if changed:
+            write_output(standings)
+        return changed
+
+    def run(self, iterations=None):
+        count = 0
         try:
-            fetch_with_requests()
-        except Exception as e2:
-            print('Requests fallback also failed:', str(e2))
-            raise
+            while iterations is None or count < iterations:
+                if count:
+                    self.sleep(self.interval)
+                count += 1
+                try:
+                    changed = self.poll()
+                except Exception as e:
+                    # One bad poll (timeout, crashed page) must not end the watch:
+                    # drop the browser so the next poll opens a fresh one
+                    print(f"Poll {count} failed: {e}")
+                    self.close()
+                    continue
+                for row in changed:
+                    self.emit(describe_change(row))
+        finally:
+            self.close()
+
+    def close(self):
+        browser, playwright = self._browser, self._playwright
+        self._browser = self._page = self._playwright = None
+        for stop in (browser and browser.close, playwright and playwright.stop):
+            if stop:
+                try:
+                    stop()
+                except Exception as e:
+                    print(f"Error closing the browser: {e}")
+
+
+def fetch_and_save():
+    write_output(fetch_standings())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fetch the Fox Sports MLS standings into output.md')
+    parser.add_argument('--watch', type=float, metavar='SECONDS',
+                        help='Poll on this interval and print only rows that changed')
+    parser.add_argument('--iterations', type=int, help='Stop watching after this many polls')
+    args = parser.parse_args(argv)
+    if args.watch:
+        StandingsWatcher(interval=args.watch).run(args.iterations)
+    else:
+        fetch_and_save()
 
 
 if __name__ == '__main__':
-    fetch_and_save()
+    main()
@@ -13,3 +13,71 @@ def test_fetch_creates_output(tmp_path):
     assert 'MLS' in txt or 'Standings' in txt
     # check at least one known team name appears
     assert ('Philadelphia' in txt) or ('San Diego' in txt) or ('FC Cincinnati' in txt)
+
+
+def _load():
+    import sys
+    sys.path.insert(0, str(ROOT))
+    import fetch_standings
+    return fetch_standings
+
+
+TABLE = [
+    ['EASTERN CONFERENCE', 'MP', 'PTS', 'W-D-L', 'PPG', 'GF', 'GA', 'GD', 'HOME'],
+    ['1', 'Philadelphia', '32', '63', '19-6-7', '1.97', '56', '33', '+23', '11-4-1'],
+    ['2', 'FC Cincinnati', '32', '59', '18-5-9', '1.84', '48', '40', '8', '8-3-5'],
+    ['WESTERN CONFERENCE', 'MP', 'PTS', 'W-D-L', 'PPG', 'GF', 'GA', 'GD', 'HOME'],
+    ['15', 'LA Galaxy', '31', '24', '5-9-17', '0.77', '41', '62', '−21', '5-2-8'],
+]
+
+
+def test_parse_standings_typed_columns():
+    standings = _load().parse_standings([TABLE])
+    assert [row['team'] for row in standings] == ['Philadelphia', 'FC Cincinnati', 'LA Galaxy']
+    assert standings[0] == {'conference': 'Eastern', 'rank': 1, 'team': 'Philadelphia', 'gp': 32, 'pts': 63,
+                            'w': 19, 't': 6, 'l': 7, 'ppg': 1.97, 'gf': 56, 'ga': 33, 'gd': 23}
+    assert (standings[2]['conference'], standings[2]['gd']) == ('Western', -21)
+
+
+def test_watcher_emits_only_changed_rows(tmp_path, monkeypatch):
+    fetch_standings = _load()
+    monkeypatch.setattr(fetch_standings, 'OUT', tmp_path / 'output.md')
+    polls = [fetch_standings.parse_standings([TABLE]) for _ in range(3)]
+    polls[2][1].update(gp=33, w=19, pts=62)
+    monkeypatch.setattr(fetch_standings, 'fetch_standings', lambda browser_fallback=None: polls.pop(0))
+
+    emitted = []
+    fetch_standings.StandingsWatcher(interval=0, emit=emitted.append, sleep=lambda s: None).run(iterations=3)
+    assert len(emitted) == 4
+    assert emitted[-1] == 'Eastern 2. FC Cincinnati: GP 32 -> 33, W 18 -> 19, PTS 59 -> 62'
+    assert '| 2 | FC Cincinnati | 33 | 19 | 9 | 5 | 62 | 8 |' in (tmp_path / 'output.md').read_text()
+
+
+def test_watcher_survives_a_failed_poll(tmp_path, monkeypatch):
+    fetch_standings = _load()
+    monkeypatch.setattr(fetch_standings, 'OUT', tmp_path / 'output.md')
+    closed = []
+
+    class DeadBrowser:
+        def close(self):
+            closed.append('browser')
+            raise RuntimeError('Target closed')
+
+    polls = [fetch_standings.parse_standings([TABLE]), TimeoutError('reload timed out'),
+             fetch_standings.parse_standings([TABLE])]
+    polls[2][0].update(pts=66)
+    emitted = []
+    watcher = fetch_standings.StandingsWatcher(interval=0, emit=emitted.append, sleep=lambda s: None)
+
+    def fetch(browser_fallback=None):
+        poll = polls.pop(0)
+        if isinstance(poll, Exception):
+            watcher._browser, watcher._page, watcher._playwright = DeadBrowser(), object(), None
+            raise poll
+        return poll
+
+    monkeypatch.setattr(fetch_standings, 'fetch_standings', fetch)
+    watcher.run(iterations=3)
+    assert closed == ['browser']
+    assert watcher._page is None
+    assert emitted[-1] == 'Eastern 1. Philadelphia: PTS 63 -> 66'
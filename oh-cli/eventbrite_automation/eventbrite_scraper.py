@@ -7,67 +7,180 @@ It saves the results to output.md file.
 """
 
 from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
+import asyncio
+import os
 import re
+import sys
 import time
 from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urlparse
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from automation_core.http_first import fetch_http_first
+from automation_core.resource_blocking import site_profile
+
+PLANNING_KEYWORDS = [
+    "event planning", "plan event", "planning tips", "event tips",
+    "organize event", "event management", "event guide", "planning guide"
+]
+
+# Article body containers, most specific first; the body text is the fallback
+ARTICLE_CONTENT_SELECTORS = [
+    "article", ".post-content", ".article-content", ".content",
+    "[class*='content']", "main", ".entry-content"
+]
+
+# Returns the text of the first visible container in one round trip
+EXTRACT_ARTICLE_CONTENT_JS = """
+(selectors) => {
+    const visible = (el) => {
+        const style = getComputedStyle(el);
+        return el.getClientRects().length > 0 && style.visibility !== 'hidden' && style.display !== 'none';
+    };
+    for (const selector of selectors) {
+        const el = document.querySelector(selector);
+        if (el && visible(el)) return el.innerText;
+    }
+    return document.body ? document.body.innerText : null;
+}
+"""
+
+# Pagination of the category listing: "Next", "Older posts", a bare arrow, or /page/N/
+NEXT_LINK_TEXT = re.compile(r'^(?:next(?: page)?|older(?: posts| entries)?)\s*[»›→]?$|^[»›→]$', re.IGNORECASE)
+LISTING_PAGE_PATTERN = re.compile(r'/page/(\d+)/?$')
+
+# Every link on the listing page, with its rel, in one round trip
+LISTING_LINKS_JS = """
+() => [...document.querySelectorAll('a[href]')].map((a) => ({href: a.href, text: (a.textContent || '').trim(), rel: a.rel || ''}))
+"""
 
 class EventbriteScraper:
-    def __init__(self):
+    def __init__(self, max_articles: Optional[int] = None, max_workers: int = 6, max_listing_pages: int = 50):
         self.base_url = "https://www.eventbrite.com"
         self.blog_url = "https://www.eventbrite.com/blog/"
         self.output_file = "output.md"
         self.tips_content = []
+        # None crawls every article found on the listing
+        self.max_articles = max_articles
+        # Article pages loaded at the same time
+        self.max_workers = max_workers
+        # Listing pages followed through next-page links before any article is visited
+        self.max_listing_pages = max_listing_pages
         
     def scrape_event_planning_tips(self):
         """Main method to scrape event planning tips from Eventbrite"""
-        with sync_playwright() as p:
-            # Launch browser (headless=True for production, False for debugging)
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            
-            try:
-                print("Starting Eventbrite event planning tips scraper...")
-                
-                # Navigate to Eventbrite blog
-                print(f"Navigating to {self.blog_url}")
-                page.goto(self.blog_url, wait_until="networkidle")
-                
-                # Wait for content to load
-                page.wait_for_timeout(3000)
-                
-                # Look for event planning related articles
-                self._find_planning_articles(page)
-                
-                # If we found articles, visit them to extract tips
-                if self.tips_content:
-                    print(f"Found {len(self.tips_content)} event planning articles")
-                    self._extract_tips_from_articles(page)
-                else:
-                    # If no specific articles found, extract general tips from blog
-                    print("No specific event planning articles found, extracting general tips...")
-                    self._extract_general_tips(page)
+        # The blog listing is server-rendered: read it over plain HTTP before starting a browser
+        articles = self._crawl_listing_http()
+        if articles is not None:
+            self.tips_content = articles
+        else:
+            with sync_playwright() as p:
+                # Launch browser (headless=True for production, False for debugging)
+                browser = p.chromium.launch(headless=True)
+                page = browser.new_page()
                 
-                # Save results to output.md
-                self._save_to_output()
-                
-                print(f"Scraping completed. Results saved to {self.output_file}")
-                
-            except Exception as e:
-                print(f"Error during scraping: {e}")
-                # Save error info to output
-                self._save_error_to_output(str(e))
-            finally:
-                browser.close()
+                try:
+                    print("Starting Eventbrite event planning tips scraper...")
+                    
+                    # Look for event planning related articles on every listing page
+                    self._crawl_listing_browser(page)
+                    
+                    if not self.tips_content:
+                        # If no specific articles found, extract general tips from blog
+                        print("No specific event planning articles found, extracting general tips...")
+                        if page.url != self.blog_url:
+                            page.goto(self.blog_url, wait_until="networkidle")
+                        self._extract_general_tips(page)
+                    
+                except Exception as e:
+                    print(f"Error during scraping: {e}")
+                    # Save error info to output
+                    self._save_error_to_output(str(e))
+                    return
+                finally:
+                    # The listing browser is closed before the article crawl starts its own
+                    browser.close()
+        
+        try:
+            # If we found articles, visit them to extract tips
+            if any(article.get('url') for article in self.tips_content):
+                print(f"Found {len(self.tips_content)} event planning articles")
+                self._extract_tips_from_articles()
+            
+            # Save results to output.md
+            self._save_to_output()
+            
+            print(f"Scraping completed. Results saved to {self.output_file}")
+            
+        except Exception as e:
+            print(f"Error during scraping: {e}")
+            self._save_error_to_output(str(e))
+    
+    def _crawl_listing_http(self) -> Optional[List[Dict]]:
+        """Planning articles from every listing page over plain HTTP, or None if the browser is needed"""
+        listing = fetch_http_first(self.blog_url, self._planning_articles_from_page, required=['articles'])
+        if not listing['success']:
+            return None
+        articles = listing['data']['articles']
+        seen = {self.blog_url}
+        next_url = listing['data'].get('next_url')
+        while next_url and next_url not in seen and len(seen) < self.max_listing_pages:
+            seen.add(next_url)
+            more = fetch_http_first(next_url, self._planning_articles_from_page)
+            if not more['success']:
+                print(f"Could not read listing page {next_url}: {more['http_error']}")
+                break
+            articles += more['data'].get('articles', [])
+            next_url = more['data'].get('next_url')
+        print(f"Found {len(articles)} event planning articles on {len(seen)} listing pages over HTTP")
+        return articles
+    
+    def _crawl_listing_browser(self, page):
+        """Follow the listing's next-page links, collecting planning articles from each page"""
+        url = self.blog_url
+        seen = set()
+        while url and url not in seen and len(seen) < self.max_listing_pages:
+            seen.add(url)
+            print(f"Navigating to {url}")
+            page.goto(url, wait_until="networkidle")
+            
+            # Wait for content to load
+            page.wait_for_timeout(3000)
+            
+            self._find_planning_articles(page)
+            url = self._next_listing_url(page.evaluate(LISTING_LINKS_JS), page.url)
+        print(f"Read {len(seen)} listing pages")
+    
+    def _next_listing_url(self, links, current_url) -> Optional[str]:
+        """The listing page after ``current_url``, from its links"""
+        path = urlparse(current_url).path
+        current = LISTING_PAGE_PATTERN.search(path)
+        number = int(current.group(1)) if current else 1
+        listing = LISTING_PAGE_PATTERN.sub('/', path)
+        numbered = None
+        for link in links:
+            if not link.get('href'):
+                continue
+            href = urljoin(current_url, link['href'])
+            if 'next' in str(link.get('rel', '')).split() or NEXT_LINK_TEXT.match(link.get('text', '').strip()):
+                return href
+            target_path = urlparse(href).path
+            target = LISTING_PAGE_PATTERN.search(target_path)
+            # /page/N+1/ of this listing, not of some other category linked from it
+            if (numbered is None and target and int(target.group(1)) == number + 1
+                    and LISTING_PAGE_PATTERN.sub('/', target_path) == listing):
+                numbered = href
+        return numbered
     
     def _find_planning_articles(self, page):
         """Find articles related to event planning"""
         try:
             # Look for article titles, links, or content related to event planning
-            planning_keywords = [
-                "event planning", "plan event", "planning tips", "event tips",
-                "organize event", "event management", "event guide", "planning guide"
-            ]
-            
             # Try different selectors for articles
             article_selectors = [
                 "article", "h2", "h3", ".post-title", ".article-title", 
@@ -80,7 +193,7 @@ class EventbriteScraper:
                     for element in elements:
                         if element.is_visible():
                             text = element.inner_text().lower()
-                            if any(keyword in text for keyword in planning_keywords):
+                            if any(keyword in text for keyword in PLANNING_KEYWORDS):
                                 # Found a relevant article
                                 href = None
                                 try:
@@ -106,49 +219,69 @@ class EventbriteScraper:
         except Exception as e:
             print(f"Error finding planning articles: {e}")
     
-    def _extract_tips_from_articles(self, page):
-        """Extract tips from found articles"""
-        for i, article in enumerate(self.tips_content[:3]):  # Limit to first 3 articles
-            if article.get('url'):
-                try:
-                    print(f"Visiting article {i+1}: {article['title'][:50]}...")
-                    
-                    # Navigate to article
-                    full_url = article['url']
-                    if not full_url.startswith('http'):
-                        full_url = self.base_url + article['url']
-                    
-                    page.goto(full_url, wait_until="networkidle")
-                    page.wait_for_timeout(2000)
-                    
-                    # Extract article content
-                    content = self._extract_article_content(page)
-                    article['full_content'] = content
-                    
-                except Exception as e:
-                    print(f"Error extracting from article {i+1}: {e}")
-                    continue
+    def _planning_articles_from_page(self, page):
+        """Event planning article links in the listing HTML, and the next listing page"""
+        articles = []
+        for link in page.links:
+            text = link['text'].lower()
+            if link['href'] and any(keyword in text for keyword in PLANNING_KEYWORDS):
+                articles.append({'title': link['text'], 'url': link['href'], 'content': text})
+        return {'articles': articles, 'next_url': self._next_listing_url(page.links, page.url or self.blog_url)}
     
-    def _extract_article_content(self, page):
-        """Extract content from an article page"""
-        content_selectors = [
-            "article", ".post-content", ".article-content", ".content",
-            "[class*='content']", "main", ".entry-content"
-        ]
-        
-        for selector in content_selectors:
+    def _article_url(self, article):
+        url = article.get('url')
+        if url and not url.startswith('http'):
+            url = self.base_url + url
+        return url
+
+    def _extract_tips_from_articles(self):
+        """Extract tips from found articles, loading the article pages concurrently"""
+        articles = [article for article in self.tips_content if article.get('url')]
+        # Titles and their parent cards often point at the same article; fetch each URL once
+        urls = list(dict.fromkeys(self._article_url(article) for article in articles))
+        if self.max_articles is not None:
+            urls = urls[:self.max_articles]
+        if not urls:
+            return
+
+        print(f"Visiting {len(urls)} articles with up to {self.max_workers} pages at a time...")
+        started = time.time()
+        contents = asyncio.run(self._fetch_articles(urls))
+        print(f"Fetched {len(contents)}/{len(urls)} articles in {time.time() - started:.1f}s")
+
+        for article in articles:
+            content = contents.get(self._article_url(article))
+            if content is not None:
+                article['full_content'] = content
+
+    async def _fetch_articles(self, urls) -> Dict[str, str]:
+        """Load ``urls`` in one browser with at most ``max_workers`` pages open"""
+        contents = {}
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            context = await browser.new_context()
+            await site_profile('eventbrite').attach_async(context)
+
+            async def fetch(i, url):
+                async with semaphore:
+                    page = await context.new_page()
+                    try:
+                        print(f"Visiting article {i + 1}: {url}")
+                        await page.goto(url, wait_until="networkidle")
+                        await page.wait_for_timeout(2000)
+                        contents[url] = await page.evaluate(EXTRACT_ARTICLE_CONTENT_JS, ARTICLE_CONTENT_SELECTORS)
+                    except Exception as e:
+                        print(f"Error extracting from article {i + 1}: {e}")
+                    finally:
+                        await page.close()
+
             try:
-                element = page.locator(selector).first
-                if element.count() > 0 and element.is_visible():
-                    return element.inner_text()
-            except:
-                continue
-        
-        # Fallback: get body text
-        try:
-            return page.locator("body").inner_text()
-        except:
-            return "Could not extract content"
+                await asyncio.gather(*(fetch(i, url) for i, url in enumerate(urls)))
+            finally:
+                await browser.close()
+        return contents
     
     def _extract_general_tips(self, page):
         """Extract general event planning tips from the blog page"""
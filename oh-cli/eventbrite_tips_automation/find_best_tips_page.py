@@ -3,90 +3,101 @@
 Script to find the best event planning tips page on Eventbrite
 """
 
-from playwright.sync_api import sync_playwright
-import json
+import asyncio
+import os
+import sys
+from playwright.async_api import async_playwright
 
-def find_best_tips_page():
-    candidate_urls = [
-        "https://www.eventbrite.com/blog/category/tips-and-guides/",
-        "https://www.eventbrite.com/resources/",
-        "https://www.eventbrite.com/help",
-        "https://www.eventbrite.com/help/en-us/"
-    ]
-    
-    results = []
-    
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        page = browser.new_page()
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from automation_core.url_probe import probe_urls_async
+
+CANDIDATE_URLS = [
+    "https://www.eventbrite.com/blog/category/tips-and-guides/",
+    "https://www.eventbrite.com/resources/",
+    "https://www.eventbrite.com/help",
+    "https://www.eventbrite.com/help/en-us/"
+]
+
+KEYWORDS = [
+    "event planning", "tips", "guide", "organize", "create event",
+    "event management", "planning tips", "event organizer",
+    "successful event", "event strategy"
+]
+
+TIPS_PHRASES = [
+    "event planning tips", "how to plan", "event planning guide",
+    "organizing events", "event planning checklist"
+]
+
+
+async def rank_tips_pages(candidate_urls=CANDIDATE_URLS):
+    """Probe the candidate pages concurrently, best keyword score first"""
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=False)
+        context = await browser.new_context()
         
-        for url in candidate_urls:
+        async def render(url):
+            page = await context.new_page()
             try:
-                print(f"\nChecking: {url}")
-                response = page.goto(url, wait_until="networkidle", timeout=10000)
+                response = await page.goto(url, wait_until="networkidle", timeout=10000)
+                if not response or response.status != 200:
+                    print(f"Failed to load {url}: {response.status if response else 'No response'}")
+                    return {"status": "failed", "error": f"HTTP {response.status if response else 'No response'}",
+                            "accessible": False}
+                
+                # Get page title
+                title = await page.title()
                 
-                if response and response.status == 200:
-                    # Get page title
-                    title = page.title()
-                    print(f"Title: {title}")
-                    
-                    # Get page content
-                    content = page.content().lower()
-                    
-                    # Count relevant keywords
-                    keywords = [
-                        "event planning", "tips", "guide", "organize", "create event",
-                        "event management", "planning tips", "event organizer",
-                        "successful event", "event strategy"
-                    ]
-                    
-                    keyword_count = sum(content.count(keyword) for keyword in keywords)
-                    print(f"Keyword relevance score: {keyword_count}")
-                    
-                    # Check for specific event planning content
-                    has_tips = any(phrase in content for phrase in [
-                        "event planning tips", "how to plan", "event planning guide",
-                        "organizing events", "event planning checklist"
-                    ])
-                    
-                    # Take screenshot
-                    screenshot_name = url.replace("https://www.eventbrite.com", "").replace("/", "_")
-                    if not screenshot_name:
-                        screenshot_name = "homepage"
-                    page.screenshot(path=f"page_{screenshot_name}.png")
-                    
-                    results.append({
-                        "url": url,
-                        "title": title,
-                        "keyword_score": keyword_count,
-                        "has_specific_tips": has_tips,
-                        "status": "success"
-                    })
-                    
-                    print(f"Has specific event planning tips: {has_tips}")
-                    
-                else:
-                    print(f"Failed to load: {response.status if response else 'No response'}")
-                    results.append({
-                        "url": url,
-                        "status": "failed",
-                        "error": f"HTTP {response.status if response else 'No response'}"
-                    })
-                    
-            except Exception as e:
-                print(f"Error checking {url}: {e}")
-                results.append({
-                    "url": url,
-                    "status": "error",
-                    "error": str(e)
-                })
+                # Get page content
+                content = (await page.content()).lower()
+                
+                # Count relevant keywords
+                keyword_count = sum(content.count(keyword) for keyword in KEYWORDS)
+                
+                # Check for specific event planning content
+                has_tips = any(phrase in content for phrase in TIPS_PHRASES)
+                
+                # Take screenshot
+                screenshot_name = url.replace("https://www.eventbrite.com", "").replace("/", "_")
+                if not screenshot_name:
+                    screenshot_name = "homepage"
+                await page.screenshot(path=f"page_{screenshot_name}.png")
+                
+                print(f"\nChecked: {url}")
+                print(f"Title: {title}")
+                print(f"Keyword relevance score: {keyword_count}")
+                print(f"Has specific event planning tips: {has_tips}")
+                
+                return {
+                    "title": title,
+                    "keyword_score": keyword_count,
+                    "has_specific_tips": has_tips,
+                    "status": "success"
+                }
+            finally:
+                await page.close()
         
-        browser.close()
+        ranked = await probe_urls_async(candidate_urls, render=render, score=lambda result: result["keyword_score"])
+        await browser.close()
+    
+    for result in ranked:
+        if not result["accessible"] and result.get("status") != "failed":
+            error = result.get("render_error") or result["http_error"] or f"HTTP {result['http_status']}"
+            print(f"Error checking {result['url']}: {error}")
+            result.update(status="error", error=error)
+    return ranked
+
+
+def find_best_tips_page():
+    results = asyncio.run(rank_tips_pages())
     
-    # Find the best page
+    # Find the best page: results come back ranked, best keyword score first
     successful_results = [r for r in results if r["status"] == "success"]
     if successful_results:
-        best_page = max(successful_results, key=lambda x: x["keyword_score"])
+        best_page = successful_results[0]
         print(f"\nBest page for event planning tips:")
         print(f"URL: {best_page['url']}")
         print(f"Title: {best_page['title']}")
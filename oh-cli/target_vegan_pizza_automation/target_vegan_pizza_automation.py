@@ -4,13 +4,21 @@ Target Vegan Pizza Automation Script
 Searches for frozen vegan cheese pizza between $5-10 on Target.com
 """
 
-from playwright.sync_api import sync_playwright
-import json
+import os
+import sys
 import time
 import re
 import urllib.parse
 from datetime import datetime
 
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from automation_core.browser_pool import sync_browser_context
+from automation_core.http_cache import attach_http_cache_sync
+from automation_core.result_store import register_renderer, shared_result_store
+
 def extract_price_value(price_text):
     """Extract numeric price value from price text"""
     if not price_text or price_text == "No price":
@@ -37,8 +45,92 @@ def is_vegan_product(title, description=""):
     text_to_check = (title + " " + description).lower()
     return any(keyword in text_to_check for keyword in vegan_keywords)
 
-def search_target_vegan_pizza():
-    """Main function to search for vegan pizza on Target"""
+# Runs inside the page: reads title/url/price/aria-price for every card at once.
+# Mirrors the old per-card selector cascades, which cost one IPC call per attempt.
+EXTRACT_PRODUCT_CARDS_JS = """
+(cards) => {
+    const isVisible = (el) => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    const titleSelectors = ["a[data-test='product-title']", "h3 a", "h2 a", "a[href*='/p/']"];
+    const priceSelectors = ["[data-test='product-price']", "span[aria-label*='$']", ".price", "[class*='price']"];
+
+    return cards.map((card) => {
+        const product = {title: null, url: null, price_text: null, aria_price: null};
+
+        for (const selector of titleSelectors) {
+            const el = card.querySelector(selector);
+            if (el && isVisible(el)) {
+                product.title = el.innerText.trim();
+                product.url = el.getAttribute('href') || '';
+                break;
+            }
+        }
+
+        for (const selector of priceSelectors) {
+            const el = card.querySelector(selector);
+            if (el && isVisible(el) && el.innerText.includes('$')) {
+                product.price_text = el.innerText.trim();
+                break;
+            }
+        }
+        if (!product.price_text) {
+            // Equivalent of span:has-text('$')
+            const span = Array.from(card.querySelectorAll('span'))
+                .find((el) => isVisible(el) && el.innerText.includes('$'));
+            if (span) {
+                product.price_text = span.innerText.trim();
+            }
+        }
+
+        const labelled = Array.from(card.querySelectorAll('[aria-label]')).find((el) => {
+            const label = el.getAttribute('aria-label');
+            return label.includes('$') && label.toLowerCase().includes('price');
+        });
+        if (labelled) {
+            product.aria_price = labelled.getAttribute('aria-label');
+        }
+        return product;
+    });
+}
+"""
+
+def extract_product_cards(page, selector):
+    """Extract raw fields for all product cards matching selector in one evaluate call"""
+    return page.locator(selector).evaluate_all(EXTRACT_PRODUCT_CARDS_JS)
+
+def build_product_info(card, position):
+    """Turn a raw card from extract_product_cards into a product result"""
+    product_info = {
+        "position": position,
+        "title": card.get("title") or "No title",
+        "price_text": card.get("price_text") or "No price",
+        "price_value": None,
+        "url": card.get("url") or "",
+        "is_vegan": False,
+        "in_price_range": False
+    }
+    
+    if product_info["url"] and not product_info["url"].startswith("http"):
+        product_info["url"] = "https://www.target.com" + product_info["url"]
+    
+    # If no visible price, fall back to the aria-label price
+    if product_info["price_text"] == "No price" and card.get("aria_price"):
+        product_info["price_text"] = card["aria_price"]
+    product_info["price_value"] = extract_price_value(product_info["price_text"])
+    
+    # Check if product is vegan
+    product_info["is_vegan"] = is_vegan_product(product_info["title"])
+    
+    # Check if price is in range
+    if product_info["price_value"] is not None:
+        product_info["in_price_range"] = 5 <= product_info["price_value"] <= 10
+    
+    return product_info
+
+def search_target_vegan_pizza(pool=None):
+    """Main function to search for vegan pizza on Target
+    
+    Pass a SyncBrowserPool to reuse a warm browser instead of launching one.
+    """
     results = {
         "timestamp": datetime.now().isoformat(),
         "search_url": "",
@@ -50,9 +142,10 @@ def search_target_vegan_pizza():
         "status": "unknown"
     }
     
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        page = browser.new_page()
+    with sync_browser_context(pool, headless=False) as context:
+        # Serve JS/CSS/images from the shared disk cache when AUTOMATION_HTTP_CACHE is set
+        http_cache = attach_http_cache_sync(context)
+        page = context.new_page()
         
         try:
             # Create search URL
@@ -84,94 +177,21 @@ def search_target_vegan_pizza():
             
             for selector in product_selectors:
                 try:
-                    elements = page.locator(selector).all()
-                    if elements and len(elements) > 0:
-                        print(f"Found {len(elements)} products with selector: {selector}")
+                    # One in-page round trip for every card and field
+                    cards = extract_product_cards(page, selector)
+                    if cards:
+                        print(f"Found {len(cards)} products with selector: {selector}")
                         products_found = True
-                        results["total_products"] = len(elements)
+                        results["total_products"] = len(cards)
                         
-                        # Extract info from all products
-                        for i, element in enumerate(elements):
-                            try:
-                                product_info = {
-                                    "position": i + 1,
-                                    "title": "No title",
-                                    "price_text": "No price",
-                                    "price_value": None,
-                                    "url": "",
-                                    "is_vegan": False,
-                                    "in_price_range": False
-                                }
-                                
-                                # Get product title and URL
-                                title_selectors = [
-                                    "a[data-test='product-title']",
-                                    "h3 a",
-                                    "h2 a",
-                                    "a[href*='/p/']"
-                                ]
-                                for title_sel in title_selectors:
-                                    try:
-                                        title_elem = element.locator(title_sel).first
-                                        if title_elem.is_visible():
-                                            product_info["title"] = title_elem.inner_text().strip()
-                                            product_info["url"] = title_elem.get_attribute("href") or ""
-                                            if product_info["url"] and not product_info["url"].startswith("http"):
-                                                product_info["url"] = "https://www.target.com" + product_info["url"]
-                                            break
-                                    except:
-                                        continue
-                                
-                                # Get price with multiple strategies
-                                price_selectors = [
-                                    "[data-test='product-price']",
-                                    "span[aria-label*='$']",
-                                    ".price",
-                                    "[class*='price']",
-                                    "span:has-text('$')"
-                                ]
-                                for price_sel in price_selectors:
-                                    try:
-                                        price_elem = element.locator(price_sel).first
-                                        if price_elem.is_visible():
-                                            price_text = price_elem.inner_text().strip()
-                                            if "$" in price_text:
-                                                product_info["price_text"] = price_text
-                                                product_info["price_value"] = extract_price_value(price_text)
-                                                break
-                                    except:
-                                        continue
-                                
-                                # If still no price, try getting it from aria-label
-                                if product_info["price_text"] == "No price":
-                                    try:
-                                        price_elements = element.locator("*").all()
-                                        for elem in price_elements:
-                                            aria_label = elem.get_attribute("aria-label") or ""
-                                            if "$" in aria_label and "price" in aria_label.lower():
-                                                product_info["price_text"] = aria_label
-                                                product_info["price_value"] = extract_price_value(aria_label)
-                                                break
-                                    except:
-                                        pass
-                                
-                                # Check if product is vegan
-                                product_info["is_vegan"] = is_vegan_product(product_info["title"])
-                                
-                                # Check if price is in range
-                                if product_info["price_value"] is not None:
-                                    product_info["in_price_range"] = 5 <= product_info["price_value"] <= 10
-                                
-                                all_products.append(product_info)
-                                
-                                # Print product info
-                                vegan_indicator = "🌱 VEGAN" if product_info["is_vegan"] else ""
-                                price_indicator = "💰 IN RANGE" if product_info["in_price_range"] else ""
-                                print(f"Product {i+1}: {product_info['title']} - {product_info['price_text']} {vegan_indicator} {price_indicator}")
-                                
-                            except Exception as e:
-                                print(f"Error extracting product {i+1}: {e}")
-                                continue
+                        for i, card in enumerate(cards):
+                            product_info = build_product_info(card, i + 1)
+                            all_products.append(product_info)
+                            
+                            # Print product info
+                            vegan_indicator = "🌱 VEGAN" if product_info["is_vegan"] else ""
+                            price_indicator = "💰 IN RANGE" if product_info["in_price_range"] else ""
+                            print(f"Product {i+1}: {product_info['title']} - {product_info['price_text']} {vegan_indicator} {price_indicator}")
                         
                         break  # Found products with this selector, no need to try others
                         
@@ -208,6 +228,9 @@ def search_target_vegan_pizza():
                     print(f"\n❌ No vegan cheese pizzas found in the $5-10 price range")
                     results["status"] = "no_matches"
             
+            if http_cache:
+                results["http_cache"] = http_cache.report()
+                print(http_cache.summary())
             return results
             
         except Exception as e:
@@ -215,19 +238,10 @@ def search_target_vegan_pizza():
             results["status"] = "error"
             results["error"] = str(e)
             return results
-        
-        finally:
-            browser.close()
 
-def save_results_to_files(results):
-    """Save results to both JSON and Markdown files"""
-    
-    # Save JSON results
-    with open("automation_results.json", "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
-    print("Results saved to: automation_results.json")
-    
-    # Create markdown output
+@register_renderer('target_vegan_pizza')
+def render_markdown(results):
+    """Markdown report for one search run"""
     markdown_content = f"""# Target Vegan Pizza Search Results
 
 ## Search Summary
@@ -276,11 +290,19 @@ This search was performed using a Playwright Python automation script that:
 
 **Screenshot**: target_search_results.png
 """
-    
-    # Save markdown file
-    with open("output.md", "w", encoding="utf-8") as f:
-        f.write(markdown_content)
-    print("Results saved to: output.md")
+    return markdown_content
+
+def save_results_to_files(results, json_path="automation_results.json", markdown_path="output.md"):
+    """Append results to the result store and render them to JSON and Markdown files"""
+    store = shared_result_store()
+    run_id = store.append("target_vegan_pizza", results, records=results.get("products_found", []),
+                          success=results.get("status") not in ("error", "unknown"))
+    if json_path:
+        store.render_json("target_vegan_pizza", run_id, path=json_path)
+        print(f"Results saved to: {json_path}")
+    if markdown_path:
+        store.render_markdown("target_vegan_pizza", run_id, path=markdown_path)
+        print(f"Results saved to: {markdown_path}")
 
 def main():
     """Main execution function"""
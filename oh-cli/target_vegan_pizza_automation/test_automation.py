@@ -239,6 +239,37 @@ class TestTargetVeganPizzaAutomation(unittest.TestCase):
             self.assertEqual(result, expected,
                            f"Price extraction for '{price_text}' should return {expected}")
 
+    def test_build_product_info(self):
+        """Test that raw batched card fields become product results"""
+        import sys
+        sys.path.append('.')
+        from target_vegan_pizza_automation import build_product_info
+        
+        product = build_product_info({
+            "title": "Daiya Dairy Free Cheeze Lover's Frozen Pizza",
+            "url": "/p/daiya-pizza/-/A-12345",
+            "price_text": "$8.99",
+            "aria_price": None
+        }, 1)
+        self.assertEqual(product["position"], 1)
+        self.assertEqual(product["url"], "https://www.target.com/p/daiya-pizza/-/A-12345")
+        self.assertEqual(product["price_value"], 8.99)
+        self.assertTrue(product["is_vegan"])
+        self.assertTrue(product["in_price_range"])
+        
+        # Falls back to the aria-label price and defaults for missing fields
+        product = build_product_info({
+            "title": None,
+            "url": None,
+            "price_text": None,
+            "aria_price": "current price $12.49"
+        }, 2)
+        self.assertEqual(product["title"], "No title")
+        self.assertEqual(product["url"], "")
+        self.assertEqual(product["price_text"], "current price $12.49")
+        self.assertEqual(product["price_value"], 12.49)
+        self.assertFalse(product["in_price_range"])
+
 def run_tests():
     """Run all tests and return results"""
     # Create test suite
@@ -12,17 +12,112 @@ This script includes multiple approaches to handle anti-bot protection:
 import asyncio
 from playwright.async_api import async_playwright
 import json
+import os
+import sys
 import time
 import random
 import urllib.parse
+from typing import Dict, Optional
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from automation_core.http_first import HttpClient
+from automation_core.selector_cascade import SelectorCascade
+from automation_core.url_probe import probe_urls_async
+from listing_harvester import LISTING_SELECTORS, ListingHarvester
+
+HOMEPAGE_URL = 'https://www.carmax.com/'
+
+# Search URL patterns CarMax might use, probed together when the homepage is blocked
+DIRECT_SEARCH_URLS = [
+    'https://www.carmax.com/cars/toyota/corolla',
+    'https://www.carmax.com/search',
+    'https://www.carmax.com/cars'
+]
+
+SEARCH_PARAMS = {
+    'make': 'Toyota',
+    'model': 'Corolla',
+    'yearMin': '2018',
+    'yearMax': '2023',
+    'color': 'Red'
+}
+
+# The same search as column filters over the harvested listings
+SEARCH_FILTERS = {'make': 'Toyota', 'model': 'Corolla', 'year': (2018, 2023), 'color': 'Red'}
+
+LAUNCH_ARGS = [
+    '--no-sandbox',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-web-security',
+    '--disable-features=VizDisplayCompositor',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--no-first-run',
+    '--no-default-browser-check',
+    '--disable-extensions',
+]
+
+STEALTH_JS = """
+    // Remove webdriver property
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined,
+    });
+
+    // Mock plugins
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => [1, 2, 3, 4, 5],
+    });
+
+    // Mock languages
+    Object.defineProperty(navigator, 'languages', {
+        get: () => ['en-US', 'en'],
+    });
+
+    // Override permissions
+    const originalQuery = window.navigator.permissions.query;
+    window.navigator.permissions.query = (parameters) => (
+        parameters.name === 'notifications' ?
+            Promise.resolve({ state: Cypress.env('NOTIFICATION_PERMISSION') || 'granted' }) :
+            originalQuery(parameters)
+    );
+"""
+
+# Status codes the bot protection answers with instead of the page
+BLOCKED_STATUSES = (403, 429)
+
+
+def is_blocked_response(response) -> bool:
+    """Whether a navigation response is the bot-protection block"""
+    return response is not None and response.status in BLOCKED_STATUSES
+
+
+def is_blocked_title(title: str) -> bool:
+    """Whether a page title is the bot-protection block"""
+    return "Access Denied" in title or "403" in title
+
+
+def backoff_delay(retry: int, base: float = 1.0, cap: float = 8.0) -> float:
+    """Capped exponential backoff with jitter, in seconds"""
+    return min(cap, base * 2 ** retry) * random.uniform(0.5, 1.0)
+
 
 class CarMaxSearcher:
-    def __init__(self):
+    def __init__(self, selectors: Optional[SelectorCascade] = None, max_attempts: int = 3,
+                 backoff_base: float = 1.0, backoff_cap: float = 8.0, http_client: Optional[HttpClient] = None):
+        # Fallback selector lists are tried historical winner first
+        self.selectors = selectors or SelectorCascade('carmax')
         self.user_agents = [
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0'
         ]
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.http_client = http_client
         
     async def human_like_delay(self, min_ms=500, max_ms=2000):
         """Add human-like delays between actions"""
@@ -30,144 +125,126 @@ class CarMaxSearcher:
         await asyncio.sleep(delay / 1000)
     
     async def try_direct_search_url(self, page):
-        """Try to construct a direct search URL for CarMax"""
-        # CarMax search URL pattern (this may need adjustment based on actual site structure)
-        search_params = {
-            'make': 'Toyota',
-            'model': 'Corolla',
-            'yearMin': '2018',
-            'yearMax': '2023',
-            'color': 'Red'
-        }
-        
-        # Try different URL patterns that CarMax might use
-        url_patterns = [
-            'https://www.carmax.com/cars/toyota/corolla',
-            'https://www.carmax.com/search',
-            'https://www.carmax.com/cars'
-        ]
-        
-        for base_url in url_patterns:
-            try:
-                # Construct URL with parameters
-                query_string = urllib.parse.urlencode(search_params)
-                full_url = f"{base_url}?{query_string}"
-                
-                print(f"Trying direct URL: {full_url}")
-                await page.goto(full_url, wait_until='networkidle', timeout=30000)
-                await self.human_like_delay()
-                
-                title = await page.title()
-                if "Access Denied" not in title and "403" not in title:
-                    return True
-                    
-            except Exception as e:
-                print(f"Failed to access {base_url}: {e}")
-                continue
-        
-        return False
+        """Probe the direct search URLs concurrently; returns a page showing the best one, or None"""
+        query_string = urllib.parse.urlencode(SEARCH_PARAMS)
+        urls = [f"{base_url}?{query_string}" for base_url in DIRECT_SEARCH_URLS]
+        pages = {}
+
+        async def render(url):
+            print(f"Trying direct URL: {url}")
+            candidate = await page.context.new_page()
+            pages[url] = candidate
+            response = await candidate.goto(url, wait_until='domcontentloaded', timeout=30000)
+            if is_blocked_response(response):
+                return {'status': response.status, 'accessible': False}
+            title = await candidate.title()
+            return {'title': title, 'accessible': not is_blocked_title(title)}
+
+        # Plain HTTP clients get the block page more often than browsers, so 403s are still rendered
+        ranked = await probe_urls_async(urls, render=render, client=self.http_client,
+                                        keep_statuses=BLOCKED_STATUSES)
+        best = ranked[0]['url'] if ranked and ranked[0]['accessible'] else None
+        for result in ranked:
+            if not result['accessible']:
+                reason = result.get('render_error') or result['http_error'] or result.get('status', result['http_status'])
+                print(f"Failed to access {result['url']}: {reason}")
+
+        for url, candidate in pages.items():
+            if url != best:
+                await candidate.close()
+        if best is None:
+            return None
+
+        await page.close()
+        await self.human_like_delay()
+        return pages[best]
     
+    async def open_attempt_page(self, browser, user_agent):
+        """Open a fresh context and page with the stealth settings"""
+        context = await browser.new_context(
+            viewport={'width': 1920, 'height': 1080},
+            user_agent=user_agent,
+            extra_http_headers={
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+                'Accept-Language': 'en-US,en;q=0.5',
+                'Accept-Encoding': 'gzip, deflate, br',
+                'DNT': '1',
+                'Connection': 'keep-alive',
+                'Upgrade-Insecure-Requests': '1',
+            }
+        )
+        # On the context so direct search pages opened later get it too
+        await context.add_init_script(STEALTH_JS)
+        page = await context.new_page()
+        return context, page
+
+    async def open_homepage(self, page):
+        """Load the homepage, returning False as soon as the response shows a block"""
+        response = await page.goto(HOMEPAGE_URL, wait_until='commit', timeout=30000)
+        if is_blocked_response(response):
+            print(f"Homepage blocked with HTTP {response.status}")
+            return False
+
+        await page.wait_for_load_state('domcontentloaded', timeout=30000)
+        title = await page.title()
+        print(f"Page title: {title}")
+        if is_blocked_title(title):
+            return False
+
+        # Only a page that was let through is worth waiting on
+        try:
+            await page.wait_for_load_state('networkidle', timeout=15000)
+        except Exception as e:
+            print(f"Network did not go idle: {e}")
+        await self.human_like_delay(2000, 4000)
+        return True
+
     async def search_with_stealth(self):
         """Main search function with stealth techniques"""
         async with async_playwright() as p:
-            # Try different browser configurations
-            for attempt in range(3):
-                try:
+            # One browser for every attempt; each attempt gets its own context
+            browser = await p.chromium.launch(headless=True, args=LAUNCH_ARGS)
+            try:
+                for attempt in range(self.max_attempts):
+                    if attempt:
+                        delay = backoff_delay(attempt - 1, self.backoff_base, self.backoff_cap)
+                        print(f"Backing off {delay:.1f}s before attempt {attempt + 1}")
+                        await asyncio.sleep(delay)
+
                     user_agent = random.choice(self.user_agents)
                     print(f"Attempt {attempt + 1} with user agent: {user_agent[:50]}...")
-                    
-                    browser = await p.chromium.launch(
-                        headless=True,
-                        args=[
-                            '--no-sandbox',
-                            '--disable-blink-features=AutomationControlled',
-                            '--disable-web-security',
-                            '--disable-features=VizDisplayCompositor',
-                            '--disable-dev-shm-usage',
-                            '--disable-gpu',
-                            '--no-first-run',
-                            '--no-default-browser-check',
-                            '--disable-extensions',
-                            f'--user-agent={user_agent}'
-                        ]
-                    )
-                    
-                    context = await browser.new_context(
-                        viewport={'width': 1920, 'height': 1080},
-                        user_agent=user_agent,
-                        extra_http_headers={
-                            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                            'Accept-Language': 'en-US,en;q=0.5',
-                            'Accept-Encoding': 'gzip, deflate, br',
-                            'DNT': '1',
-                            'Connection': 'keep-alive',
-                            'Upgrade-Insecure-Requests': '1',
-                        }
-                    )
-                    
-                    page = await context.new_page()
-                    
-                    # Add stealth scripts
-                    await page.add_init_script("""
-                        // Remove webdriver property
-                        Object.defineProperty(navigator, 'webdriver', {
-                            get: () => undefined,
-                        });
-                        
-                        // Mock plugins
-                        Object.defineProperty(navigator, 'plugins', {
-                            get: () => [1, 2, 3, 4, 5],
-                        });
-                        
-                        // Mock languages
-                        Object.defineProperty(navigator, 'languages', {
-                            get: () => ['en-US', 'en'],
-                        });
-                        
-                        // Override permissions
-                        const originalQuery = window.navigator.permissions.query;
-                        window.navigator.permissions.query = (parameters) => (
-                            parameters.name === 'notifications' ?
-                                Promise.resolve({ state: Cypress.env('NOTIFICATION_PERMISSION') || 'granted' }) :
-                                originalQuery(parameters)
-                        );
-                    """)
-                    
-                    # Try homepage first
-                    print("Attempting to access CarMax homepage...")
-                    await page.goto('https://www.carmax.com/', wait_until='networkidle', timeout=30000)
-                    await self.human_like_delay(2000, 4000)
-                    
-                    title = await page.title()
-                    print(f"Page title: {title}")
-                    
-                    if "Access Denied" in title or "403" in title:
-                        print("Homepage blocked, trying direct search URLs...")
-                        success = await self.try_direct_search_url(page)
-                        if not success:
-                            await browser.close()
-                            continue
-                    
-                    # Take screenshot
-                    await page.screenshot(path=f'/workspace/carmax_attempt_{attempt + 1}.png')
-                    
-                    # Try to perform search
-                    result = await self.perform_search(page)
-                    await browser.close()
-                    
-                    if result:
-                        return result
-                        
-                except Exception as e:
-                    print(f"Attempt {attempt + 1} failed: {e}")
+                    context = None
                     try:
-                        await browser.close()
-                    except:
-                        pass
-                    continue
-            
-            return None
-    
+                        context, page = await self.open_attempt_page(browser, user_agent)
+
+                        print("Attempting to access CarMax homepage...")
+                        if not await self.open_homepage(page):
+                            print("Homepage blocked, trying direct search URLs...")
+                            page = await self.try_direct_search_url(page)
+                            if page is None:
+                                continue
+
+                        # Take screenshot
+                        await page.screenshot(path=f'/workspace/carmax_attempt_{attempt + 1}.png')
+
+                        # Try to perform search
+                        result = await self.perform_search(page)
+                        if result:
+                            return result
+
+                    except Exception as e:
+                        print(f"Attempt {attempt + 1} failed: {e}")
+                    finally:
+                        if context is not None:
+                            try:
+                                await context.close()
+                            except Exception:
+                                pass
+
+                return None
+            finally:
+                await browser.close()
+
     async def perform_search(self, page):
         """Perform the actual search on the page"""
         try:
@@ -195,7 +272,8 @@ class CarMaxSearcher:
             search_performed = False
             
             # Method 1: Try make/model selectors
-            for selector in make_selectors:
+            ordered = self.selectors.order('make_input', make_selectors)
+            for selector in ordered:
                 try:
                     make_element = await page.query_selector(selector)
                     if make_element:
@@ -203,13 +281,15 @@ class CarMaxSearcher:
                         await make_element.select_option('Toyota')
                         await self.human_like_delay()
                         search_performed = True
+                        self.selectors.record_in_order('make_input', selector, ordered)
                         break
                 except Exception as e:
                     continue
             
             # Method 2: Try search input
             if not search_performed:
-                for selector in search_selectors:
+                ordered = self.selectors.order('search_input', search_selectors)
+                for selector in ordered:
                     try:
                         search_element = await page.query_selector(selector)
                         if search_element:
@@ -218,6 +298,7 @@ class CarMaxSearcher:
                             await search_element.press('Enter')
                             await self.human_like_delay(3000, 5000)
                             search_performed = True
+                            self.selectors.record_in_order('search_input', selector, ordered)
                             break
                     except Exception as e:
                         continue
@@ -232,7 +313,8 @@ class CarMaxSearcher:
                     '#search-btn'
                 ]
                 
-                for selector in button_selectors:
+                ordered = self.selectors.order('search_button', button_selectors)
+                for selector in ordered:
                     try:
                         button = await page.query_selector(selector)
                         if button:
@@ -240,6 +322,7 @@ class CarMaxSearcher:
                             await button.click()
                             await self.human_like_delay(3000, 5000)
                             search_performed = True
+                            self.selectors.record_in_order('search_button', selector, ordered)
                             break
                     except Exception as e:
                         continue
@@ -249,7 +332,7 @@ class CarMaxSearcher:
             page_content = await page.content()
             
             # Try to extract any vehicle listings
-            results = await self.extract_results(page)
+            results = await self.extract_results(page, SEARCH_FILTERS)
             
             return {
                 'url': current_url,
@@ -262,27 +345,27 @@ class CarMaxSearcher:
             print(f"Error performing search: {e}")
             return None
     
-    async def extract_results(self, page):
-        """Extract vehicle listings from the page"""
-        results = []
-        
-        # Common selectors for car listings
-        listing_selectors = [
-            '.car-tile',
-            '.vehicle-card',
-            '.listing-item',
-            '[data-testid="vehicle-card"]',
-            '.inventory-item',
-            '.car-listing'
-        ]
+    async def extract_results(self, page, filters: Optional[Dict] = None):
+        """Extract vehicle listings from the page, filtered by ``ListingTable.filter`` arguments"""
+        try:
+            table = await ListingHarvester(page, self.selectors).harvest()
+        except Exception as e:
+            print(f"Bulk listing harvest failed, reading tiles one by one: {e}")
+            table = None
+        if table:
+            matches = table.filter(keep_unknown=True, **filters) if filters else table
+            print(f"{len(matches)} of {len(table)} listings match the search")
+            return matches.records()
         
-        for selector in listing_selectors:
+        results = []
+        ordered = self.selectors.order('listing', LISTING_SELECTORS)
+        for selector in ordered:
             try:
                 listings = await page.query_selector_all(selector)
                 if listings:
                     print(f"Found {len(listings)} listings with selector: {selector}")
                     
-                    for listing in listings[:10]:  # Limit to first 10
+                    for listing in listings:
                         try:
                             # Try different selectors for car details
                             title_selectors = ['.car-title', '.vehicle-title', 'h3', 'h4', '.title']
@@ -322,6 +405,7 @@ class CarMaxSearcher:
                             continue
                     
                     if results:
+                        self.selectors.record_in_order('listing', selector, ordered)
                         break
                         
             except Exception as e:
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+CarMax Listing Harvester
+
+Collects every vehicle tile of a CarMax result set instead of the first ten.
+Each round reads all new tiles with one ``evaluate`` (title, price, mileage,
+color, link and stock number per tile), then advances the result set: it
+clicks "See more matches", follows a next-page link, or scrolls for lazy
+loading, and waits until new tiles appear. It stops when the page has nothing
+more to show.
+
+The tiles are normalized into a ``ListingTable``: year, make, model, price,
+mileage and a color code become columns, and make/model/year/color/price
+filters are applied to whole columns at once (numpy arrays when numpy is
+installed, plain lists otherwise).
+
+Usage:
+    harvester = ListingHarvester(page)
+    table = await harvester.harvest()
+    red_corollas = table.filter(make='Toyota', model='Corolla', year=(2018, 2023), color='Red',
+                                price=(None, 25000))
+    print(len(table), len(red_corollas), harvester.stats)
+"""
+
+import math
+import os
+import re
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from automation_core.selector_cascade import SelectorCascade
+
+try:
+    import numpy as np
+except ImportError:  # Optional: filters run over plain lists without it
+    np = None
+
+LISTING_SELECTORS = [
+    '.car-tile',
+    '.vehicle-card',
+    '.listing-item',
+    '[data-testid="vehicle-card"]',
+    '.inventory-item',
+    '.car-listing'
+]
+
+FIELD_SELECTORS = {
+    'title': ['.car-title', '.vehicle-title', 'h3', 'h4', '.title'],
+    'price': ['.price', '.vehicle-price', '.cost', '.amount'],
+    'mileage': ['.mileage', '.miles', '.odometer'],
+    'color': ['.color', '.exterior-color', '[data-color]'],
+}
+
+# Reads the tiles from ``start`` on with the first listing selector that matches
+HARVEST_TILES_JS = """
+({selectors, fields, start}) => {
+    for (const selector of selectors) {
+        const tiles = document.querySelectorAll(selector);
+        if (!tiles.length) continue;
+        const read = (tile, candidates) => {
+            for (const candidate of candidates) {
+                const element = tile.querySelector(candidate);
+                if (element) return (element.getAttribute('data-color') || element.innerText || '').trim();
+            }
+            return '';
+        };
+        const items = [];
+        for (let i = start; i < tiles.length; i++) {
+            const tile = tiles[i];
+            const item = {};
+            for (const [name, candidates] of Object.entries(fields)) item[name] = read(tile, candidates);
+            const link = tile.querySelector('a[href]');
+            item.href = link ? link.href : '';
+            item.stock = tile.getAttribute('data-stock-number') || tile.getAttribute('data-id')
+                || tile.getAttribute('data-vehicle-id') || '';
+            item.text = (tile.innerText || '').slice(0, 500);
+            items.push(item);
+        }
+        return {selector, count: tiles.length, items};
+    }
+    return {selector: null, count: 0, items: []};
+}
+"""
+
+# Shows more results: a "see more" button, then a next-page link, then a scroll
+ADVANCE_JS = """
+() => {
+    const visible = (element) => element.offsetParent !== null && !element.disabled
+        && element.getAttribute('aria-disabled') !== 'true';
+    const more = [...document.querySelectorAll('button, a')].find(
+        (element) => /^(see|show|load|view)\\s+more/i.test((element.innerText || '').trim()) && visible(element));
+    if (more) { more.click(); return 'more'; }
+    const next = document.querySelector('a[rel="next"], [aria-label="Next page"], [aria-label="Next"]');
+    if (next && visible(next)) { next.click(); return 'next'; }
+    const scroller = document.scrollingElement || document.body;
+    const before = scroller.scrollTop;
+    window.scrollTo(0, scroller.scrollHeight);
+    return scroller.scrollTop > before ? 'scroll' : null;
+}
+"""
+
+# True once the page shows a different number of tiles or has navigated
+GROWTH_JS = """
+({selector, count, url}) => location.href !== url || document.querySelectorAll(selector).length !== count
+"""
+
+COLORS = ('black', 'white', 'silver', 'gray', 'red', 'blue', 'green', 'brown', 'beige', 'gold', 'orange',
+          'yellow', 'purple', 'burgundy')
+COLOR_ALIASES = {'grey': 'gray', 'maroon': 'burgundy', 'tan': 'beige', 'charcoal': 'gray'}
+COLOR_PATTERN = re.compile(r'\b(' + '|'.join(COLORS + tuple(COLOR_ALIASES)) + r')\b', re.IGNORECASE)
+UNKNOWN_COLOR = -1
+
+PRICE_PATTERN = re.compile(r'\$\s*(\d[\d,]*(?:\.\d+)?)')
+MILEAGE_PATTERN = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*([kK])?\s*(?:mi\b|miles\b)?')
+YEAR_PATTERN = re.compile(r'\b(19[89]\d|20[0-4]\d)\b')
+MULTIWORD_MAKES = ('alfa romeo', 'aston martin', 'land rover')
+
+RangeFilter = Union[None, float, Tuple[Optional[float], Optional[float]]]
+
+
+def parse_price(text: str) -> float:
+    """Dollar amount in a price label, NaN if there is none"""
+    match = PRICE_PATTERN.search(text or '')
+    return float(match.group(1).replace(',', '')) if match else math.nan
+
+
+def parse_mileage(text: str) -> float:
+    """Miles in a mileage label such as '45,000 miles' or '45K mi', NaN if there are none"""
+    match = MILEAGE_PATTERN.search(text or '')
+    if not match:
+        return math.nan
+    miles = float(match.group(1).replace(',', ''))
+    return miles * 1000 if match.group(2) else miles
+
+
+def parse_title(title: str) -> Tuple[float, str, str]:
+    """Model year, make and model from a '2020 Toyota Corolla LE' style title"""
+    match = YEAR_PATTERN.search(title or '')
+    if not match:
+        return math.nan, '', ''
+    words = title[match.end():].split()
+    lowered = ' '.join(words[:2]).lower()
+    make_words = 2 if lowered in MULTIWORD_MAKES else 1
+    make = ' '.join(words[:make_words]).lower()
+    model = words[make_words].lower() if len(words) > make_words else ''
+    return float(match.group(1)), make, model
+
+
+def color_code(*texts: str) -> int:
+    """Index into ``COLORS`` of the first color named in ``texts``, ``UNKNOWN_COLOR`` if none is"""
+    for text in texts:
+        match = COLOR_PATTERN.search(text or '')
+        if match:
+            name = match.group(1).lower()
+            return COLORS.index(COLOR_ALIASES.get(name, name))
+    return UNKNOWN_COLOR
+
+
+def normalize_listing(item: Dict[str, str]) -> Dict[str, Any]:
+    """One harvested tile with its numeric columns added"""
+    title = (item.get('title') or '').strip()
+    year, make, model = parse_title(title)
+    if math.isnan(year):
+        year, make, model = parse_title(item.get('text', ''))
+    code = color_code(item.get('color', ''), item.get('text', ''))
+    mileage = item.get('mileage') or ''
+    return {
+        'title': title or 'N/A',
+        'price': (item.get('price') or '').strip() or 'N/A',
+        'mileage': mileage.strip() or 'N/A',
+        'href': item.get('href', ''),
+        'stock': item.get('stock', ''),
+        'year': year,
+        'make': make,
+        'model': model,
+        'price_usd': parse_price(item.get('price') or item.get('text', '')),
+        'mileage_miles': parse_mileage(mileage),
+        'color': COLORS[code] if code != UNKNOWN_COLOR else None,
+        'color_code': code,
+    }
+
+
+def listing_key(item: Dict[str, str]) -> str:
+    """Identity of a tile across rounds and pages"""
+    return item.get('stock') or item.get('href') or '|'.join(item.get(name, '') for name in FIELD_SELECTORS)
+
+
+class ListingTable:
+    """Normalized listings with column-wise filters"""
+
+    NUMERIC_COLUMNS = ('year', 'price_usd', 'mileage_miles')
+    TEXT_COLUMNS = ('make', 'model')
+
+    def __init__(self, records: Sequence[Dict[str, Any]]):
+        self.rows = list(records)
+        self.columns = {}
+        for name in self.NUMERIC_COLUMNS:
+            values = [row[name] for row in self.rows]
+            self.columns[name] = np.asarray(values, dtype=float) if np is not None else values
+        for name in self.TEXT_COLUMNS:
+            values = [row[name] for row in self.rows]
+            self.columns[name] = np.asarray(values, dtype=object) if np is not None else values
+        codes = [row['color_code'] for row in self.rows]
+        self.columns['color_code'] = np.asarray(codes, dtype=int) if np is not None else codes
+
+    def __len__(self):
+        return len(self.rows)
+
+    def records(self) -> List[Dict[str, Any]]:
+        return list(self.rows)
+
+    def filter(self, make: Optional[str] = None, model: Optional[str] = None, year: RangeFilter = None,
+               color: Union[None, str, Iterable[str]] = None, price: RangeFilter = None,
+               mileage: RangeFilter = None, keep_unknown: bool = False) -> 'ListingTable':
+        """
+        Rows matching every given filter.
+
+        Ranges are ``(low, high)`` tuples, inclusive, with ``None`` for an open
+        end; a single number matches exactly. ``color`` takes one name or
+        several. With ``keep_unknown`` a row whose tile did not show a field
+        passes that field's filter instead of failing it.
+        """
+        masks = []
+        for name, value in (('make', make), ('model', model)):
+            if value is not None:
+                masks.append(self._equal_mask(self.columns[name], value.lower(), '', keep_unknown))
+        for name, value in (('year', year), ('price_usd', price), ('mileage_miles', mileage)):
+            if value is not None:
+                low, high = value if isinstance(value, tuple) else (value, value)
+                masks.append(self._range_mask(self.columns[name], low, high, keep_unknown))
+        if color is not None:
+            names = [color] if isinstance(color, str) else list(color)
+            codes = [color_code(name) for name in names]
+            masks.append(self._equal_mask(self.columns['color_code'], codes, UNKNOWN_COLOR, keep_unknown))
+        if not masks:
+            return ListingTable(self.rows)
+
+        if np is not None:
+            mask = np.logical_and.reduce(masks)
+            return ListingTable([self.rows[i] for i in np.flatnonzero(mask)])
+        return ListingTable([row for row, *checks in zip(self.rows, *masks) if all(checks)])
+
+    @staticmethod
+    def _range_mask(column, low, high, keep_unknown):
+        if np is not None:
+            known = ~np.isnan(column)
+            inside = known.copy()
+            if low is not None:
+                inside &= np.nan_to_num(column, nan=-np.inf) >= low
+            if high is not None:
+                inside &= np.nan_to_num(column, nan=np.inf) <= high
+            return inside | (~known & keep_unknown)
+        return [keep_unknown if math.isnan(value) else
+                (low is None or value >= low) and (high is None or value <= high) for value in column]
+
+    @staticmethod
+    def _equal_mask(column, wanted, unknown, keep_unknown):
+        wanted = wanted if isinstance(wanted, list) else [wanted]
+        if np is not None:
+            matched = np.isin(column, wanted)
+            return matched | ((column == unknown) & keep_unknown)
+        return [value in wanted or (keep_unknown and value == unknown) for value in column]
+
+
+class ListingHarvester:
+    """Pages or scrolls through a result set, reading new tiles with one evaluate per round"""
+
+    def __init__(self, page, selectors: Optional[SelectorCascade] = None, max_rounds: int = 100,
+                 settle_ms: int = 4000, max_stale_rounds: int = 2):
+        self.page = page
+        self.selectors = selectors or SelectorCascade('carmax')
+        self.max_rounds = max_rounds
+        self.settle_ms = settle_ms
+        self.max_stale_rounds = max_stale_rounds
+        self.stats = {'rounds': 0, 'pages': 1, 'tiles_read': 0, 'listings': 0, 'stopped': None}
+
+    async def harvest(self) -> ListingTable:
+        """Every listing of the result set, deduplicated by stock number or link"""
+        ordered = self.selectors.order('listing', LISTING_SELECTORS)
+        listings: Dict[str, Dict[str, Any]] = {}
+        url, start, stale, winner = self.page.url, 0, 0, None
+
+        for _ in range(self.max_rounds):
+            self.stats['rounds'] += 1
+            batch = await self.page.evaluate(HARVEST_TILES_JS,
+                                             {'selectors': ordered, 'fields': FIELD_SELECTORS, 'start': start})
+            winner = winner or batch['selector']
+            start = batch['count']
+            self.stats['tiles_read'] += len(batch['items'])
+            added = 0
+            for item in batch['items']:
+                key = listing_key(item)
+                if key not in listings:
+                    listings[key] = normalize_listing(item)
+                    added += 1
+            stale = 0 if added else stale + 1
+            if stale >= self.max_stale_rounds:
+                self.stats['stopped'] = 'no new listings'
+                break
+
+            action = await self.page.evaluate(ADVANCE_JS)
+            if action is None:
+                self.stats['stopped'] = 'end of results'
+                break
+            await self._wait_for_more(batch['selector'] or ordered[0], batch['count'], url)
+            if self.page.url != url:
+                url, start = self.page.url, 0
+                self.stats['pages'] += 1
+        else:
+            self.stats['stopped'] = 'max rounds'
+
+        if winner:
+            self.selectors.record_in_order('listing', winner, ordered)
+        self.stats['listings'] = len(listings)
+        print(f"Harvested {len(listings)} listings in {self.stats['rounds']} rounds "
+              f"over {self.stats['pages']} page(s)")
+        return ListingTable(listings.values())
+
+    async def _wait_for_more(self, selector: str, count: int, url: str):
+        try:
+            await self.page.wait_for_function(GROWTH_JS, arg={'selector': selector, 'count': count, 'url': url},
+                                              timeout=self.settle_ms)
+        except Exception:
+            # Timed out (nothing new yet) or the page navigated mid-check
+            pass
+        if self.page.url != url:
+            try:
+                await self.page.wait_for_load_state('domcontentloaded', timeout=self.settle_ms)
+            except Exception:
+                pass
@@ -8,8 +8,8 @@ import unittest
 import asyncio
 import os
 import json
-from unittest.mock import patch, MagicMock
-from carmax_automation import CarMaxSearcher
+from unittest.mock import patch, MagicMock, AsyncMock
+from carmax_automation import CarMaxSearcher, backoff_delay
 
 class TestCarMaxAutomation(unittest.TestCase):
     
@@ -171,6 +171,60 @@ class TestCarMaxAutomation(unittest.TestCase):
         
         asyncio.run(test_error_handling())
 
+class TestRetries(unittest.TestCase):
+    """Test that retries share one browser and stop on the block status"""
+    
+    def test_blocked_attempts_reuse_one_browser(self):
+        """Test that a 403 ends each attempt without waiting for network idle"""
+        pages = []
+        
+        context = MagicMock()
+        
+        def new_page():
+            page = MagicMock()
+            page.goto = AsyncMock(return_value=MagicMock(status=403))
+            page.wait_for_load_state = AsyncMock()
+            page.close = AsyncMock()
+            page.context = context
+            pages.append(page)
+            return page
+        
+        context.new_page = AsyncMock(side_effect=new_page)
+        context.add_init_script = AsyncMock()
+        context.close = AsyncMock()
+        browser = MagicMock()
+        browser.new_context = AsyncMock(return_value=context)
+        browser.close = AsyncMock()
+        playwright = MagicMock()
+        playwright.chromium.launch = AsyncMock(return_value=browser)
+        manager = MagicMock()
+        manager.__aenter__ = AsyncMock(return_value=playwright)
+        manager.__aexit__ = AsyncMock(return_value=False)
+        
+        # The plain HTTP probe is refused too, but a 403 still gets a browser render
+        http_client = MagicMock()
+        http_client.head.return_value = MagicMock(status_code=403, url=None)
+        searcher = CarMaxSearcher(backoff_base=0.01, backoff_cap=0.02, http_client=http_client)
+        with patch('carmax_automation.async_playwright', return_value=manager):
+            result = asyncio.run(searcher.search_with_stealth())
+        
+        self.assertIsNone(result)
+        self.assertEqual(playwright.chromium.launch.await_count, 1)
+        self.assertEqual(browser.new_context.await_count, 3)
+        self.assertEqual(context.close.await_count, 3)
+        self.assertEqual(browser.close.await_count, 1)
+        # Homepage plus three direct URLs per attempt, each in its own page and none of them waited on
+        self.assertEqual(len(pages), 12)
+        self.assertEqual(sum(page.goto.await_count for page in pages), 12)
+        self.assertEqual(http_client.head.call_count, 9)
+        self.assertFalse(any(page.wait_for_load_state.await_count for page in pages))
+    
+    def test_backoff_is_capped(self):
+        """Test that the backoff grows exponentially up to the cap"""
+        self.assertLessEqual(backoff_delay(0, 1.0, 8.0), 1.0)
+        self.assertGreaterEqual(backoff_delay(2, 1.0, 8.0), 2.0)
+        self.assertLessEqual(backoff_delay(10, 1.0, 8.0), 8.0)
+
 class TestOutputValidation(unittest.TestCase):
     """Test the actual output file content and format"""
     
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tests for the CarMax listing harvester
+
+Runs offline: a fake page serves synthetic tiles through the harvester's
+evaluate calls, either by infinite scroll or by numbered result pages.
+
+Usage:
+    python -m pytest oh_ui_sessions/carmax/test_listing_harvester.py
+"""
+
+import asyncio
+import math
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import listing_harvester
+from listing_harvester import (ADVANCE_JS, HARVEST_TILES_JS, ListingHarvester, ListingTable, normalize_listing,
+                               parse_mileage, parse_price, parse_title)
+from automation_core.selector_cascade import SelectorCascade, SelectorStats
+
+MODELS = [('Toyota', 'Corolla'), ('Toyota', 'Camry'), ('Honda', 'Civic'), ('Land Rover', 'Defender')]
+COLORS = ['Red', 'Blue', 'Silver', 'Grey', '']
+
+
+def tile(i, rng):
+    make, model = rng.choice(MODELS)
+    return {'title': f"{rng.randint(2015, 2024)} {make} {model} LE", 'price': f"${rng.randint(12, 45)},999",
+            'mileage': f"{rng.randint(5, 90)}K mi", 'color': rng.choice(COLORS), 'href': f"https://www.carmax.com/car/{i}",
+            'stock': str(100000 + i), 'text': ''}
+
+
+class FakeResultsPage:
+    """Shows ``per_round`` more tiles per scroll, or one page of them per next-link click"""
+
+    def __init__(self, tiles, per_round=24, paged=False):
+        self.tiles = tiles
+        self.per_round = per_round
+        self.paged = paged
+        self.shown = per_round
+        self.page_number = 1
+        self.evaluations = 0
+
+    @property
+    def url(self):
+        return f"https://www.carmax.com/cars?page={self.page_number}"
+
+    def visible(self):
+        if self.paged:
+            start = (self.page_number - 1) * self.per_round
+            return self.tiles[start:start + self.per_round]
+        return self.tiles[:self.shown]
+
+    async def evaluate(self, script, arg=None):
+        self.evaluations += 1
+        if script == HARVEST_TILES_JS:
+            tiles = self.visible()
+            return {'selector': '.car-tile', 'count': len(tiles), 'items': tiles[arg['start']:]}
+        if script == ADVANCE_JS:
+            if self.paged:
+                if self.page_number * self.per_round >= len(self.tiles):
+                    return None
+                self.page_number += 1
+                return 'next'
+            if self.shown >= len(self.tiles):
+                return None
+            self.shown += self.per_round
+            return 'scroll'
+        raise AssertionError('unexpected script')
+
+    async def wait_for_function(self, script, arg=None, timeout=None):
+        pass
+
+    async def wait_for_load_state(self, state, timeout=None):
+        pass
+
+
+class TestListingHarvester(unittest.TestCase):
+    """Test cases for ListingHarvester and ListingTable"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.selectors = SelectorCascade('carmax', SelectorStats(os.path.join(self.tmp.name, 'stats.json')))
+        rng = random.Random(3)
+        self.tiles = [tile(i, rng) for i in range(300)]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def harvest(self, page):
+        harvester = ListingHarvester(page, self.selectors)
+        return harvester, asyncio.run(harvester.harvest())
+
+    def test_normalize(self):
+        self.assertEqual(parse_price('$18,999*'), 18999)
+        self.assertEqual(parse_mileage('45,000 miles'), 45000)
+        self.assertEqual(parse_mileage('45K mi'), 45000)
+        self.assertTrue(math.isnan(parse_price('Call for price')))
+        self.assertEqual(parse_title('2021 Land Rover Defender 110'), (2021, 'land rover', 'defender'))
+        listing = normalize_listing({'title': '', 'price': '', 'mileage': '',
+                                     'text': 'Maroon 2019 Toyota Corolla SE $17,500'})
+        self.assertEqual((listing['year'], listing['model'], listing['color'], listing['price_usd']),
+                         (2019, 'corolla', 'burgundy', 17500))
+
+    def test_scroll_harvest_reads_each_tile_once(self):
+        page = FakeResultsPage(self.tiles)
+        harvester, table = self.harvest(page)
+        self.assertEqual(len(table), 300)
+        self.assertEqual(harvester.stats['tiles_read'], 300)
+        self.assertEqual(harvester.stats['stopped'], 'end of results')
+        # One harvest and one advance evaluate per round
+        self.assertEqual(page.evaluations, 2 * harvester.stats['rounds'])
+
+    def test_paged_harvest(self):
+        harvester, table = self.harvest(FakeResultsPage(self.tiles, per_round=50, paged=True))
+        self.assertEqual(len(table), 300)
+        self.assertEqual(harvester.stats['pages'], 6)
+
+    def test_filters_match_row_by_row(self):
+        table = ListingTable([normalize_listing(item) for item in self.tiles])
+        for backend in (listing_harvester.np, None):
+            with mock.patch.object(listing_harvester, 'np', backend):
+                table = ListingTable(table.records())
+                matches = table.filter(make='Toyota', model='Corolla', year=(2018, 2023), color='Red',
+                                       price=(None, 30000))
+                expected = [row for row in table.records()
+                            if row['make'] == 'toyota' and row['model'] == 'corolla' and 2018 <= row['year'] <= 2023
+                            and row['color'] == 'red' and row['price_usd'] <= 30000]
+                self.assertTrue(expected)
+                self.assertEqual(matches.records(), expected)
+
+                lenient = table.filter(make='Toyota', color='Red', keep_unknown=True)
+                self.assertEqual(len(lenient), len([row for row in table.records() if row['make'] == 'toyota'
+                                                    and row['color'] in ('red', None)]))
+                self.assertEqual(len(table.filter(color=['Grey', 'Silver'])),
+                                 len([row for row in table.records() if row['color'] in ('gray', 'silver')]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,46 +5,56 @@ This script handles Cloudflare protection and navigates to the submissions page.
 """
 
 import asyncio
+import os
+import sys
 import time
-from playwright.async_api import async_playwright
+from typing import Optional
 
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
 
-async def navigate_to_discogs_submissions():
+from automation_core.browser_pool import AsyncBrowserPool, async_browser_context
+
+
+async def navigate_to_discogs_submissions(pool: Optional[AsyncBrowserPool] = None):
     """
     Navigate to the Discogs submissions overview page.
     
+    Args:
+        pool: Optional shared browser pool; without one a private browser is launched
+    
     Returns:
         dict: Contains success status, URL, and page title
     """
-    async with async_playwright() as p:
-        # Launch browser with settings that might help bypass Cloudflare
-        browser = await p.chromium.launch(
-            headless=True,  # Run in headless mode for server environments
-            args=[
-                '--disable-blink-features=AutomationControlled',
-                '--disable-dev-shm-usage',
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-                '--disable-web-security',
-                '--disable-features=VizDisplayCompositor',
-                '--disable-gpu'
-            ]
-        )
-        
-        # Create context with realistic user agent and settings
-        context = await browser.new_context(
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            viewport={'width': 1920, 'height': 1080},
-            java_script_enabled=True,
-            extra_http_headers={
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-            }
-        )
-        
+    # Launch browser with settings that might help bypass Cloudflare
+    # (ignored when a pool is given; the pool's browsers are already running)
+    launch_args = [
+        '--disable-blink-features=AutomationControlled',
+        '--disable-dev-shm-usage',
+        '--no-sandbox',
+        '--disable-setuid-sandbox',
+        '--disable-web-security',
+        '--disable-features=VizDisplayCompositor',
+        '--disable-gpu'
+    ]
+    
+    # Create context with realistic user agent and settings
+    async with async_browser_context(
+        pool,
+        headless=True,  # Run in headless mode for server environments
+        launch_args=launch_args,
+        user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        viewport={'width': 1920, 'height': 1080},
+        java_script_enabled=True,
+        extra_http_headers={
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+        }
+    ) as context:
         page = await context.new_page()
         
         try:
@@ -116,9 +126,6 @@ async def navigate_to_discogs_submissions():
                 'url': page.url if page else None,
                 'title': await page.title() if page else None
             }
-        
-        finally:
-            await browser.close()
 
 
 async def main():
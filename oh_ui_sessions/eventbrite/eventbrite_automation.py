@@ -8,29 +8,51 @@ and extracts relevant information about the available resources.
 
 import asyncio
 import json
-from playwright.async_api import async_playwright
-from typing import Dict, List, Any
+import os
+import sys
+from typing import Dict, List, Any, Optional
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from automation_core.browser_pool import AsyncBrowserPool, async_browser_context
+from automation_core.har_fixtures import attach_har_async
+from automation_core.http_cache import attach_http_cache_async
+from automation_core.resource_blocking import site_profile
+from automation_core.timing import StepTimer
 
 
 class EventbriteAutomation:
-    def __init__(self):
+    def __init__(self, pool: Optional[AsyncBrowserPool] = None, timer: Optional[StepTimer] = None):
+        # Optional shared browser pool; without one a private browser is launched
+        self.pool = pool
+        # Per-step wall times (browser startup, page load, ...) for benchmarking
+        self.timer = timer or StepTimer()
         self.base_url = "https://www.eventbrite.com/"
         self.event_planning_url = "https://www.eventbrite.com/blog/category/event-planning/"
         self.results = {}
 
     async def run(self) -> Dict[str, Any]:
         """Main automation method that navigates to event planning tips page"""
-        async with async_playwright() as p:
-            # Launch browser
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context()
+        self.timer.start('browser_startup')
+        async with async_browser_context(self.pool, headless=True) as context:
+            await attach_har_async(context, 'eventbrite_event_planning')
+            # Cache first: routes attached later run first, so blocked requests never reach it
+            http_cache = await attach_http_cache_async(context)
+            blocking = await site_profile('eventbrite').attach_async(context)
             page = await context.new_page()
+            self.timer.stop('browser_startup')
 
             try:
                 # Navigate to Eventbrite homepage
                 print("Navigating to Eventbrite homepage...")
+                self.timer.start('page_load')
                 await page.goto(self.base_url, wait_until="networkidle")
                 await page.wait_for_timeout(2000)
+                self.timer.stop('page_load')
+
+                self.timer.start('event_planning_page')
 
                 # Navigate to blog
                 print("Navigating to Eventbrite blog...")
@@ -63,12 +85,15 @@ class EventbriteAutomation:
                         # Final fallback: direct URL navigation
                         await page.goto(self.event_planning_url, wait_until="networkidle")
 
+                self.timer.stop('event_planning_page')
+
                 # Verify we're on the event planning page
                 current_url = page.url
                 print(f"Current URL: {current_url}")
 
                 # Extract page information
-                await self.extract_page_info(page)
+                with self.timer.step('extraction'):
+                    await self.extract_page_info(page)
 
                 # Save results
                 self.results['success'] = True
@@ -80,8 +105,11 @@ class EventbriteAutomation:
                 self.results['success'] = False
                 self.results['error'] = str(e)
 
-            finally:
-                await browser.close()
+            self.results['resource_blocking'] = blocking.report()
+            print(blocking.summary())
+            if http_cache:
+                self.results['http_cache'] = http_cache.report()
+                print(http_cache.summary())
 
         return self.results
 
@@ -3,173 +3,249 @@
 Enhanced FlightAware AeroAPI Plans Comparison Scraper
 
 This script extracts detailed pricing information from FlightAware's AeroAPI page.
+Runs are kept in the result store; the JSON file is only written when a path
+is given.
+
+Usage:
+    python enhanced_aeroapi_scraper.py [detailed_aeroapi_pricing.json]
 """
 
 import asyncio
-import json
+import os
+import sys
 from playwright.async_api import async_playwright
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from automation_core.change_detection import ChangeDetector, describe_changes
+from automation_core.har_fixtures import attach_har_async
+from automation_core.resource_blocking import site_profile
+from automation_core.result_store import shared_result_store
+from automation_core.timing import StepTimer
+
+
+AEROAPI_URL = "https://www.flightaware.com/commercial/aeroapi/"
+
+# Walks the page's text nodes once (skipping script/style subtrees), classifies
+# each piece of text with all matchers in the same pass and returns
+# deduplicated snippets with the element path they were found at.
+EXTRACT_PRICING_SNIPPETS_JS = r"""
+() => {
+    const SKIP_TAGS = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE', 'SVG', 'IFRAME']);
+    const MATCHERS = {
+        price: /\$\d/,
+        per_call_price: /\$\d+\.\d+/,
+        monthly_minimum: /\/month|minimum/i,
+        rate_limit: /result sets?\/|rate limit/i,
+        free_allowance: /\$\d+ free per month/i,
+        discount: /discount.*%|%.*discount/i,
+        endpoint: /^(GET|POST|PUT|PATCH|DELETE) \//,
+        plan: /^(Premium|Standard|Personal)$/,
+    };
+    const MAX_SNIPPET = 300;
+
+    const pathOf = (el) => {
+        const parts = [];
+        for (let depth = 0; el && el !== document.body && depth < 6; depth++, el = el.parentElement) {
+            let part = el.tagName.toLowerCase();
+            if (el.id) {
+                parts.unshift(part + '#' + el.id);
+                break;
+            }
+            if (typeof el.className === 'string' && el.className.trim()) {
+                part += '.' + el.className.trim().split(/\s+/)[0];
+            }
+            parts.unshift(part);
+        }
+        return parts.join(' > ');
+    };
+    const clean = (text) => text.replace(/\s+/g, ' ').trim();
+
+    const snippets = new Map();
+    const add = (text, kinds, el, extra) => {
+        const existing = snippets.get(text);
+        if (existing) {
+            existing.count += 1;
+            return;
+        }
+        snippets.set(text, Object.assign({text, kinds, path: pathOf(el), count: 1}, extra || {}));
+    };
+
+    const INLINE_TAGS = new Set(['A', 'ABBR', 'B', 'CODE', 'EM', 'I', 'SMALL', 'SPAN', 'STRONG', 'SUB', 'SUP']);
+    const blockOf = (el) => {
+        while (INLINE_TAGS.has(el.tagName.toUpperCase()) && el.parentElement && el.parentElement !== document.body) {
+            el = el.parentElement;
+        }
+        return el;
+    };
+
+    const compareSection = document.querySelector('#compare-plans-section');
+    const seenBlocks = new Set();
+    const bigBlocks = new Set();
+    const seenRows = new Set();
+    let lastEndpoint = null;
+
+    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT, {
+        acceptNode: (node) => {
+            if (node.nodeType === Node.ELEMENT_NODE) {
+                return SKIP_TAGS.has(node.tagName.toUpperCase()) ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_SKIP;
+            }
+            return NodeFilter.FILTER_ACCEPT;
+        }
+    });
+
+    for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+        const leafText = clean(node.nodeValue);
+        if (!leafText) {
+            continue;
+        }
+        if (MATCHERS.plan.test(leafText) && compareSection && compareSection.contains(node)) {
+            add(leafText, ['plan'], node.parentElement);
+        }
+        // Read "$1,000<small>/month</small>" as one snippet: use the nearest
+        // non-inline element's text once, unless it is a large container
+        let el = blockOf(node.parentElement);
+        if (seenBlocks.has(el)) {
+            continue;
+        }
+        // A large container is measured once, not again for every leaf inside it
+        const big = bigBlocks.has(el);
+        let text = big ? '' : clean(el.textContent);
+        if (big || text.length > MAX_SNIPPET) {
+            bigBlocks.add(el);
+            el = node.parentElement;
+            text = leafText;
+            if (text.length > MAX_SNIPPET) {
+                continue;
+            }
+        } else {
+            seenBlocks.add(el);
+        }
+
+        const kinds = Object.keys(MATCHERS).filter((kind) => kind !== 'plan' && MATCHERS[kind].test(text));
+        if (kinds.includes('endpoint')) {
+            lastEndpoint = text;
+        }
+        if (kinds.includes('per_call_price')) {
+            // "$0.005" and "/result set" may sit in sibling cells of a pricing block
+            const holder = el.closest('[class*="pricing"]') || el;
+            const priceText = clean(holder.textContent);
+            add(text, kinds, el, {endpoint: lastEndpoint, price_text: priceText.length <= 80 ? priceText : text});
+            continue;
+        }
+        if (!kinds.includes('discount') && /discount|%/i.test(text)) {
+            // Discount label and percentage in separate cells: use the row once
+            const row = el.closest('tr, li, [class*="discount"]');
+            if (row && !seenRows.has(row)) {
+                seenRows.add(row);
+                const rowText = clean(row.textContent);
+                if (rowText.length <= MAX_SNIPPET && MATCHERS.discount.test(rowText)) {
+                    add(rowText, ['discount'], row);
+                }
+            }
+        }
+        if (kinds.length) {
+            add(text, kinds, el);
+        }
+    }
+    return Array.from(snippets.values());
+}
+"""
+
+# (leaf text marker, plan, field) facts read off the comparison table
+PLAN_FACTS = [
+    ('$1,000/month', 'Premium', 'monthly_minimum'),
+    ('$100/month', 'Standard', 'monthly_minimum'),
+    ('No minimum', 'Personal', 'monthly_minimum'),
+    ('100 result sets/second', 'Premium', 'rate_limit'),
+    ('5 result sets/second', 'Standard', 'rate_limit'),
+    ('10 result sets/minute', 'Personal', 'rate_limit'),
+]
+
+
+def build_pricing_result(snippets: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Group the walker's snippets into pricing_data, plan_details and api_pricing"""
+    plans = []
+    features = []
+    pricing_details = {}
+    plan_details = {"Premium": {}, "Standard": {}, "Personal": {}}
+    api_pricing = {}
+
+    for snippet in snippets:
+        text, kinds = snippet["text"], snippet["kinds"]
+
+        if "plan" in kinds and text not in plans:
+            plans.append(text)
+        if "monthly_minimum" in kinds or "rate_limit" in kinds:
+            features.append(text)
+        if "discount" in kinds and "Discount" in text:
+            pricing_details[text] = "volume-discount"
+        elif "price" in kinds:
+            pricing_details[text] = "pricing-element"
+
+        for marker, plan, field in PLAN_FACTS:
+            if marker in text:
+                plan_details[plan].setdefault(field, marker)
+        if "free_allowance" in kinds:
+            plan_details["Personal"].setdefault("free_allowance", text)
+
+        if "per_call_price" in kinds:
+            endpoint = snippet.get("endpoint") or f"pricing_{len(api_pricing)}"
+            api_pricing.setdefault(endpoint, snippet.get("price_text") or text)
 
+    return {
+        "pricing_data": {
+            "plans": plans,
+            "features": features,
+            "pricing_details": pricing_details,
+            "snippets": snippets,
+        },
+        "plan_details": plan_details,
+        "api_pricing": api_pricing,
+    }
 
-async def extract_detailed_pricing_info():
+
+async def extract_detailed_pricing_info(timer: Optional[StepTimer] = None):
     """Extract detailed pricing information from FlightAware AeroAPI page"""
+    timer = timer or StepTimer()
     
     async with async_playwright() as p:
+        timer.start('browser_startup')
         browser = await p.chromium.launch(headless=True)
         context = await browser.new_context(
             user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         )
+        # Record/replay from a HAR when AUTOMATION_HAR_MODE is set
+        await attach_har_async(context, 'flightaware_aeroapi_pricing')
+        # Pricing is read from textContent; images, fonts, styles and trackers are skipped
+        blocking = await site_profile('flightaware').attach_async(context)
         page = await context.new_page()
+        timer.stop('browser_startup')
         
         try:
             print("Navigating to FlightAware AeroAPI page...")
-            await page.goto("https://www.flightaware.com/commercial/aeroapi/", wait_until="networkidle", timeout=30000)
-            await page.wait_for_timeout(3000)
+            with timer.step('page_load'):
+                await page.goto(AEROAPI_URL, wait_until="networkidle", timeout=30000)
+                await page.wait_for_timeout(3000)
             
-            # Extract the complete pricing comparison table
-            pricing_data = await page.evaluate('''
-                () => {
-                    const result = {
-                        plans: [],
-                        features: [],
-                        pricing_details: {}
-                    };
-                    
-                    // Look for the compare plans section
-                    const compareSection = document.querySelector('#compare-plans-section');
-                    if (compareSection) {
-                        // Extract plan names
-                        const planHeaders = compareSection.querySelectorAll('th, .plan-header, [class*="plan"]');
-                        planHeaders.forEach(header => {
-                            const text = header.textContent?.trim();
-                            if (text && (text.includes('Premium') || text.includes('Standard') || text.includes('Personal'))) {
-                                result.plans.push(text);
-                            }
-                        });
-                        
-                        // Extract all pricing information
-                        const pricingElements = compareSection.querySelectorAll('[class*="pricing"], .price, [data-price]');
-                        pricingElements.forEach(el => {
-                            const text = el.textContent?.trim();
-                            if (text && text.includes('$')) {
-                                result.pricing_details[text] = el.className || 'pricing-element';
-                            }
-                        });
-                    }
-                    
-                    // Look for monthly minimums and rate limits
-                    const monthlyMinElements = document.querySelectorAll('*');
-                    monthlyMinElements.forEach(el => {
-                        const text = el.textContent?.trim();
-                        if (text && (text.includes('/month') || text.includes('minimum') || text.includes('rate limit'))) {
-                            if (text.length < 200) { // Avoid very long text blocks
-                                result.features.push(text);
-                            }
-                        }
-                    });
-                    
-                    // Extract volume discounting information
-                    const discountElements = document.querySelectorAll('[class*="discount"], *');
-                    discountElements.forEach(el => {
-                        const text = el.textContent?.trim();
-                        if (text && text.includes('Discount') && text.includes('%')) {
-                            result.pricing_details[text] = 'volume-discount';
-                        }
-                    });
-                    
-                    return result;
-                }
-            ''')
-            
-            # Extract specific plan details
-            plan_details = await page.evaluate('''
-                () => {
-                    const plans = {
-                        Premium: {},
-                        Standard: {},
-                        Personal: {}
-                    };
-                    
-                    // Look for specific plan information
-                    const allElements = document.querySelectorAll('*');
-                    allElements.forEach(el => {
-                        const text = el.textContent?.trim();
-                        if (text) {
-                            // Monthly minimums
-                            if (text.includes('$1,000/month')) {
-                                plans.Premium.monthly_minimum = '$1,000/month';
-                            } else if (text.includes('$100/month')) {
-                                plans.Standard.monthly_minimum = '$100/month';
-                            } else if (text.includes('No minimum')) {
-                                plans.Personal.monthly_minimum = 'No minimum';
-                            }
-                            
-                            // Rate limits
-                            if (text.includes('100 result sets/second')) {
-                                plans.Premium.rate_limit = '100 result sets/second';
-                            } else if (text.includes('5 result sets/second')) {
-                                plans.Standard.rate_limit = '5 result sets/second';
-                            } else if (text.includes('10 result sets/minute')) {
-                                plans.Personal.rate_limit = '10 result sets/minute';
-                            }
-                            
-                            // Free allowances
-                            if (text.includes('$5 free per month') || text.includes('$10 free per month')) {
-                                plans.Personal.free_allowance = text;
-                            }
-                        }
-                    });
-                    
-                    return plans;
-                }
-            ''')
-            
-            # Extract API pricing per endpoint
-            api_pricing = await page.evaluate('''
-                () => {
-                    const apiPricing = {};
-                    const pricingElements = document.querySelectorAll('[class*="pricing"]');
-                    
-                    pricingElements.forEach(el => {
-                        const text = el.textContent?.trim();
-                        if (text && text.match(/\\$\\d+\\.\\d+/)) {
-                            // Try to find the associated API endpoint
-                            let parent = el.parentElement;
-                            let apiName = '';
-                            
-                            // Look for API endpoint names in nearby elements
-                            while (parent && !apiName) {
-                                const siblings = parent.querySelectorAll('*');
-                                siblings.forEach(sibling => {
-                                    const siblingText = sibling.textContent?.trim();
-                                    if (siblingText && (siblingText.includes('GET /') || siblingText.includes('POST /'))) {
-                                        apiName = siblingText;
-                                    }
-                                });
-                                parent = parent.parentElement;
-                            }
-                            
-                            if (apiName) {
-                                apiPricing[apiName] = text;
-                            } else {
-                                // Store pricing without specific API name
-                                apiPricing[`pricing_${Object.keys(apiPricing).length}`] = text;
-                            }
-                        }
-                    });
-                    
-                    return apiPricing;
-                }
-            ''')
+            # One pass over the leaf text nodes instead of textContent on every element
+            with timer.step('extraction'):
+                walk = await page.evaluate(EXTRACT_PRICING_SNIPPETS_JS)
+                extracted = build_pricing_result(walk)
             
             result = {
-                "url": "https://www.flightaware.com/commercial/aeroapi/",
+                "url": AEROAPI_URL,
                 "timestamp": asyncio.get_event_loop().time(),
-                "pricing_data": pricing_data,
-                "plan_details": plan_details,
-                "api_pricing": api_pricing,
+                "pricing_data": extracted["pricing_data"],
+                "plan_details": extracted["plan_details"],
+                "api_pricing": extracted["api_pricing"],
+                "resource_blocking": blocking.report(),
                 "success": True
             }
+            print(blocking.summary())
             
             return result
             
@@ -177,24 +253,39 @@ async def extract_detailed_pricing_info():
             print(f"Error: {str(e)}")
             return {"error": str(e), "success": False}
         finally:
+            # The context writes a recorded HAR as it closes
+            await context.close()
             await browser.close()
 
 
-async def main():
+async def main(output_path: Optional[str] = None,
+               timer: Optional[StepTimer] = None):
     """Main function"""
     print("Starting enhanced FlightAware AeroAPI pricing extraction...")
-    result = await extract_detailed_pricing_info()
-    
-    # Save results
-    with open('/workspace/detailed_aeroapi_pricing.json', 'w') as f:
-        json.dump(result, f, indent=2, default=str)
-    
-    print("Results saved to: /workspace/detailed_aeroapi_pricing.json")
+    timer = timer or StepTimer()
+    store = shared_result_store()
+    # The plans page is server-rendered: a conditional GET tells whether it changed
+    detector = ChangeDetector('flightaware_aeroapi_pricing', store=store)
+    if await asyncio.to_thread(detector.check_http, [AEROAPI_URL]):
+        print("AeroAPI page unchanged since the last run, reusing its results")
+        result = detector.reuse()
+        run_id = detector.previous_run_id
+    else:
+        result = await extract_detailed_pricing_info(timer)
+        # Append to the result store; the JSON file is rendered from the stored run
+        records = [{"endpoint": endpoint, "price": price} for endpoint, price in result.get("api_pricing", {}).items()]
+        run_id = store.append('flightaware_aeroapi_pricing', result, records=records)
+        if result.get("success"):
+            print(describe_changes(detector.commit(run_id, result)))
+    if output_path:
+        with timer.step('output_write'):
+            store.render_json('flightaware_aeroapi_pricing', run_id, path=output_path)
+        print(f"Results saved to: {output_path}")
     return result
 
 
 if __name__ == "__main__":
-    result = asyncio.run(main())
+    result = asyncio.run(main(*sys.argv[1:2]))
     
     if result.get("success"):
         print("\n" + "="*60)
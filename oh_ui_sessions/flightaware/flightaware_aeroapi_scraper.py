@@ -8,9 +8,17 @@ information about available AeroAPI plans and pricing.
 
 import asyncio
 import json
+import os
+import sys
 from playwright.async_api import async_playwright
 from typing import Dict, List, Any
 
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from automation_core.url_probe import probe_urls_async
+
 
 class FlightAwareAeroAPIScraper:
     def __init__(self):
@@ -179,42 +187,43 @@ class FlightAwareAeroAPIScraper:
             f"{self.base_url}/commercial/"
         ]
         
-        results = {}
-        
         async with async_playwright() as p:
             browser = await p.chromium.launch(headless=True)
             context = await browser.new_context()
-            page = await context.new_page()
             
-            for url in alternative_urls:
+            async def render(url):
+                print(f"Trying alternative URL: {url}")
+                page = await context.new_page()
                 try:
-                    print(f"Trying alternative URL: {url}")
                     response = await page.goto(url, wait_until="networkidle", timeout=15000)
+                    if not response or response.status != 200:
+                        return {"status": response.status if response else "No response", "accessible": False}
                     
-                    if response and response.status == 200:
-                        title = await page.title()
-                        content_snippet = await page.text_content('body')
-                        
-                        results[url] = {
-                            "status": response.status,
-                            "title": title,
-                            "content_preview": content_snippet[:200] if content_snippet else "",
-                            "accessible": True
-                        }
-                    else:
-                        results[url] = {
-                            "status": response.status if response else "No response",
-                            "accessible": False
-                        }
-                        
-                except Exception as e:
-                    results[url] = {
-                        "error": str(e),
-                        "accessible": False
+                    title = await page.title()
+                    content_snippet = await page.text_content('body')
+                    return {
+                        "status": response.status,
+                        "title": title,
+                        "content_preview": content_snippet[:200] if content_snippet else ""
                     }
+                finally:
+                    await page.close()
             
+            # Gone URLs (404/410) are dropped by an HTTP status probe; the rest load in parallel pages
+            ranked = await probe_urls_async(alternative_urls, render=render, timeout=15)
             await browser.close()
         
+        results = {}
+        for probe in ranked:
+            # A failed HTTP probe still got a render, so only the render can fail the URL
+            error = probe.get("render_error")
+            if error:
+                results[probe["url"]] = {"error": error, "accessible": False}
+            elif probe["accessible"]:
+                results[probe["url"]] = {key: probe[key] for key in ("status", "title", "content_preview", "accessible")}
+            else:
+                results[probe["url"]] = {"status": probe.get("status", probe["http_status"]), "accessible": False}
+        
         return results
 
 
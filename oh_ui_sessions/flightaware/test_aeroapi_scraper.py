@@ -8,7 +8,7 @@ This script tests the automated scraping functionality to ensure it works correc
 import pytest
 import asyncio
 import json
-from enhanced_aeroapi_scraper import extract_detailed_pricing_info
+from enhanced_aeroapi_scraper import build_pricing_result, extract_detailed_pricing_info
 
 
 class TestAeroAPIScraper:
@@ -110,6 +110,30 @@ class TestAeroAPIScraper:
         
         # Check that success is boolean
         assert isinstance(result["success"], bool)
+    
+    def test_build_pricing_result(self):
+        """Test grouping of walker snippets without hitting the site"""
+        snippets = [
+            {"text": "Premium", "kinds": ["plan"], "path": "th.plan-header", "count": 1},
+            {"text": "$1,000/month", "kinds": ["price", "monthly_minimum"], "path": "td", "count": 1},
+            {"text": "100 result sets/second", "kinds": ["rate_limit"], "path": "td", "count": 1},
+            {"text": "10 result sets/minute", "kinds": ["rate_limit"], "path": "td", "count": 1},
+            {"text": "$5 free per month", "kinds": ["price", "free_allowance"], "path": "td", "count": 1},
+            {"text": "Volume Discount 10% over $1,000", "kinds": ["price", "discount"], "path": "td", "count": 1},
+            {"text": "$0.005", "kinds": ["price", "per_call_price"], "path": "td.pricing", "count": 2,
+             "endpoint": "GET /flights/{ident}", "price_text": "$0.005 /result set"},
+            {"text": "$0.002", "kinds": ["price", "per_call_price"], "path": "td.pricing", "count": 1,
+             "endpoint": None, "price_text": "$0.002"},
+        ]
+        result = build_pricing_result(snippets)
+        
+        assert result["pricing_data"]["plans"] == ["Premium"]
+        assert result["plan_details"]["Premium"] == {"monthly_minimum": "$1,000/month",
+                                                     "rate_limit": "100 result sets/second"}
+        assert result["plan_details"]["Personal"]["rate_limit"] == "10 result sets/minute"
+        assert result["plan_details"]["Personal"]["free_allowance"] == "$5 free per month"
+        assert result["pricing_data"]["pricing_details"]["Volume Discount 10% over $1,000"] == "volume-discount"
+        assert result["api_pricing"] == {"GET /flights/{ident}": "$0.005 /result set", "pricing_1": "$0.002"}
 
 
 def run_manual_tests():
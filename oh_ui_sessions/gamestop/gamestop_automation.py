@@ -8,43 +8,106 @@ This script automates the process of:
 3. Setting it as the home store
 
 Usage:
-    python gamestop_automation.py [zip_code]
+    python gamestop_automation.py [zip_code ...] [--zip-file FILE] [--concurrency N]
     
 Example:
     python gamestop_automation.py 90028
+    python gamestop_automation.py 90028 90036 91502 --concurrency 3
+
+Several zip codes run in batch mode: one browser context with N pages,
+each zip's stores streamed to the result store as it completes.
 """
 
 from playwright.sync_api import sync_playwright
+import argparse
 import time
-import json
+import os
 import sys
 import re
+import uuid
 from typing import List, Dict, Optional
 
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from automation_core.browser_pool import SyncBrowserPool
+from automation_core.har_fixtures import attach_har_sync
+from automation_core.http_cache import attach_http_cache_sync
+from automation_core.result_store import ResultStore, shared_result_store
+from automation_core.selector_cascade import SelectorCascade
+from automation_core.waits import AdaptiveWaiter
+
+# Backend request that fills the store list (Salesforce Commerce Cloud store search)
+STORE_SEARCH_RESPONSE = re.compile(r'Stores-FindStores|/stores/search|storelocator', re.IGNORECASE)
+
+# Candidate keys for each field in the store-search JSON, most likely first
+STORE_JSON_FIELDS = {
+    'id': ('ID', 'id', 'storeId', 'storeID', 'store_id'),
+    'name': ('name', 'storeName', 'displayName'),
+    'phone': ('phone', 'phoneNumber', 'storePhone'),
+    'address1': ('address1', 'address', 'streetAddress', 'line1'),
+    'address2': ('address2', 'line2'),
+    'city': ('city',),
+    'state': ('stateCode', 'state', 'region'),
+    'postal_code': ('postalCode', 'zip', 'zipCode'),
+    'latitude': ('latitude', 'lat'),
+    'longitude': ('longitude', 'lng', 'lon'),
+    'distance': ('distance', 'distanceText'),
+    'hours': ('storeHours', 'hours', 'workTimes', 'storeOperatingHours'),
+    'status': ('storeStatus', 'openStatus', 'status'),
+}
+
 class GameStopStoreLocator:
-    def __init__(self, headless: bool = True, timeout: int = 30000):
+    def __init__(self, headless: bool = True, timeout: int = 30000, pool: Optional[SyncBrowserPool] = None,
+                 use_network_api: bool = True, selectors: Optional[SelectorCascade] = None,
+                 result_store: Optional[ResultStore] = None):
         self.headless = headless
         self.timeout = timeout
+        # Optional shared browser pool; without one a private browser is launched
+        self.pool = pool
+        # Build stores from the intercepted store-search JSON when it is seen
+        self.use_network_api = use_network_api
+        self._search_response_index = 0
+        # Fallback selector lists are raced in one query, most precise match first
+        self.selectors = selectors or SelectorCascade('gamestop')
+        # Runs are appended to the shared result store; JSON files are rendered from it
+        self.result_store = result_store
+        # Parsed stores by id, shared by batch pages so a store seen for several zips is parsed once
+        self._parsed_stores: Dict = {}
         self.base_url = "https://www.gamestop.com"
         self.store_locator_url = f"{self.base_url}/stores/?showMap=true&horizontalView=true&isForm=true"
         
     def setup_browser(self):
         """Initialize browser with anti-detection settings"""
-        self.playwright = sync_playwright().start()
-        self.browser = self.playwright.chromium.launch(
-            headless=self.headless,
-            args=[
-                '--no-sandbox',
-                '--disable-blink-features=AutomationControlled',
-                '--disable-web-security'
-            ]
-        )
+        context_options = {
+            'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'viewport': {'width': 1920, 'height': 1080}
+        }
         
-        self.context = self.browser.new_context(
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            viewport={'width': 1920, 'height': 1080}
-        )
+        if self.pool is not None:
+            # Reuse a warm browser from the pool and only open a fresh context
+            self.context = self.pool.acquire_context(**context_options)
+        else:
+            self.playwright = sync_playwright().start()
+            self.browser = self.playwright.chromium.launch(
+                headless=self.headless,
+                args=[
+                    '--no-sandbox',
+                    '--disable-blink-features=AutomationControlled',
+                    '--disable-web-security'
+                ]
+            )
+            self.context = self.browser.new_context(**context_options)
         
+        # Record/replay the site from a HAR when AUTOMATION_HAR_MODE is set
+        attach_har_sync(self.context, 'gamestop_store_locator')
+        # Serve JS/CSS/fonts from the shared disk cache when AUTOMATION_HTTP_CACHE is set
+        self.http_cache = attach_http_cache_sync(self.context)
+        self._open_page()
+    
+    def _open_page(self):
+        """Open a page in the current context with the stealth script and its own waiter"""
         self.page = self.context.new_page()
         
         # Add stealth script
@@ -53,13 +116,25 @@ class GameStopStoreLocator:
                 get: () => undefined,
             });
         """)
+        
+        # Waits resolve on DOM/XHR events; the old fixed sleeps are only upper bounds
+        self.waiter = AdaptiveWaiter(self.page)
+    
+    def _new_lane(self) -> 'GameStopStoreLocator':
+        """Another locator on a new page of this browser context, sharing selectors and parsed stores"""
+        lane = GameStopStoreLocator(headless=self.headless, timeout=self.timeout, use_network_api=self.use_network_api,
+                                    selectors=self.selectors, result_store=self.result_store)
+        lane._parsed_stores = self._parsed_stores
+        lane.context = self.context
+        lane._open_page()
+        return lane
     
     def navigate_to_store_locator(self) -> bool:
         """Navigate to the GameStop store locator page"""
         try:
             print(f"Navigating to store locator: {self.store_locator_url}")
             self.page.goto(self.store_locator_url, timeout=self.timeout, wait_until='domcontentloaded')
-            time.sleep(3)
+            self.waiter.until('locator_form', budget_ms=3000, selector='input[name="postalCode"]')
             
             # Check if page loaded successfully
             title = self.page.title()
@@ -77,6 +152,10 @@ class GameStopStoreLocator:
     
     def search_stores(self, zip_code: str) -> bool:
         """Search for stores by zip code"""
+        return self.submit_search(zip_code) and self.wait_for_search_results()
+    
+    def submit_search(self, zip_code: str) -> bool:
+        """Enter the zip code and click search without waiting for the results"""
         try:
             print(f"Searching for stores near zip code: {zip_code}")
             
@@ -88,9 +167,9 @@ class GameStopStoreLocator:
             
             # Clear and enter zip code
             postal_input.fill('')
-            time.sleep(1)
             postal_input.fill(zip_code)
-            time.sleep(2)
+            self.waiter.until('zip_entered', budget_ms=3000,
+                              condition=lambda: postal_input.input_value() == zip_code)
             
             # Find and click search button
             search_button = self.page.query_selector('button:has-text("Search")')
@@ -99,19 +178,38 @@ class GameStopStoreLocator:
                 return False
             
             print("Clicking search button...")
+            # A list from a previous search on this page must not satisfy the wait for the new one
+            self._stale_results = self.page.query_selector('[data-store-id]') is not None
+            self.waiter.arm()
+            self._search_response_index = len(self.waiter.responses)
             search_button.click()
+            return True
             
-            # Wait for results to load
-            time.sleep(8)
-            
-            # Try to wait for store results
-            try:
-                self.page.wait_for_selector('[data-store-id]', timeout=15000)
-                print("Store results loaded successfully")
-                return True
-            except:
+        except Exception as e:
+            print(f"Error searching for stores: {e}")
+            return False
+    
+    def wait_for_search_results(self) -> bool:
+        """Wait for the store list of the search submitted last"""
+        try:
+            # Wait for the store list or its backing XHR (previously 8 s sleep + 15 s selector wait)
+            resolved_by = self.waiter.until('store_results', budget_ms=23000,
+                                            selector=None if getattr(self, '_stale_results', False) else '[data-store-id]',
+                                            response=STORE_SEARCH_RESPONSE)
+            if resolved_by == 'response':
+                # Data is in; give the list a moment to render
+                resolved_by = self.waiter.until('store_results_render', budget_ms=5000,
+                                                selector='[data-store-id]')
+            
+            if resolved_by == 'timeout':
+                if getattr(self, '_stale_results', False):
+                    # The list on screen still belongs to the previous zip
+                    print("Error: Store results did not refresh for the new search")
+                    return False
                 print("Warning: Store results may not have loaded completely")
-                return True  # Continue anyway
+            else:
+                print("Store results loaded successfully")
+            return True  # Continue anyway, as before
                 
         except Exception as e:
             print(f"Error searching for stores: {e}")
@@ -119,6 +217,12 @@ class GameStopStoreLocator:
     
     def get_store_results(self) -> List[Dict]:
         """Extract store information from search results"""
+        if self.use_network_api:
+            stores = self.get_store_results_from_network()
+            if stores:
+                return stores
+            print("Store search JSON not captured, falling back to page text")
+        
         try:
             print("Extracting store information...")
             
@@ -150,6 +254,122 @@ class GameStopStoreLocator:
             print(f"Error getting store results: {e}")
             return []
     
+    def get_store_results_from_network(self) -> List[Dict]:
+        """Build store list from the store-search response captured during the last search"""
+        if not hasattr(self, 'waiter'):
+            return []
+        
+        responses = self.waiter.responses[self._search_response_index:]
+        for response in reversed(responses):
+            if not STORE_SEARCH_RESPONSE.search(response.url):
+                continue
+            try:
+                if 'json' not in (response.headers.get('content-type') or ''):
+                    continue
+                data = response.json()
+            except Exception as e:
+                print(f"Could not read store search response {response.url}: {e}")
+                continue
+            
+            stores = self.parse_store_search_json(data)
+            if stores:
+                print(f"Built {len(stores)} stores from network response: {response.url}")
+                return stores
+        return []
+    
+    def parse_store_search_json(self, data) -> List[Dict]:
+        """Parse the store-search JSON payload into the same shape as parse_store_info"""
+        store_items = self._find_store_list(data)
+        stores = []
+        
+        for i, item in enumerate(store_items):
+            field = lambda key: next((item[k] for k in STORE_JSON_FIELDS[key] if item.get(k) not in (None, '')), None)
+            
+            name = field('name')
+            if not name:
+                continue
+            
+            store_id = str(field('id')) if field('id') is not None else None
+            key = store_id or (str(name), str(field('address1')), str(field('postal_code')))
+            if key in self._parsed_stores:
+                # Seen for an earlier zip: only the position and distance differ
+                stores.append(dict(self._parsed_stores[key], index=i, distance=field('distance')))
+                continue
+            
+            phone = str(field('phone') or '')
+            digits = re.sub(r'\D', '', phone)
+            if len(digits) == 10:
+                phone = f"({digits[:3]}) {digits[3:6]}-{digits[6:]}"
+            
+            state_zip = ' '.join(str(v) for v in (field('state'), field('postal_code')) if v)
+            address_parts = [field('address1'), field('address2'), field('city'), state_zip]
+            address = ", ".join(str(part).strip() for part in address_parts if part)
+            
+            latitude, longitude = field('latitude'), field('longitude')
+            store = {
+                'index': i,
+                'store_id': store_id,
+                'name': str(name).strip(),
+                'phone': phone,
+                'address': address or "Address not found",
+                'status': str(field('status') or "Unknown"),
+                'hours': self._normalize_store_hours(field('hours')),
+                'latitude': float(latitude) if latitude is not None else None,
+                'longitude': float(longitude) if longitude is not None else None,
+                'distance': field('distance'),
+                'source': 'network'
+            }
+            self._parsed_stores[key] = store
+            stores.append(dict(store))
+        
+        return stores
+    
+    def _find_store_list(self, data) -> List[Dict]:
+        """Locate the list of store objects anywhere in the response"""
+        if isinstance(data, list):
+            if data and all(isinstance(item, dict) for item in data) and \
+                    any(k in data[0] for k in STORE_JSON_FIELDS['name']):
+                return data
+            for item in data:
+                found = self._find_store_list(item)
+                if found:
+                    return found
+        elif isinstance(data, dict):
+            if isinstance(data.get('stores'), list):
+                return data['stores']
+            for value in data.values():
+                found = self._find_store_list(value)
+                if found:
+                    return found
+        return []
+    
+    def _normalize_store_hours(self, hours) -> Dict[str, str]:
+        """Convert the JSON hours field (dict, list of days or text/HTML) to {day: hours}"""
+        if not hours:
+            return {}
+        if isinstance(hours, dict):
+            return {str(day): str(value) for day, value in hours.items()}
+        if isinstance(hours, list):
+            normalized = {}
+            for entry in hours:
+                if not isinstance(entry, dict):
+                    continue
+                day = entry.get('day') or entry.get('dayOfWeek') or entry.get('name')
+                value = entry.get('hours') or ' - '.join(
+                    str(entry[k]) for k in ('open', 'close') if entry.get(k))
+                if day and value:
+                    normalized[str(day)] = str(value)
+            return normalized
+        # Text or HTML: one "Day:" label per line, as on the page
+        text = re.sub(r'<br\s*/?>|</(?:div|p|li|tr)>', '\n', str(hours), flags=re.IGNORECASE)
+        text = re.sub(r'<[^>]+>', ' ', text)
+        normalized = {}
+        for line in text.split('\n'):
+            match = re.match(r'\s*((?:Sun|Mon|Tue|Wed|Thu|Fri|Sat)[a-z]*):\s*(\S.*)$', line)
+            if match:
+                normalized[match.group(1)] = ' '.join(match.group(2).split())
+        return normalized or self.extract_hours(text)
+    
     def parse_store_info(self, store_text: str, index: int) -> Optional[Dict]:
         """Parse individual store information from text"""
         try:
@@ -259,23 +479,13 @@ class GameStopStoreLocator:
             ]
             
             home_store_button = None
-            for selector in home_store_selectors:
-                try:
-                    # Look for button in the entire page first
-                    buttons = self.page.query_selector_all(selector)
-                    if buttons:
-                        # Use the first available button
-                        home_store_button = buttons[0]
-                        print(f"Found home store button with selector: {selector}")
-                        break
-                except:
-                    continue
+            selector = self.selectors.resolve_sync(self.page, 'home_store_button', home_store_selectors)
+            if selector:
+                # Use the first available button on the page
+                home_store_button = self.page.query_selector(selector)
+                print(f"Found home store button with selector: {selector}")
             
             if home_store_button:
-                print("Clicking 'Set as Home Store' button...")
-                home_store_button.click()
-                time.sleep(3)
-                
                 # Check for confirmation or success message
                 success_indicators = [
                     'text="Home store set"',
@@ -284,6 +494,11 @@ class GameStopStoreLocator:
                     '.confirmation'
                 ]
                 
+                print("Clicking 'Set as Home Store' button...")
+                home_store_button.click()
+                self.waiter.until('home_store_confirmation', budget_ms=3000,
+                                  condition=lambda: any(self.page.query_selector(i) for i in success_indicators))
+                
                 for indicator in success_indicators:
                     if self.page.query_selector(indicator):
                         print("Home store set successfully!")
@@ -299,8 +514,8 @@ class GameStopStoreLocator:
             print(f"Error setting home store: {e}")
             return False
     
-    def save_results(self, zip_code: str, stores: List[Dict], filename: str = "store_results.json"):
-        """Save search results to JSON file"""
+    def save_results(self, zip_code: str, stores: List[Dict], filename: Optional[str] = "store_results.json"):
+        """Append search results to the result store and render them to a JSON file"""
         try:
             results = {
                 'zip_code': zip_code,
@@ -310,10 +525,11 @@ class GameStopStoreLocator:
                 'url': self.page.url if hasattr(self, 'page') else self.store_locator_url
             }
             
-            with open(filename, 'w') as f:
-                json.dump(results, f, indent=2)
-            
-            print(f"Results saved to {filename}")
+            store = self.result_store or shared_result_store()
+            run_id = store.append('gamestop_stores', results, records=stores, success=bool(stores))
+            if filename:
+                store.render_json('gamestop_stores', run_id, path=filename)
+                print(f"Results saved to {filename}")
             return True
             
         except Exception as e:
@@ -323,6 +539,14 @@ class GameStopStoreLocator:
     def cleanup(self):
         """Clean up browser resources"""
         try:
+            if self.pool is not None:
+                if hasattr(self, 'context'):
+                    self.pool.release_context(self.context)
+                    del self.context
+                return
+            if hasattr(self, 'context'):
+                # Closing the context first flushes a HAR being recorded
+                self.context.close()
             if hasattr(self, 'browser'):
                 self.browser.close()
             if hasattr(self, 'playwright'):
@@ -365,6 +589,7 @@ class GameStopStoreLocator:
             # Set home store (first store by default)
             home_store_set = self.set_home_store(0)
             results['home_store_set'] = home_store_set
+            results['wait_timings'] = self.waiter.report()
             
             # Save results
             self.save_results(zip_code, stores)
@@ -379,10 +604,107 @@ class GameStopStoreLocator:
             
         finally:
             self.cleanup()
+    
+    def run_batch(self, zip_codes: List[str], concurrency: int = 4) -> Dict:
+        """
+        Search many zip codes over one browser context.
+        
+        Up to ``concurrency`` pages each submit a search before any of them is
+        waited on, so their requests overlap. Each zip's stores are appended to
+        the result store as soon as they are read; the home store is not set.
+        """
+        zip_codes = list(dict.fromkeys(z.strip() for z in zip_codes if z and z.strip()))
+        summary = {
+            'success': False,
+            'batch_id': uuid.uuid4().hex[:8],
+            'zip_codes': len(zip_codes),
+            'completed': 0,
+            'failed': [],
+            'store_hits': 0,
+            'distinct_stores': 0,
+            'error': None
+        }
+        lanes = []
+        started = time.time()
+        
+        try:
+            self.setup_browser()
+            lanes = [self] + [self._new_lane() for _ in range(max(1, min(concurrency, len(zip_codes))) - 1)]
+            for lane in lanes:
+                if not lane.navigate_to_store_locator():
+                    raise RuntimeError("Failed to navigate to store locator")
+            
+            for start in range(0, len(zip_codes), len(lanes)):
+                wave = list(zip(lanes, zip_codes[start:start + len(lanes)]))
+                submitted = []
+                for lane, zip_code in wave:
+                    ok = lane.submit_search(zip_code)
+                    if not ok:
+                        # The form may be gone after a search: reload the locator once
+                        ok = lane.navigate_to_store_locator() and lane.submit_search(zip_code)
+                    submitted.append((lane, zip_code, ok))
+                
+                for lane, zip_code, ok in submitted:
+                    stores = lane.get_store_results() if ok and lane.wait_for_search_results() else []
+                    if not stores:
+                        summary['failed'].append(zip_code)
+                        print(f"No stores found for {zip_code}")
+                    lane.save_results(zip_code, stores, filename=None)
+                    summary['completed'] += 1
+                    summary['store_hits'] += len(stores)
+                    print(f"[{summary['completed']}/{len(zip_codes)}] {zip_code}: {len(stores)} stores")
+            
+            summary['success'] = summary['completed'] > len(summary['failed'])
+            return summary
+        
+        except Exception as e:
+            summary['error'] = str(e)
+            print(f"Batch error: {e}")
+            return summary
+        
+        finally:
+            summary['distinct_stores'] = len(self._parsed_stores)
+            summary['elapsed_seconds'] = round(time.time() - started, 1)
+            for lane in lanes[1:]:
+                try:
+                    lane.page.close()
+                except Exception:
+                    pass
+            self.cleanup()
 
-def main():
+def read_zip_codes(zip_codes: List[str], zip_file: Optional[str] = None) -> List[str]:
+    """Zip codes from the command line plus a file (whitespace or comma separated, # comments)"""
+    codes = list(zip_codes)
+    if zip_file:
+        with open(zip_file) as f:
+            for line in f:
+                codes.extend(re.split(r'[\s,]+', line.split('#', 1)[0].strip()))
+    return [code for code in codes if code]
+
+def main(argv: Optional[List[str]] = None):
     """Main function to run the automation"""
-    zip_code = sys.argv[1] if len(sys.argv) > 1 else "90028"
+    parser = argparse.ArgumentParser(description='GameStop store locator automation')
+    parser.add_argument('zip_codes', nargs='*', help='Zip codes to search (default: 90028)')
+    parser.add_argument('--zip-file', help='File with more zip codes')
+    parser.add_argument('--concurrency', type=int, default=4, help='Pages searching at once in batch mode')
+    args = parser.parse_args(argv)
+    zip_codes = read_zip_codes(args.zip_codes, args.zip_file)
+    
+    if len(zip_codes) > 1:
+        print(f"Starting GameStop batch search for {len(zip_codes)} zip codes "
+              f"on {min(args.concurrency, len(zip_codes))} pages")
+        summary = GameStopStoreLocator(headless=True).run_batch(zip_codes, concurrency=args.concurrency)
+        print("\n" + "=" * 60)
+        print(f"Completed: {summary['completed']}/{summary['zip_codes']} in {summary.get('elapsed_seconds')} s")
+        print(f"Distinct stores: {summary['distinct_stores']} ({summary['store_hits']} listings)")
+        if summary['failed']:
+            print(f"No stores for: {', '.join(summary['failed'])}")
+        if summary['error']:
+            print(f"Error: {summary['error']}")
+        print("Per-zip results: python -m automation_core.result_store history gamestop_stores")
+        return summary
+    
+    zip_code = zip_codes[0] if zip_codes else "90028"
     
     print(f"Starting GameStop store locator automation for zip code: {zip_code}")
     print("=" * 60)
@@ -397,6 +719,11 @@ def main():
     print(f"Stores Found: {len(results['stores'])}")
     print(f"Home Store Set: {results['home_store_set']}")
     
+    if results.get('wait_timings'):
+        timings = results['wait_timings']
+        print(f"Time spent waiting: {timings['total_waited_ms']} ms "
+              f"(fixed sleeps would have taken {timings['total_budget_ms']} ms)")
+    
     if results['error']:
         print(f"Error: {results['error']}")
     
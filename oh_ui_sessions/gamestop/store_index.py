@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+GameStop Nationwide Store Index
+
+Instead of driving the store locator once per zip code, this crawls the
+store-search API once from a grid of seed zip codes and keeps every store
+(id, name, address, phone, hours, lat/lon) in the shared result store. Zip
+lookups are then answered locally. The zip code is mapped to its centroid,
+and a grid of 1-degree buckets narrows the search to nearby stores before
+exact haversine distances are computed for those candidates in one batch.
+
+A seed's search only returns the stores nearest to it, so one seed per cell
+under-indexes dense metros. When a seed's results hit the locator's result
+cap and its farthest store is closer to the seed than the cell's farthest
+corner, part of the cell went unsearched: the cell is split into quarters and
+each quarter is searched from its own seed zip, down to
+``--min-cell-degrees``. Cells still uncovered at that size are listed as
+coverage gaps in the crawl result.
+
+Zip centroids come from the Census ZCTA gazetteer. Download it once with
+the ``zips`` command; any zip the table lacks falls back to the average
+position of the indexed stores that carry it. The index is re-crawled only
+when it is older than ``--max-age-days``.
+
+Usage:
+    python store_index.py zips --download
+    python store_index.py crawl [--cell-degrees 1.5] [--min-cell-degrees 0.25] [--result-cap N] [--seeds ...]
+    python store_index.py nearest 90028 10001 60601 [--k 3] [--max-age-days 7]
+"""
+
+import argparse
+import csv
+import io
+import math
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from automation_core.result_store import ResultStore, shared_result_store
+
+try:
+    import numpy as np
+except ImportError:  # Optional: distances are computed in pure Python without it
+    np = None
+
+INDEX_TASK = 'gamestop_store_index'
+ZIP_CENTROIDS_ENV = 'AUTOMATION_ZIP_CENTROIDS'
+DEFAULT_ZIP_CENTROIDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'zip_centroids.csv')
+CENSUS_ZCTA_URL = ('https://www2.census.gov/geo/docs/maps-data/data/gazetteer/'
+                   '2023_Gazetteer/2023_Gaz_zcta_national.zip')
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE = 69.0
+# Store fields kept in the index; per-search fields (index, distance, source) are dropped
+INDEX_FIELDS = ('store_id', 'name', 'phone', 'address', 'status', 'hours', 'latitude', 'longitude')
+ZIP_PATTERN = re.compile(r'\b(\d{5})(?:-\d{4})?\s*$')
+# Without an explicit result cap, the largest result count returned by this many seeds is taken as the cap
+CAP_INFERENCE_SEEDS = 2
+MIN_INFERRED_CAP = 10
+
+# A grid cell: (south latitude, west longitude, size in degrees)
+Cell = Tuple[float, float, float]
+
+
+def haversine_miles(lat: float, lon: float, lats: Sequence[float], lons: Sequence[float]) -> List[float]:
+    """Great-circle distances in miles from one point to many (degrees in, one pass over arrays)"""
+    if not lats:
+        return []
+    if np is not None:
+        lat1, lon1 = np.radians(lat), np.radians(lon)
+        lat2, lon2 = np.radians(np.asarray(lats, dtype=float)), np.radians(np.asarray(lons, dtype=float))
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        return (2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.minimum(a, 1.0)))).tolist()
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    cos_lat1 = math.cos(lat1)
+    sin, cos, radians = math.sin, math.cos, math.radians
+    return [2 * EARTH_RADIUS_MILES * math.asin(min(1.0, math.sqrt(
+        sin((radians(lat2) - lat1) / 2) ** 2 + cos_lat1 * cos(radians(lat2)) * sin((radians(lon2) - lon1) / 2) ** 2)))
+        for lat2, lon2 in zip(lats, lons)]
+
+
+def farthest_corner_miles(point: Tuple[float, float], cell: Cell) -> float:
+    """Distance from ``point`` to the farthest corner of a cell"""
+    lat, lon, size = cell
+    return max(haversine_miles(point[0], point[1], [lat, lat, lat + size, lat + size],
+                               [lon, lon + size, lon, lon + size]))
+
+
+def store_zip(store: Dict) -> Optional[str]:
+    """Five-digit zip code at the end of a store's address"""
+    match = ZIP_PATTERN.search(store.get('address') or '')
+    return match.group(1) if match else None
+
+
+class ZipCentroids:
+    """Zip code -> (lat, lon) lookup table"""
+
+    def __init__(self, table: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.table = dict(table or {})
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> 'ZipCentroids':
+        """Read ``zip,lat,lon`` CSV or the Census gazetteer's tab-separated layout; empty if missing"""
+        path = path or os.environ.get(ZIP_CENTROIDS_ENV) or DEFAULT_ZIP_CENTROIDS
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding='utf-8') as f:
+            return cls(parse_zip_table(f.read()))
+
+    def add_from_stores(self, stores: Iterable[Dict]) -> int:
+        """Fill zips missing from the table with the mean position of their stores; returns how many"""
+        positions = defaultdict(list)
+        for store in stores:
+            zip_code = store_zip(store)
+            if zip_code and zip_code not in self.table and store.get('latitude') is not None:
+                positions[zip_code].append((store['latitude'], store['longitude']))
+        for zip_code, points in positions.items():
+            self.table[zip_code] = (sum(p[0] for p in points) / len(points), sum(p[1] for p in points) / len(points))
+        return len(positions)
+
+    def lookup(self, zip_code: str) -> Optional[Tuple[float, float]]:
+        return self.table.get(str(zip_code).strip()[:5])
+
+    def cell_of(self, zip_code: str, cell_degrees: float) -> Optional[Cell]:
+        """The grid cell holding a zip's centroid"""
+        point = self.lookup(zip_code)
+        if point is None:
+            return None
+        return (math.floor(point[0] / cell_degrees) * cell_degrees, math.floor(point[1] / cell_degrees) * cell_degrees,
+                cell_degrees)
+
+    def seed_cells(self, cell_degrees: float, within: Optional[Cell] = None) -> Dict[Cell, str]:
+        """One zip per grid cell, closest to the cell centre; only zips inside ``within`` if given"""
+        best: Dict[Tuple[int, int], Tuple[float, str]] = {}
+        for zip_code, (lat, lon) in self.table.items():
+            if within is not None and not (within[0] <= lat < within[0] + within[2]
+                                           and within[1] <= lon < within[1] + within[2]):
+                continue
+            cell = (math.floor(lat / cell_degrees), math.floor(lon / cell_degrees))
+            offset = abs(lat / cell_degrees - cell[0] - 0.5) + abs(lon / cell_degrees - cell[1] - 0.5)
+            if cell not in best or (offset, zip_code) < best[cell]:
+                best[cell] = (offset, zip_code)
+        return {(row * cell_degrees, col * cell_degrees, cell_degrees): zip_code
+                for (row, col), (_, zip_code) in best.items()}
+
+    def seeds(self, cell_degrees: float) -> List[str]:
+        """One zip per grid cell, closest to the cell centre: crawl seeds covering the whole table"""
+        return sorted(self.seed_cells(cell_degrees).values())
+
+    def __len__(self):
+        return len(self.table)
+
+
+def parse_zip_table(text: str) -> Dict[str, Tuple[float, float]]:
+    """Centroids from ``zip,lat,lon`` CSV or gazetteer text (GEOID ... INTPTLAT INTPTLONG)"""
+    first_line = text.split('\n', 1)[0]
+    delimiter = '\t' if '\t' in first_line else ','
+    reader = csv.reader(io.StringIO(text), delimiter=delimiter)
+    header = [column.strip().lower() for column in next(reader, [])]
+    zip_col = next((header.index(name) for name in ('zip', 'zip_code', 'geoid') if name in header), 0)
+    lat_col = next((header.index(name) for name in ('lat', 'latitude', 'intptlat') if name in header), 1)
+    lon_col = next((header.index(name) for name in ('lon', 'lng', 'longitude', 'intptlong') if name in header), 2)
+    table = {}
+    for row in reader:
+        try:
+            table[row[zip_col].strip().zfill(5)] = (float(row[lat_col]), float(row[lon_col]))
+        except (IndexError, ValueError):
+            continue
+    return table
+
+
+def download_zip_centroids(path: str = DEFAULT_ZIP_CENTROIDS, url: str = CENSUS_ZCTA_URL) -> int:
+    """Fetch the Census ZCTA gazetteer and write it as ``zip,lat,lon`` CSV; returns the row count"""
+    import zipfile
+
+    import requests
+
+    response = requests.get(url, timeout=60)
+    response.raise_for_status()
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        name = next(name for name in archive.namelist() if name.endswith('.txt'))
+        table = parse_zip_table(archive.read(name).decode('utf-8'))
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['zip', 'lat', 'lon'])
+        for zip_code in sorted(table):
+            writer.writerow([zip_code, *table[zip_code]])
+    return len(table)
+
+
+class StoreIndex:
+    """Stores bucketed into lat/lon grid cells for nearest-store queries"""
+
+    def __init__(self, stores: Iterable[Dict], cell_degrees: float = 1.0):
+        self.cell_degrees = cell_degrees
+        self.stores = [store for store in stores
+                       if store.get('latitude') is not None and store.get('longitude') is not None]
+        self.lats = [float(store['latitude']) for store in self.stores]
+        self.lons = [float(store['longitude']) for store in self.stores]
+        self.cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for i, (lat, lon) in enumerate(zip(self.lats, self.lons)):
+            self.cells[self._cell(lat, lon)].append(i)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees)
+
+    def _ring(self, center: Tuple[int, int], radius: int) -> List[int]:
+        row, col = center
+        if radius == 0:
+            return list(self.cells.get(center, ()))
+        found = []
+        for r in range(row - radius, row + radius + 1):
+            step = 1 if r in (row - radius, row + radius) else 2 * radius
+            for c in range(col - radius, col + radius + 1, step):
+                found.extend(self.cells.get((r, c), ()))
+        return found
+
+    def nearest(self, lat: float, lon: float, k: int = 5, max_miles: Optional[float] = None) -> List[Dict]:
+        """The ``k`` closest stores, each with ``distance_miles``, nearest first"""
+        if not self.stores:
+            return []
+        center = self._cell(lat, lon)
+        candidates: List[int] = []
+        distances: List[float] = []
+        max_radius = int(math.ceil(360 / self.cell_degrees))
+        for radius in range(max_radius + 1):
+            ring = self._ring(center, radius)
+            if ring:
+                candidates.extend(ring)
+                distances.extend(haversine_miles(lat, lon, [self.lats[i] for i in ring],
+                                                 [self.lons[i] for i in ring]))
+            if len(candidates) == len(self.stores):
+                break
+            # Cells beyond this ring are at least `radius` cells away in latitude or longitude
+            edge_lat = min(89.9, abs(lat) + (radius + 1) * self.cell_degrees)
+            bound = radius * self.cell_degrees * MILES_PER_DEGREE * math.cos(math.radians(edge_lat))
+            if max_miles is not None and bound > max_miles:
+                break
+            if len(candidates) >= k and sorted(distances)[k - 1] <= bound:
+                break
+        ranked = sorted(zip(distances, candidates))
+        return [dict(self.stores[i], distance_miles=round(distance, 2)) for distance, i in ranked[:k]
+                if max_miles is None or distance <= max_miles]
+
+    def __len__(self):
+        return len(self.stores)
+
+
+class StoreLocatorIndex:
+    """Zip-code queries over a crawled store index"""
+
+    def __init__(self, stores: Iterable[Dict], centroids: Optional[ZipCentroids] = None, cell_degrees: float = 1.0):
+        self.index = StoreIndex(stores, cell_degrees)
+        self.centroids = centroids if centroids is not None else ZipCentroids.load()
+        self.centroids.add_from_stores(self.index.stores)
+
+    @classmethod
+    def load(cls, store: Optional[ResultStore] = None, max_age_days: Optional[float] = None,
+             centroids: Optional[ZipCentroids] = None) -> Optional['StoreLocatorIndex']:
+        """The latest crawled index, or None if there is none or it is older than ``max_age_days``"""
+        store = store or shared_result_store()
+        runs = [run for run in store.runs(INDEX_TASK, limit=10) if run['success']]
+        if not runs:
+            return None
+        if max_age_days is not None and time.time() - runs[0]['created_at'] > max_age_days * 86400:
+            return None
+        return cls(store.records(INDEX_TASK, runs[0]['run_id']), centroids)
+
+    def nearest(self, zip_code: str, k: int = 5, max_miles: Optional[float] = None) -> Dict:
+        """Closest stores to a zip code's centroid, in the locator's result shape"""
+        point = self.centroids.lookup(zip_code)
+        if point is None:
+            return {'zip_code': zip_code, 'success': False, 'stores': [], 'error': 'Unknown zip code'}
+        stores = self.index.nearest(point[0], point[1], k, max_miles)
+        return {'zip_code': zip_code, 'success': bool(stores), 'stores': stores,
+                'error': None if stores else 'No stores found'}
+
+    def nearest_many(self, zip_codes: Iterable[str], k: int = 5, max_miles: Optional[float] = None) -> List[Dict]:
+        return [self.nearest(zip_code, k, max_miles) for zip_code in zip_codes]
+
+
+def inferred_result_cap(counts: Iterable[int]) -> Optional[int]:
+    """The largest result count, if enough seeds returned exactly that many to suggest a cap"""
+    counts = list(counts)
+    if not counts:
+        return None
+    largest = max(counts)
+    if largest >= MIN_INFERRED_CAP and counts.count(largest) >= CAP_INFERENCE_SEEDS:
+        return largest
+    return None
+
+
+def coverage_gap(point: Optional[Tuple[float, float]], cell: Cell, stores: List[Dict],
+                 result_cap: Optional[int]) -> Optional[Dict]:
+    """
+    How far a seed's results reach, if they may miss stores of its cell; else None.
+
+    The locator returns the stores nearest to the seed, so nearly every search
+    hits the cap. Only a capped search whose farthest store is closer to the
+    seed than the cell's farthest corner leaves part of the cell unsearched.
+    """
+    if point is None or not result_cap or len(stores) < result_cap:
+        return None
+    located = [item for item in stores if item.get('latitude') is not None and item.get('longitude') is not None]
+    if not located:
+        return None
+    farthest = max(haversine_miles(point[0], point[1], [float(item['latitude']) for item in located],
+                                   [float(item['longitude']) for item in located]))
+    corner = farthest_corner_miles(point, cell)
+    if farthest >= corner:
+        return None
+    return {'stores': len(stores), 'farthest_miles': round(farthest, 1), 'corner_miles': round(corner, 1)}
+
+
+def crawl_store_index(seed_zips: Sequence[str], locator=None, store: Optional[ResultStore] = None,
+                      centroids: Optional[ZipCentroids] = None, cell_degrees: Optional[float] = None,
+                      result_cap: Optional[int] = None, min_cell_degrees: float = 0.25) -> Dict:
+    """
+    Search the store locator once per seed zip and store every distinct store.
+
+    One browser session serves the whole crawl; stores are read from the
+    intercepted store-search JSON, which carries their coordinates.
+
+    With ``centroids`` and ``cell_degrees`` each seed stands for its grid cell,
+    and a cell the seed's results do not cover (see ``coverage_gap``) is split
+    into quarters that are searched in turn, down to ``min_cell_degrees``.
+    ``result_cap`` is the most stores one search returns; None infers it.
+    """
+    if locator is None:
+        from gamestop_automation import GameStopStoreLocator
+        locator = GameStopStoreLocator(headless=True)
+    store = store or shared_result_store()
+    adaptive = centroids is not None and cell_degrees is not None
+    found: Dict = {}
+    failed: List[str] = []
+    results_by_zip: Dict[str, List[Dict]] = {}
+    gaps: List[Dict] = []
+    splits = 0
+    level = [(zip_code, centroids.cell_of(zip_code, cell_degrees) if adaptive else None) for zip_code in seed_zips]
+    started = time.time()
+    try:
+        locator.setup_browser()
+        if not locator.navigate_to_store_locator():
+            raise RuntimeError("Could not open the store locator")
+        while level:
+            for n, (zip_code, _) in enumerate(level, 1):
+                if zip_code in results_by_zip or zip_code in failed:
+                    continue
+                if not locator.search_stores(zip_code):
+                    failed.append(zip_code)
+                    continue
+                stores = locator.get_store_results_from_network()
+                results_by_zip[zip_code] = stores
+                for item in stores:
+                    key = item.get('store_id') or (item['name'], item['address'])
+                    found.setdefault(key, {field: item.get(field) for field in INDEX_FIELDS})
+                print(f"[{n}/{len(level)}] {zip_code}: {len(stores)} stores, {len(found)} distinct so far")
+
+            cap = result_cap or inferred_result_cap(len(stores) for stores in results_by_zip.values())
+            next_level = []
+            for zip_code, cell in level:
+                if cell is None or zip_code not in results_by_zip:
+                    continue
+                # A search reused for a quarter of its cell is judged against the quarter
+                gap = coverage_gap(centroids.lookup(zip_code), cell, results_by_zip[zip_code], cap)
+                if gap is None:
+                    continue
+                quarters = centroids.seed_cells(cell[2] / 2, within=cell) if cell[2] / 2 >= min_cell_degrees else {}
+                if not quarters:
+                    gaps.append(dict(gap, seed_zip=zip_code, cell=list(cell)))
+                    continue
+                splits += 1
+                print(f"Splitting the {cell[2]:g} degree cell of {zip_code} (capped results reach "
+                      f"{gap['farthest_miles']} of {gap['corner_miles']} miles) into {len(quarters)} seeds")
+                next_level.extend((seed, quarter) for quarter, seed in quarters.items())
+            level = next_level
+    finally:
+        locator.cleanup()
+
+    stores = list(found.values())
+    result = {
+        'seed_zips': len(seed_zips),
+        'searches': len(results_by_zip) + len(failed),
+        'failed_seeds': failed,
+        'cell_splits': splits,
+        'coverage_gaps': gaps,
+        'total_stores': len(stores),
+        'with_coordinates': sum(1 for item in stores if item.get('latitude') is not None),
+        'crawl_seconds': round(time.time() - started, 1),
+    }
+    result['run_id'] = store.append(INDEX_TASK, result, records=stores, success=bool(stores))
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Nationwide GameStop store index')
+    commands = parser.add_subparsers(dest='command', required=True)
+    zips = commands.add_parser('zips', help='Show or download the zip centroid table')
+    zips.add_argument('--download', action='store_true')
+    crawl = commands.add_parser('crawl', help='Rebuild the store index from the locator')
+    crawl.add_argument('--seeds', nargs='*', help='Seed zip codes (default: one per grid cell of the zip table)')
+    crawl.add_argument('--cell-degrees', type=float, default=1.5, help='Seed grid spacing')
+    crawl.add_argument('--min-cell-degrees', type=float, default=0.25,
+                       help='Smallest cell a crowded seed is split into')
+    crawl.add_argument('--result-cap', type=int, help='Most stores one search returns (default: inferred)')
+    nearest = commands.add_parser('nearest', help='Closest stores for zip codes, answered locally')
+    nearest.add_argument('zip_codes', nargs='+')
+    nearest.add_argument('--k', type=int, default=3)
+    nearest.add_argument('--max-age-days', type=float, default=7,
+                         help='Re-crawl first when the index is older than this')
+    args = parser.parse_args(argv)
+
+    if args.command == 'zips':
+        if args.download:
+            print(f"Wrote {download_zip_centroids()} zip centroids to {DEFAULT_ZIP_CENTROIDS}")
+        print(f"{len(ZipCentroids.load())} zip centroids available")
+        return 0
+
+    if args.command == 'crawl':
+        centroids = ZipCentroids.load()
+        seeds = args.seeds or centroids.seeds(args.cell_degrees)
+        if not seeds:
+            print("No seed zip codes: pass --seeds or download the zip table with 'zips --download'")
+            return 1
+        result = crawl_store_index(seeds, centroids=centroids if len(centroids) else None,
+                                   cell_degrees=args.cell_degrees, result_cap=args.result_cap,
+                                   min_cell_degrees=args.min_cell_degrees)
+        print(f"Indexed {result['total_stores']} stores from {result['searches']} searches "
+              f"({result['seed_zips']} seeds, {result['cell_splits']} cells split)")
+        for gap in result['coverage_gaps']:
+            print(f"  Coverage gap around {gap['seed_zip']}: {gap['stores']} stores reach "
+                  f"{gap['farthest_miles']} of {gap['corner_miles']} miles")
+        return 0 if result['total_stores'] else 1
+
+    locator_index = StoreLocatorIndex.load(max_age_days=args.max_age_days)
+    if locator_index is None:
+        print(f"Store index missing or older than {args.max_age_days} days, re-crawling...")
+        centroids = ZipCentroids.load()
+        seeds = centroids.seeds(1.5)
+        if not seeds or not crawl_store_index(seeds, centroids=centroids, cell_degrees=1.5)['total_stores']:
+            print("Could not build the store index")
+            return 1
+        locator_index = StoreLocatorIndex.load()
+    started = time.perf_counter()
+    answers = locator_index.nearest_many(args.zip_codes, k=args.k)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    for answer in answers:
+        print(f"\n{answer['zip_code']}:")
+        if not answer['success']:
+            print(f"  {answer['error']}")
+        for item in answer['stores']:
+            print(f"  {item['distance_miles']:>7.1f} mi  {item['name']} - {item['address']} {item['phone']}")
+    print(f"\nAnswered {len(answers)} zip codes from {len(locator_index.index)} indexed stores in {elapsed_ms:.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
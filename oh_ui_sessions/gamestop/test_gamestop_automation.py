@@ -12,9 +12,11 @@ Usage:
 import unittest
 import json
 import os
+import tempfile
 import time
 from unittest.mock import patch, MagicMock
 from gamestop_automation import GameStopStoreLocator
+from automation_core.result_store import RESULT_STORE_ENV
 
 class TestGameStopAutomation(unittest.TestCase):
     """Test cases for GameStop store locator automation"""
@@ -22,12 +24,18 @@ class TestGameStopAutomation(unittest.TestCase):
     def setUp(self):
         """Set up test fixtures"""
         self.test_zip_code = "90028"
+        # Keep test runs out of the real result store
+        self.store_dir = tempfile.TemporaryDirectory()
+        self.store_env = patch.dict(os.environ, {RESULT_STORE_ENV: os.path.join(self.store_dir.name, 'results.sqlite')})
+        self.store_env.start()
         self.locator = GameStopStoreLocator(headless=True, timeout=30000)
         self.test_results_file = "test_store_results.json"
         
     def tearDown(self):
         """Clean up after tests"""
         self.locator.cleanup()
+        self.store_env.stop()
+        self.store_dir.cleanup()
         
         # Clean up test files
         if os.path.exists(self.test_results_file):
@@ -182,6 +190,81 @@ Mon:
         except Exception as e:
             self.fail(f"Store info parsing test failed: {e}")
     
+    def test_store_search_json_parsing(self):
+        """Test building stores from the intercepted store-search JSON"""
+        print("\n🧪 Testing store search JSON parsing...")
+
+        sample_response = {
+            "action": "Stores-FindStores",
+            "stores": [
+                {
+                    "ID": "6442",
+                    "name": "Edgewood Town Center",
+                    "address1": "1611 S Braddock Ave",
+                    "address2": "Ste 202",
+                    "city": "Pittsburgh",
+                    "stateCode": "PA",
+                    "postalCode": "15218",
+                    "phone": "4122415531",
+                    "latitude": 40.4190,
+                    "longitude": -79.8869,
+                    "storeHours": "<div>Sun: 11:00 AM - 7:00 PM</div><div>Mon: 12:00 PM - 8:00 PM</div>"
+                }
+            ]
+        }
+
+        stores = self.locator.parse_store_search_json(sample_response)
+
+        self.assertEqual(len(stores), 1)
+        store = stores[0]
+        self.assertEqual(store['store_id'], "6442")
+        self.assertEqual(store['name'], "Edgewood Town Center")
+        self.assertEqual(store['phone'], "(412) 241-5531")
+        self.assertEqual(store['address'], "1611 S Braddock Ave, Ste 202, Pittsburgh, PA 15218")
+        self.assertEqual(store['hours'], {'Sun': '11:00 AM - 7:00 PM', 'Mon': '12:00 PM - 8:00 PM'})
+        self.assertAlmostEqual(store['latitude'], 40.4190)
+        self.assertEqual(store['source'], 'network')
+
+        # Responses without a store list yield nothing, so the text parser is used
+        self.assertEqual(self.locator.parse_store_search_json({"error": "rate limited"}), [])
+
+        print("✅ Store search JSON parsing successful")
+
+    def test_batch_dedup_and_zip_file(self):
+        """Test that a store returned for several zips is parsed once and zip files are read"""
+        print("\n🧪 Testing batch helpers...")
+
+        first = {"stores": [{"ID": "1", "name": "Hollywood", "postalCode": "90028", "distance": "0.5 mi"},
+                            {"ID": "2", "name": "Burbank", "postalCode": "91502", "distance": "6 mi"}]}
+        second = {"stores": [{"ID": "2", "name": "Burbank", "postalCode": "91502", "distance": "0.3 mi"}]}
+        self.locator.parse_store_search_json(first)
+        with patch.object(self.locator, '_normalize_store_hours') as normalize:
+            stores = self.locator.parse_store_search_json(second)
+        normalize.assert_not_called()
+        self.assertEqual((stores[0]['name'], stores[0]['distance'], stores[0]['index']), ("Burbank", "0.3 mi", 0))
+        self.assertEqual(len(self.locator._parsed_stores), 2)
+
+        from gamestop_automation import read_zip_codes
+        zip_file = "test_zip_codes.txt"
+        with open(zip_file, 'w') as f:
+            f.write("90028, 90036\n# Los Angeles\n91502  # Burbank\n")
+        try:
+            self.assertEqual(read_zip_codes(["10001"], zip_file), ["10001", "90028", "90036", "91502"])
+        finally:
+            os.remove(zip_file)
+
+        print("✅ Batch helpers work")
+
+    def test_stale_results_timeout_fails(self):
+        """Test that a search whose list never refreshed is not read as the new zip's stores"""
+        self.locator.waiter = MagicMock()
+        self.locator.waiter.until.return_value = 'timeout'
+        self.locator._stale_results = True
+        self.assertFalse(self.locator.wait_for_search_results())
+        # Nothing on screen before the first search: carry on as before
+        self.locator._stale_results = False
+        self.assertTrue(self.locator.wait_for_search_results())
+
     def test_hours_extraction(self):
         """Test extraction of store hours"""
         print("\n🧪 Testing hours extraction...")
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Tests for the GameStop nationwide store index
+
+Runs offline: synthetic stores, a fake locator for the crawl and a temporary
+result store.
+
+Usage:
+    python -m pytest oh_ui_sessions/gamestop/test_store_index.py
+"""
+
+import math
+import os
+import random
+import tempfile
+import unittest
+
+from store_index import (INDEX_TASK, StoreIndex, StoreLocatorIndex, ZipCentroids, crawl_store_index,
+                         haversine_miles, inferred_result_cap, parse_zip_table)
+from automation_core.result_store import ResultStore
+
+
+GAZETTEER = ("GEOID\tALAND\tAWATER\tALAND_SQMI\tAWATER_SQMI\tINTPTLAT\tINTPTLONG                                  \n"
+             "90028\t3827000\t0\t1.478\t0.000\t34.099630\t-118.326536                     \n"
+             "10001\t1610000\t0\t0.622\t0.000\t40.750633\t-73.997177\n")
+
+
+def store(store_id, lat, lon, zip_code='00000'):
+    return {'store_id': str(store_id), 'name': f'GameStop {store_id}', 'phone': '', 'status': 'Open', 'hours': {},
+            'address': f'{store_id} Main St, Town, CA {zip_code}', 'latitude': lat, 'longitude': lon}
+
+
+class FakeLocator:
+    """Answers each seed zip with a fixed set of stores, overlapping between seeds"""
+
+    def __init__(self, stores_by_zip):
+        self.stores_by_zip = stores_by_zip
+        self.searched = []
+        self.cleaned_up = False
+
+    def setup_browser(self):
+        pass
+
+    def navigate_to_store_locator(self):
+        return True
+
+    def search_stores(self, zip_code):
+        self.searched.append(zip_code)
+        return zip_code in self.stores_by_zip
+
+    def get_store_results_from_network(self):
+        return [dict(item, index=i, distance='1 mi', source='network')
+                for i, item in enumerate(self.stores_by_zip[self.searched[-1]])]
+
+    def cleanup(self):
+        self.cleaned_up = True
+
+
+class NearestLocator(FakeLocator):
+    """Answers like the real locator: only the ``cap`` stores nearest to the zip's centroid"""
+
+    def __init__(self, stores, centroids, cap):
+        super().__init__({})
+        self.stores = stores
+        self.centroids = centroids
+        self.cap = cap
+
+    def search_stores(self, zip_code):
+        self.searched.append(zip_code)
+        return self.centroids.lookup(zip_code) is not None
+
+    def get_store_results_from_network(self):
+        lat, lon = self.centroids.lookup(self.searched[-1])
+        distances = haversine_miles(lat, lon, [item['latitude'] for item in self.stores],
+                                    [item['longitude'] for item in self.stores])
+        return [item for _, item in sorted(zip(distances, self.stores), key=lambda pair: pair[0])][:self.cap]
+
+
+class TestStoreIndex(unittest.TestCase):
+    """Test cases for StoreIndex and ZipCentroids"""
+
+    def test_haversine(self):
+        # Los Angeles to New York is about 2,450 miles
+        distance = haversine_miles(34.0522, -118.2437, [40.7128, 34.0522], [-74.0060, -118.2437])
+        self.assertAlmostEqual(distance[0], 2445, delta=10)
+        self.assertEqual(distance[1], 0)
+        self.assertEqual(haversine_miles(0, 0, [], []), [])
+
+    def test_nearest_matches_brute_force(self):
+        rng = random.Random(7)
+        stores = [store(i, rng.uniform(25, 49), rng.uniform(-124, -67)) for i in range(2000)]
+        index = StoreIndex(stores, cell_degrees=1.0)
+        for _ in range(50):
+            lat, lon = rng.uniform(25, 49), rng.uniform(-124, -67)
+            expected = sorted(range(len(stores)), key=lambda i: haversine_miles(lat, lon, [stores[i]['latitude']],
+                                                                                 [stores[i]['longitude']])[0])[:5]
+            self.assertEqual([item['store_id'] for item in index.nearest(lat, lon, k=5)],
+                             [stores[i]['store_id'] for i in expected])
+
+        # Sparse stores (Anchorage, Honolulu): the search widens ring by ring until it is sure
+        sparse = StoreIndex([store(1, 61.2, -149.9), store(2, 21.3, -157.8)], cell_degrees=1.0)
+        self.assertEqual([item['store_id'] for item in sparse.nearest(34.1, -118.3, k=1)], ['1'])
+        self.assertEqual(sparse.nearest(34.1, -118.3, k=1, max_miles=100), [])
+
+    def test_zip_centroids(self):
+        centroids = ZipCentroids(parse_zip_table(GAZETTEER))
+        self.assertEqual(centroids.lookup('90028'), (34.09963, -118.326536))
+        self.assertEqual(parse_zip_table("zip,lat,lon\n501,40.8,-73.0\n"), {'00501': (40.8, -73.0)})
+        self.assertEqual(centroids.add_from_stores([store(1, 30.0, -97.0, '78701'), store(2, 30.2, -97.2, '78701'),
+                                                    store(3, 0, 0, '90028')]), 1)
+        lat, lon = centroids.lookup('78701')
+        self.assertTrue(math.isclose(lat, 30.1) and math.isclose(lon, -97.1))
+        self.assertEqual(len(centroids.seeds(30)), 2)
+
+
+class TestCrawl(unittest.TestCase):
+    """Test cases for crawl_store_index and StoreLocatorIndex"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ResultStore(os.path.join(self.tmp.name, 'results.sqlite'))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_crawl_dedups_and_answers_locally(self):
+        hollywood, burbank, manhattan = (store(1, 34.1016, -118.3267), store(2, 34.1808, -118.3090),
+                                         store(3, 40.7505, -73.9934, '10001'))
+        locator = FakeLocator({'90028': [hollywood, burbank], '91502': [burbank, hollywood], '10001': [manhattan]})
+        result = crawl_store_index(['90028', '91502', '10001', '99999'], locator=locator, store=self.store)
+
+        self.assertEqual((result['total_stores'], result['failed_seeds']), (3, ['99999']))
+        self.assertTrue(locator.cleaned_up)
+        records = self.store.records(INDEX_TASK)
+        self.assertNotIn('distance', records[0])
+
+        centroids = ZipCentroids(parse_zip_table(GAZETTEER))
+        locator_index = StoreLocatorIndex.load(store=self.store, max_age_days=7, centroids=centroids)
+        answer = locator_index.nearest('90028', k=2)
+        self.assertEqual([item['store_id'] for item in answer['stores']], ['1', '2'])
+        self.assertLess(answer['stores'][0]['distance_miles'], 1)
+        self.assertEqual(locator_index.nearest('10001', k=1)['stores'][0]['store_id'], '3')
+        self.assertFalse(locator_index.nearest('12345')['success'])
+
+        self.assertIsNone(StoreLocatorIndex.load(store=self.store, max_age_days=-1, centroids=centroids))
+
+    def test_dense_cells_are_split_until_covered(self):
+        # A metro of 64 stores in one 1-degree cell, and a zip every 0.1 degrees
+        stores = [store(i, 34.03 + 0.12 * (i // 8), -118.97 + 0.12 * (i % 8)) for i in range(64)]
+        centroids = ZipCentroids({f'9{i:04d}': (34.05 + 0.1 * (i // 10), -118.95 + 0.1 * (i % 10))
+                                  for i in range(100)})
+        seeds = centroids.seeds(1.0)
+        self.assertEqual(len(seeds), 1)
+
+        flat = crawl_store_index(seeds, locator=NearestLocator(stores, centroids, 12), store=self.store)
+        self.assertEqual((flat['total_stores'], flat['cell_splits'], flat['coverage_gaps']), (12, 0, []))
+
+        locator = NearestLocator(stores, centroids, 12)
+        result = crawl_store_index(seeds, locator=locator, store=self.store, centroids=centroids, cell_degrees=1.0,
+                                   result_cap=12, min_cell_degrees=0.25)
+        self.assertEqual(result['total_stores'], 64)
+        self.assertEqual(result['cell_splits'], 5)
+        self.assertEqual(result['searches'], len(set(locator.searched)))
+        # Every quarter-degree seed's capped results reach past its cell's corners
+        self.assertEqual(result['coverage_gaps'], [])
+
+        # Stopped at half-degree cells, the capped results fall short of the corners
+        coarse = crawl_store_index(seeds, locator=NearestLocator(stores, centroids, 12), store=self.store,
+                                   centroids=centroids, cell_degrees=1.0, result_cap=12, min_cell_degrees=0.5)
+        self.assertEqual(len(coarse['coverage_gaps']), 4)
+        self.assertTrue(all(gap['cell'][2] == 0.5 and gap['farthest_miles'] < gap['corner_miles']
+                            for gap in coarse['coverage_gaps']))
+
+    def test_capped_rural_cell_is_not_split(self):
+        # The cap is hit, but the 12 nearest stores lie far beyond the cell's corners
+        stores = [store(i, 30.5 + 2 * (i // 4), -100.5 + 2 * (i % 4)) for i in range(16)]
+        centroids = ZipCentroids({f'7{i:04d}': (30.05 + 0.1 * (i // 10), -100.95 + 0.1 * (i % 10))
+                                  for i in range(100)})
+        locator = NearestLocator(stores, centroids, 12)
+        result = crawl_store_index(centroids.seeds(1.0), locator=locator, store=self.store, centroids=centroids,
+                                   cell_degrees=1.0, result_cap=12)
+        self.assertEqual((result['searches'], result['cell_splits'], result['coverage_gaps']), (1, 0, []))
+
+    def test_result_cap_inference(self):
+        self.assertEqual(inferred_result_cap([50, 12, 50]), 50)
+        self.assertIsNone(inferred_result_cap([50, 12]))
+        self.assertIsNone(inferred_result_cap([3, 3]))
+        self.assertIsNone(inferred_result_cap([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,17 +4,229 @@ Marriott Bonvoy Credit Cards Automation Script
 
 This script automates the process of browsing Marriott's credit cards page
 and extracting information about all available Marriott Bonvoy credit cards.
+Runs are kept in the result store; the JSON file is only written when a path
+is given.
+
+Usage:
+    python marriott_credit_cards_automation.py [credit_cards_data.json]
 """
 
 import asyncio
-import json
-from playwright.async_api import async_playwright
-from typing import Dict, List, Any
+import bisect
+import os
+import sys
+from typing import Dict, Iterable, List, Any, Optional, Tuple
 import re
 
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from automation_core.browser_pool import AsyncBrowserPool, async_browser_context
+from automation_core.change_detection import ChangeDetector, describe_changes
+from automation_core.har_fixtures import attach_har_async
+from automation_core.http_cache import attach_http_cache_async
+from automation_core.result_store import ResultStore, shared_result_store
+from automation_core.selector_cascade import SelectorCascade
+from automation_core.timing import StepTimer
+
+# Page region whose text is fingerprinted to tell whether the cards changed
+CARDS_REGION_SELECTOR = 'main'
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Any card container; the page is ready once one of them is visible
+CARD_SELECTOR = '.card-container, .credit-card, [data-testid="credit-card"], .card-item'
+BUSINESS_CARD_SELECTOR = '.card-item, [data-testid="credit-card"]'
+
+VISIBLE_CARDS_JS = """
+(selector) => [...document.querySelectorAll(selector)].some((element) => element.offsetParent !== null)
+"""
+
+# Whether the tab labelled ``tab`` reports itself as the selected one
+TAB_SELECTED_JS = """
+(tab) => [...document.querySelectorAll('button, [role="tab"]')].some((element) =>
+    (element.textContent || '').includes(tab)
+    && (element.getAttribute('aria-selected') === 'true' || element.getAttribute('aria-pressed') === 'true'))
+"""
+# A click that lands before the tabs are hydrated is lost; it is repeated this often
+TAB_CLICK_ATTEMPTS = 3
+
+HERO_JS = """
+() => {
+    const hero = document.querySelector('[data-testid="hero-banner"], .hero-banner, .promo-banner');
+    if (!hero) return null;
+    const text = (selector) => {
+        const element = hero.querySelector(selector);
+        return element ? element.textContent.trim() : null;
+    };
+    return {title: text('h1, h2, .heading'), description: text('p, .description')};
+}
+"""
+
+# All fields of one card in a single round trip. Text patterns resolve to the
+# innermost matching elements, as Playwright's text=/regex/ selectors do.
+CARD_INFO_JS = r"""
+(card) => {
+    const text = (element) => (element.textContent || '').trim();
+    const first = (selector) => {
+        const element = card.querySelector(selector);
+        return element ? text(element) : undefined;
+    };
+    const matching = (pattern) => [card, ...card.querySelectorAll('*')].filter((element) =>
+        pattern.test(element.textContent || '')
+        && ![...element.children].some((child) => pattern.test(child.textContent || '')));
+    const info = {};
+    const name = first('h1, h2, h3, .card-name, .title');
+    if (name !== undefined) info.name = name;
+    const tagline = first('.tagline, .subtitle, .card-subtitle');
+    if (tagline !== undefined) info.tagline = tagline;
+    const bonus = matching(/\d+,?\d*\s*(Bonus\s*Points|Free\s*Night)/i)[0];
+    if (bonus) info.welcome_offer = text(bonus);
+    const fee = matching(/\$\d+\s*Annual\s*Fee|No\s*Annual\s*Fee/i)[0];
+    if (fee) info.annual_fee = text(fee);
+    const earning = matching(/\d+X|\d+\s*points/i).slice(0, 5).map(text).filter(Boolean);
+    if (earning.length) info.earning_structure = earning;
+    if (matching(/LIMITED.TIME\s*OFFER/i).length) info.limited_time_offer = true;
+    const learnMore = [...card.querySelectorAll('a')].find((link) => (link.textContent || '').includes('Learn More'));
+    if (learnMore) info.learn_more_url = learnMore.getAttribute('href');
+    return Object.keys(info).length ? info : null;
+}
+"""
+
+# The first ``limit`` visible cards, each read with CARD_INFO_JS
+CARDS_INFO_JS = """
+(cards, limit) => cards.filter((card) => card.offsetParent !== null).slice(0, limit).map(%s)
+""" % CARD_INFO_JS.strip()
+
+
+# Fallback matcher: every pattern is one named branch of a single alternation,
+# so the HTML is scanned once. Card names are listed in output order; bonus and
+# fee branches are listed in priority order.
+# Every quantifier is bounded so that no match can be longer than CHUNK_OVERLAP
+CARD_PATTERNS = [
+    r'Marriott Bonvoy Boundless[®™]{0,3}\s{0,40}Credit Card from Chase',
+    r'Marriott Bonvoy Bold[®™]{0,3}\s{0,40}Credit Card from Chase',
+    r'Marriott Bonvoy Bevy[®™]{0,3}\s{0,40}American Express[®™]{0,3}\s{0,40}Card',
+    r'Marriott Bonvoy Brilliant[®™]{0,3}\s{0,40}American Express[®™]{0,3}\s{0,40}Card',
+    r'Marriott Bonvoy Business[®™]{0,3}\s{0,40}American Express[®™]{0,3}\s{0,40}Card'
+]
+OFFER_PATTERNS = {
+    'welcome_offer': [r'\d{1,3},?\d{3}\s{0,40}Bonus Points', r'\d{1,3}\s{0,40}Free Night Awards?'],
+    'annual_fee': [r'\$\d{1,5}\s{0,40}Annual Fee', r'No Annual Fee'],
+}
+# Group name -> ('card', card index) or (offer field, priority)
+MATCH_GROUPS = {f'card{i}': ('card', i) for i in range(len(CARD_PATTERNS))}
+MATCH_GROUPS.update({f'{field}{rank}': (field, rank) for field, patterns in OFFER_PATTERNS.items()
+                     for rank in range(len(patterns))})
+CARD_OFFER_PATTERN = re.compile('|'.join(
+    [f'(?P<card{i}>{pattern})' for i, pattern in enumerate(CARD_PATTERNS)] +
+    [f'(?P<{field}{rank}>{pattern})' for field, patterns in OFFER_PATTERNS.items()
+     for rank, pattern in enumerate(patterns)]), re.IGNORECASE)
+# Offers count for a card when they lie within this many characters of its name
+OFFER_WINDOW = 500
+# Longer than any match (the longest card name with padding is under 140
+# characters), so a match split across two chunks is seen whole
+CHUNK_OVERLAP = 256
+
+
+class CardOfferMatcher:
+    """
+    Single-pass card/offer matcher over HTML fed in chunks.
+
+    Only an unscanned tail of ``CHUNK_OVERLAP`` characters is kept between
+    chunks, plus the offsets of the matches found, so a large page never has to
+    be held in memory as one string. ``finish()`` pairs each card name with the
+    nearest-priority bonus and fee inside ``OFFER_WINDOW`` by bisecting the
+    sorted match offsets.
+    """
+
+    def __init__(self, window: int = OFFER_WINDOW):
+        self.window = window
+        self.buffer = ''
+        self.offset = 0
+        # First occurrence of each card: index -> (start, end, text)
+        self.cards: Dict[int, Tuple[int, int, str]] = {}
+        # Offer matches per field and priority, in increasing start offset
+        self.offers = {field: [([], []) for _ in patterns] for field, patterns in OFFER_PATTERNS.items()}
+
+    def feed(self, chunk: str):
+        self.buffer += chunk
+        self._scan(len(self.buffer) - CHUNK_OVERLAP)
+
+    def finish(self) -> List[Dict[str, str]]:
+        self._scan(len(self.buffer))
+        self.buffer = ''
+        results = []
+        for index in sorted(self.cards):
+            start, end, name = self.cards[index]
+            card_info = {"name": name}
+            for field, ranks in self.offers.items():
+                for ranked in ranks:
+                    text = self._nearby(ranked, start - self.window, end + self.window)
+                    if text:
+                        card_info[field] = text
+                        break
+            results.append(card_info)
+        return results
+
+    def _scan(self, safe: int):
+        """Record every match that ends before ``safe`` and drop the scanned text"""
+        if safe <= 0:
+            return
+        cut = safe
+        for match in CARD_OFFER_PATTERN.finditer(self.buffer):
+            if match.end() > safe:
+                # May continue in the next chunk: rescan it from its start
+                cut = match.start()
+                break
+            self._record(match)
+        self.buffer = self.buffer[cut:]
+        self.offset += cut
+
+    def _record(self, match):
+        kind, index = MATCH_GROUPS[match.lastgroup]
+        start, end = self.offset + match.start(), self.offset + match.end()
+        if kind == 'card':
+            self.cards.setdefault(index, (start, end, match.group()))
+            return
+        starts, matches = self.offers[kind][index]
+        starts.append(start)
+        matches.append((end, match.group()))
+
+    @staticmethod
+    def _nearby(ranked, low: int, high: int) -> Optional[str]:
+        """First match lying entirely inside [low, high]"""
+        starts, matches = ranked
+        for i in range(bisect.bisect_left(starts, low), bisect.bisect_right(starts, high)):
+            end, text = matches[i]
+            if end <= high:
+                return text
+        return None
+
+
+def match_card_offers(chunks: Iterable[str], window: int = OFFER_WINDOW) -> List[Dict[str, str]]:
+    """Known cards with their welcome offer and annual fee, from HTML given in one or more chunks"""
+    matcher = CardOfferMatcher(window)
+    for chunk in chunks:
+        matcher.feed(chunk)
+    return matcher.finish()
+
 
 class MarriottCreditCardsAutomation:
-    def __init__(self):
+    def __init__(self, pool: Optional[AsyncBrowserPool] = None, selectors: Optional[SelectorCascade] = None,
+                 result_store: Optional[ResultStore] = None,
+                 output_path: Optional[str] = None,
+                 timer: Optional[StepTimer] = None):
+        # Optional shared browser pool; without one a private browser is launched
+        self.pool = pool
+        # Runs are appended to the result store; output_path=None skips rendering the JSON file
+        self.result_store = result_store
+        self.output_path = output_path
+        # Fallback selector lists are raced in one query, most precise match first
+        self.selectors = selectors or SelectorCascade('marriott')
+        # Per-step wall times (browser startup, page load, ...) for benchmarking
+        self.timer = timer or StepTimer()
         self.base_url = "https://www.marriott.com/"
         self.credit_cards_url = "https://www.marriott.com/credit-cards.mi"
         self.results = {
@@ -23,64 +235,102 @@ class MarriottCreditCardsAutomation:
             "business_cards": [],
             "hero_promotion": None
         }
+        # Unchanged pages reuse the previous stored run instead of re-extracting
+        self.detector: Optional[ChangeDetector] = None
 
     async def run(self):
         """Main execution method"""
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
+        # The cards are rendered client-side, so the server HTML says nothing about
+        # them: only the rendered region is fingerprinted
+        self.detector = ChangeDetector('marriott_cards', store=self.result_store)
+
+        self.timer.start('browser_startup')
+        async with async_browser_context(self.pool, headless=True) as context:
+            await attach_har_async(context, 'marriott_credit_cards')
+            # Serve JS/CSS/fonts from the shared disk cache when AUTOMATION_HTTP_CACHE is set
+            http_cache = await attach_http_cache_async(context)
+            # Personal and business views load side by side in two pages of the same context
+            personal_page, business_page = await asyncio.gather(context.new_page(), context.new_page())
+            self.timer.stop('browser_startup')
             
+            # The business tab keeps loading while the personal page is checked for changes
+            business_load = asyncio.ensure_future(self.open_cards_page(business_page, tab='Business'))
             try:
-                # Set longer timeout and user agent
-                page.set_default_timeout(60000)
-                await page.set_extra_http_headers({
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                })
-                
-                # Navigate directly to credit cards page
                 print("Navigating to credit cards page...")
-                await page.goto(self.credit_cards_url, wait_until="domcontentloaded", timeout=60000)
-                await page.wait_for_timeout(5000)
-                
-                # Extract hero promotion
-                await self.extract_hero_promotion(page)
+                with self.timer.step('page_load'):
+                    await self.open_cards_page(personal_page)
                 
-                # Extract personal credit cards (default tab)
-                print("Extracting personal credit cards...")
-                await self.extract_personal_cards(page)
+                with self.timer.step('change_check'):
+                    unchanged = await self.detector.check_dom_async(personal_page, CARDS_REGION_SELECTOR)
+                if unchanged:
+                    print("Credit cards unchanged since the last run, reusing its results")
+                    self.reuse_previous_results()
+                    return
                 
-                # Switch to business tab and extract business cards
-                print("Switching to business tab...")
-                business_tab = page.locator('button:has-text("Business")')
-                await business_tab.click()
-                await page.wait_for_timeout(2000)
+                with self.timer.step('business_tab'):
+                    business_tab = await business_load
                 
-                print("Extracting business credit cards...")
-                await self.extract_business_cards(page)
+                print("Extracting hero promotion, personal and business credit cards...")
+                with self.timer.step('extraction'):
+                    # Without the business tab the visible cards are personal ones
+                    extract_business = (self.extract_business_cards(business_page) if business_tab
+                                        else self.extract_business_cards_from_html(business_page))
+                    await asyncio.gather(self.extract_hero_promotion(personal_page),
+                                         self.extract_personal_cards(personal_page),
+                                         extract_business)
                 
                 # Save results
-                await self.save_results()
+                with self.timer.step('output_write'):
+                    await self.save_results()
                 
                 print("Automation completed successfully!")
+                if http_cache:
+                    print(http_cache.summary())
                 
             except Exception as e:
                 print(f"Error during automation: {str(e)}")
                 raise
             finally:
-                await browser.close()
+                if not business_load.done():
+                    business_load.cancel()
+                    await asyncio.gather(business_load, return_exceptions=True)
+
+    async def open_cards_page(self, page, tab: Optional[str] = None) -> bool:
+        """
+        Load the credit cards page, switch to ``tab`` if given, and wait for visible cards.
+        
+        Returns False if ``tab`` never got selected.
+        """
+        # Set longer timeout and user agent
+        page.set_default_timeout(60000)
+        await page.set_extra_http_headers({'User-Agent': USER_AGENT})
+        await page.goto(self.credit_cards_url, wait_until="domcontentloaded", timeout=60000)
+        if tab:
+            print(f"Switching to {tab.lower()} tab...")
+            # Personal cards also match the card selectors, so only the tab's
+            # selected state shows that the switch happened
+            for attempt in range(1, TAB_CLICK_ATTEMPTS + 1):
+                await page.locator(f'button:has-text("{tab}")').click()
+                try:
+                    await page.wait_for_function(TAB_SELECTED_JS, arg=tab, timeout=3000)
+                    break
+                except Exception:
+                    print(f"{tab} tab not selected after click {attempt}")
+            else:
+                return False
+        # The old fixed 5 s sleep is now only the budget
+        try:
+            await page.wait_for_function(VISIBLE_CARDS_JS, arg=CARD_SELECTOR, timeout=5000)
+        except Exception:
+            print(f"No visible cards after 5 s{f' on the {tab.lower()} tab' if tab else ''}")
+        return True
 
     async def extract_hero_promotion(self, page):
         """Extract hero banner promotion information"""
         try:
-            hero_section = page.locator('[data-testid="hero-banner"], .hero-banner, .promo-banner').first
-            if await hero_section.count() > 0:
-                title = await hero_section.locator('h1, h2, .heading').first.text_content()
-                description = await hero_section.locator('p, .description').first.text_content()
-                
-                self.results["hero_promotion"] = {
-                    "title": title.strip() if title else None,
-                    "description": description.strip() if description else None
-                }
+            hero = await page.evaluate(HERO_JS)
+            if hero:
+                self.results["hero_promotion"] = hero
         except Exception as e:
             print(f"Could not extract hero promotion: {e}")
 
@@ -96,32 +346,21 @@ class MarriottCreditCardsAutomation:
                 '.card-item'
             ]
             
-            card_containers = None
-            for selector in selectors_to_try:
-                try:
-                    await page.wait_for_selector(selector, timeout=5000)
-                    containers = page.locator(selector)
-                    count = await containers.count()
-                    if count > 0:
-                        card_containers = containers
-                        print(f"Found {count} elements with selector '{selector}'")
-                        break
-                except:
-                    continue
-            
-            if not card_containers:
+            # One shared 5 s budget for all candidates instead of 5 s per missing selector
+            selector = await self.selectors.resolve_async(page, 'personal_cards', selectors_to_try, budget_ms=5000)
+            if not selector:
                 print("No card containers found, trying to extract from page content")
                 # Fallback: extract from page text
                 content = await page.content()
                 self.extract_from_html_content(content)
                 return
             
-            card_count = await card_containers.count()
-            print(f"Processing {card_count} personal credit cards")
+            # Every card's fields in one evaluate; limit to the first 10 to avoid non-card elements
+            cards = await page.locator(selector).evaluate_all(CARDS_INFO_JS, 10)
+            print(f"Processing {len(cards)} personal credit cards found with selector '{selector}'")
             
-            for i in range(min(card_count, 10)):  # Limit to first 10 to avoid processing non-card elements
-                card = card_containers.nth(i)
-                card_info = await self.extract_card_info(card)
+            for card_info in cards:
+                card_info = self.clean_card_info(card_info)
                 if card_info and card_info.get('name'):
                     self.results["personal_cards"].append(card_info)
                     print(f"Extracted: {card_info.get('name', 'Unknown card')}")
@@ -136,156 +375,99 @@ class MarriottCreditCardsAutomation:
                 print(f"Fallback extraction also failed: {e2}")
 
     async def extract_business_cards(self, page):
-        """Extract business credit card information"""
+        """Extract business credit card information from a page showing the business tab"""
         try:
-            # Wait for business card to load
-            await page.wait_for_timeout(2000)
+            # First visible business credit card container
+            cards = await page.locator(BUSINESS_CARD_SELECTOR).evaluate_all(CARDS_INFO_JS, 1)
+            card_info = self.clean_card_info(cards[0]) if cards else None
             
-            # Find business credit card container
-            card_container = page.locator('.card-item, [data-testid="credit-card"]').first
-            
-            if await card_container.count() > 0:
-                card_info = await self.extract_card_info(card_container)
-                if card_info:
-                    self.results["business_cards"].append(card_info)
-                    print("Extracted business credit card information")
+            if card_info:
+                self.results["business_cards"].append(card_info)
+                print("Extracted business credit card information")
             else:
                 print("No business credit card found")
                 
         except Exception as e:
             print(f"Error extracting business cards: {e}")
 
+    async def extract_business_cards_from_html(self, page):
+        """Business cards matched in the page HTML, for when the business tab could not be selected"""
+        self.results["business_tab_error"] = f"Business tab not selected after {TAB_CLICK_ATTEMPTS} clicks"
+        print("Business tab not selected, matching business cards in the page HTML...")
+        try:
+            html = await page.content()
+        except Exception as e:
+            print(f"Error reading page content: {e}")
+            return
+        for card_info in match_card_offers([html]):
+            if "Business" in card_info["name"]:
+                self.results["business_cards"].append(card_info)
+                print(f"Extracted from HTML: {card_info['name']}")
+
     async def extract_card_info(self, card_element) -> Dict[str, Any]:
         """Extract information from a single credit card element"""
         try:
-            card_info = {}
-            
-            # Extract card name
-            name_element = card_element.locator('h1, h2, h3, .card-name, .title').first
-            if await name_element.count() > 0:
-                card_info["name"] = await name_element.text_content()
-                card_info["name"] = card_info["name"].strip()
-            
-            # Extract tagline/subtitle
-            tagline_element = card_element.locator('.tagline, .subtitle, .card-subtitle').first
-            if await tagline_element.count() > 0:
-                card_info["tagline"] = await tagline_element.text_content()
-                card_info["tagline"] = card_info["tagline"].strip()
-            
-            # Extract bonus points offer
-            bonus_element = card_element.locator('text=/\\d+,?\\d*\\s*(Bonus\\s*Points|Free\\s*Night)/i').first
-            if await bonus_element.count() > 0:
-                card_info["welcome_offer"] = await bonus_element.text_content()
-                card_info["welcome_offer"] = card_info["welcome_offer"].strip()
-            
-            # Extract annual fee
-            fee_element = card_element.locator('text=/\\$\\d+\\s*Annual\\s*Fee|No\\s*Annual\\s*Fee/i').first
-            if await fee_element.count() > 0:
-                card_info["annual_fee"] = await fee_element.text_content()
-                card_info["annual_fee"] = card_info["annual_fee"].strip()
-            
-            # Extract earning structure (look for X points patterns)
-            earning_elements = card_element.locator('text=/\\d+X|\\d+\\s*points/i')
-            earning_count = await earning_elements.count()
-            if earning_count > 0:
-                earning_structure = []
-                for i in range(min(earning_count, 5)):  # Limit to first 5 earning categories
-                    earning_text = await earning_elements.nth(i).text_content()
-                    if earning_text:
-                        earning_structure.append(earning_text.strip())
-                card_info["earning_structure"] = earning_structure
-            
-            # Check for limited-time offer
-            lto_element = card_element.locator('text=/LIMITED.TIME\\s*OFFER/i').first
-            if await lto_element.count() > 0:
-                card_info["limited_time_offer"] = True
-            
-            # Extract Learn More link
-            learn_more_link = card_element.locator('a:has-text("Learn More")').first
-            if await learn_more_link.count() > 0:
-                card_info["learn_more_url"] = await learn_more_link.get_attribute("href")
-            
-            return card_info if card_info else None
-            
+            return self.clean_card_info(await card_element.evaluate(CARD_INFO_JS))
         except Exception as e:
             print(f"Error extracting card info: {e}")
             return None
 
+    @staticmethod
+    def clean_card_info(card_info: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Drop empty fields from a card read by ``CARD_INFO_JS``"""
+        if not card_info:
+            return None
+        card_info = {key: value for key, value in card_info.items() if value not in (None, '', [])}
+        return card_info or None
+
     async def save_results(self):
-        """Save extracted results to JSON file"""
+        """Append extracted results to the result store and render them to the JSON file"""
         try:
-            with open('/workspace/credit_cards_data.json', 'w') as f:
-                json.dump(self.results, f, indent=2)
-            print("Results saved to credit_cards_data.json")
+            cards = ([dict(card, category='personal') for card in self.results['personal_cards']] +
+                     [dict(card, category='business') for card in self.results['business_cards']])
+            store = self.result_store or shared_result_store()
+            run_id = store.append('marriott_cards', self.results, records=cards, success=bool(cards))
+            # Only a run that found cards is worth reusing
+            if self.detector and cards:
+                print(describe_changes(self.detector.commit(run_id, self.results)))
+            if self.output_path:
+                store.render_json('marriott_cards', run_id, path=self.output_path)
+                print(f"Results saved to {self.output_path}")
         except Exception as e:
             print(f"Error saving results: {e}")
 
+    def reuse_previous_results(self):
+        """Take the results of the stored run the change check matched and render them again"""
+        self.results = self.detector.reuse()
+        if self.output_path:
+            store = self.result_store or shared_result_store()
+            store.render_json('marriott_cards', self.detector.previous_run_id, path=self.output_path)
+            print(f"Results saved to {self.output_path}")
+
     def extract_from_html_content(self, html_content: str):
         """Fallback method to extract card info from HTML content using regex"""
-        import re
-        
+        self.extract_from_html_chunks([html_content])
+
+    def extract_from_html_chunks(self, chunks: Iterable[str]):
+        """Fallback extraction over HTML that arrives in pieces, e.g. a streamed response body"""
         print("Using fallback HTML content extraction...")
-        
-        # Known card names to look for
-        card_patterns = [
-            r'Marriott Bonvoy Boundless[®™]*\s*Credit Card from Chase',
-            r'Marriott Bonvoy Bold[®™]*\s*Credit Card from Chase',
-            r'Marriott Bonvoy Bevy[®™]*\s*American Express[®™]*\s*Card',
-            r'Marriott Bonvoy Brilliant[®™]*\s*American Express[®™]*\s*Card',
-            r'Marriott Bonvoy Business[®™]*\s*American Express[®™]*\s*Card'
-        ]
-        
-        # Extract bonus point offers
-        bonus_patterns = [
-            r'(\d{1,3},?\d{3})\s*Bonus Points',
-            r'(\d+)\s*Free Night Awards?'
-        ]
-        
-        # Extract annual fees
-        fee_patterns = [
-            r'\$(\d+)\s*Annual Fee',
-            r'No Annual Fee'
-        ]
-        
-        for pattern in card_patterns:
-            match = re.search(pattern, html_content, re.IGNORECASE)
-            if match:
-                card_name = match.group(0)
-                card_info = {"name": card_name}
-                
-                # Look for bonus offers near the card name
-                context_start = max(0, match.start() - 500)
-                context_end = min(len(html_content), match.end() + 500)
-                context = html_content[context_start:context_end]
-                
-                for bonus_pattern in bonus_patterns:
-                    bonus_match = re.search(bonus_pattern, context, re.IGNORECASE)
-                    if bonus_match:
-                        card_info["welcome_offer"] = bonus_match.group(0)
-                        break
-                
-                for fee_pattern in fee_patterns:
-                    fee_match = re.search(fee_pattern, context, re.IGNORECASE)
-                    if fee_match:
-                        card_info["annual_fee"] = fee_match.group(0)
-                        break
-                
-                # Determine if it's business or personal
-                if "Business" in card_name:
-                    self.results["business_cards"].append(card_info)
-                else:
-                    self.results["personal_cards"].append(card_info)
-                
-                print(f"Extracted from HTML: {card_name}")
+        for card_info in match_card_offers(chunks):
+            card_name = card_info["name"]
+            # Determine if it's business or personal
+            cards = self.results["business_cards" if "Business" in card_name else "personal_cards"]
+            if any(card.get("name") == card_name for card in cards):
+                continue
+            cards.append(card_info)
+            print(f"Extracted from HTML: {card_name}")
 
     def get_results(self) -> Dict[str, Any]:
         """Return the extracted results"""
         return self.results
 
 
-async def main():
+async def main(output_path: Optional[str] = None):
     """Main function to run the automation"""
-    automation = MarriottCreditCardsAutomation()
+    automation = MarriottCreditCardsAutomation(output_path=output_path)
     await automation.run()
     
     # Print summary
@@ -300,4 +482,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main(*sys.argv[1:2]))
\ No newline at end of file
@@ -9,8 +9,25 @@ extracted credit card information is accurate and complete.
 import asyncio
 import json
 import os
+import tempfile
+from contextlib import asynccontextmanager
+from unittest import mock
+
 import pytest
-from marriott_credit_cards_automation import MarriottCreditCardsAutomation
+import marriott_credit_cards_automation
+from marriott_credit_cards_automation import (CARDS_INFO_JS, CHUNK_OVERLAP, HERO_JS, TAB_CLICK_ATTEMPTS,
+                                              TAB_SELECTED_JS, MarriottCreditCardsAutomation, match_card_offers)
+from automation_core.change_detection import CHANGE_DETECTION_ENV
+from automation_core.result_store import RESULT_STORE_ENV, ResultStore
+from automation_core.standin_sites.pages import marriott_credit_cards
+
+
+@pytest.fixture(autouse=True, scope="module")
+def isolated_result_store(tmp_path_factory):
+    """Keep test runs out of the real result store"""
+    path = str(tmp_path_factory.mktemp('store') / 'results.sqlite')
+    with mock.patch.dict(os.environ, {RESULT_STORE_ENV: path}):
+        yield path
 
 
 class TestMarriottAutomation:
@@ -116,7 +133,7 @@ class TestMarriottAutomation:
     
     async def run_automation_for_json(self):
         """Helper method to run automation for JSON test"""
-        automation = MarriottCreditCardsAutomation()
+        automation = MarriottCreditCardsAutomation(output_path='/workspace/credit_cards_data.json')
         await automation.run()
     
     def test_output_md_content_accuracy(self):
@@ -154,6 +171,205 @@ class TestMarriottAutomation:
             pytest.skip(f"URL accessibility test skipped due to network issue: {e}")
 
 
+class FakeCardsPage:
+    """Stands in for a Playwright page; the business tab shows its cards once clicked"""
+    
+    in_flight = 0
+    max_in_flight = 0
+    
+    def __init__(self, load_delay=0.05, clicks_to_select=2):
+        self.tab = 'Personal'
+        self.load_delay = load_delay
+        self.clicks_to_select = clicks_to_select
+        self.evaluations = []
+        # The first click lands before the tabs are hydrated and does nothing
+        self.clicks = 0
+    
+    def set_default_timeout(self, timeout):
+        pass
+    
+    async def set_extra_http_headers(self, headers):
+        pass
+    
+    async def goto(self, url, **kwargs):
+        FakeCardsPage.in_flight += 1
+        FakeCardsPage.max_in_flight = max(FakeCardsPage.max_in_flight, FakeCardsPage.in_flight)
+        try:
+            await asyncio.sleep(self.load_delay)
+        finally:
+            FakeCardsPage.in_flight -= 1
+    
+    async def wait_for_function(self, script, arg=None, timeout=None):
+        if script == TAB_SELECTED_JS and self.tab != arg:
+            raise TimeoutError(f"{arg} tab not selected")
+    
+    async def content(self):
+        return marriott_credit_cards(6)
+    
+    async def evaluate(self, script, arg=None):
+        self.evaluations.append(script)
+        assert script == HERO_JS
+        return {'title': 'Earn 5 Free Night Awards', 'description': None}
+    
+    def locator(self, selector):
+        page = self
+        
+        class Locator:
+            async def click(self):
+                page.clicks += 1
+                if page.clicks >= page.clicks_to_select:
+                    page.tab = selector.split('"')[1]
+            
+            async def evaluate_all(self, script, limit):
+                page.evaluations.append(script)
+                assert script == CARDS_INFO_JS
+                return [{'name': f'Marriott Bonvoy {page.tab} Card {i}', 'tagline': None, 'annual_fee': '$95 Annual Fee'}
+                        for i in range(4)][:limit]
+        
+        return Locator()
+
+
+class FakeSelectors:
+    async def resolve_async(self, page, page_type, candidates, budget_ms=None):
+        return '.card-container'
+
+
+def test_tabs_load_in_parallel_pages():
+    """Both tabs load at once and each card list comes back from one evaluate"""
+    pages = []
+    
+    class FakeContext:
+        async def new_page(self):
+            pages.append(FakeCardsPage())
+            return pages[-1]
+    
+    @asynccontextmanager
+    async def fake_browser_context(pool, headless=True):
+        yield FakeContext()
+    
+    with tempfile.TemporaryDirectory() as tmp, \
+            mock.patch.dict(os.environ, {CHANGE_DETECTION_ENV: '0'}), \
+            mock.patch.object(marriott_credit_cards_automation, 'async_browser_context', fake_browser_context):
+        store = ResultStore(os.path.join(tmp, 'results.sqlite'))
+        automation = MarriottCreditCardsAutomation(selectors=FakeSelectors(), result_store=store, output_path=None)
+        asyncio.run(automation.run())
+        assert len(store.records('marriott_cards')) == 5
+        store.close()
+    
+    results = automation.get_results()
+    assert FakeCardsPage.max_in_flight == 2
+    assert [page.tab for page in pages] == ['Personal', 'Business']
+    assert [page.clicks for page in pages] == [0, 2]
+    assert len(results['personal_cards']) == 4
+    assert results['business_cards'] == [{'name': 'Marriott Bonvoy Business Card 0', 'annual_fee': '$95 Annual Fee'}]
+    assert results['hero_promotion']['title'] == 'Earn 5 Free Night Awards'
+    assert pages[0].evaluations.count(CARDS_INFO_JS) == 1
+
+
+def test_stuck_business_tab_falls_back_to_html():
+    """Personal cards shown under a tab that never switched are not saved as business cards"""
+    pages = []
+    
+    class FakeContext:
+        async def new_page(self):
+            pages.append(FakeCardsPage(clicks_to_select=99))
+            return pages[-1]
+    
+    @asynccontextmanager
+    async def fake_browser_context(pool, headless=True):
+        yield FakeContext()
+    
+    with tempfile.TemporaryDirectory() as tmp, \
+            mock.patch.dict(os.environ, {CHANGE_DETECTION_ENV: '0'}), \
+            mock.patch.object(marriott_credit_cards_automation, 'async_browser_context', fake_browser_context):
+        store = ResultStore(os.path.join(tmp, 'results.sqlite'))
+        automation = MarriottCreditCardsAutomation(selectors=FakeSelectors(), result_store=store, output_path=None)
+        asyncio.run(automation.run())
+        store.close()
+    
+    results = automation.get_results()
+    assert pages[1].clicks == TAB_CLICK_ATTEMPTS
+    assert results['business_tab_error'] == f'Business tab not selected after {TAB_CLICK_ATTEMPTS} clicks'
+    assert [card['name'] for card in results['business_cards']] == ['Marriott Bonvoy Business® American Express® Card']
+    assert pages[1].evaluations.count(CARDS_INFO_JS) == 0
+
+
+def test_unchanged_cards_skip_the_business_tab():
+    """The change check runs as soon as the personal page has loaded; the business load is dropped"""
+    pages = []
+    checked = []
+    
+    class FakeContext:
+        async def new_page(self):
+            # The business page (second) loads slowly
+            pages.append(FakeCardsPage(load_delay=0.05 if not pages else 5))
+            return pages[-1]
+    
+    @asynccontextmanager
+    async def fake_browser_context(pool, headless=True):
+        yield FakeContext()
+    
+    class UnchangedDetector:
+        previous_run_id = 'previous'
+        
+        def __init__(self, task, store=None):
+            pass
+        
+        async def check_dom_async(self, page, selector):
+            checked.append((page, pages[1].clicks))
+            return True
+        
+        def reuse(self):
+            return {'url': 'https://www.marriott.com/credit-cards.mi', 'personal_cards': [{'name': 'Stored'}],
+                    'business_cards': [], 'hero_promotion': None}
+    
+    with mock.patch.object(marriott_credit_cards_automation, 'async_browser_context', fake_browser_context), \
+            mock.patch.object(marriott_credit_cards_automation, 'ChangeDetector', UnchangedDetector):
+        automation = MarriottCreditCardsAutomation(selectors=FakeSelectors(), output_path=None)
+        asyncio.run(asyncio.wait_for(automation.run(), timeout=2))
+    
+    assert checked == [(pages[0], 0)]
+    assert automation.get_results()['personal_cards'] == [{'name': 'Stored'}]
+    assert 'business_tab' not in automation.timer.totals()
+
+
+def chunked(text, size):
+    return (text[i:i + size] for i in range(0, len(text), size))
+
+
+def test_html_fallback_matches_in_chunks():
+    """The single-pass fallback gives the same cards however the HTML is split"""
+    html = marriott_credit_cards(6)
+    cards = match_card_offers([html])
+    assert [card['name'] for card in cards] == [
+        'Marriott Bonvoy Boundless® Credit Card from Chase', 'Marriott Bonvoy Bold® Credit Card from Chase',
+        'Marriott Bonvoy Bevy™ American Express® Card', 'Marriott Bonvoy Brilliant® American Express® Card',
+        'Marriott Bonvoy Business® American Express® Card']
+    assert cards[0] == {'name': 'Marriott Bonvoy Boundless® Credit Card from Chase',
+                        'welcome_offer': '75,000 Bonus Points', 'annual_fee': '$95 Annual Fee'}
+    # A points bonus within the window wins over the card's own Free Night Awards, as before
+    assert cards[1]['welcome_offer'] == '75,000 Bonus Points'
+    for size in (1, 7, 300, 4096):
+        assert match_card_offers(chunked(html, size)) == cards
+    
+    # Offers outside the window are ignored; a megabyte of filler is streamed through
+    filler = '<p>filler</p>' * 80000
+    far = f'{filler}<h3>Marriott Bonvoy Bold® Credit Card from Chase</h3>{"x" * 600}<p>No Annual Fee</p>{filler}'
+    assert match_card_offers(chunked(far, 65536)) == [{'name': 'Marriott Bonvoy Bold® Credit Card from Chase'}]
+
+    # The widest possible match still fits in the overlap, so it is found across any split
+    widest = f'Marriott Bonvoy Brilliant®™®{" " * 40}American Express®™®{" " * 40}Card'
+    assert len(widest) < CHUNK_OVERLAP
+    for size in (1, 50, 100):
+        assert [card['name'] for card in match_card_offers(chunked(f'<p>{widest}</p>', size))] == [widest]
+    
+    automation = MarriottCreditCardsAutomation()
+    automation.extract_from_html_content(html)
+    automation.extract_from_html_chunks(chunked(html, 1000))
+    assert len(automation.results['personal_cards']) == 4
+    assert len(automation.results['business_cards']) == 1
+
+
 def run_manual_validation():
     """Manual validation function to check results against known data"""
     print("=== MANUAL VALIDATION ===")
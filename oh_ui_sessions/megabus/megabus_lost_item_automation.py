@@ -11,29 +11,109 @@ import asyncio
 from playwright.async_api import async_playwright
 import json
 import os
+import sys
+from typing import Optional
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from automation_core.change_detection import ChangeDetector, describe_changes, detection_enabled, visible_text
+from automation_core.har_fixtures import attach_har_async
+from automation_core.resource_blocking import site_profile
+from automation_core.selector_cascade import SelectorCascade
+from automation_core.timing import StepTimer
+
+# Phrases of the extracted answer and contact details; the text around them is what gets fingerprinted
+LOST_ITEM_MARKERS = ('If an item is lost on a bus', 'lost and found department', 'questions@us.megabus.com')
+MARKER_WINDOW = 400
+
+
+def lost_item_fingerprint(html):
+    """Text around the lost item answer and contact details, or None if the server HTML lacks them"""
+    text = visible_text(html)
+    windows = []
+    for marker in LOST_ITEM_MARKERS:
+        start = text.find(marker)
+        if start >= 0:
+            windows.append(text[max(0, start - MARKER_WINDOW):start + len(marker) + MARKER_WINDOW])
+    # A client-rendered FAQ has none of them: the page must be read in the browser
+    return windows or None
 
 
 class MegabusLostItemAutomation:
-    def __init__(self):
+    def __init__(self, timer: Optional[StepTimer] = None, selectors: Optional[SelectorCascade] = None,
+                 detect_changes: bool = True):
         self.base_url = "https://us.megabus.com"
         self.lost_item_info = {}
+        # Skip the browser when the FAQ and contact pages match the last stored run
+        self.detect_changes = detect_changes
+        # Per-step wall times (browser startup, page load, ...) for benchmarking
+        self.timer = timer or StepTimer()
+        # Fallback selector lists are raced in one query, most precise match first
+        self.selectors = selectors or SelectorCascade('megabus')
         
     async def run(self):
         """Main automation method"""
+        # Detection is off during HAR replay and benchmarks; those runs leave the shared store alone
+        detector = ChangeDetector('megabus_lost_item') if self.detect_changes and detection_enabled() else None
+        if detector:
+            pages = self._previous_pages(detector)
+            if pages:
+                with self.timer.step('change_check'):
+                    unchanged = await asyncio.to_thread(detector.check_http, pages, lost_item_fingerprint)
+                if unchanged:
+                    print("Megabus FAQ unchanged since the last run, reusing its results")
+                    self.lost_item_info = detector.reuse()
+                    return self.lost_item_info
+        
+        info = await self._run_browser()
+        if detector:
+            await self._record(detector)
+        return info
+    
+    def _previous_pages(self, detector):
+        """Help and contact page URLs found by the last stored run"""
+        try:
+            previous = detector.store.get('megabus_lost_item')
+        except KeyError:
+            return []
+        return [url for url in (previous.get('help_page_url'), previous.get('contact_page_url')) if url]
+    
+    async def _record(self, detector):
+        """Store this run and fingerprint the pages it read"""
+        run_id = detector.store.append('megabus_lost_item', self.lost_item_info,
+                                       success=bool(self.lost_item_info.get('content')))
+        if not self.lost_item_info.get('content'):
+            return
+        if not detector.pending:
+            # First run: the page URLs are only known now
+            pages = [self.lost_item_info.get('help_page_url'), self.lost_item_info.get('contact_page_url')]
+            await asyncio.to_thread(detector.check_http, [url for url in pages if url], lost_item_fingerprint)
+        print(describe_changes(detector.commit(run_id, self.lost_item_info)))
+    
+    async def _run_browser(self):
+        """Navigate to the FAQ and contact pages and extract the lost item information"""
         async with async_playwright() as p:
             # Launch browser
+            self.timer.start('browser_startup')
             browser = await p.chromium.launch(headless=True)
             context = await browser.new_context()
+            await attach_har_async(context, 'megabus_lost_item')
+            blocking = await site_profile('megabus').attach_async(context)
             page = await context.new_page()
+            self.timer.stop('browser_startup')
             
             try:
                 # Step 1: Navigate to Megabus homepage
                 print("Step 1: Navigating to Megabus homepage...")
-                await page.goto(self.base_url)
-                await page.wait_for_load_state('networkidle')
+                with self.timer.step('page_load'):
+                    await page.goto(self.base_url)
+                    await page.wait_for_load_state('networkidle')
                 
                 # Step 2: Navigate to Help/FAQ section
                 print("Step 2: Navigating to Help section...")
+                self.timer.start('open_help')
                 await page.click('text=Help')
                 await page.wait_for_load_state('networkidle')
                 
@@ -42,7 +122,10 @@ class MegabusLostItemAutomation:
                 # Wait for the page to fully load
                 await page.wait_for_timeout(2000)
                 
+                self.timer.stop('open_help')
+                
                 # Try multiple selectors to find the lost item button
+                self.timer.start('find_faq')
                 selectors_to_try = [
                     'button:has-text("What do I do if I lost an item on the bus?")',
                     '[aria-expanded]:has-text("What do I do if I lost an item on the bus?")',
@@ -50,26 +133,22 @@ class MegabusLostItemAutomation:
                     'button:has-text("lost an item")'
                 ]
                 
-                lost_item_button = None
-                for selector in selectors_to_try:
-                    try:
-                        lost_item_button = page.locator(selector).first
-                        if await lost_item_button.count() > 0:
-                            print(f"Found button with selector: {selector}")
-                            break
-                    except:
-                        continue
-                
-                if not lost_item_button or await lost_item_button.count() == 0:
+                selector = await self.selectors.resolve_async(page, 'lost_item_button', selectors_to_try)
+                if not selector:
                     raise Exception("Could not find lost item FAQ button")
+                print(f"Found button with selector: {selector}")
+                lost_item_button = page.locator(selector).first
+                self.timer.stop('find_faq')
                 
-                await lost_item_button.click()
-                
-                # Wait for the content to expand
-                await page.wait_for_timeout(2000)
+                with self.timer.step('expand_faq'):
+                    await lost_item_button.click()
+                    
+                    # Wait for the content to expand
+                    await page.wait_for_timeout(2000)
                 
                 # Step 4: Extract the lost item information
                 print("Step 4: Extracting lost item information...")
+                self.timer.start('extraction')
                 
                 # Try to find the expanded content
                 content_selectors = [
@@ -82,15 +161,10 @@ class MegabusLostItemAutomation:
                 content = ""
                 form_link = ""
                 
-                for selector in content_selectors:
-                    try:
-                        lost_item_panel = page.locator(selector).first
-                        if await lost_item_panel.count() > 0:
-                            content = await lost_item_panel.text_content()
-                            print(f"Found content with selector: {selector}")
-                            break
-                    except:
-                        continue
+                selector = await self.selectors.resolve_async(page, 'lost_item_content', content_selectors)
+                if selector:
+                    content = await page.locator(selector).first.text_content() or ""
+                    print(f"Found content with selector: {selector}")
                 
                 # Extract form link - try multiple approaches
                 try:
@@ -112,15 +186,17 @@ class MegabusLostItemAutomation:
                     "form_url": form_link,
                     "help_page_url": page.url
                 }
+                self.timer.stop('extraction')
                 
                 # Step 5: Visit the contact form page to get additional details
                 print("Step 5: Visiting contact form page...")
-                await page.goto(form_link)
-                await page.wait_for_load_state('networkidle')
-                
-                # Extract contact information
-                contact_info = await self.extract_contact_info(page)
-                self.lost_item_info.update(contact_info)
+                with self.timer.step('contact_page'):
+                    await page.goto(form_link)
+                    await page.wait_for_load_state('networkidle')
+                    
+                    # Extract contact information
+                    contact_info = await self.extract_contact_info(page)
+                    self.lost_item_info.update(contact_info)
                 
                 print("✅ Successfully extracted lost item information!")
                 return self.lost_item_info
@@ -129,6 +205,9 @@ class MegabusLostItemAutomation:
                 print(f"❌ Error during automation: {str(e)}")
                 raise
             finally:
+                print(blocking.summary())
+                # The context writes a recorded HAR as it closes
+                await context.close()
                 await browser.close()
     
     async def extract_contact_info(self, page):
@@ -157,7 +236,7 @@ class MegabusLostItemAutomation:
     
     def save_results(self, filename="automation_results.json"):
         """Save the extracted information to a JSON file"""
-        with open(filename, 'w') as f:
+        with self.timer.step('output_write'), open(filename, 'w') as f:
             json.dump(self.lost_item_info, f, indent=2)
         print(f"✅ Results saved to {filename}")
     
@@ -207,7 +286,7 @@ If you lose an item on a Megabus, you need to report it to their lost and found
 ```
 """
         
-        with open(filename, 'w') as f:
+        with self.timer.step('output_write'), open(filename, 'w') as f:
             f.write(markdown_content)
         print(f"✅ Markdown report saved to {filename}")
 
@@ -15,7 +15,7 @@ import tempfile
 import shutil
 
 # Import the automation script
-from megabus_lost_item_automation import MegabusLostItemAutomation
+from megabus_lost_item_automation import MegabusLostItemAutomation, lost_item_fingerprint
 
 
 class TestMegabusAutomation(unittest.TestCase):
@@ -103,6 +103,12 @@ class TestMegabusAutomation(unittest.TestCase):
         # File should not be created when there's no data
         self.assertFalse(os.path.exists(filename))
 
+    def test_fingerprint_needs_server_rendered_answer(self):
+        """Only HTML that carries the answer is fingerprinted over HTTP"""
+        self.assertIsNone(lost_item_fingerprint('<html><body><div id="app"></div><script>x</script></body></html>'))
+        fingerprint = lost_item_fingerprint('<p>Help</p><div>If an item is lost on a bus, fill out the form.</div>')
+        self.assertEqual(fingerprint, ['Help If an item is lost on a bus, fill out the form.'])
+
 
 class TestOutputValidation(unittest.TestCase):
     """Test cases to validate the actual output.md file"""
@@ -1,89 +1,197 @@
 #!/usr/bin/env python3
 """
 Playwright automation script to find Brooklyn neighborhood maps on new.mta.info
+
+Usage:
+    python brooklyn_maps_automation.py                  # Brooklyn, written to output.md
+    python brooklyn_maps_automation.py --all-boroughs   # all five, written to neighborhood_maps.md
 """
 
 import asyncio
+import os
 import re
-from playwright.async_api import async_playwright
+import sys
+from urllib.parse import urljoin
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from automation_core.browser_pool import async_browser_context
+from automation_core.change_detection import ChangeDetector, describe_changes, detection_enabled
+from automation_core.har_fixtures import attach_har_async
+from automation_core.http_first import fetch_http_first_async, parse_page
+from automation_core.resource_blocking import site_profile
+from automation_core.timing import StepTimer
+
+MAPS_BASE_URL = "https://new.mta.info/maps/neighborhood-maps"
+BOROUGHS = ('bronx', 'brooklyn', 'manhattan', 'queens', 'staten-island')
+MAPS_URL = f"{MAPS_BASE_URL}/brooklyn"
+
+# A station label carries at least one line bullet such as (F) or (SIR)
+SUBWAY_LINE_PATTERN = re.compile(r'\((?:[A-GJLMNQRSWZ1-7]|SIR)\)')
+DOWNLOAD_ICON_PATTERN = re.compile(r'\s*\ue900\s*$')
+DOWNLOAD_HREF_PATTERN = re.compile(r'\.pdf(\?|#|$)', re.IGNORECASE)
+
+# Every button plus download links in one round trip: label and the PDF it points at
+HARVEST_MAP_BUTTONS_JS = r"""
+() => {
+    const isDownload = (a) => a.hasAttribute('download') || /\.pdf(\?|#|$)/i.test(a.href);
+    const items = [];
+    for (const el of document.querySelectorAll('button, a[href]')) {
+        let href = null;
+        if (el.tagName === 'A') {
+            if (!isDownload(el)) continue;
+            href = el.href;
+        } else {
+            const link = el.closest('a[href]') || el.querySelector('a[href]');
+            const raw = (link && link.getAttribute('href')) || el.getAttribute('data-href') || el.getAttribute('data-url');
+            href = raw ? new URL(raw, document.baseURI).href : null;
+        }
+        items.push({text: el.textContent || '', href});
+    }
+    return items;
+}
+"""
+
+
+def maps_url(borough):
+    return f"{MAPS_BASE_URL}/{borough}"
+
 
+def clean_station_name(text):
+    """Button text without the download icon, or None if it isn't a station with subway lines"""
+    if not text or not text.strip():
+        return None
+    clean_text = DOWNLOAD_ICON_PATTERN.sub('', text.strip())
+    return clean_text if SUBWAY_LINE_PATTERN.search(clean_text) else None
 
-async def get_brooklyn_neighborhood_maps():
+
+def station_maps(items):
+    """``[{name, href}]`` for harvested ``{text, href}`` items that are stations, first occurrence kept"""
+    maps = {}
+    for item in items:
+        name = clean_station_name(item.get('text'))
+        if name:
+            entry = maps.setdefault(name, {'name': name, 'href': None})
+            entry['href'] = entry['href'] or item.get('href')
+    return list(maps.values())
+
+
+def maps_from_page(page):
+    """Station maps from the server-rendered buttons of the maps page, paired with their download links"""
+    # A button wrapped in its download link shows up as both, with the same text
+    links = [{'text': link['text'], 'href': urljoin(page.url, link['href'])}
+             for link in page.links if DOWNLOAD_HREF_PATTERN.search(link['href'])]
+    return {'maps': station_maps([{'text': text, 'href': None} for text in page.buttons] + links)}
+
+
+def maps_fingerprint(html):
+    """Only the station list counts as a change, not the rest of the page"""
+    maps = maps_from_page(parse_page(html))
+    # A client-rendered page has no station buttons yet: unknown, not unchanged
+    return maps if maps['maps'] else None
+
+
+async def get_brooklyn_neighborhood_maps(pool=None, timer=None, http_first=True, detect_changes=True):
     """
     Automate the process of finding Brooklyn neighborhood maps on MTA website
     Returns a list of neighborhood map names
+    
+    Pass an AsyncBrowserPool to reuse a warm browser instead of launching one,
+    and a StepTimer to record per-step wall times. With http_first the page is
+    first read over plain HTTP and the browser only starts if that finds nothing.
+    With detect_changes a conditional GET decides whether the stored maps of the
+    last run can be returned without extracting anything.
+    """
+    maps = await get_neighborhood_maps(('brooklyn',), pool, timer, http_first, detect_changes)
+    return [entry['name'] for entry in maps['brooklyn']]
+
+
+async def get_neighborhood_maps(boroughs=BOROUGHS, pool=None, timer=None, http_first=True, detect_changes=True):
+    """
+    Neighborhood maps of several boroughs in one run: ``{borough: [{name, href}]}``
+    
+    Unchanged boroughs reuse their stored maps, the rest are read over HTTP
+    where possible, and whatever is left is harvested from one browser context
+    with a page per borough, all concurrently.
     """
-    async with async_playwright() as p:
-        # Launch browser
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
+    timer = timer or StepTimer()
+    boroughs = list(boroughs)
+    found = {}
+    # Detection is off during HAR replay and benchmarks; those runs leave the shared store alone
+    detect_changes = detect_changes and detection_enabled()
+    detectors = {borough: ChangeDetector(f'mta_maps_{borough}') for borough in boroughs} if detect_changes else {}
+    
+    if detectors:
+        with timer.step('change_check'):
+            unchanged = await asyncio.gather(*(
+                asyncio.to_thread(detectors[borough].check_http, [maps_url(borough)], normalize=maps_fingerprint)
+                for borough in boroughs))
+        for borough, same in zip(boroughs, unchanged):
+            if same:
+                found[borough] = detectors[borough].reuse()['maps']
+                print(f"{borough.title()} maps unchanged since the last run, reusing {len(found[borough])} stored maps")
+    
+    fresh = {}
+    pending = [borough for borough in boroughs if borough not in found]
+    if http_first and pending:
+        with timer.step('http_first'):
+            fetched = await asyncio.gather(*(
+                fetch_http_first_async(maps_url(borough), maps_from_page, required=['maps']) for borough in pending))
+        for borough, result in zip(pending, fetched):
+            if result['success']:
+                fresh[borough] = result['data']['maps']
+                print(f"Found {len(fresh[borough])} {borough.title()} neighborhood maps over HTTP "
+                      f"in {result['http_ms']:.0f} ms")
+        pending = [borough for borough in pending if borough not in fresh]
+    
+    if pending:
+        fresh.update(await _harvest_in_browser(pending, pool, timer))
+    
+    for borough, maps in fresh.items():
+        if borough in detectors and maps:
+            result = {'url': maps_url(borough), 'maps': maps, 'total': len(maps)}
+            run_id = detectors[borough].store.append(f'mta_maps_{borough}', result, records=maps)
+            print(describe_changes(detectors[borough].commit(run_id, result)))
+    found.update(fresh)
+    return {borough: found.get(borough, []) for borough in boroughs}
+
+
+async def _harvest_in_browser(boroughs, pool, timer):
+    """Open every borough's page in one context and harvest its buttons with a single evaluate each"""
+    # Per-borough step names only when pages overlap, so single-borough timings keep their names
+    step = (lambda name, borough: name) if len(boroughs) == 1 else (lambda name, borough: f'{name}:{borough}')
+    
+    timer.start('browser_startup')
+    async with async_browser_context(pool, headless=True) as context:
+        await attach_har_async(context, 'mta_brooklyn_maps' if boroughs == ['brooklyn'] else 'mta_neighborhood_maps')
+        # Only button text is needed: skip images, fonts, styles and trackers
+        blocking = await site_profile('mta').attach_async(context)
+        timer.stop('browser_startup')
         
-        try:
-            # Navigate directly to Brooklyn neighborhood maps page
-            print("Navigating directly to Brooklyn neighborhood maps...")
-            await page.goto("https://new.mta.info/maps/neighborhood-maps/brooklyn")
-            await page.wait_for_load_state('networkidle')
-            
-            # Wait for the page to load completely
-            await page.wait_for_timeout(3000)
-            
-            # Try different selectors to find the map buttons
-            print("Extracting Brooklyn neighborhood maps...")
-            
-            # First try to find buttons with specific text patterns
-            all_buttons = await page.query_selector_all('button')
-            
-            neighborhood_maps = []
-            for button in all_buttons:
-                # Get the text content of each button
-                text = await button.text_content()
-                if text and text.strip():
-                    # Clean up the text (remove download icon and extra whitespace)
-                    clean_text = re.sub(r'\s*\ue900\s*$', '', text.strip())
-                    # Check if it looks like a station name with subway lines
-                    if clean_text and '(' in clean_text and ')' in clean_text:
-                        # Additional check to ensure it's a station name
-                        if any(line in clean_text for line in ['(A)', '(B)', '(C)', '(D)', '(E)', '(F)', '(G)', '(J)', '(L)', '(M)', '(N)', '(Q)', '(R)', '(S)', '(Z)', '(1)', '(2)', '(3)', '(4)', '(5)', '(6)', '(7)']):
-                            neighborhood_maps.append(clean_text)
-            
-            # If no buttons found, try alternative approach
-            if not neighborhood_maps:
-                print("No buttons found, trying alternative selectors...")
-                # Try to get all text content and parse it
-                page_content = await page.content()
-                
-                # Look for station patterns in the page content
-                station_pattern = r'([^<>]+\([A-Z0-9\)\(]+\))'
-                matches = re.findall(station_pattern, page_content)
-                
-                for match in matches:
-                    clean_match = re.sub(r'\s*\ue900\s*$', '', match.strip())
-                    # Filter out non-station content
-                    if (clean_match and len(clean_match) > 3 and 
-                        not clean_match.startswith('window.') and
-                        not clean_match.startswith('function') and
-                        not 'dataLayer' in clean_match and
-                        not 'gtag' in clean_match and
-                        len(clean_match) < 100):  # Station names shouldn't be too long
-                        neighborhood_maps.append(clean_match)
-            
-            # Remove duplicates while preserving order
-            seen = set()
-            unique_maps = []
-            for map_name in neighborhood_maps:
-                if map_name not in seen:
-                    seen.add(map_name)
-                    unique_maps.append(map_name)
-            
-            print(f"Found {len(unique_maps)} Brooklyn neighborhood maps")
-            return unique_maps
-            
-        except Exception as e:
-            print(f"Error occurred: {e}")
-            return []
+        async def harvest(borough):
+            page = await context.new_page()
+            try:
+                with timer.step(step('page_load', borough)):
+                    print(f"Navigating to {borough.title()} neighborhood maps...")
+                    await page.goto(maps_url(borough))
+                    await page.wait_for_load_state('networkidle')
+                    # Give client-rendered buttons time to appear, as before
+                    await page.wait_for_timeout(3000)
+                with timer.step(step('extraction', borough)):
+                    maps = station_maps(await page.evaluate(HARVEST_MAP_BUTTONS_JS))
+                print(f"Found {len(maps)} {borough.title()} neighborhood maps")
+                return maps
+            except Exception as e:
+                print(f"Error occurred for {borough}: {e}")
+                return []
+            finally:
+                await page.close()
         
-        finally:
-            await browser.close()
+        harvested = await asyncio.gather(*(harvest(borough) for borough in boroughs))
+        print(blocking.summary())
+    return dict(zip(boroughs, harvested))
 
 
 async def save_results_to_file(maps_list, filename="output.md"):
@@ -115,10 +223,35 @@ The following neighborhood maps are available for Brooklyn on the MTA website:
     print(f"Results saved to {filename}")
 
 
+async def save_all_results_to_file(maps_by_borough, filename="neighborhood_maps.md"):
+    """
+    Save the maps of several boroughs to one markdown file
+    """
+    content = "# Neighborhood Maps - MTA\n"
+    for borough, maps in maps_by_borough.items():
+        content += f"\n## {borough.replace('-', ' ').title()} ({len(maps)} maps)\n\n**Website:** {maps_url(borough)}\n\n"
+        for i, entry in enumerate(maps, 1):
+            content += f"{i}. [{entry['name']}]({entry['href']})\n" if entry['href'] else f"{i}. {entry['name']}\n"
+    content += f"\n**Total:** {sum(len(maps) for maps in maps_by_borough.values())} neighborhood maps\n"
+    
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write(content)
+    
+    print(f"Results saved to {filename}")
+
+
 async def main():
     """
     Main function to run the automation
     """
+    if '--all-boroughs' in sys.argv[1:]:
+        print("Starting neighborhood maps automation for all boroughs...")
+        maps_by_borough = await get_neighborhood_maps()
+        await save_all_results_to_file(maps_by_borough)
+        for borough, maps in maps_by_borough.items():
+            print(f"- {borough.replace('-', ' ').title()}: {len(maps)} maps")
+        return maps_by_borough
+    
     print("Starting Brooklyn neighborhood maps automation...")
     
     # Get the list of neighborhood maps
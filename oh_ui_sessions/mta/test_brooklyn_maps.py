@@ -6,7 +6,27 @@ Test script to verify the Brooklyn neighborhood maps automation
 import asyncio
 import os
 import sys
-from brooklyn_maps_automation import get_brooklyn_neighborhood_maps, save_results_to_file
+import tempfile
+from contextlib import asynccontextmanager
+from unittest import mock
+import brooklyn_maps_automation
+from brooklyn_maps_automation import (HARVEST_MAP_BUTTONS_JS, get_brooklyn_neighborhood_maps, get_neighborhood_maps,
+                                      maps_fingerprint, maps_url, save_all_results_to_file, save_results_to_file,
+                                      station_maps)
+from automation_core.http_first import parse_page
+from automation_core.result_store import RESULT_STORE_ENV
+
+_store_dir = tempfile.TemporaryDirectory()
+# Keep test runs out of the real result store
+_store_env = mock.patch.dict(os.environ, {RESULT_STORE_ENV: os.path.join(_store_dir.name, 'results.sqlite')})
+
+
+def setup_module(module):
+    _store_env.start()
+
+
+def teardown_module(module):
+    _store_env.stop()
 
 
 def test_output_file_exists():
@@ -120,6 +140,113 @@ def test_specific_stations():
         f"Should find at least 80% of key stations, found {found_stations}"
 
 
+def test_station_filter():
+    """Test that harvested buttons are filtered to stations and deduplicated, keeping download links"""
+    items = [
+        {'text': 'Menu', 'href': None},
+        {'text': '4 Av-9 St (F)(G) \ue900', 'href': None},
+        {'text': '4 Av-9 St (F)(G)', 'href': 'https://new.mta.info/maps/4-av.pdf'},
+        {'text': 'Feedback (opens survey)', 'href': None},
+        {'text': 'St George (SIR)', 'href': None},
+    ]
+    assert station_maps(items) == [
+        {'name': '4 Av-9 St (F)(G)', 'href': 'https://new.mta.info/maps/4-av.pdf'},
+        {'name': 'St George (SIR)', 'href': None},
+    ]
+    print("✓ Station filter works")
+
+
+def test_maps_fingerprint_needs_stations():
+    """A page without server-rendered station buttons has no fingerprint"""
+    assert maps_fingerprint('<html><body><div id="root"></div></body></html>') is None
+    assert maps_fingerprint('<button>4 Av-9 St (F)(G)</button>') == {'maps': [{'name': '4 Av-9 St (F)(G)', 'href': None}]}
+    print("✓ Station fingerprint ignores empty shells")
+
+
+BROOKLYN_HTML = """
+<a href="/maps/4-av.pdf" download><button>4 Av-9 St (F)(G) \ue900</button></a>
+<button>St George (SIR)</button>
+<a href="/about">About (MTA)</a>
+"""
+
+
+class FakeMapsPage:
+    """Stands in for a Playwright page of a client-rendered borough"""
+
+    def __init__(self, opened):
+        self.opened = opened
+        self.closed = False
+
+    async def goto(self, url, **kwargs):
+        self.opened.append(url)
+
+    async def wait_for_load_state(self, state, **kwargs):
+        pass
+
+    async def wait_for_timeout(self, ms):
+        pass
+
+    async def evaluate(self, script):
+        assert script == HARVEST_MAP_BUTTONS_JS
+        return [{'text': 'Menu', 'href': None},
+                {'text': 'Flushing-Main St (7)', 'href': 'https://new.mta.info/maps/flushing.pdf'}]
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeMapsContext:
+    def __init__(self):
+        self.opened = []
+        self.pages = []
+
+    async def new_page(self):
+        self.pages.append(FakeMapsPage(self.opened))
+        return self.pages[-1]
+
+    async def route(self, pattern, handler):
+        pass
+
+    def on(self, event, handler):
+        pass
+
+
+def test_neighborhood_maps_with_fake_pages():
+    """Server-rendered boroughs are read over HTTP with their links, the rest in one browser context"""
+    context = FakeMapsContext()
+
+    @asynccontextmanager
+    async def fake_browser_context(pool, headless=True):
+        yield context
+
+    async def fake_fetch(url, extract, required=()):
+        if url != maps_url('brooklyn'):
+            return {'success': False, 'data': {'maps': []}, 'http_ms': 5.0}
+        return {'success': True, 'data': extract(parse_page(BROOKLYN_HTML, url)), 'http_ms': 5.0}
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            mock.patch.object(brooklyn_maps_automation, 'fetch_http_first_async', fake_fetch), \
+            mock.patch.object(brooklyn_maps_automation, 'async_browser_context', fake_browser_context):
+        maps = asyncio.run(get_neighborhood_maps(('brooklyn', 'queens'), detect_changes=False))
+        path = os.path.join(tmp, 'neighborhood_maps.md')
+        asyncio.run(save_all_results_to_file(maps, path))
+        with open(path, encoding='utf-8') as f:
+            content = f.read()
+
+    assert maps['brooklyn'] == [
+        {'name': '4 Av-9 St (F)(G)', 'href': 'https://new.mta.info/maps/4-av.pdf'},
+        {'name': 'St George (SIR)', 'href': None},
+    ]
+    assert maps['queens'] == [{'name': 'Flushing-Main St (7)', 'href': 'https://new.mta.info/maps/flushing.pdf'}]
+    # Only the borough HTTP could not read was opened in the browser
+    assert context.opened == [maps_url('queens')]
+    assert all(page.closed for page in context.pages)
+    assert '1. [4 Av-9 St (F)(G)](https://new.mta.info/maps/4-av.pdf)' in content
+    assert '2. St George (SIR)' in content
+    assert '**Total:** 3 neighborhood maps' in content
+    print("✓ Neighborhood maps harvested from fake pages")
+
+
 async def run_all_tests():
     """Run all tests"""
     print("Running Brooklyn neighborhood maps tests...\n")
@@ -160,5 +287,6 @@ if __name__ == "__main__":
         os.system("playwright install chromium")
     
     # Run tests
-    success = asyncio.run(run_all_tests())
+    with _store_env:
+        success = asyncio.run(run_all_tests())
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -5,14 +5,28 @@ Automates searching for Human Resources jobs in Miami, Florida on Target's caree
 """
 
 import asyncio
+import os
+import sys
 import time
-from playwright.async_api import async_playwright
 from typing import List, Dict, Optional
 
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from automation_core.browser_pool import AsyncBrowserPool, async_browser_context
+from automation_core.har_fixtures import attach_har_async
+from automation_core.timing import StepTimer
+
 
 class TargetJobSearchAutomation:
-    def __init__(self, headless: bool = True):
+    def __init__(self, headless: bool = True, pool: Optional[AsyncBrowserPool] = None,
+                 timer: Optional[StepTimer] = None):
         self.headless = headless
+        # Optional shared browser pool; without one a private browser is launched
+        self.pool = pool
+        # Per-step wall times (browser startup, page load, ...) for benchmarking
+        self.timer = timer or StepTimer()
         self.base_url = "https://www.target.com/"
         self.careers_url = "https://corporate.target.com/careers"
         
@@ -27,26 +41,29 @@ class TargetJobSearchAutomation:
         Returns:
             Dictionary containing search results and metadata
         """
-        async with async_playwright() as p:
-            # Launch browser
-            browser = await p.chromium.launch(headless=self.headless)
-            context = await browser.new_context()
+        self.timer.start('browser_startup')
+        async with async_browser_context(self.pool, headless=self.headless) as context:
+            await attach_har_async(context, 'target_job_search')
             page = await context.new_page()
+            self.timer.stop('browser_startup')
             
             try:
-                # Navigate to Target homepage
-                print(f"Navigating to {self.base_url}")
-                await page.goto(self.base_url)
-                await page.wait_for_load_state('networkidle')
-                
-                # Navigate to careers page
-                print(f"Navigating to careers page: {self.careers_url}")
-                await page.goto(self.careers_url)
-                await page.wait_for_load_state('networkidle')
+                with self.timer.step('page_load'):
+                    # Navigate to Target homepage
+                    print(f"Navigating to {self.base_url}")
+                    await page.goto(self.base_url)
+                    await page.wait_for_load_state('networkidle')
                 
-                # Wait for the job search form to be visible
-                await page.wait_for_selector('input[placeholder*="Job title"], input[placeholder*="keyword"]', timeout=30000)
+                with self.timer.step('careers_page'):
+                    # Navigate to careers page
+                    print(f"Navigating to careers page: {self.careers_url}")
+                    await page.goto(self.careers_url)
+                    await page.wait_for_load_state('networkidle')
+                    
+                    # Wait for the job search form to be visible
+                    await page.wait_for_selector('input[placeholder*="Job title"], input[placeholder*="keyword"]', timeout=30000)
                 
+                self.timer.start('fill_search_form')
                 # Fill in the job title field
                 print(f"Entering job title: {job_title}")
                 job_title_input = page.locator('input[placeholder*="Job title"], input[placeholder*="keyword"]').first
@@ -68,17 +85,21 @@ class TargetJobSearchAutomation:
                     await miami_option.click()
                     print("Selected Miami, FL from dropdown")
                 
-                # Click search button
-                print("Clicking search button")
-                search_button = page.locator('button:has-text("Search jobs")').first
-                await search_button.click()
+                self.timer.stop('fill_search_form')
                 
-                # Wait for results page to load
-                await page.wait_for_load_state('networkidle')
-                await page.wait_for_selector('h1:has-text("results for")', timeout=10000)
+                with self.timer.step('search_results'):
+                    # Click search button
+                    print("Clicking search button")
+                    search_button = page.locator('button:has-text("Search jobs")').first
+                    await search_button.click()
+                    
+                    # Wait for results page to load
+                    await page.wait_for_load_state('networkidle')
+                    await page.wait_for_selector('h1:has-text("results for")', timeout=10000)
                 
                 # Extract search results
-                results = await self._extract_job_results(page)
+                with self.timer.step('extraction'):
+                    results = await self._extract_job_results(page)
                 
                 # Get current URL
                 current_url = page.url
@@ -100,9 +121,6 @@ class TargetJobSearchAutomation:
                     'error': str(e),
                     'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
                 }
-                
-            finally:
-                await browser.close()
     
     async def _extract_job_results(self, page) -> Dict:
         """Extract job results from the search results page."""